@@ -31,7 +31,8 @@ def quantize_shares(
     :param asset_id_to_decimals: a dict with asset ids as keys and the number
         of decimal places to round the corresponding shares to as values
     """
-    _LOG.debug("`shares` before quantization=\n%s", hpandas.df_to_str(shares))
+    if _LOG.isEnabledFor(logging.DEBUG):
+        _LOG.debug("`shares` before quantization=\n%s", hpandas.df_to_str(shares))
     # Perform sanity-checks.
     hdbg.dassert_type_in(shares, [pd.Series, pd.DataFrame])
     #
@@ -72,5 +73,6 @@ def quantize_shares(
         if isinstance(shares, pd.Series):
             quantized_shares = quantized_shares.squeeze()
             quantized_shares.name = shares.name
-    _LOG.debug("`quantized_shares`=\n%s", hpandas.df_to_str(quantized_shares))
+    if _LOG.isEnabledFor(logging.DEBUG):
+        _LOG.debug("`quantized_shares`=\n%s", hpandas.df_to_str(quantized_shares))
     return quantized_shares
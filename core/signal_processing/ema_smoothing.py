@@ -6,10 +6,11 @@ import core.signal_processing.ema_smoothing as cspremsm
 
 import functools
 import logging
-from typing import Any, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
+import scipy as sp
 
 import core.signal_processing.fir_utils as csprfiut
 import core.signal_processing.special_functions as csprspfu
@@ -106,7 +107,7 @@ def compute_smooth_derivative(
     _LOG.debug("tau2 = %0.2f", tau2)
 
     def order_one(
-        signal: Union[pd.DataFrame, pd.Series]
+        signal: Union[pd.DataFrame, pd.Series],
     ) -> Union[pd.DataFrame, pd.Series]:
         s1 = compute_ema(signal, tau1, min_periods, 1)
         s2 = compute_ema(signal, tau1, min_periods, 2)
@@ -153,6 +154,368 @@ def compute_smooth_moving_average(
     return sum(map(ema_eval, range(min_depth, max_depth + 1))) / denom
 
 
+# #############################################################################
+# EMA smoothing on NumPy arrays
+# #############################################################################
+
+
+# Parameter with a scalar value or one value per column of a 2D array.
+ColumnParam = Union[float, np.ndarray]
+
+
+def _broadcast_column_param(param: ColumnParam, num_cols: int) -> np.ndarray:
+    """
+    Return a 1D array with the value of `param` for each column.
+    """
+    param = np.asarray(param)
+    if param.ndim == 0:
+        param = np.full(num_cols, param)
+    hdbg.dassert_eq(param.shape, (num_cols,))
+    return param
+
+
+def _compute_ema_stage_on_array(
+    values: np.ndarray, taus: np.ndarray, min_periods: np.ndarray
+) -> np.ndarray:
+    """
+    Apply one EMA to each column of `values`.
+
+    The result is the same as `df.ewm(com=com, adjust=True,
+    ignore_na=False).mean()`, computed as the ratio of the exponentially
+    weighted sum of the observations and of the weights. The sums are computed
+    with a linear filter on all the columns with the same tau at once.
+
+    :param values: 2D array
+    :param taus: tau of each column
+    :param min_periods: `min_periods` of each column
+    :return: 2D array with the EMA of each column
+    """
+    is_observation = ~np.isnan(values)
+    observations = np.where(is_observation, values, 0.0)
+    weights = is_observation.astype(float)
+    weighted_sums = np.empty_like(observations)
+    weight_sums = np.empty_like(weights)
+    for tau in np.unique(taus):
+        mask = taus == tau
+        com = csprspfu.calculate_com_from_tau(tau)
+        # Compute the decay factor like pandas does.
+        alpha = 1.0 / (1.0 + com)
+        old_wt_factor = 1.0 - alpha
+        a = [1.0, -old_wt_factor]
+        weighted_sums[:, mask] = sp.signal.lfilter(
+            [1.0], a, observations[:, mask], axis=0
+        )
+        weight_sums[:, mask] = sp.signal.lfilter(
+            [1.0], a, weights[:, mask], axis=0
+        )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ema = weighted_sums / weight_sums
+    # Like in pandas, at least one observation is needed to emit a value.
+    nobs = np.cumsum(is_observation, axis=0)
+    ema[nobs < np.maximum(min_periods, 1)] = np.nan
+    return ema
+
+
+def compute_smooth_moving_average_on_array(
+    values: np.ndarray,
+    tau: ColumnParam,
+    min_periods: ColumnParam = 0,
+    min_depth: int = 1,
+    max_depth: int = 1,
+    skip_nans: bool = False,
+) -> np.ndarray:
+    """
+    Compute `compute_smooth_moving_average()` on all the columns of a 2D array.
+
+    The columns are processed at once without building any pandas object, and
+    each column can have its own `tau` and `min_periods`.
+
+    :param values: 2D array with one column per signal
+    :param tau, min_periods: as in `compute_smooth_moving_average()`, either
+        the same for all the columns or a 1D array with one value per column
+    :param min_depth, max_depth: as in `compute_smooth_moving_average()`
+    :param skip_nans: if `True`, process each column as if its NaNs were
+        dropped, i.e., like calling `compute_smooth_moving_average()` on
+        `srs.dropna()` and reindexing the result like `srs`
+    :return: 2D array with the smooth moving average of each column
+    """
+    hdbg.dassert_eq(values.ndim, 2)
+    hdbg.dassert_isinstance(min_depth, int)
+    hdbg.dassert_isinstance(max_depth, int)
+    hdbg.dassert_lte(1, min_depth)
+    hdbg.dassert_lte(min_depth, max_depth)
+    num_cols = values.shape[1]
+    taus = _broadcast_column_param(tau, num_cols).astype(float)
+    hdbg.dassert((taus > 0).all(), "Invalid tau=%s", taus)
+    min_periods = _broadcast_column_param(min_periods, num_cols)
+    values = values.astype(float)
+    if skip_nans:
+        # Move the non-NaN values of each column to the top of the array,
+        # preserving their order. The NaNs at the bottom don't affect the
+        # values above them.
+        is_nan = np.isnan(values)
+        order = np.argsort(is_nan, axis=0, kind="stable")
+        values = np.take_along_axis(values, order, axis=0)
+    emas = []
+    ema = values
+    for _ in range(max_depth):
+        # The output of each EMA, including the NaNs during the warm-up period,
+        # is the input of the next one.
+        ema = _compute_ema_stage_on_array(ema, taus, min_periods)
+        emas.append(ema)
+    denom = float(max_depth - min_depth + 1)
+    sma = sum(emas[min_depth - 1 :]) / denom
+    if skip_nans:
+        # Restore the original order, setting the dropped values to NaN.
+        sma[np.take_along_axis(is_nan, order, axis=0)] = np.nan
+        out = np.empty_like(sma)
+        np.put_along_axis(out, order, sma, axis=0)
+        sma = out
+    return sma
+
+
+# #############################################################################
+# Incremental EMA smoothing
+# #############################################################################
+
+
+# State of an incremental computation that is carried from one call to the next
+# one, e.g., the partial weights of the EMAs.
+IncrementalState = Dict[str, Any]
+
+
+def _get_ema_stage_state(num_cols: int) -> Dict[str, np.ndarray]:
+    """
+    Return the state of an EMA that has not seen any observation.
+    """
+    state = {
+        "weighted": np.full(num_cols, np.nan),
+        "old_wt": np.ones(num_cols),
+        "nobs": np.zeros(num_cols, dtype=int),
+    }
+    return state
+
+
+def _update_ema_stage(
+    values: np.ndarray,
+    com: float,
+    min_periods: int,
+    state: Dict[str, np.ndarray],
+) -> np.ndarray:
+    """
+    Apply one EMA to the rows of `values` starting from `state`.
+
+    The recursion is the same as `df.ewm(com=com, adjust=True,
+    ignore_na=False).mean()` so that processing the rows in multiple calls
+    gives the same result as processing all of them at once.
+
+    :param values: 2D array with the new rows
+    :param state: state of the EMA, updated in place
+    :return: 2D array with the EMA for the new rows
+    """
+    alpha = 1.0 / (1.0 + com)
+    old_wt_factor = 1.0 - alpha
+    # Like in pandas, at least one observation is needed to emit a value.
+    min_periods = max(min_periods, 1)
+    weighted = state["weighted"]
+    old_wt = state["old_wt"]
+    nobs = state["nobs"]
+    out = np.empty_like(values)
+    for i in range(values.shape[0]):
+        cur = values[i]
+        is_observation = ~np.isnan(cur)
+        nobs = nobs + is_observation
+        has_weighted = ~np.isnan(weighted)
+        # Decay the weight of the past observations.
+        old_wt = np.where(has_weighted, old_wt * old_wt_factor, old_wt)
+        # Add the new observation.
+        mask = has_weighted & is_observation
+        # Avoid numerical errors on constant series, like pandas does.
+        update_mask = mask & (weighted != cur)
+        with np.errstate(invalid="ignore"):
+            weighted = np.where(
+                update_mask,
+                (old_wt * weighted + 1.0 * cur) / (old_wt + 1.0),
+                weighted,
+            )
+        old_wt = np.where(mask, old_wt + 1.0, old_wt)
+        # Initialize with the first observation.
+        weighted = np.where(~has_weighted & is_observation, cur, weighted)
+        out[i] = np.where(nobs >= min_periods, weighted, np.nan)
+    state["weighted"] = weighted
+    state["old_wt"] = old_wt
+    state["nobs"] = nobs
+    return out
+
+
+def _compute_ema_stages_incrementally(
+    signal: Union[pd.DataFrame, pd.Series],
+    tau: float,
+    min_periods: int,
+    max_depth: int,
+    state: Optional[IncrementalState],
+) -> Tuple[List[Union[pd.DataFrame, pd.Series]], IncrementalState]:
+    """
+    Compute the iterated EMAs of depth 1, ..., `max_depth` incrementally.
+
+    :return: list with the EMA of each depth and the updated state
+    """
+    hdbg.dassert_isinstance(max_depth, int)
+    hdbg.dassert_lte(1, max_depth)
+    hdbg.dassert_lt(0, tau)
+    is_series = isinstance(signal, pd.Series)
+    values = signal.to_frame().values if is_series else signal.values
+    values = values.astype(float)
+    if state is None:
+        state = {
+            "tau": tau,
+            "min_periods": min_periods,
+            "stages": [
+                _get_ema_stage_state(values.shape[1]) for _ in range(max_depth)
+            ],
+        }
+    hdbg.dassert_eq(state["tau"], tau)
+    hdbg.dassert_eq(state["min_periods"], min_periods)
+    hdbg.dassert_eq(len(state["stages"]), max_depth)
+    hdbg.dassert_eq(state["stages"][0]["weighted"].shape[0], values.shape[1])
+    com = csprspfu.calculate_com_from_tau(tau)
+    emas = []
+    for stage_state in state["stages"]:
+        # The output of each EMA, including the NaNs during the warm-up period,
+        # is the input of the next one.
+        values = _update_ema_stage(values, com, min_periods, stage_state)
+        if is_series:
+            ema = pd.Series(values[:, 0], index=signal.index, name=signal.name)
+        else:
+            ema = pd.DataFrame(values, index=signal.index, columns=signal.columns)
+        emas.append(ema)
+    return emas, state
+
+
+def compute_ema_incrementally(
+    signal: Union[pd.DataFrame, pd.Series],
+    tau: float,
+    min_periods: int,
+    depth: int = 1,
+    state: Optional[IncrementalState] = None,
+) -> Tuple[Union[pd.DataFrame, pd.Series], IncrementalState]:
+    """
+    Compute `compute_ema()` on new rows of a signal, given the previous state.
+
+    Calling this function on consecutive chunks of a signal, passing the
+    returned state to the next call, gives the same result as calling
+    `compute_ema()` on the entire signal, with a cost proportional to the
+    number of new rows.
+
+    :param signal: new rows of the signal
+    :param tau, min_periods, depth: as in `compute_ema()`
+    :param state: state returned by the previous call or `None` for the first
+        chunk
+    :return: EMA for the new rows and updated state
+    """
+    emas, state = _compute_ema_stages_incrementally(
+        signal, tau, min_periods, depth, state
+    )
+    return emas[-1], state
+
+
+def compute_smooth_moving_average_incrementally(
+    signal: Union[pd.DataFrame, pd.Series],
+    tau: float,
+    min_periods: int = 0,
+    min_depth: int = 1,
+    max_depth: int = 1,
+    state: Optional[IncrementalState] = None,
+) -> Tuple[Union[pd.DataFrame, pd.Series], IncrementalState]:
+    """
+    Compute `compute_smooth_moving_average()` on new rows of a signal.
+
+    Same interface as `compute_ema_incrementally()`.
+    """
+    hdbg.dassert_isinstance(min_depth, int)
+    hdbg.dassert_lte(1, min_depth)
+    hdbg.dassert_lte(min_depth, max_depth)
+    emas, state = _compute_ema_stages_incrementally(
+        signal, tau, min_periods, max_depth, state
+    )
+    denom = float(max_depth - min_depth + 1)
+    return sum(emas[min_depth - 1 :]) / denom, state
+
+
+def _shift_incrementally(
+    signal: Union[pd.DataFrame, pd.Series],
+    delay: int,
+    state: IncrementalState,
+    key: str,
+) -> Union[pd.DataFrame, pd.Series]:
+    """
+    Shift the new rows of a signal using the last `delay` rows of the previous
+    chunks stored in `state[key]`.
+    """
+    if delay == 0:
+        return signal
+    num_new_rows = len(signal)
+    prev_signal = state.get(key)
+    if prev_signal is not None:
+        signal = pd.concat([prev_signal, signal])
+    state[key] = signal.iloc[-delay:]
+    shifted = signal.shift(delay).iloc[len(signal) - num_new_rows :]
+    return shifted
+
+
+def compute_rolling_zscore_incrementally(
+    signal: Union[pd.DataFrame, pd.Series],
+    tau: float,
+    min_periods: int = 0,
+    min_depth: int = 1,
+    max_depth: int = 1,
+    p_moment: float = 2,
+    demean: bool = True,
+    delay: int = 0,
+    atol: float = 0,
+    state: Optional[IncrementalState] = None,
+) -> Tuple[Union[pd.DataFrame, pd.Series], IncrementalState]:
+    """
+    Compute `compute_rolling_zscore()` on new rows of a signal.
+
+    Same interface as `compute_ema_incrementally()`.
+    """
+    hdbg.dassert_lte(0, delay)
+    if state is None:
+        state = {"ma": None, "norm": None}
+    if demean:
+        signal_ma, state["ma"] = compute_smooth_moving_average_incrementally(
+            signal, tau, min_periods, min_depth, max_depth, state=state["ma"]
+        )
+        signal_p, state["norm"] = compute_smooth_moving_average_incrementally(
+            np.abs(signal - signal_ma) ** p_moment,
+            tau,
+            min_periods,
+            min_depth,
+            max_depth,
+            state=state["norm"],
+        )
+        numerator = signal - _shift_incrementally(
+            signal_ma, delay, state, "ma_tail"
+        )
+    else:
+        signal_p, state["norm"] = compute_smooth_moving_average_incrementally(
+            np.abs(signal) ** p_moment,
+            tau,
+            min_periods,
+            min_depth,
+            max_depth,
+            state=state["norm"],
+        )
+        numerator = signal
+    signal_std = signal_p ** (1.0 / p_moment)
+    denominator = _shift_incrementally(signal_std, delay, state, "std_tail")
+    denominator = denominator.copy()
+    denominator[denominator.abs() <= atol] = np.nan
+    ret = numerator / denominator
+    return ret, state
+
+
 def extract_smooth_moving_average_weights(
     signal: Union[pd.DataFrame, pd.Series],
     tau: float,
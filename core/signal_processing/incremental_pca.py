@@ -5,13 +5,14 @@ import core.signal_processing.incremental_pca as csprinpc
 """
 
 import logging
-from typing import Dict, List, Tuple
+from typing import List, Tuple
 
 import numpy as np
 import pandas as pd
 
 import core.signal_processing.special_functions as csprspfu
 import helpers.hdbg as hdbg
+import helpers.hnumba as hnumba
 
 _LOG = logging.getLogger(__name__)
 
@@ -29,6 +30,10 @@ def compute_ipca(
     https://ieeexplore.ieee.org/document/1217609
     https://www.cse.msu.edu/~weng/research/CCIPCApami.pdf
 
+    The state is updated row by row by `_update_ipca()`, which is compiled
+    with numba when it is available. Use `IncrementalPca` to update the state
+    one observation at a time, e.g., in real-time.
+
     :param num_pc: number of principal components to calculate
     :param tau: parameter used in (continuous) compute_ema and compute_ema-derived kernels. For
         typical ranges it is approximately but not exactly equal to the
@@ -51,52 +56,182 @@ def compute_ipca(
         df.shape[1],
         msg="Dimension should be greater than or equal to the number of principal components.",
     )
-    hdbg.dassert_lt(0, tau)
-    com = csprspfu.calculate_com_from_tau(tau)
-    alpha = 1.0 / (com + 1.0)
-    _LOG.debug("com = %0.2f", com)
-    _LOG.debug("alpha = %0.2f", alpha)
+    alpha = _get_alpha(tau)
     # TODO(Paul): Consider requiring that the caller do this instead.
     # Fill NaNs with zero.
-    df.fillna(0, inplace=True)
-    lambdas: Dict[int, list] = {k: [] for k in range(num_pc)}
-    # V's are eigenvectors with norm equal to corresponding eigenvalue.
-    vs: Dict[int, list] = {k: [] for k in range(num_pc)}
-    unit_eigenvecs: Dict[int, list] = {k: [] for k in range(num_pc)}
-    step = 0
-    for n in df.index:
-        # Initialize u(n).
-        u = df.loc[n].copy()
-        for i in range(min(num_pc, step + 1)):
-            # Initialize ith eigenvector.
-            if i == step:
-                v = u.copy()
-                if np.linalg.norm(v):
-                    _LOG.debug("Initializing eigenvector %s...", i)
-                    step += 1
-            else:
-                # Main update step for eigenvector i.
-                u, v = _compute_ipca_step(u, vs[i][-1], alpha)
-            # Bookkeeping.
-            v.name = n
-            vs[i].append(v)
-            norm = np.linalg.norm(v)
-            lambdas[i].append(norm)
-            unit_eigenvecs[i].append(v / norm)
+    values = df.fillna(0).to_numpy(dtype=np.float64)
+    lambdas, unit_eigenvecs, first_rows = _compute_ipca(values, num_pc, alpha)
     _LOG.debug("Completed %s steps of incremental PCA.", len(df))
-    # Convert lambda dict of lists to list of series.
-    # Convert unit_eigenvecs dict of lists to list of dataframes.
-    lambdas_srs = []
+    # The estimates of an eigenvector start at the first row where the
+    # previous eigenvectors have been initialized.
+    lambda_df = pd.DataFrame(lambdas, index=df.index, columns=range(num_pc))
     unit_eigenvec_dfs = []
     for i in range(num_pc):
-        lambdas_srs.append(
-            pd.Series(index=df.index[-len(lambdas[i]) :], data=lambdas[i])
+        first_row = first_rows[i] if first_rows[i] >= 0 else len(df)
+        unit_eigenvec_df = pd.DataFrame(
+            unit_eigenvecs[first_row:, i, :],
+            index=df.index[first_row:].rename(None),
+            columns=df.columns,
         )
-        unit_eigenvec_dfs.append(pd.concat(unit_eigenvecs[i], axis=1).transpose())
-    lambda_df = pd.concat(lambdas_srs, axis=1)
+        unit_eigenvec_dfs.append(unit_eigenvec_df)
     return lambda_df, unit_eigenvec_dfs
 
 
+# #############################################################################
+# IncrementalPca
+# #############################################################################
+
+
+class IncrementalPca:
+    """
+    Compute incremental PCA one observation at a time.
+
+    This computes the same estimates as `compute_ipca()`, keeping the state
+    in preallocated arrays, so that it can be updated in real-time.
+    """
+
+    def __init__(self, num_pc: int, tau: float, dim: int):
+        """
+        Constructor.
+
+        :param num_pc: number of principal components to calculate
+        :param tau: same as in `compute_ipca()`
+        :param dim: dimension of the observations
+        """
+        hdbg.dassert_isinstance(num_pc, int)
+        hdbg.dassert_lte(1, num_pc)
+        hdbg.dassert_lte(num_pc, dim)
+        self._num_pc = num_pc
+        self._dim = dim
+        self._alpha = _get_alpha(tau)
+        # Unnormalized eigenvectors, with norm equal to the eigenvalues.
+        self._vs = np.zeros((num_pc, dim))
+        # Number of eigenvectors initialized with a nonzero observation.
+        self._num_initialized = 0
+        self._u = np.zeros(dim)
+        self._lambdas = np.full(num_pc, np.nan)
+        self._unit_eigenvecs = np.full((num_pc, dim), np.nan)
+
+    def update(self, obs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Update the estimates with a new observation.
+
+        :param obs: centered observation; NaNs are treated as zeros, like in
+            `compute_ipca()`
+        :return:
+          - eigenvalues, sorted like in `compute_ipca()`, with NaNs for the
+            eigenvectors not estimated yet
+          - unit eigenvectors as rows
+        """
+        obs = np.asarray(obs, dtype=np.float64)
+        hdbg.dassert_eq(obs.shape, (self._dim,))
+        np.copyto(self._u, obs)
+        self._u[np.isnan(self._u)] = 0
+        self._num_initialized = _update_ipca(
+            self._u,
+            self._vs,
+            self._num_initialized,
+            self._alpha,
+            self._lambdas,
+            self._unit_eigenvecs,
+        )
+        return self._lambdas.copy(), self._unit_eigenvecs.copy()
+
+
+def _get_alpha(tau: float) -> float:
+    hdbg.dassert_lt(0, tau)
+    com = csprspfu.calculate_com_from_tau(tau)
+    alpha = 1.0 / (com + 1.0)
+    _LOG.debug("com = %0.2f", com)
+    _LOG.debug("alpha = %0.2f", alpha)
+    return alpha
+
+
+@hnumba.jit
+def _update_ipca(
+    u: np.ndarray,
+    vs: np.ndarray,
+    num_initialized: int,
+    alpha: float,
+    lambdas: np.ndarray,
+    unit_eigenvecs: np.ndarray,
+) -> int:
+    """
+    Update the incremental PCA state in place with an observation.
+
+    The eigenvectors not updated yet are left unchanged in the outputs.
+
+    :param u: observation, which is residualized in place
+    :param vs: unnormalized eigenvectors as rows, updated in place
+    :param num_initialized: number of initialized eigenvectors
+    :param alpha: compute_ema-type weight
+    :param lambdas: eigenvalues output
+    :param unit_eigenvecs: unit eigenvectors output, as rows
+    :return: updated number of initialized eigenvectors
+    """
+    num_pc = vs.shape[0]
+    num_updated = min(num_pc, num_initialized + 1)
+    new_num_initialized = num_initialized
+    for i in range(num_updated):
+        v = vs[i]
+        if i == num_initialized:
+            # Initialize the i-th eigenvector with the residualized
+            # observation.
+            v[:] = u
+            if np.linalg.norm(v) != 0:
+                new_num_initialized += 1
+        else:
+            # Same as `_compute_ipca_step()`.
+            v_norm = np.linalg.norm(v)
+            if v_norm == 0:
+                v[:] = 0
+            else:
+                u_dot_v = np.dot(u, v)
+                u_coeff = alpha * u_dot_v / v_norm
+                v_coeff = u_dot_v / v_norm**2
+                for j in range(u.shape[0]):
+                    u_j = u[j]
+                    u[j] = u_j - v_coeff * v[j]
+                    v[j] = (1 - alpha) * v[j] + u_coeff * u_j
+        norm = np.linalg.norm(v)
+        lambdas[i] = norm
+        if norm == 0:
+            unit_eigenvecs[i, :] = np.nan
+        else:
+            unit_eigenvecs[i, :] = v / norm
+    return new_num_initialized
+
+
+@hnumba.jit
+def _compute_ipca(
+    values: np.ndarray, num_pc: int, alpha: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run incremental PCA on all the rows of `values`.
+
+    :return:
+      - eigenvalues with shape `(num_rows, num_pc)`
+      - unit eigenvectors with shape `(num_rows, num_pc, dim)`
+      - first row with an estimate for each eigenvector, or -1
+    """
+    num_rows, dim = values.shape
+    vs = np.zeros((num_pc, dim))
+    lambdas = np.full((num_rows, num_pc), np.nan)
+    unit_eigenvecs = np.full((num_rows, num_pc, dim), np.nan)
+    first_rows = np.full(num_pc, -1)
+    num_initialized = 0
+    u = np.empty(dim)
+    for n in range(num_rows):
+        for i in range(min(num_pc, num_initialized + 1)):
+            if first_rows[i] == -1:
+                first_rows[i] = n
+        u[:] = values[n]
+        num_initialized = _update_ipca(
+            u, vs, num_initialized, alpha, lambdas[n], unit_eigenvecs[n]
+        )
+    return lambdas, unit_eigenvecs, first_rows
+
+
 def _compute_ipca_step(
     u: pd.Series, v: pd.Series, alpha: float
 ) -> Tuple[pd.Series, pd.Series]:
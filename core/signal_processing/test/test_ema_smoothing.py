@@ -1,6 +1,6 @@
 import datetime
 import logging
-from typing import List
+from typing import Any, Callable, List, Union
 
 import numpy as np
 import pandas as pd
@@ -159,6 +159,157 @@ class Test_extract_smooth_moving_average_weights(hunitest.TestCase):
         self.check_string(actual)
 
 
+class Test_compute_smooth_moving_average_on_array1(hunitest.TestCase):
+    """
+    Check that the computation on NumPy arrays matches the one on dataframes.
+    """
+
+    @staticmethod
+    def _get_values() -> np.ndarray:
+        np.random.seed(42)
+        values = np.random.randn(200, 3)
+        # Add some NaNs at the beginning and in the middle of the series.
+        values[:10, 2] = np.nan
+        values[50:55, 1] = np.nan
+        values[100, 0] = np.nan
+        return values
+
+    def test1(self) -> None:
+        """
+        Use different `tau` and `min_periods` for each column.
+        """
+        values = self._get_values()
+        taus = np.array([3.0, 10.0, 3.0])
+        min_periods = np.array([0, 5, 2])
+        actual = cspremsm.compute_smooth_moving_average_on_array(
+            values, tau=taus, min_periods=min_periods, min_depth=2, max_depth=3
+        )
+        expected = np.column_stack(
+            [
+                cspremsm.compute_smooth_moving_average(
+                    pd.Series(values[:, i]),
+                    tau=taus[i],
+                    min_periods=min_periods[i],
+                    min_depth=2,
+                    max_depth=3,
+                ).values
+                for i in range(values.shape[1])
+            ]
+        )
+        np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-12)
+
+    def test2(self) -> None:
+        """
+        Skip the NaNs of each column.
+        """
+        values = self._get_values()
+        actual = cspremsm.compute_smooth_moving_average_on_array(
+            values, tau=5, min_periods=3, skip_nans=True
+        )
+        signal = pd.DataFrame(values)
+        expected = pd.concat(
+            [
+                cspremsm.compute_smooth_moving_average(
+                    signal[col].dropna(), tau=5, min_periods=3
+                )
+                for col in signal.columns
+            ],
+            axis=1,
+        ).reindex(signal.index)
+        np.testing.assert_allclose(
+            actual, expected.values, rtol=1e-12, atol=1e-12
+        )
+
+
+class Test_incremental_ema_smoothing1(hunitest.TestCase):
+    """
+    Check that processing a signal in chunks gives the same result as
+    processing it at once.
+    """
+
+    @staticmethod
+    def _get_signal() -> pd.DataFrame:
+        np.random.seed(42)
+        n = 200
+        signal = pd.DataFrame(
+            np.random.randn(n, 3),
+            index=pd.date_range("2022-01-03 09:30", periods=n, freq="5T"),
+            columns=["a", "b", "c"],
+        )
+        # Add some NaNs at the beginning and in the middle of the series.
+        signal.iloc[:10, 2] = np.nan
+        signal.iloc[50:55, 1] = np.nan
+        signal.iloc[100, 0] = np.nan
+        return signal
+
+    @staticmethod
+    def _compute_in_chunks(
+        func: Callable, signal: Union[pd.DataFrame, pd.Series], **kwargs: Any
+    ) -> Union[pd.DataFrame, pd.Series]:
+        chunk_bounds = [0, 1, 23, 24, 120, len(signal)]
+        state = None
+        chunks = []
+        for start, end in zip(chunk_bounds[:-1], chunk_bounds[1:]):
+            chunk, state = func(signal.iloc[start:end], state=state, **kwargs)
+            chunks.append(chunk)
+        return pd.concat(chunks)
+
+    def test_compute_ema1(self) -> None:
+        signal = self._get_signal()
+        kwargs = {"tau": 10, "min_periods": 5, "depth": 2}
+        expected = cspremsm.compute_ema(signal, **kwargs)
+        actual = self._compute_in_chunks(
+            cspremsm.compute_ema_incrementally, signal, **kwargs
+        )
+        self.assert_dfs_close(actual, expected, equal_nan=True)
+
+    def test_compute_ema2(self) -> None:
+        """
+        Process a series instead of a dataframe.
+        """
+        signal = self._get_signal()["b"]
+        kwargs = {"tau": 3, "min_periods": 0}
+        expected = cspremsm.compute_ema(signal, **kwargs)
+        actual = self._compute_in_chunks(
+            cspremsm.compute_ema_incrementally, signal, **kwargs
+        )
+        self.assert_dfs_close(
+            actual.to_frame(), expected.to_frame(), equal_nan=True
+        )
+
+    def test_compute_smooth_moving_average1(self) -> None:
+        signal = self._get_signal()
+        kwargs = {"tau": 10, "min_periods": 5, "min_depth": 2, "max_depth": 4}
+        expected = cspremsm.compute_smooth_moving_average(signal, **kwargs)
+        actual = self._compute_in_chunks(
+            cspremsm.compute_smooth_moving_average_incrementally,
+            signal,
+            **kwargs,
+        )
+        self.assert_dfs_close(actual, expected, equal_nan=True)
+
+    def test_compute_rolling_zscore1(self) -> None:
+        signal = self._get_signal()
+        kwargs = {"tau": 10, "min_periods": 5, "delay": 2, "atol": 1e-2}
+        expected = cspremsm.compute_rolling_zscore(signal, **kwargs)
+        actual = self._compute_in_chunks(
+            cspremsm.compute_rolling_zscore_incrementally, signal, **kwargs
+        )
+        self.assert_dfs_close(actual, expected, equal_nan=True)
+
+    def test_compute_rolling_zscore2(self) -> None:
+        """
+        Like `test_compute_rolling_zscore1()`, but without demeaning.
+        """
+        signal = self._get_signal()
+        kwargs = {"tau": 10, "demean": False, "delay": 1}
+        expected = cspremsm.compute_rolling_zscore(signal, **kwargs)
+        actual = self._compute_in_chunks(
+            cspremsm.compute_rolling_zscore_incrementally, signal, **kwargs
+        )
+        self.assert_dfs_close(actual, expected, equal_nan=True)
+
+
 class Test_compute_rolling_moment1(hunitest.TestCase):
     def test1(self) -> None:
         np.random.seed(42)
@@ -1,4 +1,5 @@
 import logging
+from typing import Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
@@ -6,6 +7,7 @@ import pytest
 
 import core.artificial_signal_generators as carsigen
 import core.signal_processing.incremental_pca as csprinpc
+import core.signal_processing.special_functions as csprspfu
 import helpers.hpandas as hpandas
 import helpers.hunit_test as hunitest
 
@@ -139,6 +141,131 @@ class Test_compute_ipca(hunitest.TestCase):
         return df
 
 
+class Test_compute_ipca2(hunitest.TestCase):
+    """
+    Compare `compute_ipca()` to a reference implementation with pandas.
+    """
+
+    @staticmethod
+    def compute_ipca_with_pandas(
+        df: pd.DataFrame, num_pc: int, alpha: float
+    ) -> Tuple[pd.DataFrame, List[pd.DataFrame]]:
+        """
+        Run incremental PCA updating the eigenvectors with
+        `_compute_ipca_step()`.
+        """
+        df = df.fillna(0)
+        vs: Dict[int, list] = {k: [] for k in range(num_pc)}
+        lambdas: Dict[int, list] = {k: [] for k in range(num_pc)}
+        unit_eigenvecs: Dict[int, list] = {k: [] for k in range(num_pc)}
+        step = 0
+        for n in df.index:
+            u = df.loc[n].copy()
+            for i in range(min(num_pc, step + 1)):
+                if i == step:
+                    v = u.copy()
+                    if np.linalg.norm(v):
+                        step += 1
+                else:
+                    u, v = csprinpc._compute_ipca_step(u, vs[i][-1], alpha)
+                v.name = n
+                vs[i].append(v)
+                norm = np.linalg.norm(v)
+                lambdas[i].append(norm)
+                unit_eigenvecs[i].append(v / norm)
+        lambda_df = pd.concat(
+            [
+                pd.Series(lambdas[i], index=df.index[-len(lambdas[i]) :])
+                for i in range(num_pc)
+            ],
+            axis=1,
+        )
+        unit_eigenvec_dfs = [
+            pd.concat(unit_eigenvecs[i], axis=1).transpose()
+            for i in range(num_pc)
+        ]
+        return lambda_df, unit_eigenvec_dfs
+
+    @staticmethod
+    def get_df() -> pd.DataFrame:
+        """
+        Generate correlated normal data.
+        """
+        rng = np.random.default_rng(seed=1)
+        mixing = rng.normal(size=(6, 6))
+        df = pd.DataFrame(
+            rng.normal(size=(40, 6)) @ mixing,
+            index=pd.date_range("2000-01-01", periods=40, freq="B"),
+        )
+        return df
+
+    def helper(self, df: pd.DataFrame) -> None:
+        num_pc = 3
+        tau = 16
+        alpha = 1.0 / (csprspfu.calculate_com_from_tau(tau) + 1.0)
+        (
+            expected_lambda_df,
+            expected_unit_eigenvec_dfs,
+        ) = self.compute_ipca_with_pandas(df, num_pc, alpha)
+        lambda_df, unit_eigenvec_dfs = csprinpc.compute_ipca(df, num_pc, tau)
+        pd.testing.assert_frame_equal(
+            lambda_df, expected_lambda_df, check_freq=False
+        )
+        self.assertEqual(len(unit_eigenvec_dfs), num_pc)
+        for actual, expected in zip(
+            unit_eigenvec_dfs, expected_unit_eigenvec_dfs
+        ):
+            pd.testing.assert_frame_equal(actual, expected, check_freq=False)
+
+    def test1(self) -> None:
+        """
+        Test for a clean input.
+        """
+        df = self.get_df()
+        self.helper(df)
+
+    def test2(self) -> None:
+        """
+        Test for an input with leading and interspersed NaNs.
+        """
+        df = self.get_df()
+        df.iloc[0:3, :-3] = np.nan
+        df.iloc[5:8, 3:5] = np.nan
+        self.helper(df)
+
+    def test3(self) -> None:
+        """
+        Test for an input with all-NaN rows, which delay the initialization.
+        """
+        df = self.get_df()
+        df.iloc[:2, :] = np.nan
+        df.iloc[3:4, :] = np.nan
+        self.helper(df)
+
+
+class TestIncrementalPca1(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Check that updating one row at a time is the same as `compute_ipca()`.
+        """
+        df = Test_compute_ipca2.get_df()
+        df.iloc[1:2, :] = np.nan
+        num_pc = 3
+        tau = 16
+        lambda_df, unit_eigenvec_dfs = csprinpc.compute_ipca(df, num_pc, tau)
+        ipca = csprinpc.IncrementalPca(num_pc, tau, df.shape[1])
+        for timestamp, row in df.iterrows():
+            lambdas, unit_eigenvecs = ipca.update(row.to_numpy())
+            np.testing.assert_allclose(lambdas, lambda_df.loc[timestamp])
+            for i in range(num_pc):
+                unit_eigenvec_df = unit_eigenvec_dfs[i]
+                if timestamp in unit_eigenvec_df.index:
+                    expected = unit_eigenvec_df.loc[timestamp]
+                else:
+                    expected = np.full(df.shape[1], np.nan)
+                np.testing.assert_allclose(unit_eigenvecs[i], expected)
+
+
 @pytest.mark.skip("See CmTask5898.")
 class Test__compute_ipca_step(hunitest.TestCase):
     def test1(self) -> None:
@@ -4,17 +4,32 @@ Import as:
 import dataflow.core.dag as dtfcordag
 """
 
+import collections
+import concurrent.futures
+import functools
 import itertools
 import json
 import logging
 import os
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 import networkx as networ
 import pandas as pd
 from tqdm.autonotebook import tqdm
 
 import dataflow.core.node as dtfcornode
+import dataflow.core.node_io_writer as dtfcnoiowr
+import dataflow.core.node_output_cache as dtfcnoouca
 import helpers.hdatetime as hdateti
 import helpers.hdbg as hdbg
 import helpers.hio as hio
@@ -96,8 +111,32 @@ class DAG(hobject.PrintableMixin):
         )
         # Disable freeing nodes.
         self.force_free_nodes = False
+        # Execute nodes serially by default.
+        self._num_workers = 1
+        # Keep all the node outputs by default.
+        self._free_dead_outputs = False
+        self._pinned_nids: List[dtfcornode.NodeId] = []
+        # Save the node interfaces synchronously by default.
+        self._node_io_writer: Optional[dtfcnoiowr.NodeIoWriter] = None
+        # Don't cache the node outputs by default.
+        self._node_output_cache: Optional[dtfcnoouca.NodeOutputCache] = None
+        # Map `(nid, method)` to the fingerprint of the last output of the node,
+        # or `None` if the output is not cacheable.
+        self._node_fingerprints: Dict[
+            Tuple[dtfcornode.NodeId, dtfcornode.Method], Optional[str]
+        ] = {}
+
+    def __str__(
+        self,
+        attr_names_to_skip: Optional[List[str]] = None,
+    ) -> str:
+        attr_names_to_skip = self._get_attr_names_to_skip(attr_names_to_skip)
+        return super().__str__(attr_names_to_skip=attr_names_to_skip)
 
-    def __repr__(self) -> str:
+    def __repr__(
+        self,
+        attr_names_to_skip: Optional[List[str]] = None,
+    ) -> str:
         """
         Return a detailed representation for debugging.
 
@@ -120,7 +159,8 @@ class DAG(hobject.PrintableMixin):
         """
         txt = []
         # Get the representation for the class.
-        txt.append(super().__repr__())
+        attr_names_to_skip = self._get_attr_names_to_skip(attr_names_to_skip)
+        txt.append(super().__repr__(attr_names_to_skip=attr_names_to_skip))
         # Add more details.
         res = []
         res.append("nodes=" + str(self.nx_dag.nodes(data=True)))
@@ -139,6 +179,8 @@ class DAG(hobject.PrintableMixin):
         save_node_df_out_stats: bool,
         profile_execution: bool,
         dst_dir: Optional[str],
+        *,
+        node_io_checkpoint_period: int = 12,
     ) -> None:
         """
         Set the debug parameters.
@@ -153,15 +195,28 @@ class DAG(hobject.PrintableMixin):
             - `df_as_csv`: save the full content of the node interface, using CSV for
               dataframes
             - `df_as_parquet`: like `df_as_csv` but using Parquet for dataframes
+            - `df_as_pq_delta`: like `df_as_pq` but saving only the rows that are
+              new or changed with respect to the previous bar, with a full
+              checkpoint every `node_io_checkpoint_period` bars. Use
+              `dag_statistics.get_dag_node_output()` to rebuild the full output
         :param save_node_df_out_stats: save high level information about the output DataFrame, e.g.,
             dtype info, shape info, memory usage, nans info
         :param profile_execution: if not `None`, store information about the
             execution of the nodes
         :param dst_dir: directory to save node interface and execution profiling info
+        :param node_io_checkpoint_period: number of bars between two full
+            checkpoints for `df_as_pq_delta`
         """
         hdbg.dassert_in(
             save_node_io,
-            ("", "stats", "df_as_csv", "df_as_pq", "df_as_csv_and_pq"),
+            (
+                "",
+                "stats",
+                "df_as_csv",
+                "df_as_pq",
+                "df_as_csv_and_pq",
+                "df_as_pq_delta",
+            ),
         )
         if _LOG.isEnabledFor(logging.DEBUG):
             _LOG.debug(
@@ -177,6 +232,14 @@ class DAG(hobject.PrintableMixin):
         self._save_node_df_out_stats = save_node_df_out_stats
         self._profile_execution = profile_execution
         self._dst_dir = dst_dir
+        # Keep the state needed to save the node interfaces as deltas.
+        self._node_io_delta_encoder: Optional[
+            dtfcnoiowr.NodeIoDeltaEncoder
+        ] = None
+        if self._save_node_io == "df_as_pq_delta":
+            self._node_io_delta_encoder = dtfcnoiowr.NodeIoDeltaEncoder(
+                node_io_checkpoint_period
+            )
         if self._dst_dir:
             hio.create_dir(self._dst_dir, incremental=False)
         if any(
@@ -196,6 +259,140 @@ class DAG(hobject.PrintableMixin):
                 dst_dir, None, "Need to specify a directory to save the data"
             )
 
+    def set_async_node_io_mode(
+        self, async_node_io: bool, *, max_queue_size: int = 64
+    ) -> None:
+        """
+        Save the node interfaces in a background thread.
+
+        When `save_node_io` is enabled, the DAG enqueues a snapshot of each
+        node output and continues executing the nodes, instead of writing the
+        data to disk before running the next node. See `NodeIoWriter` for
+        details.
+
+        :param async_node_io: whether to write the node interfaces in the
+            background
+        :param max_queue_size: max number of snapshots kept in memory before
+            the execution blocks waiting for the writes
+        """
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug(hprint.to_str("async_node_io max_queue_size"))
+        # Flush the writes of the previous writer, if any.
+        self.close_node_io_writer()
+        if async_node_io:
+            self._node_io_writer = dtfcnoiowr.NodeIoWriter(
+                max_queue_size=max_queue_size
+            )
+
+    def flush_node_io(self) -> None:
+        """
+        Wait until all the node interfaces are written to disk.
+        """
+        if self._node_io_writer is not None:
+            self._node_io_writer.flush()
+            _LOG.info("NodeIoWriter stats: %s", self._node_io_writer.get_stats())
+
+    def close_node_io_writer(self) -> None:
+        """
+        Flush the node interfaces and stop the background writer, if any.
+        """
+        if self._node_io_writer is not None:
+            self._node_io_writer.close()
+            self._node_io_writer = None
+
+    def set_parallel_mode(self, num_workers: int) -> None:
+        """
+        Set the number of workers used to execute the DAG nodes.
+
+        With `num_workers > 1` the nodes whose predecessors have all been
+        executed are scheduled concurrently on a thread pool, so that
+        independent branches of the DAG (e.g., different features computed
+        from the same data) run at the same time. The output of each node and
+        the way it is stored is the same as in the serial execution.
+
+        We use threads and not processes since the state of a node (e.g., the
+        fit parameters and the outputs) is stored inside the `Node` object and
+        needs to be visible to the caller after the execution.
+
+        :param num_workers: number of threads to use
+            - 1 executes the nodes serially in topological order
+        """
+        hdbg.dassert_isinstance(num_workers, int)
+        hdbg.dassert_lte(1, num_workers)
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug(hprint.to_str("num_workers"))
+        self._num_workers = num_workers
+
+    def set_free_dead_outputs_mode(
+        self,
+        free_dead_outputs: bool,
+        *,
+        pinned_nids: Optional[List[dtfcornode.NodeId]] = None,
+    ) -> None:
+        """
+        Set whether to deallocate the node outputs that are not needed anymore.
+
+        When enabled, the DAG counts how many nodes consume each output
+        `(nid, output_name)` and frees the output as soon as the last consumer
+        has been executed. The outputs of the sink nodes, of the node passed to
+        `run_leq_node()`, and of the pinned nodes are never freed.
+
+        Unlike `force_free_nodes`, this is correct also for DAGs that are not
+        linear pipelines.
+
+        :param free_dead_outputs: whether to free the outputs that have no
+            pending consumer
+        :param pinned_nids: nodes whose outputs should be kept, e.g., because
+            they are accessed after the DAG execution
+        """
+        hdbg.dassert_isinstance(free_dead_outputs, bool)
+        pinned_nids = pinned_nids or []
+        hdbg.dassert_container_type(pinned_nids, list, dtfcornode.NodeId)
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug(hprint.to_str("free_dead_outputs pinned_nids"))
+        self._free_dead_outputs = free_dead_outputs
+        self._pinned_nids = pinned_nids
+
+    def set_node_output_cache(
+        self,
+        cache_dir: Optional[str],
+        *,
+        max_cache_size_in_bytes: int = 10 * 1024**3,
+    ) -> None:
+        """
+        Cache the outputs of the `FitPredictNode`s on disk.
+
+        A node is not executed if a node of the same class, with the same
+        params and fit state, was already executed on the same inputs, e.g.,
+        when sweeping configs that share the data loading and the feature
+        computation. See `NodeOutputCache` for details.
+
+        The cache should not be used in real-time, since the nodes depend on
+        the wall clock.
+
+        :param cache_dir: dir storing the cache
+            - `None` disables the cache
+        :param max_cache_size_in_bytes: max size of the cache on disk, after
+            which the least recently used entries are evicted
+        """
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug(hprint.to_str("cache_dir max_cache_size_in_bytes"))
+        self._node_fingerprints = {}
+        if cache_dir is None:
+            self._node_output_cache = None
+        else:
+            self._node_output_cache = dtfcnoouca.NodeOutputCache(
+                cache_dir, max_cache_size_in_bytes=max_cache_size_in_bytes
+            )
+
+    def get_node_output_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Return the counters of the node output cache, if any.
+        """
+        if self._node_output_cache is None:
+            return None
+        return self._node_output_cache.get_stats()
+
     # /////////////////////////////////////////////////////////////////////////////
     # Accessor.
     # /////////////////////////////////////////////////////////////////////////////
@@ -493,8 +690,8 @@ class DAG(hobject.PrintableMixin):
             `get_outputs(method)`
         """
         sinks = self.get_sinks()
-        for id_, nid in enumerate(networ.topological_sort(self._nx_dag)):
-            self._run_node(id_, nid, method)
+        nids = list(networ.topological_sort(self._nx_dag))
+        self._run_nodes(nids, method)
         return {sink: self.get_node(sink).get_outputs(method) for sink in sinks}
 
     def run_leq_node(
@@ -523,14 +720,9 @@ class DAG(hobject.PrintableMixin):
         )
         # The `ancestors` filter only returns nodes strictly less than `nid`,
         # and so we need to add `nid` back.
-        nids = itertools.chain(ancestors, [nid])
+        nids = list(itertools.chain(ancestors, [nid]))
         # Execute all the ancestors of `nid`.
-        if progress_bar:
-            nids = tqdm(list(nids), desc="run_leq_node")
-        for id_, pred_nid in enumerate(nids):
-            if _LOG.isEnabledFor(logging.DEBUG):
-                _LOG.debug("Executing node '%s'", pred_nid)
-            self._run_node(id_, pred_nid, method)
+        self._run_nodes(nids, method, progress_bar=progress_bar)
         # Retrieve the output the node.
         node = self.get_node(nid)
         node_output = node.get_outputs(method)
@@ -540,6 +732,29 @@ class DAG(hobject.PrintableMixin):
     # Private methods.
     # /////////////////////////////////////////////////////////////////////////////
 
+    @staticmethod
+    def _get_attr_names_to_skip(
+        attr_names_to_skip: Optional[List[str]],
+    ) -> List[str]:
+        """
+        Add the attributes about how the nodes are executed to the ones to skip
+        when printing the DAG.
+        """
+        if attr_names_to_skip is None:
+            attr_names_to_skip = []
+        attr_names_to_skip.extend(
+            [
+                "_num_workers",
+                "_free_dead_outputs",
+                "_pinned_nids",
+                "_node_io_writer",
+                "_node_io_delta_encoder",
+                "_node_output_cache",
+                "_node_fingerprints",
+            ]
+        )
+        return attr_names_to_skip
+
     def _to_json(self) -> str:
         # Get internal networkx representation of the DAG.
         graph: networ.classes.digraph.DiGraph = self.nx_dag
@@ -639,7 +854,7 @@ class DAG(hobject.PrintableMixin):
         ```
         {dst_dir}/
            node_io.stats/
-               {method}.{topo_id}.{nid}.{output_name}.{bar_timestamp}.[csv|parquet]
+               {method}.{topo_id}.{nid}.{output_name}.{bar_timestamp}.[csv|parquet|delta.parquet]
         ```
         E.g.,
         ```
@@ -660,34 +875,19 @@ class DAG(hobject.PrintableMixin):
         if isinstance(obj, pd.Series):
             obj = pd.DataFrame(obj)
         if isinstance(obj, pd.DataFrame):
-            df = obj
-            if self._save_node_df_out_stats:
-                # Save high level description about the df.
-                _LOG.debug("Saving node df out stats...")
-                txt = hpandas.df_to_str(
-                    df,
-                    print_dtypes=True,
-                    print_shape_info=True,
-                    print_memory_usage=True,
-                    print_nan_info=True,
-                )
-                hio.to_file(file_name + ".txt", txt)
-            # Save content of the df.
-            if self._save_node_io == "df_as_csv":
-                csv_file_name = f"{file_name}.csv.gz"
-                df.to_csv(csv_file_name, compression="gzip")
-            elif self._save_node_io == "df_as_pq":
-                parquet_file_name = f"{file_name}.parquet"
-                hparque.to_parquet(df, parquet_file_name)
-            elif self._save_node_io == "df_as_csv_and_pq":
-                csv_file_name = f"{file_name}.csv.gz"
-                df.to_csv(csv_file_name, compression="gzip")
-                parquet_file_name = f"{file_name}.parquet"
-                hparque.to_parquet(df, parquet_file_name)
+            if self._node_io_writer is None:
+                if self._node_io_delta_encoder is not None:
+                    # The encoder keeps the output until the next bar, so take
+                    # a snapshot in case the data is modified in place.
+                    obj = obj.copy()
+                self._save_node_interface(file_name, obj)
             else:
-                raise ValueError(f"Invalid save_node_io='{self._save_node_io}'")
-            if _LOG.isEnabledFor(logging.DEBUG):
-                _LOG.debug("Saved log dir in '%s'", file_name)
+                # Take a snapshot of the data since the node can modify it
+                # before it's written.
+                write_func = functools.partial(
+                    self._save_node_interface, file_name, obj.copy()
+                )
+                self._node_io_writer.submit(file_name, write_func)
         else:
             _LOG.warning(
                 "Can't save node input / output of type '%s': %s",
@@ -695,16 +895,214 @@ class DAG(hobject.PrintableMixin):
                 obj,
             )
 
+    def _save_node_interface(self, file_name: str, df: pd.DataFrame) -> None:
+        """
+        Save a node output to files with the given name and different
+        extensions.
+
+        This is executed in the background thread in async node IO mode.
+        """
+        if self._save_node_df_out_stats:
+            # Save high level description about the df.
+            _LOG.debug("Saving node df out stats...")
+            txt = hpandas.df_to_str(
+                df,
+                print_dtypes=True,
+                print_shape_info=True,
+                print_memory_usage=True,
+                print_nan_info=True,
+            )
+            hio.to_file(file_name + ".txt", txt)
+        # Save content of the df.
+        if self._save_node_io == "df_as_csv":
+            csv_file_name = f"{file_name}.csv.gz"
+            df.to_csv(csv_file_name, compression="gzip")
+        elif self._save_node_io == "df_as_pq":
+            parquet_file_name = f"{file_name}.parquet"
+            hparque.to_parquet(df, parquet_file_name)
+        elif self._save_node_io == "df_as_csv_and_pq":
+            csv_file_name = f"{file_name}.csv.gz"
+            df.to_csv(csv_file_name, compression="gzip")
+            parquet_file_name = f"{file_name}.parquet"
+            hparque.to_parquet(df, parquet_file_name)
+        elif self._save_node_io == "df_as_pq_delta":
+            # Strip the bar and wall clock timestamps from the file name to get
+            # the node output, e.g., `predict.0.read_data.df_out`.
+            key = os.path.basename(file_name).rsplit(".", 2)[0]
+            encoder = cast(
+                dtfcnoiowr.NodeIoDeltaEncoder, self._node_io_delta_encoder
+            )
+            df, is_checkpoint = encoder.encode(key, df)
+            if is_checkpoint:
+                parquet_file_name = f"{file_name}.parquet"
+            else:
+                parquet_file_name = f"{file_name}.{dtfcnoiowr.NODE_IO_DELTA_EXT}"
+            hparque.to_parquet(df, parquet_file_name)
+        else:
+            raise ValueError(f"Invalid save_node_io='{self._save_node_io}'")
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug("Saved log dir in '%s'", file_name)
+
+    def _run_nodes(
+        self,
+        nids: List[dtfcornode.NodeId],
+        method: dtfcornode.Method,
+        *,
+        progress_bar: bool = False,
+    ) -> None:
+        """
+        Run the requested `method` on the nodes `nids`.
+
+        :param nids: nodes to execute, in topological order. The predecessors
+            of each node in the DAG must be either in `nids` or already executed
+        :param method: `Node` subclass method to be executed
+        :param progress_bar: whether to show a progress bar
+        """
+        if self._free_dead_outputs:
+            hdbg.dassert(
+                not self.force_free_nodes,
+                "force_free_nodes and free_dead_outputs are mutually exclusive",
+            )
+            # Keep the outputs of the last node to execute (e.g., the one
+            # passed to `run_leq_node()`) and of the sinks.
+            nids_to_keep = set(self._pinned_nids)
+            nids_to_keep.update(self.get_sinks())
+            nids_to_keep.add(nids[-1])
+            liveness_tracker = _OutputLivenessTracker(
+                self._nx_dag, nids, nids_to_keep
+            )
+        else:
+            liveness_tracker = None
+        if self._num_workers == 1:
+            # Execute the nodes serially.
+            if progress_bar:
+                nids = tqdm(nids, desc="run_leq_node")
+            for id_, nid in enumerate(nids):
+                if _LOG.isEnabledFor(logging.DEBUG):
+                    _LOG.debug("Executing node '%s'", nid)
+                self._run_node(id_, nid, method)
+                self._free_outputs(liveness_tracker, nid, method)
+        else:
+            self._run_nodes_in_parallel(
+                nids, method, liveness_tracker, progress_bar=progress_bar
+            )
+
+    def _free_outputs(
+        self,
+        liveness_tracker: Optional["_OutputLivenessTracker"],
+        nid: dtfcornode.NodeId,
+        method: dtfcornode.Method,
+    ) -> None:
+        """
+        Free the outputs that are dead after executing node `nid`.
+        """
+        if liveness_tracker is None:
+            return
+        dead_outputs = liveness_tracker.mark_as_executed(nid)
+        for pred_nid, output_name in dead_outputs:
+            self.get_node(pred_nid).free_output(method, output_name)
+
+    def _run_nodes_in_parallel(
+        self,
+        nids: List[dtfcornode.NodeId],
+        method: dtfcornode.Method,
+        liveness_tracker: Optional["_OutputLivenessTracker"],
+        *,
+        progress_bar: bool = False,
+    ) -> None:
+        """
+        Run the requested `method` on the nodes `nids` using a thread pool.
+
+        A node is submitted for execution as soon as all its predecessors in
+        `nids` are executed. The topological id of a node is its position in
+        `nids`, like in the serial execution.
+
+        The outputs that are not needed anymore are freed by this thread after
+        the execution of the consumers, so that no node can read a freed
+        output.
+
+        With `force_free_nodes`, a node is deallocated after all its successors
+        in `nids` are executed, instead of as soon as one successor reads its
+        output, since other successors can run concurrently.
+
+        Same interface as `_run_nodes()`.
+        """
+        topological_ids = {nid: id_ for id_, nid in enumerate(nids)}
+        # Count the predecessors of each node that still need to be executed.
+        dag = self._nx_dag.subgraph(nids)
+        num_pending_preds = {nid: dag.in_degree(nid) for nid in nids}
+        # Count the successors of each node that still need to be executed.
+        num_pending_succs = {nid: dag.out_degree(nid) for nid in nids}
+        ready_nids = [nid for nid in nids if num_pending_preds[nid] == 0]
+        pbar = tqdm(
+            total=len(nids), desc="run_leq_node", disable=not progress_bar
+        )
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._num_workers
+        ) as executor:
+            futures: Dict[concurrent.futures.Future, dtfcornode.NodeId] = {}
+            while ready_nids or futures:
+                # Submit the nodes that are ready in topological order.
+                for nid in sorted(ready_nids, key=topological_ids.get):
+                    if _LOG.isEnabledFor(logging.DEBUG):
+                        _LOG.debug("Executing node '%s'", nid)
+                    future = executor.submit(
+                        self._run_node,
+                        topological_ids[nid],
+                        nid,
+                        method,
+                        free_preds=False,
+                    )
+                    futures[future] = nid
+                ready_nids = []
+                # Wait for at least one node to complete.
+                done_futures, _ = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done_futures:
+                    nid = futures.pop(future)
+                    # Propagate the exception raised by the node, if any.
+                    future.result()
+                    pbar.update(1)
+                    self._free_outputs(liveness_tracker, nid, method)
+                    if self.force_free_nodes:
+                        # Free the predecessors whose successors are all
+                        # executed.
+                        for pred_nid in dag.predecessors(nid):
+                            num_pending_succs[pred_nid] -= 1
+                            if num_pending_succs[pred_nid] == 0:
+                                _LOG.warning(
+                                    "Forcing deallocation of pred_node=%s",
+                                    self.get_node(pred_nid),
+                                )
+                                self.get_node(pred_nid).free()
+                    # Update the successors of the executed node.
+                    for succ_nid in dag.successors(nid):
+                        num_pending_preds[succ_nid] -= 1
+                        if num_pending_preds[succ_nid] == 0:
+                            ready_nids.append(succ_nid)
+        pbar.close()
+        hdbg.dassert(
+            all(num == 0 for num in num_pending_preds.values()),
+            "Some nodes were not executed: %s",
+            num_pending_preds,
+        )
+
     def _run_node(
         self,
         topological_id: int,
         nid: dtfcornode.NodeId,
         method: dtfcornode.Method,
+        *,
+        free_preds: bool = True,
     ) -> None:
         """
         Run the requested `method` on a single node.
 
         This method DOES NOT run (or re-run) ancestors of `nid`.
+
+        :param free_preds: whether to deallocate the predecessors after
+            reading their outputs, when `force_free_nodes` is set
         """
         if _LOG.isEnabledFor(logging.DEBUG):
             _LOG.debug(
@@ -732,7 +1130,7 @@ class DAG(hobject.PrintableMixin):
             for input_name, value in kvs.items():
                 # Retrieve output from store.
                 kwargs[input_name] = pred_node.get_output(method, value)
-                if self.force_free_nodes:
+                if self.force_free_nodes and free_preds:
                     _LOG.warning(
                         "Forcing deallocation of pred_node=%s", pred_node
                     )
@@ -746,12 +1144,19 @@ class DAG(hobject.PrintableMixin):
         # Execute `node.method()`.
         with htimer.TimedScope(logging.DEBUG, "node_execution") as ts:
             node = self.get_node(nid)
-            try:
-                output = getattr(node, method)(**kwargs)
-            except AttributeError as e:
-                raise AttributeError(
-                    f"An exception occurred in node '{nid}'\n{str(e)}"
-                ) from e
+            run_node_func = functools.partial(
+                self._call_node_method, node, method, kwargs
+            )
+            if self._node_output_cache is None:
+                output = run_node_func()
+            else:
+                # Reuse the cached output, if the node and its inputs didn't
+                # change.
+                input_fingerprints = self._get_input_fingerprints(nid, method)
+                output, fingerprint = self._node_output_cache.run_node(
+                    node, method, input_fingerprints, run_node_func
+                )
+                self._node_fingerprints[(nid, method)] = fingerprint
         # Update the node.
         for output_name in node.output_names:
             value = output[output_name]
@@ -779,6 +1184,101 @@ class DAG(hobject.PrintableMixin):
                 extra_txt=txt,
             )
 
+    @staticmethod
+    def _call_node_method(
+        node: dtfcornode.Node,
+        method: dtfcornode.Method,
+        kwargs: Dict[str, Any],
+    ) -> dtfcornode.NodeOutput:
+        try:
+            output = getattr(node, method)(**kwargs)
+        except AttributeError as e:
+            raise AttributeError(
+                f"An exception occurred in node '{node.nid}'\n{str(e)}"
+            ) from e
+        return output
+
+    def _get_input_fingerprints(
+        self, nid: dtfcornode.NodeId, method: dtfcornode.Method
+    ) -> Optional[Dict[str, str]]:
+        """
+        Return the fingerprints of the inputs of a node.
+
+        :return: map from input name to the fingerprint of the output connected
+            to it, or `None` if any of the predecessors is not cacheable
+        """
+        input_fingerprints = {}
+        for pred_nid in self._nx_dag.predecessors(nid):
+            pred_fingerprint = self._node_fingerprints.get((pred_nid, method))
+            if pred_fingerprint is None:
+                return None
+            kvs = self._nx_dag.edges[[pred_nid, nid]]
+            for input_name, output_name in kvs.items():
+                input_fingerprints[
+                    input_name
+                ] = dtfcnoouca.get_output_fingerprint(
+                    pred_fingerprint, output_name
+                )
+        return input_fingerprints
+
+
+# #############################################################################
+# _OutputLivenessTracker
+# #############################################################################
+
+
+class _OutputLivenessTracker:
+    """
+    Track the number of pending consumers of each node output during a DAG
+    execution.
+    """
+
+    def __init__(
+        self,
+        nx_dag: networ.DiGraph,
+        nids: List[dtfcornode.NodeId],
+        nids_to_keep: Set[dtfcornode.NodeId],
+    ) -> None:
+        """
+        Constructor.
+
+        :param nx_dag: graph of the DAG
+        :param nids: nodes to execute
+        :param nids_to_keep: nodes whose outputs are never reported as dead
+        """
+        self._nx_dag = nx_dag
+        self._nids_to_keep = nids_to_keep
+        # Count how many nodes among the ones to execute read each output
+        # `(nid, output_name)`.
+        self._num_consumers: Dict[
+            Tuple[dtfcornode.NodeId, str], int
+        ] = collections.Counter()
+        for nid in nids:
+            for pred_nid in self._nx_dag.predecessors(nid):
+                for output_name in self._nx_dag.edges[pred_nid, nid].values():
+                    self._num_consumers[(pred_nid, output_name)] += 1
+
+    def mark_as_executed(
+        self, nid: dtfcornode.NodeId
+    ) -> List[Tuple[dtfcornode.NodeId, str]]:
+        """
+        Update the number of pending consumers after executing `nid`.
+
+        :return: outputs `(nid, output_name)` without pending consumers
+        """
+        dead_outputs = []
+        for pred_nid in self._nx_dag.predecessors(nid):
+            for output_name in self._nx_dag.edges[pred_nid, nid].values():
+                key = (pred_nid, output_name)
+                hdbg.dassert_lt(0, self._num_consumers[key])
+                self._num_consumers[key] -= 1
+                if (
+                    self._num_consumers[key] == 0
+                    and pred_nid not in self._nids_to_keep
+                ):
+                    dead_outputs.append(key)
+        return dead_outputs
+
 
 # TODO(Grisha): consider creating a class `DagStatsComputer` and moving the
 # function (together with `DAG._write_prof_stats_to_dst_dir()`) there.
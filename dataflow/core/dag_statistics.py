@@ -14,6 +14,7 @@ import pandas as pd
 
 import core.plotting as coplotti
 import dataflow.core.dag as dtfcordag
+import dataflow.core.node_io_writer as dtfcnoiowr
 import helpers.hdbg as hdbg
 import helpers.hpandas as hpandas
 import helpers.hparquet as hparque
@@ -172,6 +173,54 @@ def _get_dag_node_parquet_file_names(dag_dir: str) -> List[str]:
     return nodes
 
 
+def _is_delta_file_name(file_name: str) -> bool:
+    """
+    Return whether a file stores a node output as a delta.
+
+    See `DAG.set_debug_mode()` for the `df_as_pq_delta` mode.
+    """
+    return file_name.endswith("." + dtfcnoiowr.NODE_IO_DELTA_EXT)
+
+
+def _get_dag_node_output_file_names(
+    dag_dir: str, dag_node_name: str
+) -> List[str]:
+    """
+    Get the Parquet files with the outputs of a node sorted by bar timestamp.
+
+    :param dag_dir: dir with the DAG output
+    :param dag_node_name: a node name, e.g., `predict.0.read_data`
+    :return: paths to the checkpoint and delta files
+    """
+    hdbg.dassert_dir_exists(dag_dir)
+    cmd = f"find '{dag_dir}' -name '{dag_node_name}.df_out.*.parquet'"
+    _, files = hsystem.system_to_string(cmd)
+    files = [file_name for file_name in files.split("\n") if file_name]
+    # The file names start with the node name followed by the bar and the
+    # wall clock timestamps, so sorting by name sorts by bar timestamp.
+    files = sorted(files, key=os.path.basename)
+    return files
+
+
+def _load_dag_node_output_file(
+    file_name: str, prev_df: Optional[pd.DataFrame]
+) -> pd.DataFrame:
+    """
+    Load the output of a node from a checkpoint or a delta file.
+
+    :param file_name: path to the file
+    :param prev_df: output at the previous bar, needed to apply a delta
+    :return: full output of the node
+    """
+    df = hparque.from_parquet(file_name)
+    if _is_delta_file_name(file_name):
+        hdbg.dassert_is_not(
+            prev_df, None, msg=f"Missing checkpoint before '{file_name}'"
+        )
+        df = dtfcnoiowr.apply_df_delta(prev_df, df)
+    return df
+
+
 # TODO(Grisha): @Dan use `hio.listdir()` instead.
 def get_dag_node_csv_file_names(dag_dir: str) -> List[str]:
     """
@@ -256,6 +305,11 @@ def get_dag_node_timestamps(
         # E.g., file name is "predict.8.process_forecasts.df_out.20221028_080000.20221028_080143.parquet".
         # The bar timestamp is "20221028_080000", and the wall clock timestamp
         # is "20221028_080143".
+        if _is_delta_file_name(file_name):
+            # Handle the deltas saved in `df_as_pq_delta` mode, e.g.,
+            # "predict.8.process_forecasts.df_out.20221028_080000.20221028_080143.delta.parquet".
+            file_name = file_name[: -len(dtfcnoiowr.NODE_IO_DELTA_EXT)]
+            file_name += "parquet"
         splitted_file_name = file_name.split(".")
         bar_timestamp = splitted_file_name[-3]
         wall_clock_timestamp = splitted_file_name[-2]
@@ -287,6 +341,9 @@ def get_dag_node_output(
     This function relies on our file naming conventions, e.g.,
     `dag/node_io/node_io.data/predict.0.read_data.df_out.20221021_060500.parquet`.
 
+    If the output was saved as a delta (i.e., in `df_as_pq_delta` mode), the
+    full output is rebuilt from the last checkpoint before the bar timestamp.
+
     :param dag_dir: dir with the DAG output
     :param dag_node_name: a node name, e.g., `predict.0.read_data`
     :param timestamp: bar timestamp
@@ -304,7 +361,25 @@ def get_dag_node_output(
     number_of_files = len(files)
     msg = f"There were found {number_of_files} files at {dag_dir} for node={dag_node_name} for bar_timestamp={timestamp} while should be only one file for each node, bar timestamp."
     hdbg.dassert_eq(1, number_of_files, msg=msg)
-    df = hparque.from_parquet(files[0])
+    file_name = files[0]
+    if _is_delta_file_name(file_name):
+        # Find the last checkpoint before the requested bar.
+        file_names = _get_dag_node_output_file_names(dag_dir, dag_node_name)
+        end_idx = file_names.index(file_name)
+        start_idx = end_idx
+        while start_idx >= 0 and _is_delta_file_name(file_names[start_idx]):
+            start_idx -= 1
+        hdbg.dassert_lte(
+            0,
+            start_idx,
+            msg=f"No checkpoint found for node={dag_node_name} before bar_timestamp={timestamp}",
+        )
+        # Apply the deltas to the checkpoint.
+        df = None
+        for file_name in file_names[start_idx : end_idx + 1]:
+            df = _load_dag_node_output_file(file_name, df)
+    else:
+        df = hparque.from_parquet(file_name)
     hpandas.dassert_index_is_datetime(df.index)
     return df
 
@@ -326,17 +401,18 @@ def load_dag_outputs(
     :return: a df that consists of last rows from every bar timestamp
         DAG results df
     """
-    # Get DAG timestamps to iterate over them.
-    dag_timestamps = get_dag_node_timestamps(dag_data_path, node_name)
-    # Keep bar timestamps only.
-    bar_timestamps = [bar_timestamp for bar_timestamp, _ in dag_timestamps]
+    # Get the files sorted by bar timestamp to iterate over them.
+    file_names = _get_dag_node_output_file_names(dag_data_path, node_name)
+    hdbg.dassert_lt(0, len(file_names))
     last_rows = []
-    for timestamp in bar_timestamps:
+    df = None
+    for file_name in file_names:
+        # Rebuild the output incrementally, in case it's saved as deltas.
+        df = _load_dag_node_output_file(file_name, df)
+        hpandas.dassert_index_is_datetime(df.index)
         # Get the row that corresponds to the current bar timestamp, i.e.
         # the last row.
-        df = get_dag_node_output(dag_data_path, node_name, timestamp)
-        df = df.sort_index().tail(1)
-        last_rows.append(df)
+        last_rows.append(df.sort_index().tail(1))
     df = pd.concat(last_rows)
     return df
 
@@ -3,6 +3,7 @@ Import as:
 
 import dataflow.core.node as dtfcornode
 """
+
 import abc
 import logging
 from typing import Any, Dict, List, Optional
@@ -137,6 +138,13 @@ class Node(_Node):
             output_name,
             self.nid,
         )
+        hdbg.dassert_in(
+            output_name,
+            self._output_vals[method],
+            "%s of node %s has been freed!",
+            output_name,
+            self.nid,
+        )
         return self._output_vals[method][output_name]
 
     def get_outputs(self, method: Method) -> NodeOutput:
@@ -221,6 +229,26 @@ class Node(_Node):
         #     only_warning=only_warning,
         # )
 
+    def free_output(self, method: Method, output_name: str) -> None:
+        """
+        Deallocate the value of output `output_name` for the requested
+        `method`.
+
+        Note that this should be called only after the output is not
+        needed anymore.
+        """
+        hdbg.dassert_in(method, self._output_vals.keys())
+        hdbg.dassert_in(
+            output_name,
+            self._output_vals[method],
+            "%s of node %s has already been freed!",
+            output_name,
+            self.nid,
+        )
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug("Freeing %s:%s of node %s", method, output_name, self.nid)
+        del self._output_vals[method][output_name]
+
     def _store_output(self, method: Method, output_name: str, value: Any) -> None:
         """
         Store the output for `name` and the specific `method`.
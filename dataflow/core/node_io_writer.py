@@ -0,0 +1,333 @@
+"""
+Import as:
+
+import dataflow.core.node_io_writer as dtfcnoiowr
+"""
+
+import atexit
+import collections
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import helpers.hdbg as hdbg
+
+_LOG = logging.getLogger(__name__)
+
+
+# Function writing a snapshot of a node interface to disk.
+WriteFunc = Callable[[], None]
+
+
+# #############################################################################
+# NodeIoWriter
+# #############################################################################
+
+
+class NodeIoWriter:
+    """
+    Write the interfaces of the DAG nodes to disk in a background thread.
+
+    The DAG submits a snapshot of each node output, together with the function
+    to save it, and continues executing the nodes while a background thread
+    writes the snapshots to disk.
+
+    - The writes are performed in batches, taking all the pending snapshots at
+      once
+    - A pending write is replaced by a new write to the same file, so that
+      only the latest snapshot is saved
+    - The number of snapshots in memory is bounded: when the queue is full
+      `submit()` blocks until the background thread catches up. The number of
+      times and the time spent waiting are reported by `get_stats()`
+    - All the pending writes are flushed by `flush()`, `close()` and when the
+      interpreter exits
+    """
+
+    def __init__(self, max_queue_size: int = 64) -> None:
+        """
+        Constructor.
+
+        :param max_queue_size: max number of snapshots waiting to be written
+            or being written
+        """
+        hdbg.dassert_isinstance(max_queue_size, int)
+        hdbg.dassert_lte(1, max_queue_size)
+        self._max_queue_size = max_queue_size
+        # Map file names to the functions writing the corresponding snapshot.
+        self._pending_writes: Dict[str, WriteFunc] = collections.OrderedDict()
+        self._num_in_flight = 0
+        self._is_closed = False
+        # Store the first exception raised by a write, if any.
+        self._exception: Optional[BaseException] = None
+        # Protect the state above.
+        self._cond = threading.Condition()
+        # Counters reported by `get_stats()`.
+        self._num_submitted = 0
+        self._num_written = 0
+        self._num_coalesced = 0
+        self._num_blocked = 0
+        self._blocked_time_in_secs = 0.0
+        self._max_queue_size_reached = 0
+        #
+        self._thread = threading.Thread(
+            target=self._write_loop, name="NodeIoWriter", daemon=True
+        )
+        self._thread.start()
+        # Make sure that the pending writes are not lost on exit.
+        atexit.register(self.close)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(max_queue_size={self._max_queue_size})"
+
+    def submit(self, file_name: str, write_func: WriteFunc) -> None:
+        """
+        Enqueue a write, blocking if the queue is full.
+
+        :param file_name: file written by `write_func`, used to coalesce the
+            writes to the same file
+        :param write_func: function performing the write
+        """
+        with self._cond:
+            hdbg.dassert(not self._is_closed, "NodeIoWriter is closed")
+            self._raise_if_failed()
+            self._num_submitted += 1
+            if file_name in self._pending_writes:
+                # Replace the pending write with the latest snapshot.
+                self._num_coalesced += 1
+                self._pending_writes[file_name] = write_func
+                return
+            if self._get_queue_size() >= self._max_queue_size:
+                # Apply back-pressure to the DAG execution.
+                self._num_blocked += 1
+                _LOG.warning(
+                    "NodeIoWriter queue is full (max_queue_size=%s): waiting",
+                    self._max_queue_size,
+                )
+                start_time = time.time()
+                self._cond.wait_for(
+                    lambda: self._get_queue_size() < self._max_queue_size
+                    or self._exception is not None
+                )
+                self._blocked_time_in_secs += time.time() - start_time
+                self._raise_if_failed()
+            self._pending_writes[file_name] = write_func
+            self._max_queue_size_reached = max(
+                self._max_queue_size_reached, self._get_queue_size()
+            )
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        """
+        Wait until all the submitted writes are completed.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._get_queue_size() == 0 or self._exception is not None
+            )
+            self._raise_if_failed()
+
+    def close(self) -> None:
+        """
+        Flush the pending writes and stop the background thread.
+        """
+        with self._cond:
+            if self._is_closed:
+                return
+            self._is_closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
+        _LOG.info("NodeIoWriter closed: %s", self.get_stats())
+        self._raise_if_failed()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return counters about the writes and the back-pressure.
+        """
+        with self._cond:
+            stats = {
+                "num_submitted": self._num_submitted,
+                "num_written": self._num_written,
+                "num_coalesced": self._num_coalesced,
+                "num_blocked": self._num_blocked,
+                "blocked_time_in_secs": self._blocked_time_in_secs,
+                "queue_size": self._get_queue_size(),
+                "max_queue_size_reached": self._max_queue_size_reached,
+            }
+        return stats
+
+    # ///////////////////////////////////////////////////////////////////////////
+    # Private methods.
+    # ///////////////////////////////////////////////////////////////////////////
+
+    def _get_queue_size(self) -> int:
+        return len(self._pending_writes) + self._num_in_flight
+
+    def _raise_if_failed(self) -> None:
+        if self._exception is not None:
+            raise RuntimeError(
+                "NodeIoWriter failed to write node interface"
+            ) from self._exception
+
+    def _write_loop(self) -> None:
+        """
+        Write batches of pending snapshots until the writer is closed.
+        """
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._pending_writes or self._is_closed
+                )
+                if not self._pending_writes:
+                    # The writer is closed and all the writes are completed.
+                    return
+                # Take all the pending writes.
+                batch: List[WriteFunc] = list(self._pending_writes.values())
+                self._pending_writes.clear()
+                self._num_in_flight = len(batch)
+            for write_func in batch:
+                exception = None
+                try:
+                    write_func()
+                except Exception as e:  # pylint: disable=broad-except
+                    _LOG.error("Failed to write node interface: %s", e)
+                    exception = e
+                with self._cond:
+                    self._num_in_flight -= 1
+                    if exception is None:
+                        self._num_written += 1
+                    elif self._exception is None:
+                        self._exception = exception
+                    self._cond.notify_all()
+
+
+# #############################################################################
+# NodeIoDeltaEncoder
+# #############################################################################
+
+
+# Extension of the files storing only the rows of a node output that are new or
+# changed with respect to the previous bar.
+NODE_IO_DELTA_EXT = "delta.parquet"
+
+
+def compute_df_delta(
+    prev_df: pd.DataFrame, df: pd.DataFrame
+) -> Optional[pd.DataFrame]:
+    """
+    Compute the rows of `df` that are new or changed with respect to `prev_df`.
+
+    The first row of `df` is always included in the delta, so that the rows of
+    `prev_df` that are not in `df` anymore (e.g., the rows dropping out of a
+    lookback window) can be discarded when applying the delta.
+
+    :param prev_df: node output at the previous bar
+    :param df: node output at the current bar
+    :return: the delta, or `None` if `df` can't be represented as a delta
+        with respect to `prev_df` (e.g., the columns or the dtypes changed or
+        rows were removed in the middle of the index)
+    """
+    if prev_df.empty or df.empty:
+        return None
+    if not df.columns.equals(prev_df.columns):
+        return None
+    if not df.dtypes.equals(prev_df.dtypes):
+        return None
+    for df_tmp in (prev_df, df):
+        if not (df_tmp.index.is_unique and df_tmp.index.is_monotonic_increasing):
+            return None
+    # Discard the rows before the start of the current output.
+    prev_df = prev_df[prev_df.index >= df.index[0]]
+    if not prev_df.index.isin(df.index).all():
+        # Some rows were removed in the middle of the index.
+        return None
+    # Find the rows that changed, considering NaNs in the same position equal.
+    common_df = df.loc[prev_df.index]
+    is_equal = (common_df == prev_df) | (common_df.isna() & prev_df.isna())
+    is_changed = ~is_equal.all(axis=1)
+    changed_idx = is_changed.index[is_changed.to_numpy()]
+    # Keep the new rows, the changed rows and the first row.
+    mask = ~df.index.isin(prev_df.index) | df.index.isin(changed_idx)
+    mask[0] = True
+    delta_df = df[mask]
+    return delta_df
+
+
+def apply_df_delta(prev_df: pd.DataFrame, delta_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rebuild a node output from the previous one and a delta.
+
+    This is the inverse of `compute_df_delta()`.
+
+    :param prev_df: node output at the previous bar
+    :param delta_df: delta computed by `compute_df_delta()`
+    :return: node output at the current bar
+    """
+    hdbg.dassert_lt(0, delta_df.shape[0])
+    hdbg.dassert(delta_df.columns.equals(prev_df.columns))
+    prev_df = prev_df[prev_df.index >= delta_df.index[0]]
+    prev_df = prev_df[~prev_df.index.isin(delta_df.index)]
+    df = pd.concat([prev_df, delta_df]).sort_index()
+    return df
+
+
+class NodeIoDeltaEncoder:
+    """
+    Encode the outputs of the DAG nodes as deltas with respect to the previous
+    bar.
+
+    In real time each node output contains the entire lookback window, which
+    is mostly the same as in the previous bar. Saving only the rows that are
+    new or changed reduces the amount of data written by orders of magnitude.
+
+    A full checkpoint is emitted every `checkpoint_period` bars and every time
+    an output can't be represented as a delta, so that the output at any bar
+    can be rebuilt from the last checkpoint before it and the following deltas.
+    """
+
+    def __init__(self, checkpoint_period: int) -> None:
+        """
+        Constructor.
+
+        :param checkpoint_period: number of bars between two full checkpoints,
+            e.g., 1 to save only checkpoints
+        """
+        hdbg.dassert_isinstance(checkpoint_period, int)
+        hdbg.dassert_lte(1, checkpoint_period)
+        self._checkpoint_period = checkpoint_period
+        # Map a node output to its value at the previous bar.
+        self._prev_dfs: Dict[str, pd.DataFrame] = {}
+        # Map a node output to the number of deltas since the last checkpoint.
+        self._num_deltas: Dict[str, int] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}"
+            f"(checkpoint_period={self._checkpoint_period})"
+        )
+
+    def encode(self, key: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, bool]:
+        """
+        Encode the current value of a node output.
+
+        The encoder keeps a reference to `df`, so the caller should not modify
+        it.
+
+        :param key: id of the node output, e.g., `predict.0.read_data.df_out`
+        :param df: current value of the node output
+        :return: the data to save and whether it's a full checkpoint or a delta
+        """
+        prev_df = self._prev_dfs.get(key)
+        num_deltas = self._num_deltas.get(key, 0)
+        delta_df = None
+        if prev_df is not None and num_deltas + 1 < self._checkpoint_period:
+            delta_df = compute_df_delta(prev_df, df)
+        self._prev_dfs[key] = df
+        if delta_df is None:
+            self._num_deltas[key] = 0
+            return df, True
+        self._num_deltas[key] = num_deltas + 1
+        return delta_df, False
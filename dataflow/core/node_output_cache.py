@@ -0,0 +1,507 @@
+"""
+Import as:
+
+import dataflow.core.node_output_cache as dtfcnoouca
+"""
+
+import datetime
+import enum
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import threading
+import types
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import dataflow.core.node as dtfcornode
+import helpers.hdbg as hdbg
+import helpers.hio as hio
+import helpers.hparquet as hparque
+
+_LOG = logging.getLogger(__name__)
+
+
+# #############################################################################
+# Fingerprints
+# #############################################################################
+
+
+# Node attributes that don't affect the output of a node.
+_ATTRIBUTES_TO_SKIP = (
+    "_nid",
+    "_output_vals",
+    "_info",
+    "_incremental_inputs",
+    "_last_incremental_idxs",
+)
+
+# Types that are fingerprinted through their `repr()`.
+_REPR_TYPES = (
+    type(None),
+    bool,
+    int,
+    float,
+    complex,
+    str,
+    bytes,
+    range,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    pd.Timestamp,
+    pd.Timedelta,
+    pd.tseries.offsets.BaseOffset,
+    np.generic,
+    np.dtype,
+    enum.Enum,
+)
+
+
+def _update_hash(hasher: Any, obj: Any, path_ids: Set[int]) -> None:
+    """
+    Update `hasher` with the content of `obj`.
+
+    :param path_ids: ids of the objects being fingerprinted, used to detect
+        cycles
+    :raises TypeError: if `obj` can't be fingerprinted
+    """
+    hasher.update(type(obj).__qualname__.encode())
+    if isinstance(obj, _REPR_TYPES):
+        hasher.update(repr(obj).encode())
+        return
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        if isinstance(obj, pd.DataFrame):
+            hasher.update(repr(obj.dtypes).encode())
+            _update_hash(hasher, obj.columns, path_ids)
+        else:
+            hasher.update(repr(obj.dtype).encode())
+        if isinstance(obj, pd.Index):
+            hasher.update(repr(obj.names).encode())
+        else:
+            hasher.update(repr(obj.index.names).encode())
+        hasher.update(
+            pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes()
+        )
+        return
+    if isinstance(obj, np.ndarray):
+        hasher.update(repr((obj.dtype, obj.shape)).encode())
+        if obj.dtype == object:
+            for item in obj.ravel():
+                _update_hash(hasher, item, path_ids)
+        else:
+            hasher.update(np.ascontiguousarray(obj).tobytes())
+        return
+    if isinstance(obj, (types.ModuleType, types.BuiltinFunctionType, type)):
+        name = getattr(obj, "__qualname__", obj.__name__)
+        hasher.update(f"{getattr(obj, '__module__', '')}.{name}".encode())
+        return
+    if isinstance(obj, np.ufunc):
+        hasher.update(obj.__name__.encode())
+        return
+    # Detect cycles in the containers and the objects.
+    if id(obj) in path_ids:
+        raise TypeError(f"Can't fingerprint object with a cycle: {type(obj)}")
+    path_ids.add(id(obj))
+    if isinstance(obj, (list, tuple)):
+        for item in obj:
+            _update_hash(hasher, item, path_ids)
+    elif isinstance(obj, (set, frozenset)):
+        for item_fingerprint in sorted(_get_fingerprint(item) for item in obj):
+            hasher.update(item_fingerprint.encode())
+    elif isinstance(obj, dict):
+        for key in sorted(obj.keys(), key=repr):
+            _update_hash(hasher, key, path_ids)
+            _update_hash(hasher, obj[key], path_ids)
+    elif isinstance(obj, types.CodeType):
+        hasher.update(obj.co_code)
+        _update_hash(hasher, obj.co_consts, path_ids)
+        _update_hash(hasher, obj.co_names, path_ids)
+    elif isinstance(obj, types.FunctionType):
+        hasher.update(f"{obj.__module__}.{obj.__qualname__}".encode())
+        _update_hash(hasher, obj.__code__, path_ids)
+        _update_hash(hasher, obj.__defaults__, path_ids)
+        _update_hash(hasher, obj.__kwdefaults__, path_ids)
+        closure = obj.__closure__ or ()
+        _update_hash(hasher, [cell.cell_contents for cell in closure], path_ids)
+    elif isinstance(obj, types.MethodType):
+        _update_hash(hasher, obj.__func__, path_ids)
+        _update_hash(hasher, obj.__self__, path_ids)
+    elif isinstance(obj, functools.partial):
+        _update_hash(hasher, obj.func, path_ids)
+        _update_hash(hasher, obj.args, path_ids)
+        _update_hash(hasher, obj.keywords, path_ids)
+    elif isinstance(obj, dtfcornode.Node):
+        # Skip the outputs of the nodes, e.g., for nodes running a DAG.
+        _update_hash(hasher, type(obj), path_ids)
+        _update_hash(hasher, _get_node_attributes(obj), path_ids)
+    elif hasattr(obj, "__dict__"):
+        _update_hash(hasher, type(obj), path_ids)
+        _update_hash(hasher, vars(obj), path_ids)
+    else:
+        raise TypeError(f"Can't fingerprint object of type '{type(obj)}'")
+    path_ids.remove(id(obj))
+
+
+def _get_fingerprint(obj: Any) -> str:
+    """
+    Return a fingerprint of the content of `obj`.
+
+    :raises TypeError: if `obj` can't be fingerprinted
+    """
+    hasher = hashlib.sha256()
+    _update_hash(hasher, obj, set())
+    return hasher.hexdigest()
+
+
+def _get_node_attributes(node: dtfcornode.Node) -> Dict[str, Any]:
+    """
+    Return the attributes of a node that can affect its output.
+    """
+    attributes = {
+        attr: value
+        for attr, value in vars(node).items()
+        if attr not in _ATTRIBUTES_TO_SKIP
+    }
+    return attributes
+
+
+def get_node_attribute_fingerprints(node: dtfcornode.Node) -> Dict[str, str]:
+    """
+    Return the fingerprints of the attributes of a node affecting its output.
+
+    The attributes include the constructor params and the fit state.
+
+    :raises TypeError: if an attribute can't be fingerprinted
+    """
+    attribute_fingerprints = {
+        attr: _get_fingerprint(value)
+        for attr, value in _get_node_attributes(node).items()
+    }
+    return attribute_fingerprints
+
+
+def get_node_fingerprint(
+    node: dtfcornode.Node,
+    method: dtfcornode.Method,
+    attribute_fingerprints: Dict[str, str],
+    input_fingerprints: Dict[str, str],
+) -> str:
+    """
+    Return the fingerprint of the output of running `method` on a node.
+
+    :param attribute_fingerprints: as returned by
+        `get_node_attribute_fingerprints()`
+    :param input_fingerprints: map each input name to the fingerprint of the
+        output of the predecessor node connected to it
+    """
+    obj = (
+        type(node),
+        method,
+        node.output_names,
+        attribute_fingerprints,
+        input_fingerprints,
+    )
+    return _get_fingerprint(obj)
+
+
+def get_output_fingerprint(node_fingerprint: str, output_name: str) -> str:
+    """
+    Return the fingerprint of an output of a node.
+    """
+    return _get_fingerprint((node_fingerprint, output_name))
+
+
+# #############################################################################
+# NodeOutputCache
+# #############################################################################
+
+
+class NodeOutputCache:
+    """
+    Cache the outputs of the `FitPredictNode`s on disk.
+
+    The outputs are keyed by a fingerprint of the class of the node, of its
+    attributes (i.e., the constructor params and the fit state) and of the
+    fingerprints of its inputs, so that a node is executed only if something
+    changed in the DAG before it. E.g., when running many configs sharing the
+    data loading and the feature computation, the shared nodes are executed
+    only for the first config.
+
+    An entry is stored in the dir `{cache_dir}/{fingerprint}` with:
+    - a Parquet file for each output
+    - a pickle file with the attributes of the node changed by the execution
+      (e.g., `info` and the fit state), which are restored on a cache hit
+
+    The entries are written atomically, so that the cache can be shared by
+    processes running in parallel. The least recently used entries are
+    evicted when the size of the cache exceeds `max_cache_size_in_bytes`.
+
+    Caveats:
+    - The functions passed to the nodes are fingerprinted through their code
+      and closures, but not through the global objects they refer to
+    - Nodes that depend on external state (e.g., the wall clock or a DB) can't
+      be cached correctly, so the cache should not be used in real-time
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        *,
+        max_cache_size_in_bytes: int = 10 * 1024**3,
+    ) -> None:
+        """
+        Constructor.
+
+        :param cache_dir: dir storing the cache entries
+        :param max_cache_size_in_bytes: max size of the cache on disk
+        """
+        hdbg.dassert_isinstance(cache_dir, str)
+        hdbg.dassert_lt(0, max_cache_size_in_bytes)
+        self._cache_dir = cache_dir
+        self._max_cache_size_in_bytes = max_cache_size_in_bytes
+        hio.create_dir(self._cache_dir, incremental=True)
+        # Counters reported by `get_stats()`, updated by the nodes running in
+        # parallel.
+        self._stats_lock = threading.Lock()
+        self._num_hits = 0
+        self._num_misses = 0
+        self._num_uncacheable = 0
+        self._num_evicted = 0
+        # Size of the entries in the cache, updated when an entry is saved so
+        # that the cache dir is scanned only when the size exceeds the limit.
+        # The entries saved by other processes are accounted for at the next
+        # scan.
+        self._size_lock = threading.Lock()
+        self._cache_size_in_bytes = sum(
+            size for _, size, _ in self._get_entries()
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(cache_dir='{self._cache_dir}', "
+            f"max_cache_size_in_bytes={self._max_cache_size_in_bytes})"
+        )
+
+    def run_node(
+        self,
+        node: dtfcornode.Node,
+        method: dtfcornode.Method,
+        input_fingerprints: Optional[Dict[str, str]],
+        run_node_func: Callable[[], dtfcornode.NodeOutput],
+    ) -> Tuple[dtfcornode.NodeOutput, Optional[str]]:
+        """
+        Run `method` on a node, reusing the cached output if possible.
+
+        :param input_fingerprints: fingerprints of the inputs of the node
+            (see `get_node_fingerprint()`), `None` if some inputs are not
+            cacheable
+        :param run_node_func: function executing the node
+        :return: the output of the node and its fingerprint, `None` if the node
+            is not cacheable
+        """
+        fingerprint = None
+        # Cache only the methods of the `FitPredictNode`s. The type of the node
+        # is not checked since `dataflow.core.nodes` imports
+        # `dataflow.core.dag`, which imports this module.
+        if method in ("fit", "predict") and input_fingerprints is not None:
+            try:
+                attribute_fingerprints = get_node_attribute_fingerprints(node)
+            except TypeError as e:
+                _LOG.debug("Node '%s' is not cacheable: %s", node.nid, e)
+            else:
+                fingerprint = get_node_fingerprint(
+                    node, method, attribute_fingerprints, input_fingerprints
+                )
+        if fingerprint is None:
+            self._increment_stat("_num_uncacheable")
+            return run_node_func(), None
+        # Look up the output.
+        output = self._load(node, fingerprint)
+        if output is not None:
+            _LOG.debug("Cache hit for node '%s'", node.nid)
+            self._increment_stat("_num_hits")
+            return output, fingerprint
+        # Execute the node and save the output.
+        self._increment_stat("_num_misses")
+        output = run_node_func()
+        try:
+            new_attribute_fingerprints = get_node_attribute_fingerprints(node)
+        except TypeError as e:
+            _LOG.debug("Node '%s' is not cacheable: %s", node.nid, e)
+            return output, None
+        # Save the attributes changed by the execution.
+        node_state = {
+            attr: vars(node)[attr]
+            for attr, attr_fingerprint in new_attribute_fingerprints.items()
+            if attribute_fingerprints.get(attr) != attr_fingerprint
+        }
+        if "_info" in vars(node):
+            node_state["_info"] = vars(node)["_info"]
+        is_saved = self._save(fingerprint, output, node_state)
+        if not is_saved:
+            return output, None
+        return output, fingerprint
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return counters about the cache lookups.
+        """
+        with self._stats_lock:
+            stats = {
+                "num_hits": self._num_hits,
+                "num_misses": self._num_misses,
+                "num_uncacheable": self._num_uncacheable,
+                "num_evicted": self._num_evicted,
+            }
+        return stats
+
+    # ///////////////////////////////////////////////////////////////////////////
+    # Private methods.
+    # ///////////////////////////////////////////////////////////////////////////
+
+    def _increment_stat(self, attr: str) -> None:
+        with self._stats_lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def _load(
+        self, node: dtfcornode.Node, fingerprint: str
+    ) -> Optional[dtfcornode.NodeOutput]:
+        """
+        Load the output of a node and restore its state.
+
+        :return: the output or `None` if the entry is not in the cache
+        """
+        entry_dir = os.path.join(self._cache_dir, fingerprint)
+        if not os.path.exists(entry_dir):
+            return None
+        try:
+            with open(os.path.join(entry_dir, "state.pkl"), "rb") as f:
+                state = pickle.load(f)
+            output = {}
+            for output_name in node.output_names:
+                file_name = os.path.join(entry_dir, f"{output_name}.parquet")
+                df = hparque.from_parquet(file_name)
+                # Restore the metadata that Parquet doesn't preserve.
+                df.columns = state["columns"][output_name]
+                index_freq = state["index_freqs"][output_name]
+                if index_freq is not None:
+                    df.index.freq = index_freq
+                output[output_name] = df
+        except (OSError, AssertionError) as e:
+            # The entry was evicted by another process while reading.
+            _LOG.warning("Can't read cache entry '%s': %s", entry_dir, e)
+            return None
+        vars(node).update(state["node_state"])
+        # Mark the entry as recently used.
+        os.utime(entry_dir)
+        return output
+
+    def _save(
+        self,
+        fingerprint: str,
+        output: dtfcornode.NodeOutput,
+        node_state: Dict[str, Any],
+    ) -> bool:
+        """
+        Save the output of a node and the attributes to restore.
+
+        :return: whether the entry was saved
+        """
+        if not all(isinstance(df, pd.DataFrame) for df in output.values()):
+            return False
+        state = {
+            "columns": {name: df.columns for name, df in output.items()},
+            "index_freqs": {
+                name: getattr(df.index, "freq", None)
+                for name, df in output.items()
+            },
+            "node_state": node_state,
+        }
+        try:
+            state_as_bytes = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            _LOG.debug("Can't pickle node state: %s", e)
+            return False
+        # Write the entry to a tmp dir and then rename it, so that readers
+        # never see partial entries.
+        entry_dir = os.path.join(self._cache_dir, fingerprint)
+        tmp_dir = os.path.join(self._cache_dir, f"tmp.{uuid.uuid4().hex}")
+        hio.create_dir(tmp_dir, incremental=False)
+        for output_name, df in output.items():
+            file_name = os.path.join(tmp_dir, f"{output_name}.parquet")
+            # Parquet requires string column names.
+            df = df.set_axis(
+                [str(col) for col in df.columns.to_flat_index()], axis=1
+            )
+            try:
+                hparque.to_parquet(df, file_name)
+            except (pa.ArrowException, ValueError) as e:
+                # E.g., an object column with values of different types.
+                _LOG.debug(
+                    "Can't save output '%s' to Parquet: %s", output_name, e
+                )
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return False
+        with open(os.path.join(tmp_dir, "state.pkl"), "wb") as f:
+            f.write(state_as_bytes)
+        entry_size = sum(file.stat().st_size for file in os.scandir(tmp_dir))
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Another process saved the same entry.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        else:
+            self._update_cache_size(entry_size)
+        return True
+
+    def _update_cache_size(self, entry_size: int) -> None:
+        """
+        Account for a saved entry and evict entries if the cache is too big.
+        """
+        with self._size_lock:
+            self._cache_size_in_bytes += entry_size
+            if self._cache_size_in_bytes > self._max_cache_size_in_bytes:
+                self._evict()
+
+    def _get_entries(self) -> List[Tuple[float, int, str]]:
+        """
+        Scan the cache dir.
+
+        :return: modification time, size, and dir of each entry
+        """
+        entries: List[Tuple[float, int, str]] = []
+        for entry in os.scandir(self._cache_dir):
+            if not entry.is_dir() or entry.name.startswith("tmp."):
+                continue
+            try:
+                size = sum(file.stat().st_size for file in os.scandir(entry.path))
+                mtime = entry.stat().st_mtime
+            except OSError:
+                # The entry was evicted by another process.
+                continue
+            entries.append((mtime, size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        """
+        Delete the least recently used entries until the cache fits its size.
+        """
+        entries = self._get_entries()
+        total_size = sum(size for _, size, _ in entries)
+        # Delete the oldest entries first.
+        for _, size, entry_dir in sorted(entries):
+            if total_size <= self._max_cache_size_in_bytes:
+                break
+            _LOG.debug("Evicting cache entry '%s'", entry_dir)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
+            self._increment_stat("_num_evicted")
+        self._cache_size_in_bytes = total_size
@@ -58,6 +58,14 @@ class FitPredictNode(dtfcornode.Node, abc.ABC):
             outputs = ["df_out"]
         super().__init__(nid, inputs, outputs)
         self._info: collections.OrderedDict = collections.OrderedDict()
+        # Number of past input rows needed by `predict_incrementally()` to
+        # process the new rows. `None` means the entire history.
+        self._warmup_length: Optional[int] = None
+        # Past input rows kept by `predict_incrementally()` for each input.
+        self._incremental_inputs: Dict[str, pd.DataFrame] = {}
+        # Index of the last row returned by `predict_incrementally()` for each
+        # output.
+        self._last_incremental_idxs: Dict[str, Any] = {}
 
     # //////////////////////////////////////////////////////////////////////////
     # fit / predict.
@@ -78,6 +86,102 @@ class FitPredictNode(dtfcornode.Node, abc.ABC):
     def set_fit_state(self, fit_state: "FitPredictNode.NodeState") -> None:
         _ = self, fit_state
 
+    # //////////////////////////////////////////////////////////////////////////
+    # Incremental predict.
+    # //////////////////////////////////////////////////////////////////////////
+
+    def get_warmup_length(self) -> Optional[int]:
+        """
+        Return the number of past input rows needed to process new rows.
+
+        `None` means that the entire history is needed.
+        """
+        return self._warmup_length
+
+    def set_warmup_length(self, warmup_length: Optional[int]) -> None:
+        """
+        Set the number of past input rows needed to process new rows.
+
+        E.g., a node applying a row-wise transformation has a warm-up length
+        of 0, while a node computing a rolling window of 10 rows has a
+        warm-up length of 9.
+        """
+        if warmup_length is not None:
+            hdbg.dassert_isinstance(warmup_length, int)
+            hdbg.dassert_lte(0, warmup_length)
+        self._warmup_length = warmup_length
+
+    def predict_incrementally(
+        self, **kwargs: pd.DataFrame
+    ) -> "FitPredictNode.NodeOutput":
+        """
+        Run `predict()` on the rows appended to the inputs since the last call.
+
+        The inputs contain only the new rows, i.e., the rows with an index
+        larger than the ones passed in the previous calls. The outputs contain
+        only the rows that running `predict()` on the entire history would
+        have appended to the outputs returned so far.
+
+        This implementation keeps the last `get_warmup_length()` rows of each
+        input and runs `predict()` on them together with the new rows. Nodes
+        with a state (e.g., EMAs) override this method to carry the state
+        across calls and process only the new rows.
+        """
+        inputs = {}
+        for input_name, df_in in kwargs.items():
+            df_in = self._append_to_incremental_input(input_name, df_in)
+            inputs[input_name] = df_in
+        node_output = self.predict(**inputs)
+        if "predict" in self._info:
+            self._info["predict_incrementally"] = self._info["predict"]
+        node_output = self._get_new_incremental_output_rows(node_output)
+        return node_output
+
+    def _append_to_incremental_input(
+        self, input_name: str, df_in: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Append the new rows of an input to the rows kept from previous calls.
+
+        :return: the rows needed to process the new rows
+        """
+        if input_name in self._incremental_inputs:
+            df_prev = self._incremental_inputs[input_name]
+            if not df_prev.empty and not df_in.empty:
+                hdbg.dassert_lt(
+                    df_prev.index[-1],
+                    df_in.index[0],
+                    "Input '%s' of node '%s' is not append-only",
+                    input_name,
+                    self.nid,
+                )
+            df_in = pd.concat([df_prev, df_in])
+        # Keep only the rows needed by the next call.
+        warmup_length = self.get_warmup_length()
+        if warmup_length is None:
+            self._incremental_inputs[input_name] = df_in
+        elif warmup_length == 0:
+            self._incremental_inputs[input_name] = df_in.iloc[0:0]
+        else:
+            self._incremental_inputs[input_name] = df_in.iloc[-warmup_length:]
+        return df_in
+
+    def _get_new_incremental_output_rows(
+        self, node_output: "FitPredictNode.NodeOutput"
+    ) -> "FitPredictNode.NodeOutput":
+        """
+        Remove the output rows already returned by the previous calls.
+        """
+        new_node_output = {}
+        for output_name, df_out in node_output.items():
+            last_idx = self._last_incremental_idxs.get(output_name)
+            if last_idx is not None:
+                df_out = df_out[df_out.index > last_idx]
+            if not df_out.empty:
+                self._last_incremental_idxs[output_name] = df_out.index[-1]
+            new_node_output[output_name] = df_out
+        return new_node_output
+
     # //////////////////////////////////////////////////////////////////////////
     # Info.
     # //////////////////////////////////////////////////////////////////////////
@@ -1,5 +1,7 @@
+import collections
 import io
 import logging
+from typing import Any, Dict
 
 import numpy as np
 import pandas as pd
@@ -7,6 +9,7 @@ import pytest
 
 import core.artificial_signal_generators as carsigen
 import core.config as cconfig
+import core.signal_processing as csigproc
 import dataflow.core.nodes.test.helpers as cdnth
 import dataflow.core.nodes.transformers as dtfconotra
 import helpers.hpandas as hpandas
@@ -786,6 +789,149 @@ datetime,MN0,MN1,MN0,MN1
         return df
 
 
+def _compute_ret_and_demeaned_ret(
+    srs: pd.Series, info: collections.OrderedDict
+) -> pd.DataFrame:
+    """
+    Compute returns and demeaned returns, storing the mean in `info`.
+
+    This is defined at module level so that it can be pickled and sent to
+    other processes.
+    """
+    ret = srs.pct_change()
+    info["mean"] = ret.mean()
+    df = pd.DataFrame({"ret": ret, "demeaned_ret": ret - ret.mean()})
+    return df
+
+
+def _compute_ret_failing_on_small_prices(srs: pd.Series) -> pd.Series:
+    if srs.iloc[0] < 1:
+        raise ValueError(f"Small price for '{srs.name}'")
+    return srs.pct_change()
+
+
+class TestParallelTransformers1(hunitest.TestCase):
+    """
+    Check that applying the functions in parallel gives the same results as
+    applying them serially.
+    """
+
+    def test_grouped_col_df_to_df1(self) -> None:
+        """
+        Test `GroupedColDfToDfTransformer` with a thread pool.
+        """
+        data = self._get_data()
+
+        def divide(
+            df: pd.DataFrame, col1: str, col2: str, info: collections.OrderedDict
+        ) -> pd.DataFrame:
+            quotient = (df[col1] / df[col2]).rename("div")
+            info["max"] = quotient.max()
+            return quotient.to_frame()
+
+        kwargs = {
+            "in_col_groups": [("close",), ("volume",)],
+            "out_col_group": (),
+            "transformer_func": divide,
+            "transformer_kwargs": {"col1": "close", "col2": "volume"},
+        }
+        self._check_parallel_output(
+            dtfconotra.GroupedColDfToDfTransformer, kwargs, data, "thread"
+        )
+
+    def test_series_to_df1(self) -> None:
+        """
+        Test `SeriesToDfTransformer` with a process pool.
+        """
+        data = self._get_data()
+        kwargs = {
+            "in_col_group": ("close",),
+            "out_col_group": (),
+            "transformer_func": _compute_ret_and_demeaned_ret,
+        }
+        self._check_parallel_output(
+            dtfconotra.SeriesToDfTransformer, kwargs, data, "process"
+        )
+
+    def test_series_to_series1(self) -> None:
+        """
+        Test `SeriesToSeriesTransformer` with a thread pool.
+        """
+        data = self._get_data()
+        kwargs = {
+            "in_col_group": ("close",),
+            "out_col_group": ("ret_0",),
+            "transformer_func": lambda x: x.pct_change(),
+        }
+        self._check_parallel_output(
+            dtfconotra.SeriesToSeriesTransformer, kwargs, data, "thread"
+        )
+
+    def test_series_to_series2(self) -> None:
+        """
+        Check that the permitted exceptions are handled for each asset.
+        """
+        data = self._get_data()
+        # Make the function fail for one asset.
+        data[("close", "MN3")] = 0.5
+        kwargs = {
+            "in_col_group": ("close",),
+            "out_col_group": ("ret_0",),
+            "transformer_func": _compute_ret_failing_on_small_prices,
+            "permitted_exceptions": (ValueError,),
+        }
+        df_out = self._check_parallel_output(
+            dtfconotra.SeriesToSeriesTransformer, kwargs, data, "thread"
+        )
+        self.assertTrue(df_out[("ret_0", "MN3")].isna().all())
+        self.assertFalse(df_out[("ret_0", "MN4")].isna().all())
+
+    def _check_parallel_output(
+        self,
+        node_class: type,
+        kwargs: Dict[str, Any],
+        data: pd.DataFrame,
+        executor_type: str,
+    ) -> pd.DataFrame:
+        """
+        Check that the output and the info in serial and parallel mode match.
+
+        :return: the output of the node
+        """
+        node = node_class("serial", **kwargs)
+        expected = node.fit(data)["df_out"]
+        expected_info = node.get_info("fit")["func_info"]
+        node = node_class(
+            "parallel", num_workers=3, executor_type=executor_type, **kwargs
+        )
+        actual = node.fit(data)["df_out"]
+        actual_info = node.get_info("fit")["func_info"]
+        self.assert_equal(
+            hpandas.df_to_str(actual, num_rows=None),
+            hpandas.df_to_str(expected, num_rows=None),
+        )
+        self.assert_equal(str(actual_info), str(expected_info))
+        return actual
+
+    @staticmethod
+    def _get_data() -> pd.DataFrame:
+        """
+        Generate prices and volumes for 10 assets.
+        """
+        mn_process = carsigen.MultivariateNormalProcess()
+        mn_process.set_cov_from_inv_wishart_draw(dim=10, seed=342)
+        realization = mn_process.generate_sample(
+            {"start": "2000-01-01", "periods": 40, "freq": "B"}, seed=134
+        )
+        realization = realization.rename(columns=lambda x: "MN" + str(x))
+        close = np.exp(0.1 * realization.cumsum())
+        volume = pd.DataFrame(
+            index=close.index, columns=close.columns, data=100.0
+        )
+        data = pd.concat([close, volume], axis=1, keys=["close", "volume"])
+        return data
+
+
 class TestFunctionWrapper(hunitest.TestCase):
     def test1(self) -> None:
         """
@@ -832,6 +978,199 @@ datetime,close,volume
         return df
 
 
+class TestResample1(hunitest.TestCase):
+    def test_predict_incrementally1(self) -> None:
+        """
+        Check that predicting incrementally gives the same rows as `predict()`.
+        """
+        data = self._get_data()
+        self._check_predict_incrementally(data)
+
+    def test_predict_incrementally2(self) -> None:
+        """
+        Like `test_predict_incrementally1()`, but with an empty bucket.
+        """
+        data = self._get_data()
+        data = data.drop(
+            data.loc["2001-01-04 09:41:00":"2001-01-04 09:49:00"].index
+        )
+        self._check_predict_incrementally(data)
+
+    def test_predict_incrementally3(self) -> None:
+        """
+        Check bars not aligned with the buckets against the rows appended by
+        `predict()` on the history at each call.
+        """
+        data = self._get_data()
+        data.index = data.index + pd.Timedelta(seconds=30)
+        config = cconfig.Config.from_dict({"rule": "5T", "agg_func": "sum"})
+        node = dtfconotra.Resample("resample", **config.to_dict())
+        chunk_bounds = [0, 3, 4, 12, 13, len(data)]
+        dfs = []
+        expected_dfs = []
+        last_label = None
+        for start, end in zip(chunk_bounds[:-1], chunk_bounds[1:]):
+            df_in = data.iloc[start:end]
+            dfs.append(node.predict_incrementally(df_in=df_in)["df_out"])
+            # Compute the rows appended by `predict()`.
+            reference_node = dtfconotra.Resample(
+                "resample", **config.to_dict()
+            )
+            df_out = reference_node.predict(data.iloc[:end])["df_out"]
+            if last_label is not None:
+                df_out = df_out[df_out.index > last_label]
+            if not df_out.empty:
+                last_label = df_out.index[-1]
+            expected_dfs.append(df_out)
+        actual = pd.concat(dfs)
+        expected = pd.concat(expected_dfs)
+        self.assert_dfs_close(actual, expected)
+        # The last bucket is returned even if it has no bar at its label.
+        self.assertEqual(actual.index[-1], pd.Timestamp("2001-01-04 10:05:00"))
+
+    @staticmethod
+    def _get_data() -> pd.DataFrame:
+        date_range_kwargs = {
+            "start": "2001-01-04 09:31:00",
+            "end": "2001-01-04 10:00:00",
+            "freq": "T",
+        }
+        arma_process = carsigen.ArmaProcess([0.5], [])
+        rets = arma_process.generate_sample(
+            date_range_kwargs=date_range_kwargs, scale=1, burnin=0, seed=100
+        )
+        df = rets.to_frame(name="ret_0")
+        return df
+
+    def _check_predict_incrementally(self, data: pd.DataFrame) -> None:
+        config = cconfig.Config.from_dict({"rule": "5T", "agg_func": "sum"})
+        node = dtfconotra.Resample("resample", **config.to_dict())
+        expected = node.predict(data)["df_out"]
+        # Feed the data in chunks not aligned with the buckets.
+        node = dtfconotra.Resample("resample", **config.to_dict())
+        chunk_bounds = [0, 3, 4, 12, 13, len(data)]
+        dfs = []
+        for start, end in zip(chunk_bounds[:-1], chunk_bounds[1:]):
+            df_in = data.iloc[start:end]
+            df_out = node.predict_incrementally(df_in=df_in)["df_out"]
+            # Only the complete buckets are returned.
+            if not df_out.empty:
+                self.assertLessEqual(df_out.index[-1], data.index[end - 1])
+            dfs.append(df_out)
+        actual = pd.concat(dfs)
+        self.assert_dfs_close(actual, expected)
+
+
+class TestPredictIncrementally1(hunitest.TestCase):
+    """
+    Check that predicting incrementally gives the same rows as `predict()`.
+    """
+
+    def test_column_transformer1(self) -> None:
+        """
+        Check a z-score computed incrementally.
+        """
+        node_class = dtfconotra.ColumnTransformer
+        node_kwargs = {
+            "transformer_func": csigproc.compute_rolling_zscore,
+            "transformer_kwargs": {"tau": 5, "delay": 1},
+            "col_rename_func": lambda x: f"zscore_{x}",
+            "col_mode": "merge_all",
+        }
+        node = self._check_predict_incrementally(node_class, node_kwargs)
+        # Check that the state of the z-score is carried across the calls.
+        self.assertEqual(list(node._incremental_func_states.keys()), [None])
+
+    def test_series_transformer1(self) -> None:
+        """
+        Check a z-score computed incrementally dropping NaNs.
+        """
+        node_class = dtfconotra.SeriesTransformer
+        node_kwargs = {
+            "transformer_func": csigproc.compute_rolling_zscore,
+            "transformer_kwargs": {"tau": 5, "min_periods": 3},
+            "col_mode": "replace_all",
+            "nan_mode": "drop",
+        }
+        node = self._check_predict_incrementally(node_class, node_kwargs)
+        self.assertEqual(
+            list(node._incremental_func_states.keys()), ["ret_0", "ret_1"]
+        )
+
+    def test_series_transformer2(self) -> None:
+        """
+        Check a function without an incremental version.
+        """
+        node_class = dtfconotra.SeriesTransformer
+        node_kwargs = {
+            "transformer_func": lambda x: x.rolling(3).mean(),
+            "col_mode": "replace_all",
+        }
+        node = node_class("transformer", **node_kwargs)
+        # The node keeps the entire history.
+        self.assertIsNone(node.get_warmup_length())
+        self._check_predict_incrementally(node_class, node_kwargs)
+
+    def test_calculator1(self) -> None:
+        """
+        Check a node keeping only the rows needed by its delays.
+        """
+        node_class = dtfconotra.Calculator
+        node_kwargs = {
+            "term1": "ret_0",
+            "term2": "ret_1",
+            "out_col_name": "ret_sum",
+            "operation": "add",
+            "term1_delay": 2,
+        }
+        node = self._check_predict_incrementally(node_class, node_kwargs)
+        self.assertEqual(node.get_warmup_length(), 2)
+        self.assertEqual(len(node._incremental_inputs["df_in"]), 2)
+
+    @staticmethod
+    def _get_data() -> pd.DataFrame:
+        date_range_kwargs = {
+            "start": "2001-01-04 09:31:00",
+            "end": "2001-01-04 10:00:00",
+            "freq": "T",
+        }
+        arma_process = carsigen.ArmaProcess([0.5], [])
+        dfs = []
+        for seed in [1, 2]:
+            rets = arma_process.generate_sample(
+                date_range_kwargs=date_range_kwargs,
+                scale=1,
+                burnin=0,
+                seed=seed,
+            )
+            dfs.append(rets)
+        df = pd.concat(dfs, axis=1, keys=["ret_0", "ret_1"])
+        df.iloc[5:8, 1] = np.nan
+        return df
+
+    def _check_predict_incrementally(
+        self, node_class: type, node_kwargs: Dict[str, Any]
+    ) -> dtfconotra.dtfconobas.Transformer:
+        """
+        Predict incrementally in chunks and compare with `predict()`.
+
+        :return: the node used to predict incrementally
+        """
+        data = self._get_data()
+        node = node_class("transformer", **node_kwargs)
+        expected = node.predict(data)["df_out"]
+        node = node_class("transformer", **node_kwargs)
+        chunk_bounds = [0, 1, 4, 6, 13, len(data)]
+        dfs = []
+        for start, end in zip(chunk_bounds[:-1], chunk_bounds[1:]):
+            df_in = data.iloc[start:end]
+            df_out = node.predict_incrementally(df_in=df_in)["df_out"]
+            dfs.append(df_out)
+        actual = pd.concat(dfs)
+        self.assert_dfs_close(actual, expected)
+        return node
+
+
 class TestTwapVwapComputer(hunitest.TestCase):
     def test1(self) -> None:
         """
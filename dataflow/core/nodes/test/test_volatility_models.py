@@ -27,6 +27,32 @@ from dataflow.core.nodes.volatility_models import (
 _LOG = logging.getLogger(__name__)
 
 
+def _check_infos_close(
+    self_: hunitest.TestCase,
+    infos: List[List[collections.OrderedDict]],
+) -> None:
+    """
+    Check that the per-column and the vectorized infos are the same.
+
+    The learned taus are compared within floating-point tolerance.
+
+    :param infos: fit and predict infos of the per-column and of the
+        vectorized computation
+    """
+    infos = copy.deepcopy(infos)
+    for expected, actual in zip(*infos):
+        for col, col_info in expected.items():
+            sma_infos = []
+            for info in (col_info, actual[col]):
+                sma_info = info[col]["compute_smooth_moving_average"]
+                (sma_info,) = sma_info.values()
+                sma_infos.append(sma_info)
+            self_.assertAlmostEqual(
+                sma_infos[0].pop("tau"), sma_infos[1].pop("tau"), places=6
+            )
+        self_.assertEqual(actual, expected)
+
+
 class TestSmaModel(hunitest.TestCase):
     def test1(self) -> None:
         # Load test data.
@@ -119,6 +145,54 @@ class TestSmaModel(hunitest.TestCase):
         )
         self.assert_equal(actual, expected)
 
+    def test6(self) -> None:
+        """
+        Check that `predict_incrementally()` gives the same predictions as
+        `predict()`.
+        """
+        data = self._get_data()
+        config = cconfig.Config.from_dict(
+            {
+                "col": ["vol_sq"],
+                "steps_ahead": 2,
+                "tau": 8,
+                "nan_mode": "drop",
+            }
+        )
+        node = SmaModel("sma", **config.to_dict())
+        expected = node.predict(data)["df_out"]
+        chunks = [data.iloc[:10], data.iloc[10:11], data.iloc[11:]]
+        dfs = [node.predict_incrementally(chunk)["df_out"] for chunk in chunks]
+        actual = pd.concat(dfs)
+        col = "vol_sq.shift_-2_hat"
+        self.assert_dfs_close(actual[[col]], expected[[col]], equal_nan=True)
+
+    def test7(self) -> None:
+        """
+        Check that `vectorize=True` gives the same tau and predictions as the
+        pandas computation.
+        """
+        data = self._get_data()
+        config = cconfig.Config.from_dict(
+            {
+                "col": ["vol_sq"],
+                "steps_ahead": 2,
+                "nan_mode": "drop",
+            }
+        )
+        fit_df = data.loc["2000-01-01":"2000-02-10"]  # type: ignore[misc]
+        outputs = []
+        taus = []
+        for vectorize in [False, True]:
+            node = SmaModel("sma", vectorize=vectorize, **config.to_dict())
+            df_fit = node.fit(fit_df)["df_out"]
+            df_predict = node.predict(data)["df_out"]
+            outputs.append((df_fit, df_predict))
+            taus.append(node.get_fit_state()["_tau"])
+        self.assertAlmostEqual(taus[0], taus[1], places=6)
+        for expected, actual in zip(*outputs):
+            self.assert_dfs_close(actual, expected, equal_nan=True, rtol=1e-10)
+
     @staticmethod
     def _get_data() -> pd.DataFrame:
         """
@@ -561,6 +635,53 @@ class TestVolatilityModel(hunitest.TestCase):
         output_predefined = node_predefined.predict(data)["df_out"]
         pd.testing.assert_frame_equal(output_fit, output_predefined)
 
+    def test14(self) -> None:
+        """
+        Compare results of `predict_incrementally()` and `predict()`.
+        """
+        data = self._get_data()
+        config = cconfig.Config()
+        config["cols"] = ["ret_0"]
+        config["steps_ahead"] = 2
+        config["tau"] = 8
+        config["nan_mode"] = "leave_unchanged"
+        node = VolatilityModel("vol_model", **config.to_dict())
+        node.fit(data)
+        expected = node.predict(data)["df_out"]
+        chunks = [data.iloc[:10], data.iloc[10:11], data.iloc[11:]]
+        dfs = [node.predict_incrementally(chunk)["df_out"] for chunk in chunks]
+        actual = pd.concat(dfs)
+        # The forward columns are not comparable since they are computed only
+        # from the rows available at each call.
+        cols = ["ret_0_vol.shift_-2_hat", "ret_0_vol_adj"]
+        self.assert_dfs_close(actual[cols], expected[cols], equal_nan=True)
+
+    def test15(self) -> None:
+        """
+        Compare results of the vectorized and of the per-column computation.
+        """
+        data = self._get_data()
+        data["ret_1"] = data["ret_0"].shift(1) * 2
+        data.iloc[20:23, 0] = np.nan
+        for tau in [None, 4]:
+            config = cconfig.Config()
+            config["steps_ahead"] = 2
+            config["tau"] = tau
+            config["nan_mode"] = "drop"
+            outputs = []
+            infos = []
+            for vectorize in [False, True]:
+                node = VolatilityModel(
+                    "vol_model", vectorize=vectorize, **config.to_dict()
+                )
+                df_fit = node.fit(data.iloc[:30])["df_out"]
+                df_predict = node.predict(data)["df_out"]
+                outputs.append((df_fit, df_predict))
+                infos.append((node.get_info("fit"), node.get_info("predict")))
+            for expected, actual in zip(*outputs):
+                self.assert_dfs_close(actual, expected, equal_nan=True)
+            _check_infos_close(self, infos)
+
     @staticmethod
     def _package_results1(
         config: cconfig.Config,
@@ -676,6 +797,35 @@ class TestMultiindexVolatilityModel(hunitest.TestCase):
         )
         self.assert_equal(actual, expected)
 
+    def test4(self) -> None:
+        """
+        Compare results of the vectorized and of the per-column computation.
+        """
+        data = self._get_data()
+        data.iloc[5:8, 1] = np.nan
+        config = cconfig.Config.from_dict(
+            {
+                "in_col_group": ("ret_0",),
+                "steps_ahead": 2,
+                "nan_mode": "leave_unchanged",
+            }
+        )
+        fit_df = data.loc["2000-01-01":"2000-02-10"]  # type: ignore[misc]
+        outputs = []
+        infos = []
+        for vectorize in [False, True]:
+            node = MultiindexVolatilityModel(
+                "vol_model", vectorize=vectorize, **config.to_dict()
+            )
+            df_fit = node.fit(fit_df)["df_out"]
+            df_predict = node.predict(data)["df_out"]
+            outputs.append((df_fit, df_predict))
+            infos.append((node.get_info("fit"), node.get_info("predict")))
+        for expected, actual in zip(*outputs):
+            self.assertTrue(actual.columns.equals(expected.columns))
+            self.assert_dfs_close(actual, expected, equal_nan=True)
+        _check_infos_close(self, infos)
+
     @staticmethod
     def _package_results1(
         method: str,
@@ -3,9 +3,14 @@ Import as:
 
 import dataflow.core.nodes.transformers as dtfconotra
 """
+
 import collections
+import concurrent.futures
+import functools
 import inspect
+import itertools
 import logging
+import math
 from typing import (
     Any,
     Callable,
@@ -22,6 +27,7 @@ import numpy as np
 import pandas as pd
 
 import core.finance as cofinanc
+import core.signal_processing as csigproc
 import dataflow.core.node as dtfcornode
 import dataflow.core.nodes.base as dtfconobas
 import dataflow.core.utils as dtfcorutil
@@ -31,13 +37,63 @@ _LOG = logging.getLogger(__name__)
 
 _ResamplingRule = Union[pd.DateOffset, pd.Timedelta, str]
 
+# Number of chunks of leaf cols assigned to each worker when applying a
+# function in parallel, to balance the load across workers.
+_NUM_CHUNKS_PER_WORKER = 4
+
+
+# Map a stateful transformer function to the function computing it on new rows
+# given the state of the previous call, e.g., for a z-score node.
+_INCREMENTAL_TRANSFORMER_FUNCS = {
+    csigproc.compute_ema: csigproc.compute_ema_incrementally,
+    csigproc.compute_smooth_moving_average: csigproc.compute_smooth_moving_average_incrementally,
+    csigproc.compute_rolling_zscore: csigproc.compute_rolling_zscore_incrementally,
+}
+
 
 # #############################################################################
 # Column transformers.
 # #############################################################################
 
 
-class ColumnTransformer(dtfconobas.Transformer, dtfconobas.ColModeMixin):
+class _IncrementalTransformerFuncMixin:
+    """
+    Predict incrementally carrying the state of the transformer function.
+
+    When the transformer function has an incremental version in
+    `_INCREMENTAL_TRANSFORMER_FUNCS` (e.g., `compute_rolling_zscore()`), only
+    the new rows are transformed, giving the same result as `predict()` on the
+    entire history. Otherwise, fall back to the warm-up based implementation.
+    """
+
+    def predict_incrementally(
+        self, df_in: pd.DataFrame
+    ) -> Dict[str, pd.DataFrame]:
+        if self._transformer_func not in _INCREMENTAL_TRANSFORMER_FUNCS:
+            return super().predict_incrementally(df_in=df_in)
+        hdbg.dassert_no_duplicates(df_in.columns)
+        df_out, info = self._transform(df_in, incremental=True)
+        hdbg.dassert_no_duplicates(df_out.columns)
+        self._set_info("predict_incrementally", info)
+        return {"df_out": df_out}
+
+    def _call_incremental_transformer_func(
+        self, key: Any, data: Union[pd.Series, pd.DataFrame], **kwargs: Any
+    ) -> Union[pd.Series, pd.DataFrame]:
+        """
+        Call the incremental transformer function updating the state of `key`.
+        """
+        func = _INCREMENTAL_TRANSFORMER_FUNCS[self._transformer_func]
+        states = self._incremental_func_states
+        data, states[key] = func(data, state=states.get(key), **kwargs)
+        return data
+
+
+class ColumnTransformer(
+    _IncrementalTransformerFuncMixin,
+    dtfconobas.Transformer,
+    dtfconobas.ColModeMixin,
+):
     """
     Perform non-index modifying changes of columns.
     """
@@ -83,6 +139,8 @@ class ColumnTransformer(dtfconobas.Transformer, dtfconobas.ColModeMixin):
         self._nan_mode = nan_mode or "leave_unchanged"
         # State of the object. This is set by derived classes.
         self._fit_cols = cols
+        # State of the transformer function when predicting incrementally.
+        self._incremental_func_states: Dict[Any, Any] = {}
 
     @property
     def transformed_col_names(self) -> List[str]:
@@ -97,8 +155,12 @@ class ColumnTransformer(dtfconobas.Transformer, dtfconobas.ColModeMixin):
         return col_names
 
     def _transform(
-        self, df: pd.DataFrame
+        self, df: pd.DataFrame, *, incremental: bool = False
     ) -> Tuple[pd.DataFrame, collections.OrderedDict]:
+        """
+        :param incremental: transform only the new rows with the incremental
+            version of the transformer function
+        """
         df_in = df.copy()
         df = df.copy()
         if self._fit_cols is None:
@@ -121,7 +183,11 @@ class ColumnTransformer(dtfconobas.Transformer, dtfconobas.ColModeMixin):
         # parameter. If so, inject an empty dict to be populated when
         # `_transformer_func` is executed.
         func_sig = inspect.signature(self._transformer_func)
-        if "info" in func_sig.parameters:
+        if incremental:
+            df = self._call_incremental_transformer_func(
+                None, df, **self._transformer_kwargs
+            )
+        elif "info" in func_sig.parameters:
             func_info = collections.OrderedDict()  # type: ignore
             df = self._transformer_func(
                 df, info=func_info, **self._transformer_kwargs
@@ -150,7 +216,11 @@ class ColumnTransformer(dtfconobas.Transformer, dtfconobas.ColModeMixin):
         return df, info
 
 
-class SeriesTransformer(dtfconobas.Transformer, dtfconobas.ColModeMixin):
+class SeriesTransformer(
+    _IncrementalTransformerFuncMixin,
+    dtfconobas.Transformer,
+    dtfconobas.ColModeMixin,
+):
     """
     Perform non-index modifying changes of columns.
 
@@ -196,6 +266,9 @@ class SeriesTransformer(dtfconobas.Transformer, dtfconobas.ColModeMixin):
         self._transformed_col_names = None
         self._nan_mode = nan_mode or "leave_unchanged"
         self._fit_cols = cols
+        # State of the transformer function for each column when predicting
+        # incrementally.
+        self._incremental_func_states: Dict[Any, Any] = {}
 
     @property
     def transformed_col_names(self) -> List[str]:
@@ -210,8 +283,11 @@ class SeriesTransformer(dtfconobas.Transformer, dtfconobas.ColModeMixin):
         return col_names
 
     def _transform(
-        self, df: pd.DataFrame
+        self, df: pd.DataFrame, *, incremental: bool = False
     ) -> Tuple[pd.DataFrame, collections.OrderedDict]:
+        """
+        :param incremental: same as in `ColumnTransformer._transform()`
+        """
         df_in = df.copy()
         df = df.copy()
         if self._fit_cols is None:
@@ -227,10 +303,15 @@ class SeriesTransformer(dtfconobas.Transformer, dtfconobas.ColModeMixin):
         func_info = info["func_info"]
         srs_list = []
         for col in self._fit_cols:
+            func = self._transformer_func
+            if incremental:
+                func = functools.partial(
+                    self._call_incremental_transformer_func, col
+                )
             srs, col_info = _apply_func_to_series(
                 df[col],
                 self._nan_mode,
-                self._transformer_func,
+                func,
                 self._transformer_kwargs,
             )
             hdbg.dassert_isinstance(srs, pd.Series)
@@ -285,6 +366,8 @@ class GroupedColDfToDfTransformer(dtfconobas.Transformer):
         drop_nans: bool = False,
         reindex_like_input: bool = True,
         join_output_with_input: bool = True,
+        num_workers: int = 1,
+        executor_type: str = "thread",
     ) -> None:
         """
         For reference, let.
@@ -311,11 +394,22 @@ class GroupedColDfToDfTransformer(dtfconobas.Transformer):
         :param join_output_with_input: whether to join the output with the input. A
             common case where this should typically be set to `False` is in
             resampling.
+        :param num_workers: number of workers applying `transformer_func` to
+            the leaf cols (e.g., the assets) in parallel, in chunks of leaf cols
+            - 1 applies the function serially
+        :param executor_type: type of the workers
+            - "thread": useful when `transformer_func` releases the GIL (e.g.,
+              NumPy or pandas vectorized code)
+            - "process": `transformer_func` and `transformer_kwargs` must be
+              picklable (e.g., no lambdas)
         """
         super().__init__(nid)
         # TODO(Paul): Add more checks here.
         hdbg.dassert_isinstance(in_col_groups, list)
         hdbg.dassert_isinstance(out_col_group, tuple)
+        hdbg.dassert_isinstance(num_workers, int)
+        hdbg.dassert_lte(1, num_workers)
+        hdbg.dassert_in(executor_type, ("thread", "process"))
         self._in_col_groups = in_col_groups
         self._out_col_group = out_col_group
         self._transformer_func = transformer_func
@@ -325,6 +419,8 @@ class GroupedColDfToDfTransformer(dtfconobas.Transformer):
         self._reindex_like_input = reindex_like_input
         self._join_output_with_input = join_output_with_input
         self._permitted_exceptions = permitted_exceptions
+        self._num_workers = num_workers
+        self._executor_type = executor_type
         # The leaf col names are determined from the dataframe at runtime.
         self._leaf_cols = None
 
@@ -344,15 +440,17 @@ class GroupedColDfToDfTransformer(dtfconobas.Transformer):
         info["func_info"] = collections.OrderedDict()
         func_info = info["func_info"]
         out_dfs = {}
-        for key in self._leaf_cols:
-            df_out, key_info = _apply_func_to_data(
-                in_dfs[key],
-                self._transformer_func,
-                self._transformer_kwargs,
-                self._drop_nans,
-                self._reindex_like_input,
-                self._permitted_exceptions,
-            )
+        results = _apply_func_to_data_items(
+            [in_dfs[key] for key in self._leaf_cols],
+            self._transformer_func,
+            self._transformer_kwargs,
+            self._drop_nans,
+            self._reindex_like_input,
+            self._permitted_exceptions,
+            self._num_workers,
+            self._executor_type,
+        )
+        for key, (df_out, key_info) in zip(self._leaf_cols, results):
             if df_out is None:
                 _LOG.warning(
                     "No output for key=%s, imputing empty dataframe", key
@@ -493,6 +591,8 @@ class SeriesToDfTransformer(dtfconobas.Transformer):
         drop_nans: bool = False,
         reindex_like_input: bool = True,
         join_output_with_input: bool = True,
+        num_workers: int = 1,
+        executor_type: str = "thread",
     ) -> None:
         """
         For reference, let.
@@ -515,10 +615,14 @@ class SeriesToDfTransformer(dtfconobas.Transformer):
         join_output_with_input: whether to join the output with the input. A
             common case where this should typically be set to `False` is in
             resampling.
+        :param num_workers, executor_type: as in `GroupedColDfToDfTransformer`
         """
         super().__init__(nid)
         hdbg.dassert_isinstance(in_col_group, tuple)
         hdbg.dassert_isinstance(out_col_group, tuple)
+        hdbg.dassert_isinstance(num_workers, int)
+        hdbg.dassert_lte(1, num_workers)
+        hdbg.dassert_in(executor_type, ("thread", "process"))
         self._in_col_group = in_col_group
         self._out_col_group = out_col_group
         self._transformer_func = transformer_func
@@ -526,6 +630,8 @@ class SeriesToDfTransformer(dtfconobas.Transformer):
         self._drop_nans = drop_nans
         self._reindex_like_input = reindex_like_input
         self._join_output_with_input = join_output_with_input
+        self._num_workers = num_workers
+        self._executor_type = executor_type
         # The leaf col names are determined from the dataframe at runtime.
         self._leaf_cols = None
 
@@ -545,14 +651,17 @@ class SeriesToDfTransformer(dtfconobas.Transformer):
         dfs = {}
         leaf_cols = self._leaf_cols
         leaf_cols = cast(List[str], leaf_cols)
-        for col in leaf_cols:
-            df_out, col_info = _apply_func_to_data(
-                df[col],
-                self._transformer_func,
-                self._transformer_kwargs,
-                self._drop_nans,
-                self._reindex_like_input,
-            )
+        results = _apply_func_to_data_items(
+            [df[col] for col in leaf_cols],
+            self._transformer_func,
+            self._transformer_kwargs,
+            self._drop_nans,
+            self._reindex_like_input,
+            (),
+            self._num_workers,
+            self._executor_type,
+        )
+        for col, (df_out, col_info) in zip(leaf_cols, results):
             if df_out is None:
                 _LOG.warning("No output for col=%s", col)
                 continue
@@ -619,6 +728,8 @@ class SeriesToSeriesTransformer(dtfconobas.Transformer):
         drop_nans: bool = False,
         reindex_like_input: bool = True,
         join_output_with_input: bool = True,
+        num_workers: int = 1,
+        executor_type: str = "thread",
     ) -> None:
         """
         For reference, let.
@@ -639,10 +750,14 @@ class SeriesToSeriesTransformer(dtfconobas.Transformer):
         :param reindex_like_input: reindex result of `transformer_func` like
             the input series
         join_output_with_input: whether to join the output with the input
+        :param num_workers, executor_type: as in `GroupedColDfToDfTransformer`
         """
         super().__init__(nid)
         hdbg.dassert_isinstance(in_col_group, tuple)
         hdbg.dassert_isinstance(out_col_group, tuple)
+        hdbg.dassert_isinstance(num_workers, int)
+        hdbg.dassert_lte(1, num_workers)
+        hdbg.dassert_in(executor_type, ("thread", "process"))
         hdbg.dassert_eq(
             len(in_col_group),
             len(out_col_group),
@@ -656,6 +771,8 @@ class SeriesToSeriesTransformer(dtfconobas.Transformer):
         self._reindex_like_input = reindex_like_input
         self._join_output_with_input = join_output_with_input
         self._permitted_exceptions = permitted_exceptions
+        self._num_workers = num_workers
+        self._executor_type = executor_type
         # The leaf col names are determined from the dataframe at runtime.
         self._leaf_cols = None
 
@@ -677,15 +794,17 @@ class SeriesToSeriesTransformer(dtfconobas.Transformer):
         srs_list = []
         leaf_cols = self._leaf_cols
         leaf_cols = cast(List[str], leaf_cols)
-        for col in leaf_cols:
-            srs, col_info = _apply_func_to_data(
-                df[col],
-                self._transformer_func,
-                self._transformer_kwargs,
-                self._drop_nans,
-                self._reindex_like_input,
-                self._permitted_exceptions,
-            )
+        results = _apply_func_to_data_items(
+            [df[col] for col in leaf_cols],
+            self._transformer_func,
+            self._transformer_kwargs,
+            self._drop_nans,
+            self._reindex_like_input,
+            self._permitted_exceptions,
+            self._num_workers,
+            self._executor_type,
+        )
+        for col, (srs, col_info) in zip(leaf_cols, results):
             if srs is None:
                 _LOG.warning("No output for key=%s, imputing NaNs", col)
                 srs = pd.Series(np.nan, index=df[col].index)
@@ -747,6 +866,96 @@ def _apply_func_to_data(
     return result, info
 
 
+def _apply_func_to_data_chunk(
+    data_items: List[Union[pd.Series, pd.DataFrame]],
+    func: Callable,
+    func_kwargs: Dict[str, Any],
+    drop_nans: bool,
+    reindex_like_input: bool,
+    exceptions: Tuple[Any],
+) -> List[
+    Tuple[
+        Optional[Union[pd.Series, pd.DataFrame]],
+        Optional[collections.OrderedDict],
+    ]
+]:
+    """
+    Apply `_apply_func_to_data()` to each data item serially.
+    """
+    results = [
+        _apply_func_to_data(
+            data, func, func_kwargs, drop_nans, reindex_like_input, exceptions
+        )
+        for data in data_items
+    ]
+    return results
+
+
+def _apply_func_to_data_items(
+    data_items: List[Union[pd.Series, pd.DataFrame]],
+    func: Callable,
+    func_kwargs: Dict[str, Any],
+    drop_nans: bool,
+    reindex_like_input: bool,
+    exceptions: Tuple[Any],
+    num_workers: int,
+    executor_type: str,
+) -> List[
+    Tuple[
+        Optional[Union[pd.Series, pd.DataFrame]],
+        Optional[collections.OrderedDict],
+    ]
+]:
+    """
+    Apply `_apply_func_to_data()` to each data item, possibly in parallel.
+
+    The data items are split in chunks that are processed by a pool of
+    `num_workers` workers. The permitted exceptions are handled for each data
+    item, while the other exceptions are propagated to the caller.
+
+    :param data_items: data for each leaf col (e.g., asset)
+    :param num_workers, executor_type: as in `GroupedColDfToDfTransformer`
+    :return: output and info for each data item, in the same order as
+        `data_items`
+    """
+    apply_func = functools.partial(
+        _apply_func_to_data_chunk,
+        func=func,
+        func_kwargs=func_kwargs,
+        drop_nans=drop_nans,
+        reindex_like_input=reindex_like_input,
+        exceptions=exceptions,
+    )
+    if num_workers == 1 or len(data_items) <= 1:
+        return apply_func(data_items)
+    # Split the data in chunks.
+    chunk_size = math.ceil(
+        len(data_items) / (num_workers * _NUM_CHUNKS_PER_WORKER)
+    )
+    chunks = [
+        data_items[idx : idx + chunk_size]
+        for idx in range(0, len(data_items), chunk_size)
+    ]
+    if _LOG.isEnabledFor(logging.DEBUG):
+        _LOG.debug(
+            "Applying function to %s data items in %s chunks with %s %s workers",
+            len(data_items),
+            len(chunks),
+            num_workers,
+            executor_type,
+        )
+    if executor_type == "thread":
+        executor_class = concurrent.futures.ThreadPoolExecutor
+    elif executor_type == "process":
+        executor_class = concurrent.futures.ProcessPoolExecutor
+    else:
+        raise ValueError(f"Invalid executor_type='{executor_type}'")
+    with executor_class(max_workers=num_workers) as executor:
+        chunk_results = list(executor.map(apply_func, chunks))
+    results = list(itertools.chain.from_iterable(chunk_results))
+    return results
+
+
 # TODO(Paul): Consider deprecating.
 def _apply_func_to_series(
     srs: pd.Series,
@@ -861,6 +1070,74 @@ class Resample(dtfconobas.Transformer):
         self._agg_func = agg_func
         self._resample_kwargs = resample_kwargs or {}
         self._agg_func_kwargs = agg_func_kwargs or {}
+        # Input rows of the buckets not returned yet by
+        # `predict_incrementally()`, preceded by the last row of the last
+        # returned bucket.
+        self._incremental_df: Optional[pd.DataFrame] = None
+        self._last_incremental_label: Optional[pd.Timestamp] = None
+
+    def predict_incrementally(
+        self, df_in: pd.DataFrame
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Same as `predict()`, but resample only the rows of the open buckets.
+
+        When the bars of the input are aligned with the resampling rule (e.g.,
+        1 minute bars resampled to 5 minutes), a bucket is returned once it is
+        complete, i.e., when the input contains its last bar, which gives the
+        same rows as `predict()` on the entire history. Otherwise, the last
+        bucket is returned as soon as it is open, like `predict()` does.
+        """
+        if self._resample_kwargs:
+            # Buckets can be closed or labeled on the left, so fall back to
+            # the generic implementation.
+            return super().predict_incrementally(df_in=df_in)
+        hdbg.dassert_no_duplicates(df_in.columns)
+        if self._incremental_df is not None:
+            hdbg.dassert_lt(self._incremental_df.index[-1], df_in.index[0])
+            df = pd.concat([self._incremental_df, df_in])
+        else:
+            df = df_in
+        df_out, info = self._transform(df)
+        if self._are_bars_aligned(df.index):
+            # Keep only the complete buckets.
+            df_out = df_out[df_out.index <= df.index[-1]]
+        # Remove the bucket that was already returned.
+        if self._last_incremental_label is not None:
+            df_out = df_out[df_out.index > self._last_incremental_label]
+        # Keep the rows needed by the next call. The last row of the last
+        # complete bucket makes the resampling include the empty buckets
+        # between the returned buckets and the new rows.
+        if df_out.empty:
+            self._incremental_df = df
+        else:
+            self._last_incremental_label = df_out.index[-1]
+            is_returned = df.index <= self._last_incremental_label
+            self._incremental_df = pd.concat(
+                [df[is_returned].iloc[-1:], df[~is_returned]]
+            )
+        self._set_info("predict_incrementally", info)
+        return {"df_out": df_out}
+
+    def _are_bars_aligned(self, index: pd.DatetimeIndex) -> bool:
+        """
+        Return whether the last bar of each bucket is timestamped as the bucket.
+
+        The bars are aligned when their spacing divides the resampling rule
+        and their timestamps are multiples of the spacing. With less than 2
+        bars, the spacing is unknown and the bars are assumed to be aligned.
+        """
+        offset = pd.tseries.frequencies.to_offset(self._rule)
+        if not isinstance(offset, pd.offsets.Tick):
+            # The buckets of a calendar rule don't have a fixed length.
+            return False
+        if len(index) < 2:
+            return True
+        spacing = np.diff(index.asi8).min()
+        is_aligned = offset.nanos % spacing == 0 and bool(
+            np.all(index.asi8 % spacing == 0)
+        )
+        return is_aligned
 
     def _transform(
         self, df: pd.DataFrame
@@ -1010,6 +1287,11 @@ class Calculator(dtfconobas.Transformer):
         self._term1_delay = term1_delay
         self._term2_delay = term2_delay
         self._nan_mode = nan_mode or "leave_unchanged"
+        # Without dropping NaNs, a row depends only on the rows `delay` rows
+        # before it.
+        delays = [term1_delay or 0, term2_delay or 0]
+        if self._nan_mode == "leave_unchanged" and min(delays) >= 0:
+            self.set_warmup_length(max(delays))
 
     def _transform(
         self, df: pd.DataFrame
@@ -28,6 +28,68 @@ import helpers.hdbg as hdbg
 _LOG = logging.getLogger(__name__)
 
 
+def _get_method(fit: bool, incremental: bool) -> dtfcornode.Method:
+    """
+    Return the name of the method used to store the info of a node.
+    """
+    if fit:
+        hdbg.dassert(not incremental)
+        method = "fit"
+    elif incremental:
+        method = "predict_incrementally"
+    else:
+        method = "predict"
+    return method
+
+
+def _learn_sma_tau(
+    x: np.ndarray,
+    y: np.ndarray,
+    *,
+    min_tau_periods: float,
+    min_depth: int,
+    max_depth: int,
+    metric: Callable[[np.ndarray, np.ndarray], float],
+    vectorize: bool,
+) -> float:
+    """
+    Learn the tau of the SMA of `x` that best predicts `y`.
+
+    :param x: 1D or single-column array with the observations
+    :param y: array with the targets aligned with `x`
+    :param min_tau_periods, min_depth, max_depth, vectorize: as in `SmaModel`
+    :param metric: error between the SMA and the targets to minimize
+    :return: optimal tau
+    """
+    x = x.reshape(-1, 1)
+    if vectorize:
+        compute_sma = csigproc.compute_smooth_moving_average_on_array
+    else:
+        x = pd.DataFrame(x.flatten())
+        compute_sma = csigproc.compute_smooth_moving_average
+
+    def score(tau: float) -> float:
+        sma = compute_sma(
+            x,
+            tau=tau,
+            min_periods=0,
+            min_depth=min_depth,
+            max_depth=max_depth,
+        )
+        min_periods = int(np.rint(min_tau_periods * tau))
+        return metric(sma[min_periods:], y[min_periods:])
+
+    tau_lb, tau_ub = 1, 1000
+    # Satisfy 2 * tau_ub * min_tau_periods = len(x).
+    # This ensures that no more than half of the `fit` series is burned.
+    if min_tau_periods > 0:
+        tau_ub = int(len(x) / (2 * min_tau_periods))
+    opt_results = sp.optimize.minimize_scalar(
+        score, method="bounded", bounds=[tau_lb, tau_ub]
+    )
+    return opt_results.x
+
+
 class SmaModel(dtfconobas.FitPredictNode, dtfconobas.ColModeMixin):
     """
     Fit and predict a smooth moving average (SMA) model.
@@ -42,6 +104,7 @@ class SmaModel(dtfconobas.FitPredictNode, dtfconobas.ColModeMixin):
         min_tau_periods: Optional[float] = 2,
         col_mode: Optional[str] = None,
         nan_mode: Optional[str] = None,
+        vectorize: bool = False,
     ) -> None:
         """
         Specify the data and SMA modeling parameters.
@@ -56,6 +119,10 @@ class SmaModel(dtfconobas.FitPredictNode, dtfconobas.ColModeMixin):
             tau
         :param col_mode: `merge_all` or `replace_all`, as in `ColumnTransformer()`
         :param nan_mode: as in `ContinuousSkLearnModel`
+        :param vectorize: if `True`, compute the SMA in `fit()` / `predict()`
+            with `csigproc.compute_smooth_moving_average_on_array()` (i.e., a
+            linear filter on the NumPy array) instead of the pandas EWM. The
+            results are the same up to floating point rounding (~1e-12)
         """
         super().__init__(nid)
         self._col = dtfcorutil.convert_to_list(col)
@@ -77,6 +144,10 @@ class SmaModel(dtfconobas.FitPredictNode, dtfconobas.ColModeMixin):
         self._min_depth = 1
         self._max_depth = 1
         self._metric = sklear.metrics.mean_absolute_error
+        self._vectorize = vectorize
+        # State of the smooth moving average carried across the calls to
+        # `predict_incrementally()`.
+        self._incremental_sma_state: Optional[csigproc.IncrementalState] = None
 
     def fit(self, df_in: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         idx = df_in.index[: -self._steps_ahead]
@@ -120,6 +191,27 @@ class SmaModel(dtfconobas.FitPredictNode, dtfconobas.ColModeMixin):
             df_in, idx, non_nan_idx, fit=False
         )
 
+    def predict_incrementally(
+        self, df_in: pd.DataFrame
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Same as `predict()`, but carry the state of the SMA across calls.
+
+        The forward columns are computed using only the new rows.
+        """
+        dtfcorutil.validate_df_indices(df_in)
+        idx = df_in.index
+        non_nan_idx = df_in[self._col].dropna().index
+        self._handle_nans(idx, non_nan_idx)
+        hdbg.dassert_is_not(
+            self._tau,
+            None,
+            "Parameter tau not found! Check if `fit` has been run.",
+        )
+        return self._predict_and_package_results(
+            df_in, idx, non_nan_idx, fit=False, incremental=True
+        )
+
     def get_fit_state(self) -> Dict[str, Any]:
         fit_state = {"_tau": self._tau, "_info['fit']": self._info["fit"]}
         return fit_state
@@ -134,9 +226,16 @@ class SmaModel(dtfconobas.FitPredictNode, dtfconobas.ColModeMixin):
         idx: pd.Index,
         non_nan_idx: pd.Index,
         fit: bool = True,
+        incremental: bool = False,
     ) -> Dict[str, pd.DataFrame]:
-        data = cdatadap.transform_to_sklearn(df_in.loc[non_nan_idx], self._col)
-        fwd_y_hat = self._predict(data)
+        if incremental and non_nan_idx.empty:
+            # There are no new observations to update the SMA with.
+            fwd_y_hat = np.empty((0, len(self._col)))
+        else:
+            data = cdatadap.transform_to_sklearn(
+                df_in.loc[non_nan_idx], self._col
+            )
+            fwd_y_hat = self._predict(data, incremental=incremental)
         forward_y_df = dtfcorutil.get_forward_cols(
             df_in, self._col, self._steps_ahead
         )
@@ -160,7 +259,7 @@ class SmaModel(dtfconobas.FitPredictNode, dtfconobas.ColModeMixin):
         info["tau"] = self._tau
         info["min_periods"] = self._get_min_periods(self._tau)
         info["df_out_info"] = dtfcorutil.get_df_info_as_string(df_out)
-        method = "fit" if fit else "predict"
+        method = _get_method(fit, incremental)
         self._set_info(method, info)
         return {"df_out": df_out}
 
@@ -179,27 +278,15 @@ class SmaModel(dtfconobas.FitPredictNode, dtfconobas.ColModeMixin):
             raise ValueError(f"Unrecognized nan_mode `{self._nan_mode}`")
 
     def _learn_tau(self, x: np.array, y: np.array) -> float:
-        def score(tau: float) -> float:
-            x_srs = pd.DataFrame(x.flatten())
-            sma = csigproc.compute_smooth_moving_average(
-                x_srs,
-                tau=tau,
-                min_periods=0,
-                min_depth=self._min_depth,
-                max_depth=self._max_depth,
-            )
-            min_periods = self._get_min_periods(tau)
-            return self._metric(sma[min_periods:], y[min_periods:])
-
-        tau_lb, tau_ub = 1, 1000
-        # Satisfy 2 * tau_ub * min_tau_periods = len(x).
-        # This ensures that no more than half of the `fit` series is burned.
-        if self._min_tau_periods > 0:
-            tau_ub = int(len(x) / (2 * self._min_tau_periods))
-        opt_results = sp.optimize.minimize_scalar(
-            score, method="bounded", bounds=[tau_lb, tau_ub]
+        return _learn_sma_tau(
+            x,
+            y,
+            min_tau_periods=self._min_tau_periods,
+            min_depth=self._min_depth,
+            max_depth=self._max_depth,
+            metric=self._metric,
+            vectorize=self._vectorize,
         )
-        return opt_results.x
 
     def _get_min_periods(self, tau: float) -> int:
         """
@@ -212,19 +299,46 @@ class SmaModel(dtfconobas.FitPredictNode, dtfconobas.ColModeMixin):
         """
         return int(np.rint(self._min_tau_periods * tau))
 
-    def _predict(self, x: np.array) -> np.array:
-        x_srs = pd.DataFrame(x.flatten())
+    def _predict(self, x: np.array, incremental: bool = False) -> np.array:
+        """
+        :param incremental: if `True`, continue the SMA from the state of the
+            previous call instead of starting from scratch
+        """
         # TODO(Paul): Make `min_periods` configurable.
         min_periods = int(np.rint(self._min_tau_periods * self._tau))
         if _LOG.isEnabledFor(logging.DEBUG):
             _LOG.debug("min_periods=%f", min_periods)
-        x_sma = csigproc.compute_smooth_moving_average(
-            x_srs,
-            tau=self._tau,
-            min_periods=min_periods,
-            min_depth=self._min_depth,
-            max_depth=self._max_depth,
-        )
+        if self._vectorize and not incremental:
+            # Work on the NumPy array directly without building a dataframe.
+            x_sma = csigproc.compute_smooth_moving_average_on_array(
+                x.reshape(-1, 1),
+                tau=self._tau,
+                min_periods=min_periods,
+                min_depth=self._min_depth,
+                max_depth=self._max_depth,
+            )
+            return x_sma
+        x_srs = pd.DataFrame(x.flatten())
+        if incremental:
+            (
+                x_sma,
+                self._incremental_sma_state,
+            ) = csigproc.compute_smooth_moving_average_incrementally(
+                x_srs,
+                tau=self._tau,
+                min_periods=min_periods,
+                min_depth=self._min_depth,
+                max_depth=self._max_depth,
+                state=self._incremental_sma_state,
+            )
+        else:
+            x_sma = csigproc.compute_smooth_moving_average(
+                x_srs,
+                tau=self._tau,
+                min_periods=min_periods,
+                min_depth=self._min_depth,
+                max_depth=self._max_depth,
+            )
         return x_sma.values
 
 
@@ -253,6 +367,9 @@ class SingleColumnVolatilityModel(dtfconobas.FitPredictNode):
         self._learn_tau_on_fit = tau is None
         self._nan_mode = nan_mode
         self._out_col_prefix = out_col_prefix
+        # DAG kept across the calls to `predict_incrementally()`, so that its
+        # nodes can carry their state.
+        self._incremental_dag: Optional[dtfcordag.DAG] = None
 
     def get_fit_state(self) -> Dict[str, Any]:
         fit_state = {
@@ -275,6 +392,31 @@ class SingleColumnVolatilityModel(dtfconobas.FitPredictNode):
     def predict(self, df_in: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         return {"df_out": self._fit_predict_helper(df_in, fit=False)}
 
+    def predict_incrementally(
+        self, df_in: pd.DataFrame
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Same as `predict()`, but run the inner DAG incrementally.
+        """
+        info = collections.OrderedDict()
+        mode = "predict_incrementally"
+        if self._incremental_dag is None:
+            name = str(self._out_col_prefix or self._col)
+            hdbg.dassert_not_in(name + "_vol", df_in.columns)
+            config = self._get_config(
+                col=self._col, out_col_prefix=name, tau=self._tau
+            )
+            self._incremental_dag = self._get_dag(df_in[[self._col]], config)
+        else:
+            self._incremental_dag.get_node("load_data").df = df_in[[self._col]]
+        df_out = self._incremental_dag.run_leq_node(
+            "demodulate_using_vol_pred", mode, progress_bar=self._progress_bar
+        )["df_out"]
+        info[self._col] = dtfcorvisi.extract_info(self._incremental_dag, [mode])
+        df_out = df_out.reindex(df_in.index)
+        self._set_info(mode, info)
+        return {"df_out": df_out}
+
     # TODO(gp): This code has several copies. Move it to the base class.
     @staticmethod
     def _append(
@@ -392,6 +534,8 @@ class SingleColumnVolatilityModel(dtfconobas.FitPredictNode):
             transformer_func=lambda x: np.abs(x) ** self._p_moment,
             **config[nid].to_dict(),
         )
+        # The transformation is applied row by row.
+        node.set_warmup_length(0)
         tail_nid = self._append(dag, tail_nid, node)
         # Predict pth power of volatility using smooth moving average.
         nid = "compute_smooth_moving_average"
@@ -404,6 +548,7 @@ class SingleColumnVolatilityModel(dtfconobas.FitPredictNode):
             transformer_func=lambda x: np.abs(x) ** (1.0 / self._p_moment),
             **config[nid].to_dict(),
         )
+        node.set_warmup_length(0)
         tail_nid = self._append(dag, tail_nid, node)
         # Divide returns by volatilty prediction.
         nid = "demodulate_using_vol_pred"
@@ -414,14 +559,52 @@ class SingleColumnVolatilityModel(dtfconobas.FitPredictNode):
         return dag
 
 
+def _get_node_info(
+    mode: dtfcornode.Method, info: collections.OrderedDict
+) -> collections.OrderedDict:
+    """
+    Nest the info of a node like `dtfcorvisi.extract_info()` does.
+    """
+    node_info = collections.OrderedDict()
+    node_info[mode] = info
+    return node_info
+
+
 class _MultiColVolatilityModelMixin:
     def _fit_predict_volatility_model(
-        self, df: pd.DataFrame, fit: bool, out_col_prefix: Optional[str] = None
+        self,
+        df: pd.DataFrame,
+        fit: bool,
+        out_col_prefix: Optional[str] = None,
+        incremental: bool = False,
     ) -> Tuple[Dict[str, pd.DataFrame], collections.OrderedDict]:
+        """
+        :param incremental: if `True`, predict incrementally reusing the
+            per-column models of the previous calls
+        """
         dfs = {}
         info = collections.OrderedDict()
         for col in df.columns:
             local_out_col_prefix = out_col_prefix or col
+            if incremental:
+                hdbg.dassert(not fit)
+                if col not in self._incremental_models:
+                    scvm = SingleColumnVolatilityModel(
+                        "volatility",
+                        steps_ahead=self._steps_ahead,
+                        col=col,
+                        p_moment=self._p_moment,
+                        progress_bar=self._progress_bar,
+                        tau=self._tau,
+                        nan_mode=self._nan_mode,
+                        out_col_prefix=local_out_col_prefix,
+                    )
+                    scvm.set_fit_state(self._col_fit_state[col])
+                    self._incremental_models[col] = scvm
+                scvm = self._incremental_models[col]
+                dfs[col] = scvm.predict_incrementally(df[[col]])["df_out"]
+                info[col] = scvm.get_info("predict_incrementally")
+                continue
             scvm = SingleColumnVolatilityModel(
                 "volatility",
                 steps_ahead=self._steps_ahead,
@@ -444,6 +627,165 @@ class _MultiColVolatilityModelMixin:
             info[col] = info_out
         return dfs, info
 
+    def _fit_predict_volatility_model_on_array(
+        self,
+        df: pd.DataFrame,
+        fit: bool,
+        out_col_prefix: Optional[str] = None,
+    ) -> Tuple[Dict[str, pd.DataFrame], collections.OrderedDict]:
+        """
+        Same as `_fit_predict_volatility_model()` but compute the SMA of all
+        the columns at once.
+
+        Each column is processed by the `SmaModel` and the `VolatilityModulator`
+        configured like in `SingleColumnVolatilityModel`, without running a DAG
+        for each column: the tau of each column is learned and the SMA is
+        computed on the `(time x column)` NumPy array. The output, the info and
+        the fit state are the same as the ones of
+        `_fit_predict_volatility_model()`.
+        """
+        mode = "fit" if fit else "predict"
+        num_rows = df.shape[0]
+        steps_ahead = self._steps_ahead
+        # Raise volatility columns to pth power.
+        vol = np.abs(df.to_numpy(dtype=float)) ** self._p_moment
+        fwd_vol = pd.DataFrame(vol).shift(-steps_ahead).to_numpy()
+        # Find the observations used by the SMA, like `SmaModel` does.
+        is_valid = ~np.isnan(vol)
+        if fit:
+            hdbg.dassert_lt(steps_ahead, num_rows)
+            is_valid &= ~np.isnan(fwd_vol)
+            is_valid[num_rows - steps_ahead :] = False
+            idx = df.index[: num_rows - steps_ahead]
+        else:
+            idx = df.index
+        fwd_vol[~is_valid] = np.nan
+        # Build the nodes of each column from the config of the DAG of
+        # `SingleColumnVolatilityModel` and get the tau of each column.
+        configs = []
+        sma_models = []
+        for col_idx, col in enumerate(df.columns):
+            tau = self._tau if fit else self._col_fit_state[col]["_tau"]
+            scvm = SingleColumnVolatilityModel(
+                "volatility",
+                steps_ahead=steps_ahead,
+                col=col,
+                p_moment=self._p_moment,
+                tau=tau,
+                nan_mode=self._nan_mode,
+                out_col_prefix=out_col_prefix or col,
+            )
+            config = scvm._get_config(
+                col=col, out_col_prefix=str(out_col_prefix or col), tau=tau
+            )
+            nid = "compute_smooth_moving_average"
+            sma_model = SmaModel(nid, vectorize=True, **config[nid].to_dict())
+            mask = is_valid[:, col_idx]
+            sma_model._handle_nans(idx, df.index[mask])
+            if sma_model._must_learn_tau:
+                hdbg.dassert(mask.any(), "No data to fit col=%s", col)
+                sma_model._tau = sma_model._learn_tau(
+                    vol[mask, col_idx], fwd_vol[mask, col_idx]
+                )
+            configs.append(config)
+            sma_models.append(sma_model)
+        taus = np.array([sma_model._tau for sma_model in sma_models])
+        min_periods = np.array(
+            [
+                sma_model._get_min_periods(sma_model._tau)
+                for sma_model in sma_models
+            ]
+        )
+        # Predict pth power of volatility using smooth moving average.
+        vol_hat = csigproc.compute_smooth_moving_average_on_array(
+            np.where(is_valid, vol, np.nan),
+            tau=taus,
+            min_periods=min_periods,
+            min_depth=sma_models[0]._min_depth,
+            max_depth=sma_models[0]._max_depth,
+            skip_nans=True,
+        )
+        # Package the results of each column like the nodes of the DAG do.
+        dfs = {}
+        info = collections.OrderedDict()
+        for col_idx, col in enumerate(df.columns):
+            config = configs[col_idx]
+            vol_col, fwd_vol_col, vol_hat_col = config["calculate_vol_pth_root"][
+                "cols"
+            ]
+            col_info = collections.OrderedDict()
+            df_col = df[[col]]
+            col_info["load_data"] = _get_node_info(
+                mode,
+                collections.OrderedDict(
+                    [
+                        (
+                            f"{mode}_df_info",
+                            dtfcorutil.get_df_info_as_string(df_col),
+                        )
+                    ]
+                ),
+            )
+            df_col = df_col.assign(**{vol_col: vol[:, col_idx]})
+            col_info["calculate_vol_pth_power"] = _get_node_info(
+                mode,
+                collections.OrderedDict(
+                    [
+                        (
+                            "df_transformed_info",
+                            dtfcorutil.get_df_info_as_string(df_col),
+                        )
+                    ]
+                ),
+            )
+            df_col = df_col.assign(
+                **{
+                    fwd_vol_col: fwd_vol[:, col_idx],
+                    vol_hat_col: vol_hat[:, col_idx],
+                }
+            )
+            sma_info = collections.OrderedDict()
+            sma_info["tau"] = taus[col_idx]
+            sma_info["min_periods"] = int(min_periods[col_idx])
+            sma_info["df_out_info"] = dtfcorutil.get_df_info_as_string(df_col)
+            col_info["compute_smooth_moving_average"] = _get_node_info(
+                mode, sma_info
+            )
+            # Calculate the pth root of volatility columns.
+            df_col = df_col.assign(
+                **{
+                    col_name: np.abs(df_col[col_name]) ** (1.0 / self._p_moment)
+                    for col_name in (vol_col, fwd_vol_col, vol_hat_col)
+                }
+            )
+            col_info["calculate_vol_pth_root"] = _get_node_info(
+                mode,
+                collections.OrderedDict(
+                    [
+                        (
+                            "df_transformed_info",
+                            dtfcorutil.get_df_info_as_string(df_col),
+                        )
+                    ]
+                ),
+            )
+            # Divide returns by volatility prediction.
+            nid = "demodulate_using_vol_pred"
+            modulator = VolatilityModulator(
+                nid, mode="demodulate", **config[nid].to_dict()
+            )
+            dfs[col] = getattr(modulator, mode)(df_col)["df_out"]
+            col_info[nid] = _get_node_info(mode, modulator.get_info(mode))
+            info[col] = collections.OrderedDict([(col, col_info)])
+            if fit:
+                self._col_fit_state[col] = {
+                    "_col": col,
+                    "_tau": taus[col_idx],
+                    "_info['fit']": info[col],
+                    "_out_col_prefix": out_col_prefix or col,
+                }
+        return dfs, info
+
 
 class VolatilityModel(
     dtfconobas.FitPredictNode,
@@ -468,6 +810,7 @@ class VolatilityModel(
         col_rename_func: Callable[[Any], Any] = lambda x: f"{x}_zscored",
         col_mode: Optional[str] = None,
         nan_mode: Optional[str] = None,
+        vectorize: bool = False,
     ) -> None:
         """
         Specify the data and smooth moving average (SMA) modeling parameters.
@@ -486,6 +829,11 @@ class VolatilityModel(
               and transformed selected columns
             - If "replace_all", leave only transformed selected columns
         :param nan_mode: as in ContinuousSkLearnModel
+        :param vectorize: if `True`, learn tau and compute the SMA of all the
+            columns at once on a NumPy array instead of running a
+            `SingleColumnVolatilityModel` for each column. The results and the
+            info are the same within floating-point tolerance.
+            `predict_incrementally()` always processes one column at a time
         """
         super().__init__(nid)
         self._cols = cols
@@ -501,9 +849,14 @@ class VolatilityModel(
         self._col_rename_func = col_rename_func
         self._col_mode = col_mode or "merge_all"
         self._nan_mode = nan_mode
+        self._vectorize = vectorize
         # State of the model to serialize/deserialize.
         self._fit_cols: List[dtfcorutil.NodeColumn] = []
         self._col_fit_state = {}
+        # Per-column models kept across the calls to `predict_incrementally()`.
+        self._incremental_models: Dict[
+            dtfcorutil.NodeColumn, SingleColumnVolatilityModel
+        ] = {}
 
     def fit(self, df_in: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         return self._fit_predict_helper(df_in, fit=True)
@@ -511,6 +864,11 @@ class VolatilityModel(
     def predict(self, df_in: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         return self._fit_predict_helper(df_in, fit=False)
 
+    def predict_incrementally(
+        self, df_in: pd.DataFrame
+    ) -> Dict[str, pd.DataFrame]:
+        return self._fit_predict_helper(df_in, fit=False, incremental=True)
+
     def get_fit_state(self) -> Dict[str, Any]:
         fit_state = {
             "_fit_cols": self._fit_cols,
@@ -524,14 +882,21 @@ class VolatilityModel(
         self._col_fit_state = fit_state["_col_fit_state"]
         self._info["fit"] = fit_state["_info['fit']"]
 
-    def _fit_predict_helper(self, df_in: pd.DataFrame, fit: bool):
+    def _fit_predict_helper(
+        self, df_in: pd.DataFrame, fit: bool, incremental: bool = False
+    ):
         dtfcorutil.validate_df_indices(df_in)
         # Get the columns.
         self._fit_cols = dtfcorutil.convert_to_list(
             self._cols or df_in.columns.tolist()
         )
         df = df_in[self._fit_cols]
-        dfs, info = self._fit_predict_volatility_model(df, fit=fit)
+        if self._vectorize and not incremental:
+            dfs, info = self._fit_predict_volatility_model_on_array(df, fit)
+        else:
+            dfs, info = self._fit_predict_volatility_model(
+                df, fit=fit, incremental=incremental
+            )
         df_out = pd.concat(dfs.values(), axis=1)
         df_out = self._apply_col_mode(
             df_in.drop(df_out.columns.intersection(df_in.columns), axis=1),
@@ -539,7 +904,7 @@ class VolatilityModel(
             cols=self._fit_cols,
             col_mode=self._col_mode,
         )
-        method = "fit" if fit else "predict"
+        method = _get_method(fit, incremental)
         self._set_info(method, info)
         return {"df_out": df_out}
 
@@ -563,6 +928,7 @@ class MultiindexVolatilityModel(
         progress_bar: bool = False,
         tau: Optional[float] = None,
         nan_mode: Optional[str] = None,
+        vectorize: bool = False,
     ) -> None:
         """
         Specify the data and sma modeling parameters.
@@ -573,6 +939,11 @@ class MultiindexVolatilityModel(
         :param tau: as in `csigproc.compute_smooth_moving_average`. If `None`,
             learn this parameter
         :param nan_mode: as in ContinuousSkLearnModel
+        :param vectorize: if `True`, learn tau and compute the SMA of all the
+            columns at once on a NumPy array instead of running a
+            `SingleColumnVolatilityModel` for each column. The results and the
+            info are the same within floating-point tolerance.
+            `predict_incrementally()` always processes one column at a time
         """
         super().__init__(nid)
         hdbg.dassert_isinstance(in_col_group, tuple)
@@ -588,8 +959,13 @@ class MultiindexVolatilityModel(
         #
         self._tau = tau
         self._nan_mode = nan_mode
+        self._vectorize = vectorize
         #
         self._col_fit_state = {}
+        # Per-column models kept across the calls to `predict_incrementally()`.
+        self._incremental_models: Dict[
+            dtfcorutil.NodeColumn, SingleColumnVolatilityModel
+        ] = {}
 
     def fit(self, df_in: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         return self._fit_predict_helper(df_in, fit=True)
@@ -597,6 +973,11 @@ class MultiindexVolatilityModel(
     def predict(self, df_in: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         return self._fit_predict_helper(df_in, fit=False)
 
+    def predict_incrementally(
+        self, df_in: pd.DataFrame
+    ) -> Dict[str, pd.DataFrame]:
+        return self._fit_predict_helper(df_in, fit=False, incremental=True)
+
     def get_fit_state(self) -> Dict[str, Any]:
         fit_state = {
             "_col_fit_state": self._col_fit_state,
@@ -608,19 +989,29 @@ class MultiindexVolatilityModel(
         self._col_fit_state = fit_state["_col_fit_state"]
         self._info["fit"] = fit_state["_info['fit']"]
 
-    def _fit_predict_helper(self, df_in: pd.DataFrame, fit: bool):
+    def _fit_predict_helper(
+        self, df_in: pd.DataFrame, fit: bool, incremental: bool = False
+    ):
         dtfcorutil.validate_df_indices(df_in)
         df = dtfconobas.SeriesToDfColProcessor.preprocess(
             df_in, self._in_col_group
         )
-        dfs, info = self._fit_predict_volatility_model(
-            df, fit=fit, out_col_prefix=self._out_col_prefix
-        )
+        if self._vectorize and not incremental:
+            dfs, info = self._fit_predict_volatility_model_on_array(
+                df, fit, out_col_prefix=self._out_col_prefix
+            )
+        else:
+            dfs, info = self._fit_predict_volatility_model(
+                df,
+                fit=fit,
+                out_col_prefix=self._out_col_prefix,
+                incremental=incremental,
+            )
         df_out = dtfconobas.SeriesToDfColProcessor.postprocess(
             dfs, self._out_col_group
         )
         df_out = dtfcorutil.merge_dataframes(df_in, df_out)
-        method = "fit" if fit else "predict"
+        method = _get_method(fit, incremental)
         self._set_info(method, info)
         return {"df_out": df_out}
 
@@ -688,6 +1079,11 @@ class VolatilityModulator(dtfconobas.FitPredictNode, dtfconobas.ColModeMixin):
         self._col_rename_func = col_rename_func or (lambda x: x)
         self._col_mode = col_mode or "replace_all"
         self._nan_mode = nan_mode or "leave_unchanged"
+        # The volatility is shifted by a fixed number of rows, unless NaNs are
+        # dropped.
+        volatility_shift = volatility_steps_ahead - signal_steps_ahead
+        if self._nan_mode == "leave_unchanged" and volatility_shift >= 0:
+            self.set_warmup_length(volatility_shift)
 
     def fit(self, df_in: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         df_out = self._process_signal(df_in)
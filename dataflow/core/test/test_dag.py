@@ -1,9 +1,16 @@
 import logging
 import os
+from typing import List
+
+import pandas as pd
 
 import dataflow.core.dag as dtfcordag
 import dataflow.core.node as dtfcornode
+import dataflow.core.nodes.base as dtfconobas
+import dataflow.core.nodes.sources as dtfconosou
+import dataflow.core.nodes.transformers as dtfconotra
 import dataflow.core.visualization as dtfcorvisu
+import helpers.hpandas as hpandas
 import helpers.hprint as hprint
 import helpers.hunit_test as hunitest
 
@@ -528,3 +535,168 @@ class Test_dataflow_core_DAG5(_TestDataflowHelper):
         #
         dag1.compose(dag2)
         self._check(dag1)
+
+
+# #############################################################################
+# Test_dataflow_core_DAG6
+# #############################################################################
+
+
+class Test_dataflow_core_DAG6(hunitest.TestCase):
+    """
+    Check that executing a DAG in parallel is equivalent to the serial
+    execution.
+    """
+
+    @staticmethod
+    def get_dag(num_workers: int) -> dtfcordag.DAG:
+        """
+        Build a DAG with two independent branches joined in a single sink.
+
+        ```
+                   / diff  \
+        read_data -         - join
+                   \ cumsum /
+        ```
+        """
+        dag = dtfcordag.DAG()
+        dag.set_parallel_mode(num_workers)
+        index = pd.date_range("2022-01-03 09:30", periods=5, freq="T")
+        df = pd.DataFrame({"x": [1.0, 3.0, 2.0, 5.0, 4.0]}, index=index)
+        dag.add_node(dtfconosou.DfDataSource("read_data", df))
+        for nid, func in [
+            ("diff", lambda df: df.diff().add_suffix(".diff")),
+            ("cumsum", lambda df: df.cumsum().add_suffix(".cumsum")),
+        ]:
+            dag.add_node(dtfconotra.FunctionWrapper(nid, func))
+            dag.connect("read_data", nid)
+        node = dtfconobas.YConnector(
+            "join",
+            lambda df_in1, df_in2: df_in1.join(df_in2),
+        )
+        dag.add_node(node)
+        dag.connect("diff", ("join", "df_in1"))
+        dag.connect("cumsum", ("join", "df_in2"))
+        return dag
+
+    def test_run_dag1(self) -> None:
+        """
+        Run the entire DAG.
+        """
+        expected = self.get_dag(num_workers=1).run_dag("fit")
+        actual = self.get_dag(num_workers=2).run_dag("fit")
+        self.assertEqual(list(actual.keys()), ["join"])
+        self.assert_equal(
+            hpandas.df_to_str(actual["join"]["df_out"]),
+            hpandas.df_to_str(expected["join"]["df_out"]),
+        )
+
+    def test_run_leq_node1(self) -> None:
+        """
+        Run the DAG up to a node and check the outputs of all the nodes.
+        """
+        dag1 = self.get_dag(num_workers=1)
+        dag2 = self.get_dag(num_workers=3)
+        for method in ["fit", "predict"]:
+            _ = dag1.run_leq_node("join", method)
+            _ = dag2.run_leq_node("join", method)
+            for nid in ["read_data", "diff", "cumsum", "join"]:
+                expected = dag1.get_node(nid).get_output(method, "df_out")
+                actual = dag2.get_node(nid).get_output(method, "df_out")
+                self.assert_equal(
+                    hpandas.df_to_str(actual), hpandas.df_to_str(expected)
+                )
+
+    def test_run_leq_node2(self) -> None:
+        """
+        Propagate an exception raised by a node.
+        """
+        dag = self.get_dag(num_workers=2)
+        node = dtfconotra.FunctionWrapper("fail", lambda df: None)
+        dag.add_node(node)
+        dag.connect("diff", "fail")
+        with self.assertRaises(AssertionError):
+            dag.run_leq_node("fail", "fit")
+
+    def test_force_free_nodes1(self) -> None:
+        """
+        Free a node only after all its concurrent successors are executed.
+        """
+        expected = self.get_dag(num_workers=1).run_dag("fit")
+        dag = self.get_dag(num_workers=2)
+        dag.force_free_nodes = True
+        actual = dag.run_dag("fit")
+        self.assert_equal(
+            hpandas.df_to_str(actual["join"]["df_out"]),
+            hpandas.df_to_str(expected["join"]["df_out"]),
+        )
+        for nid in ["read_data", "diff", "cumsum"]:
+            with self.assertRaises(AssertionError):
+                dag.get_node(nid).get_output("fit", "df_out")
+
+
+# #############################################################################
+# Test_dataflow_core_DAG7
+# #############################################################################
+
+
+class Test_dataflow_core_DAG7(hunitest.TestCase):
+    """
+    Check that the outputs are freed after their last consumer is executed.
+    """
+
+    def run_dag_and_check(
+        self,
+        num_workers: int,
+        pinned_nids: List[str],
+        expected_freed_nids: List[str],
+    ) -> None:
+        dag = Test_dataflow_core_DAG6.get_dag(num_workers)
+        expected = dag.run_dag("fit")
+        #
+        dag = Test_dataflow_core_DAG6.get_dag(num_workers)
+        dag.set_free_dead_outputs_mode(True, pinned_nids=pinned_nids)
+        actual = dag.run_dag("fit")
+        # The output of the DAG doesn't change.
+        self.assert_equal(
+            hpandas.df_to_str(actual["join"]["df_out"]),
+            hpandas.df_to_str(expected["join"]["df_out"]),
+        )
+        # Check which outputs have been freed.
+        for nid in ["read_data", "diff", "cumsum", "join"]:
+            node = dag.get_node(nid)
+            if nid in expected_freed_nids:
+                with self.assertRaises(AssertionError):
+                    node.get_output("fit", "df_out")
+            else:
+                _ = node.get_output("fit", "df_out")
+
+    def test_serial1(self) -> None:
+        """
+        Free all the intermediate outputs in the serial execution.
+        """
+        num_workers = 1
+        pinned_nids: List[str] = []
+        expected_freed_nids = ["read_data", "diff", "cumsum"]
+        self.run_dag_and_check(num_workers, pinned_nids, expected_freed_nids)
+
+    def test_parallel1(self) -> None:
+        """
+        Free the intermediate outputs that are not pinned in the parallel
+        execution.
+        """
+        num_workers = 2
+        pinned_nids = ["diff"]
+        expected_freed_nids = ["read_data", "cumsum"]
+        self.run_dag_and_check(num_workers, pinned_nids, expected_freed_nids)
+
+    def test_run_leq_node1(self) -> None:
+        """
+        Keep the output of the node passed to `run_leq_node()`.
+        """
+        dag = Test_dataflow_core_DAG6.get_dag(num_workers=1)
+        dag.set_free_dead_outputs_mode(True)
+        df_out = dag.run_leq_node("diff", "fit")["df_out"]
+        self.assertEqual(df_out.columns.tolist(), ["x.diff"])
+        with self.assertRaises(AssertionError):
+            dag.get_node("read_data").get_output("fit", "df_out")
@@ -1,11 +1,16 @@
 import logging
 import os
+from typing import Dict
 
 import pandas as pd
 
+import dataflow.core.dag as dtfcordag
 import dataflow.core.dag_statistics as dtfcodasta
+import dataflow.core.nodes.sources as dtfconosou
+import helpers.hpandas as hpandas
 import helpers.hparquet as hparque
 import helpers.hunit_test as hunitest
+import helpers.hwall_clock_time as hwacltim
 
 _LOG = logging.getLogger(__name__)
 
@@ -88,3 +93,90 @@ class Test_compare_dag_outputs(hunitest.TestCase):
         # Check. It should exit from the function safely, i.e. return `None`.
         expected = "None"
         self.assert_equal(actual, expected)
+
+
+class Test_get_dag_node_output1(hunitest.TestCase):
+    """
+    Test reading the DAG outputs saved in `df_as_pq_delta` mode.
+    """
+
+    def test1(self) -> None:
+        """
+        Check that the full output at every bar is rebuilt from the deltas.
+        """
+        dag_dir = self.get_scratch_space()
+        expected_dfs = self._run_dag(dag_dir, num_bars=6)
+        node_io_dir = os.path.join(dag_dir, "node_io.data")
+        # Check the saved files: 2 checkpoints and 4 deltas.
+        file_names = sorted(os.listdir(node_io_dir))
+        is_delta = [
+            file_name.endswith("delta.parquet") for file_name in file_names
+        ]
+        self.assertEqual(is_delta, [False, True, True, True, False, True])
+        # Check the timestamps.
+        node_name = "predict.0.read_data"
+        dag_timestamps = dtfcodasta.get_dag_node_timestamps(
+            node_io_dir, node_name
+        )
+        bar_timestamps = [bar_timestamp for bar_timestamp, _ in dag_timestamps]
+        self.assertEqual(bar_timestamps, list(expected_dfs.keys()))
+        # Check the output at every bar.
+        for bar_timestamp, expected in expected_dfs.items():
+            actual = dtfcodasta.get_dag_node_output(
+                node_io_dir, node_name, bar_timestamp
+            )
+            self._assert_dfs_equal(actual, expected)
+        # Check the last rows for all the bars.
+        actual = dtfcodasta.load_dag_outputs(node_io_dir, node_name)
+        expected = pd.concat([df.tail(1) for df in expected_dfs.values()])
+        self._assert_dfs_equal(actual, expected)
+
+    @staticmethod
+    def _run_dag(dag_dir: str, num_bars: int) -> Dict[pd.Timestamp, pd.DataFrame]:
+        """
+        Run a DAG emitting a sliding window of data for `num_bars` bars.
+
+        The value at the last bar is revised at the next bar, like for a
+        partially filled bar.
+
+        :return: the output of the DAG at each bar timestamp
+        """
+        tz = "America/New_York"
+        index = pd.date_range(
+            "2022-01-03 09:35", periods=num_bars + 4, freq="5T", tz=tz
+        )
+        data = pd.DataFrame({"x": range(len(index))}, index=index, dtype=float)
+        node = dtfconosou.DfDataSource("read_data", data)
+        get_wall_clock_time = lambda: hwacltim.get_current_bar_timestamp()
+        dag = dtfcordag.DAG(
+            mode="strict", get_wall_clock_time=get_wall_clock_time
+        )
+        dag.add_node(node)
+        dag.set_debug_mode(
+            "df_as_pq_delta",
+            False,
+            False,
+            dag_dir,
+            node_io_checkpoint_period=4,
+        )
+        expected_dfs = {}
+        hwacltim.reset_current_bar_timestamp()
+        try:
+            for i in range(num_bars):
+                df = data.iloc[i : i + 5].copy()
+                df.iloc[-1] += 0.5
+                bar_timestamp = df.index[-1]
+                hwacltim.set_current_bar_timestamp(bar_timestamp)
+                node.df = df
+                dag.run_leq_node("read_data", "predict")
+                expected_dfs[bar_timestamp] = df
+        finally:
+            hwacltim.reset_current_bar_timestamp()
+        return expected_dfs
+
+    def _assert_dfs_equal(
+        self, actual: pd.DataFrame, expected: pd.DataFrame
+    ) -> None:
+        actual = hpandas.df_to_str(actual, num_rows=None)
+        expected = hpandas.df_to_str(expected, num_rows=None)
+        self.assert_equal(actual, expected)
@@ -0,0 +1,226 @@
+import logging
+import os
+import threading
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+import dataflow.core.dag as dtfcordag
+import dataflow.core.node_io_writer as dtfcnoiowr
+import dataflow.core.nodes.sources as dtfconosou
+import dataflow.core.nodes.transformers as dtfconotra
+import helpers.hpandas as hpandas
+import helpers.hunit_test as hunitest
+
+_LOG = logging.getLogger(__name__)
+
+
+# #############################################################################
+# TestNodeIoWriter1
+# #############################################################################
+
+
+class TestNodeIoWriter1(hunitest.TestCase):
+    def test_write1(self) -> None:
+        """
+        Check that all the submitted writes are performed on `flush()`.
+        """
+        writer = dtfcnoiowr.NodeIoWriter(max_queue_size=4)
+        written: List[str] = []
+        for i in range(10):
+            file_name = f"file{i}"
+            writer.submit(file_name, lambda x=file_name: written.append(x))
+        writer.flush()
+        self.assertEqual(written, [f"file{i}" for i in range(10)])
+        stats = writer.get_stats()
+        self.assertEqual(stats["num_submitted"], 10)
+        self.assertEqual(stats["num_written"], 10)
+        self.assertEqual(stats["queue_size"], 0)
+        writer.close()
+
+    def test_coalesce1(self) -> None:
+        """
+        Check that pending writes to the same file are coalesced.
+        """
+        writer = dtfcnoiowr.NodeIoWriter(max_queue_size=4)
+        # Block the background thread on the first write.
+        is_blocked = threading.Event()
+        can_proceed = threading.Event()
+
+        def _block() -> None:
+            is_blocked.set()
+            can_proceed.wait()
+
+        writer.submit("file0", _block)
+        is_blocked.wait()
+        written: List[str] = []
+        writer.submit("file1", lambda: written.append("old"))
+        writer.submit("file1", lambda: written.append("new"))
+        can_proceed.set()
+        writer.close()
+        self.assertEqual(written, ["new"])
+        stats = writer.get_stats()
+        self.assertEqual(stats["num_coalesced"], 1)
+        self.assertEqual(stats["num_written"], 2)
+
+    def test_back_pressure1(self) -> None:
+        """
+        Check that `submit()` blocks when the queue is full.
+        """
+        writer = dtfcnoiowr.NodeIoWriter(max_queue_size=1)
+        is_blocked = threading.Event()
+        can_proceed = threading.Event()
+
+        def _block() -> None:
+            is_blocked.set()
+            can_proceed.wait()
+
+        writer.submit("file0", _block)
+        is_blocked.wait()
+        # Unblock the writer after the second submit starts waiting.
+        timer = threading.Timer(0.1, can_proceed.set)
+        timer.start()
+        writer.submit("file1", lambda: None)
+        writer.close()
+        stats = writer.get_stats()
+        self.assertEqual(stats["num_blocked"], 1)
+        self.assertLess(0, stats["blocked_time_in_secs"])
+
+    def test_exception1(self) -> None:
+        """
+        Check that an exception in a write is propagated to the caller.
+        """
+        writer = dtfcnoiowr.NodeIoWriter()
+
+        def _fail() -> None:
+            raise ValueError("disk full")
+
+        writer.submit("file0", _fail)
+        with self.assertRaises(RuntimeError) as cm:
+            writer.flush()
+        self.assertIn("disk full", str(cm.exception.__cause__))
+        with self.assertRaises(RuntimeError):
+            writer.close()
+
+
+# #############################################################################
+# TestNodeIoDeltaEncoder1
+# #############################################################################
+
+
+class TestNodeIoDeltaEncoder1(hunitest.TestCase):
+    def test_encode1(self) -> None:
+        """
+        Check that the delta contains only the first, changed and new rows.
+        """
+        prev_df = self._get_df(0, 6)
+        df = self._get_df(2, 7)
+        # Change a value and replace a NaN with a value.
+        df.iloc[1, 0] = 100.0
+        df.iloc[2, 1] = 200.0
+        delta_df = dtfcnoiowr.compute_df_delta(prev_df, df)
+        expected = df.iloc[[0, 1, 2, 4]]
+        self._assert_dfs_equal(delta_df, expected)
+        # Check that the full output is rebuilt from the delta.
+        actual = dtfcnoiowr.apply_df_delta(prev_df, delta_df)
+        self._assert_dfs_equal(actual, df)
+
+    def test_encode2(self) -> None:
+        """
+        Check that a delta is not computed when the columns change.
+        """
+        prev_df = self._get_df(0, 6)
+        df = self._get_df(1, 7).rename(columns={"y": "z"})
+        delta_df = dtfcnoiowr.compute_df_delta(prev_df, df)
+        self.assertIsNone(delta_df)
+
+    def test_encode3(self) -> None:
+        """
+        Check that a delta is not computed when a row in the middle is removed.
+        """
+        prev_df = self._get_df(0, 6)
+        df = self._get_df(1, 7).drop(index=prev_df.index[3])
+        delta_df = dtfcnoiowr.compute_df_delta(prev_df, df)
+        self.assertIsNone(delta_df)
+
+    def test_checkpoint_period1(self) -> None:
+        """
+        Check that a full checkpoint is emitted every `checkpoint_period` bars.
+        """
+        encoder = dtfcnoiowr.NodeIoDeltaEncoder(checkpoint_period=3)
+        is_checkpoints = []
+        for i in range(7):
+            _, is_checkpoint = encoder.encode("df_out", self._get_df(i, i + 5))
+            is_checkpoints.append(is_checkpoint)
+        expected = [True, False, False, True, False, False, True]
+        self.assertEqual(is_checkpoints, expected)
+
+    @staticmethod
+    def _get_df(start: int, end: int) -> pd.DataFrame:
+        """
+        Return the rows in `[start, end)` of a df with a NaN in every 4th row.
+        """
+        index = pd.date_range(
+            "2022-01-03 09:35", periods=20, freq="5T", tz="America/New_York"
+        )
+        df = pd.DataFrame(
+            {
+                "x": np.arange(20, dtype=float),
+                "y": [np.nan if i % 4 == 0 else i for i in range(20)],
+            },
+            index=index,
+        )
+        return df.iloc[start:end].copy()
+
+    def _assert_dfs_equal(
+        self, actual: pd.DataFrame, expected: pd.DataFrame
+    ) -> None:
+        actual = hpandas.df_to_str(actual, num_rows=None)
+        expected = hpandas.df_to_str(expected, num_rows=None)
+        self.assert_equal(actual, expected)
+
+
+# #############################################################################
+# TestDagAsyncNodeIo1
+# #############################################################################
+
+
+class TestDagAsyncNodeIo1(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Check that the async mode saves the same files as the sync mode.
+        """
+        scratch_dir = self.get_scratch_space()
+        files = []
+        for async_node_io in [False, True]:
+            dst_dir = os.path.join(scratch_dir, f"async_node_io={async_node_io}")
+            dag = self._get_dag()
+            dag.set_debug_mode("df_as_pq", True, False, dst_dir)
+            dag.set_async_node_io_mode(async_node_io, max_queue_size=1)
+            dag.run_leq_node("cumsum", "fit")
+            dag.close_node_io_writer()
+            files.append(
+                sorted(os.listdir(os.path.join(dst_dir, "node_io.data")))
+            )
+        self.assertEqual(files[0], files[1])
+        self.assertEqual(len(files[1]), 4)
+
+    @staticmethod
+    def _get_dag() -> dtfcordag.DAG:
+        df = pd.DataFrame(
+            {"x": range(10)},
+            index=pd.date_range("2022-01-03 09:35", periods=10, freq="5T"),
+        )
+        # Use a fixed wall clock since it's part of the file names.
+        get_wall_clock_time = lambda: pd.Timestamp(
+            "2022-01-03 10:30", tz="America/New_York"
+        )
+        dag = dtfcordag.DAG(
+            mode="strict", get_wall_clock_time=get_wall_clock_time
+        )
+        dag.add_node(dtfconosou.DfDataSource("read_data", df))
+        node = dtfconotra.FunctionWrapper("cumsum", func=lambda df: df.cumsum())
+        dag.add_node(node)
+        dag.connect("read_data", "cumsum")
+        return dag
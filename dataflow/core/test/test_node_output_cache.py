@@ -0,0 +1,177 @@
+import logging
+import os
+import threading
+import unittest.mock as umock
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+import dataflow.core.dag as dtfcordag
+import dataflow.core.node_output_cache as dtfcnoouca
+import dataflow.core.nodes.sources as dtfconosou
+import dataflow.core.nodes.transformers as dtfconotra
+import dataflow.core.nodes.volatility_models as dtfcnovomo
+import helpers.hpandas as hpandas
+import helpers.hunit_test as hunitest
+
+_LOG = logging.getLogger(__name__)
+
+
+# #############################################################################
+# TestNodeOutputCache1
+# #############################################################################
+
+
+class TestNodeOutputCache1(hunitest.TestCase):
+    def test_hit1(self) -> None:
+        """
+        Check that a DAG with the same nodes reuses all the cached outputs.
+        """
+        cache_dir = self.get_scratch_space()
+        # Run the DAG without cache.
+        dag = self._get_dag()
+        expected_fit = dag.run_leq_node("vol", "fit", progress_bar=False)
+        expected_predict = dag.run_leq_node("vol", "predict", progress_bar=False)
+        # Run the DAG filling the cache.
+        dag = self._get_dag()
+        dag.set_node_output_cache(cache_dir)
+        dag.run_leq_node("vol", "fit", progress_bar=False)
+        stats = dag.get_node_output_cache_stats()
+        self.assertEqual(stats["num_hits"], 0)
+        self.assertEqual(stats["num_misses"], 3)
+        # Run a new DAG reading from the cache.
+        dag = self._get_dag()
+        dag.set_node_output_cache(cache_dir)
+        actual_fit = dag.run_leq_node("vol", "fit", progress_bar=False)
+        # The fit state restored from the cache is used by `predict()`.
+        actual_predict = dag.run_leq_node("vol", "predict", progress_bar=False)
+        stats = dag.get_node_output_cache_stats()
+        self.assertEqual(stats["num_hits"], 3)
+        self.assertEqual(stats["num_misses"], 3)
+        # Check.
+        self._assert_outputs_equal(actual_fit, expected_fit)
+        self._assert_outputs_equal(actual_predict, expected_predict)
+        self.assertIsNotNone(dag.get_node("vol").get_info("fit"))
+
+    def test_miss1(self) -> None:
+        """
+        Check that changing the params of a node invalidates it and the nodes
+        after it.
+        """
+        cache_dir = self.get_scratch_space()
+        dag = self._get_dag()
+        dag.set_node_output_cache(cache_dir)
+        dag.run_leq_node("vol", "fit", progress_bar=False)
+        # Change the params of the node computing the returns.
+        dag = self._get_dag(periods=2)
+        dag.set_node_output_cache(cache_dir)
+        dag.run_leq_node("vol", "fit", progress_bar=False)
+        stats = dag.get_node_output_cache_stats()
+        self.assertEqual(stats["num_hits"], 1)
+        self.assertEqual(stats["num_misses"], 2)
+
+    def test_uncacheable1(self) -> None:
+        """
+        Check that the nodes after a node that can't be fingerprinted are not
+        cached.
+        """
+        cache_dir = self.get_scratch_space()
+        for _ in range(2):
+            dag = self._get_dag()
+            # Store an object that can't be fingerprinted in a node.
+            dag.get_node("compute_ret")._lock = threading.Lock()
+            dag.set_node_output_cache(cache_dir)
+            dag.run_leq_node("vol", "fit", progress_bar=False)
+        stats = dag.get_node_output_cache_stats()
+        self.assertEqual(stats["num_hits"], 1)
+        self.assertEqual(stats["num_uncacheable"], 2)
+
+    def test_eviction1(self) -> None:
+        """
+        Check that the least recently used entries are evicted.
+        """
+        cache_dir = self.get_scratch_space()
+        dag = self._get_dag()
+        dag.set_node_output_cache(cache_dir, max_cache_size_in_bytes=10000)
+        dag.run_leq_node("vol", "fit", progress_bar=False)
+        stats = dag.get_node_output_cache_stats()
+        self.assertLess(0, stats["num_evicted"])
+
+    def test_eviction2(self) -> None:
+        """
+        Check that the cache dir is scanned only when the cache is too big.
+        """
+        cache_dir = self.get_scratch_space()
+        evict = dtfcnoouca.NodeOutputCache._evict
+        with umock.patch.object(
+            dtfcnoouca.NodeOutputCache, "_evict", autospec=True, side_effect=evict
+        ) as evict_mock:
+            dag = self._get_dag()
+            dag.set_node_output_cache(cache_dir)
+            dag.run_leq_node("vol", "fit", progress_bar=False)
+            self.assertEqual(evict_mock.call_count, 0)
+            # The size of the entries saved by the previous DAG is accounted
+            # for by a new cache.
+            dag = self._get_dag(periods=2)
+            dag.set_node_output_cache(cache_dir, max_cache_size_in_bytes=10000)
+            dag.run_leq_node("vol", "fit", progress_bar=False)
+            self.assertLess(0, evict_mock.call_count)
+        stats = dag.get_node_output_cache_stats()
+        self.assertLess(0, stats["num_evicted"])
+
+    def test_unsavable1(self) -> None:
+        """
+        Check that an output that can't be saved to Parquet is not cached.
+        """
+        cache_dir = self.get_scratch_space()
+        index = pd.date_range("2022-01-03 09:35", periods=3, freq="5T")
+        # An object column with values of different types.
+        df = pd.DataFrame({"x": [1, "a", 2.5]}, index=index)
+        for _ in range(2):
+            dag = dtfcordag.DAG(mode="strict")
+            dag.add_node(dtfconosou.DfDataSource("read_data", df))
+            dag.set_node_output_cache(cache_dir)
+            actual = dag.run_leq_node("read_data", "fit", progress_bar=False)
+            self.assertEqual(actual["df_out"]["x"].tolist(), [1, "a", 2.5])
+        stats = dag.get_node_output_cache_stats()
+        self.assertEqual(stats["num_hits"], 0)
+        self.assertEqual(stats["num_misses"], 1)
+        # The partially written entries are removed.
+        self.assertEqual(os.listdir(cache_dir), [])
+
+    @staticmethod
+    def _get_dag(periods: int = 1) -> dtfcordag.DAG:
+        index = pd.date_range(
+            "2022-01-03 09:35", periods=300, freq="5T", tz="America/New_York"
+        )
+        close = np.random.RandomState(0).rand(len(index)).cumsum() + 100
+        df = pd.DataFrame({"close": close}, index=index)
+        dag = dtfcordag.DAG(mode="strict")
+        dag.add_node(dtfconosou.DfDataSource("read_data", df))
+        node = dtfconotra.ColumnTransformer(
+            "compute_ret",
+            transformer_func=lambda x, periods: x.pct_change(periods=periods),
+            transformer_kwargs={"periods": periods},
+            col_rename_func=lambda x: x + "_ret",
+            col_mode="merge_all",
+        )
+        dag.add_node(node)
+        node = dtfcnovomo.VolatilityModel(
+            "vol", cols=["close_ret"], steps_ahead=1, nan_mode="drop"
+        )
+        dag.add_node(node)
+        dag.connect("read_data", "compute_ret")
+        dag.connect("compute_ret", "vol")
+        return dag
+
+    def _assert_outputs_equal(
+        self, actual: Dict[str, Any], expected: Dict[str, Any]
+    ) -> None:
+        self.assertEqual(list(actual.keys()), list(expected.keys()))
+        for output_name, expected_df in expected.items():
+            actual_df = actual[output_name]
+            self.assertEqual(actual_df.index.freq, expected_df.index.freq)
+            actual_str = hpandas.df_to_str(actual_df, num_rows=None)
+            expected_str = hpandas.df_to_str(expected_df, num_rows=None)
+            self.assert_equal(actual_str, expected_str)
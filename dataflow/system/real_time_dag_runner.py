@@ -51,6 +51,7 @@ class RealTimeDagRunner(dtfcore.DagRunner):
         set_current_bar_timestamp: bool = True,
         # TODO(Danya): -> `max_allowed_delay_from_bar_start_in_secs`.
         max_distance_in_secs: int = 30,
+        incremental: bool = False,
     ) -> None:
         """
         Build object.
@@ -73,6 +74,9 @@ class RealTimeDagRunner(dtfcore.DagRunner):
             that last a multiple of one minute.
         :param max_distance_in_secs: maximal distance that is allowed
             from the start of the bar.
+        :param incremental: if True, run the DAG with
+            `predict_incrementally()` so that at each bar the nodes process
+            only the new rows instead of the entire history
         """
         super().__init__(dag)
         # Save input parameters.
@@ -86,6 +90,7 @@ class RealTimeDagRunner(dtfcore.DagRunner):
         self._bar_duration_in_secs = bar_duration_in_secs
         self._set_current_bar_timestamp = set_current_bar_timestamp
         self._max_distance_in_secs = max_distance_in_secs
+        self._incremental = incremental
         # Store information about the real-time execution.
         self._events: creatime.Events = []
         if _LOG.isEnabledFor(logging.DEBUG):
@@ -133,6 +138,8 @@ class RealTimeDagRunner(dtfcore.DagRunner):
         async for result_bundle in self.predict_at_datetime():
             self._apply_current_bar_timestamp()
             result_bundles.append(result_bundle)
+        # Wait for the node interfaces saved in the background, if any.
+        self.dag.flush_node_io()
         return result_bundles
 
     async def predict_at_datetime(self) -> dtfcore.ResultBundle:
@@ -141,7 +148,7 @@ class RealTimeDagRunner(dtfcore.DagRunner):
 
         :return: list of `ResultBundle`, one per event
         """
-        method = "predict"
+        method = "predict_incrementally" if self._incremental else "predict"
         # Adapt `_dag_workload()` to the expected call back signature.
         workload = lambda current_time: self._run_dag(method)
         # Call the event loop.
@@ -4,7 +4,6 @@ Import as:
 import dataflow.system.sink_nodes as dtfsysinod
 """
 
-
 import collections
 import logging
 import os
@@ -58,6 +57,9 @@ class ProcessForecastsNode(dtfcore.FitPredictNode):
         self._portfolio = portfolio
         hdbg.dassert_isinstance(process_forecasts_dict, dict)
         self._process_forecasts_dict = process_forecasts_dict
+        # In real-time mode only the last row of the forecasts is processed,
+        # so no history is needed when predicting incrementally.
+        self.set_warmup_length(0)
 
     def fit(self, df_in: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         return self._compute_forecasts(df_in, fit=True)
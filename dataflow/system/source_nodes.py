@@ -20,7 +20,6 @@ import helpers.hprint as hprint
 import im.kibot as vkibot
 import market_data as mdata
 
-
 _LOG = logging.getLogger(__name__)
 
 
@@ -370,12 +369,17 @@ class RealTimeDataSource(dtfcore.DataSource):
         timedelta: pd.Timedelta,
         ts_col_name: str,
         multiindex_output: bool,
+        *,
+        incremental_overlap: pd.Timedelta = pd.Timedelta(minutes=5),
     ) -> None:
         """
         Constructor.
 
         :param timedelta: how much history is needed from the real-time
             node. See `MarketData.get_data()` for details.
+        :param incremental_overlap: how much of the data retrieved by the
+            previous call to re-fetch when predicting incrementally, to get the
+            rows that arrived late
         """
         if _LOG.isEnabledFor(logging.DEBUG):
             _LOG.debug(
@@ -391,6 +395,14 @@ class RealTimeDataSource(dtfcore.DataSource):
         self._ts_col_name = ts_col_name
         hdbg.dassert_isinstance(multiindex_output, bool)
         self._multiindex_output = multiindex_output
+        hdbg.dassert_isinstance(incremental_overlap, pd.Timedelta)
+        hdbg.dassert_lte(pd.Timedelta(0), incremental_overlap)
+        self._incremental_overlap = incremental_overlap
+        # End of the interval of the last data retrieved by
+        # `predict_incrementally()`.
+        self._incremental_end_ts: Optional[pd.Timestamp] = None
+        # Data retrieved by the last call to `predict_incrementally()`.
+        self._incremental_df: Optional[pd.DataFrame] = None
 
     # TODO(gp): Can we use a run and move it inside fit?
     async def wait_for_latest_data(
@@ -407,17 +419,73 @@ class RealTimeDataSource(dtfcore.DataSource):
         self._get_data()
         return super().predict()  # type: ignore[no-any-return]
 
-    def _get_data(self) -> None:
+    def predict_incrementally(self) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Emit only the data that arrived since the previous call.
+
+        The first call emits the entire history lookback, like `predict()`.
+        The next calls re-fetch the last `incremental_overlap` of the previous
+        interval, so that the bars that arrived late (i.e., after the previous
+        call) are emitted. The rows arriving after their bar was emitted can't
+        be appended and are reported.
+        """
+        self._get_data(incremental=True)
+        node_output = super().predict()
+        self._info["predict_incrementally"] = self._info["predict"]
+        # Remove the rows that overlap with the data of the previous call.
+        node_output = self._get_new_incremental_output_rows(node_output)
+        return node_output
+
+    def _get_data(self, incremental: bool = False) -> None:
         # TODO(gp): This approach of communicating params through the state
         #  makes the code difficult to understand.
         if _LOG.isEnabledFor(logging.DEBUG):
-            _LOG.debug("timedelta=%s", self._timedelta)
-        self.df = self._market_data.get_data_for_last_period(
-            self._timedelta, ts_col_name=self._ts_col_name
-        )
+            _LOG.debug(hprint.to_str("timedelta incremental"))
+        if incremental and self._incremental_end_ts is not None:
+            # Get the data in `[previous wall clock time - overlap, wall clock
+            # time)`, which contains what `get_data_for_last_period()` would
+            # add to the data retrieved by the previous call, including the
+            # rows that arrived after the previous call.
+            start_ts = self._incremental_end_ts - self._incremental_overlap
+            end_ts = self._market_data.get_wall_clock_time()
+            self.df = self._market_data.get_data_for_interval(
+                start_ts, end_ts, self._ts_col_name, None
+            )
+            self._warn_about_late_rows(self.df)
+            self._incremental_end_ts = end_ts
+            self._incremental_df = self.df
+        else:
+            if incremental:
+                self._incremental_end_ts = self._market_data.get_wall_clock_time()
+            self.df = self._market_data.get_data_for_last_period(
+                self._timedelta, ts_col_name=self._ts_col_name
+            )
+            if incremental:
+                self._incremental_df = self.df
         if self._multiindex_output:
             self.df = dtfcorutil.convert_to_multiindex(self.df, self._asset_id_col)
 
+    def _warn_about_late_rows(self, df: pd.DataFrame) -> None:
+        """
+        Report the rows that arrived after their bar was emitted.
+        """
+        last_idx = self._last_incremental_idxs.get("df_out")
+        if last_idx is None or self._incremental_df is None:
+            return
+        # Count the rows of each emitted bar that were not retrieved by the
+        # previous call.
+        counts = df.index[df.index <= last_idx].value_counts()
+        prev_counts = self._incremental_df.index.value_counts()
+        prev_counts = prev_counts.reindex(counts.index, fill_value=0)
+        num_late_rows = (counts - prev_counts).clip(lower=0).sum()
+        if num_late_rows > 0:
+            _LOG.warning(
+                "Node '%s' ignores %s rows that arrived after their bar was "
+                "emitted",
+                self.nid,
+                num_late_rows,
+            )
+
 
 # #############################################################################
 
@@ -624,6 +624,45 @@ def apply_dag_property(
     if force_free_nodes:
         _LOG.warning("Setting force free nodes")
         dag.force_free_nodes = force_free_nodes
+    # 3) num_workers
+    num_workers = system.config.get_and_mark_as_used(
+        ("dag_property_config", "num_workers"), default_value=1
+    )
+    if _LOG.isEnabledFor(logging.DEBUG):
+        _LOG.debug(hprint.to_str("num_workers"))
+    if num_workers > 1:
+        _LOG.warning("Setting parallel mode with num_workers=%s", num_workers)
+        dag.set_parallel_mode(num_workers)
+    # 4) free_dead_outputs
+    free_dead_outputs = system.config.get_and_mark_as_used(
+        ("dag_property_config", "free_dead_outputs"), default_value=False
+    )
+    if _LOG.isEnabledFor(logging.DEBUG):
+        _LOG.debug(hprint.to_str("free_dead_outputs"))
+    if free_dead_outputs:
+        _LOG.warning("Setting free dead outputs")
+        dag.set_free_dead_outputs_mode(free_dead_outputs)
+    # 5) async_node_io
+    async_node_io = system.config.get_and_mark_as_used(
+        ("dag_property_config", "async_node_io"), default_value=False
+    )
+    if _LOG.isEnabledFor(logging.DEBUG):
+        _LOG.debug(hprint.to_str("async_node_io"))
+    if async_node_io:
+        _LOG.warning("Setting async node io mode")
+        dag.set_async_node_io_mode(async_node_io)
+    # 6) node_output_cache_config
+    node_output_cache_config = system.config.get(
+        ("dag_property_config", "node_output_cache_config"), default_value=None
+    )
+    if _LOG.isEnabledFor(logging.DEBUG):
+        _LOG.debug(hprint.to_str("node_output_cache_config"))
+    if node_output_cache_config:
+        _LOG.warning("Setting node output cache")
+        node_output_cache_config = system.config.get_and_mark_as_used(
+            ("dag_property_config", "node_output_cache_config")
+        )
+        dag.set_node_output_cache(**node_output_cache_config)
     return system
 
 
@@ -1221,6 +1260,9 @@ def get_RealTimeDagRunner_from_System(
     max_distance_in_secs = system.config.get_and_mark_as_used(
         ("dag_runner_config", "max_distance_in_secs"), default_value=30
     )
+    incremental = system.config.get_and_mark_as_used(
+        ("dag_runner_config", "incremental"), default_value=False
+    )
     execute_rt_loop_config = {
         "get_wall_clock_time": get_wall_clock_time,
         "bar_duration_in_secs": bar_duration_in_secs,
@@ -1240,6 +1282,7 @@ def get_RealTimeDagRunner_from_System(
         "wake_up_timestamp": wake_up_timestamp,
         "bar_duration_in_secs": bar_duration_in_secs,
         "max_distance_in_secs": max_distance_in_secs,
+        "incremental": incremental,
     }
     # if _LOG.isEnabledFor(logging.DEBUG): _LOG.debug("system=\n%s", str(system.config))
     dag_runner = dtfsrtdaru.RealTimeDagRunner(**dag_runner_kwargs)
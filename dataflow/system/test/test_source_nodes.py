@@ -1,8 +1,11 @@
+import numpy as np
+import pandas as pd
 import pytest
 
 import dataflow.system.source_nodes as dtfsysonod
 import helpers.hpandas as hpandas
 import helpers.hunit_test as hunitest
+import market_data.replayed_market_data as mdremada
 
 
 @pytest.mark.skip(reason="Kibot Equity Reader not in use ref. #5582.")
@@ -19,3 +22,65 @@ class TestKibotEquityReader(hunitest.TestCase):
         df = node.fit()["df_out"]
         df_str = hpandas.df_to_str(df, num_rows=None)
         self.check_string(df_str)
+
+
+class TestRealTimeDataSource1(hunitest.TestCase):
+    def test_predict_incrementally1(self) -> None:
+        """
+        Check that a bar arriving after the next call is emitted.
+        """
+        end_times = pd.date_range(
+            "2000-01-01 09:31:00",
+            "2000-01-01 09:40:00",
+            freq="T",
+            tz="America/New_York",
+        )
+        asset_ids = [101, 202]
+        df = pd.DataFrame(
+            {
+                "asset_id": asset_ids * len(end_times),
+                "end_datetime": end_times.repeat(len(asset_ids)),
+                "price": np.arange(2 * len(end_times), dtype=float),
+            }
+        )
+        df["start_datetime"] = df["end_datetime"] - pd.Timedelta(minutes=1)
+        df["timestamp_db"] = df["end_datetime"] + pd.Timedelta(seconds=5)
+        # The bar at 9:35 arrives 30 seconds late.
+        is_late = df["end_datetime"] == pd.Timestamp(
+            "2000-01-01 09:35:00", tz="America/New_York"
+        )
+        df.loc[is_late, "timestamp_db"] += pd.Timedelta(seconds=25)
+        # Build a market data with a wall clock set by the test.
+        wall_clock_time = [None]
+        market_data = mdremada.ReplayedMarketData(
+            df,
+            "timestamp_db",
+            0,
+            #
+            "asset_id",
+            asset_ids,
+            "start_datetime",
+            "end_datetime",
+            None,
+            lambda: wall_clock_time[0],
+        )
+        node = dtfsysonod.RealTimeDataSource(
+            "source",
+            market_data,
+            pd.Timedelta(minutes=30),
+            "end_datetime",
+            True,
+        )
+        dfs = []
+        for time in ["09:33:10", "09:35:10", "09:36:10", "09:38:10"]:
+            wall_clock_time[0] = pd.Timestamp(
+                f"2000-01-01 {time}", tz="America/New_York"
+            )
+            dfs.append(node.predict_incrementally()["df_out"])
+        actual = pd.concat(dfs)
+        expected = node.predict()["df_out"]
+        self.assertEqual(len(actual), 8)
+        self.assert_equal(
+            hpandas.df_to_str(actual, num_rows=None),
+            hpandas.df_to_str(expected, num_rows=None),
+        )
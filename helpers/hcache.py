@@ -7,14 +7,18 @@ import helpers.hcache as hcache
 """
 
 import atexit
+import collections
 import copy
+import datetime
 import functools
 import logging
 import os
 import time
+import uuid
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union, cast
 
 import joblib
+import joblib._store_backends as jstoba
 import joblib.func_inspect as jfunci
 import joblib.memory as jmemor
 
@@ -32,6 +36,11 @@ _LOG = logging.getLogger(__name__)
 # Enable extra verbose debugging. Do not commit.
 _TRACE = False
 
+# Maximum interval between two scans of all the items of a cache to enforce the
+# cache limits, when the size of the cache tracked after each store is below
+# the limit.
+_CACHE_LIMITS_SCAN_INTERVAL = datetime.timedelta(minutes=1)
+
 # #############################################################################
 
 
@@ -321,6 +330,215 @@ def clear_global_cache(
     _LOG.info("After clear_global_cache: %s", info_after)
 
 
+# #############################################################################
+# Arrow serializer
+# #############################################################################
+
+
+def _get_serializers() -> List[str]:
+    """
+    Return the serializers of the cached values.
+
+    - "pickle": store all the values with Joblib pickles
+    - "arrow": store dataframes and series in Arrow IPC files (memory cache)
+      or Parquet files (disk cache), and all the other values with Joblib
+      pickles
+    """
+    return ["pickle", "arrow"]
+
+
+def _is_arrow_serializable(obj: Any) -> bool:
+    """
+    Return whether `obj` is a dataframe or a series that can be stored with
+    Arrow and loaded back without changes.
+    """
+    import pandas as pd
+
+    if isinstance(obj, pd.Series):
+        df = obj.to_frame()
+    elif isinstance(obj, pd.DataFrame):
+        df = obj
+    else:
+        return False
+    index_levels = [df.index.get_level_values(i) for i in range(df.index.nlevels)]
+    for values in index_levels + [df.iloc[:, i] for i in range(df.shape[1])]:
+        if values.dtype != object:
+            continue
+        # Arrow converts arbitrary Python objects, e.g., lists and dicts, to
+        # nested types that are not loaded back as the original objects, so
+        # only strings are allowed.
+        if pd.api.types.infer_dtype(values, skipna=True) not in (
+            "string",
+            "empty",
+        ):
+            return False
+        # Arrow loads back all the missing values as `None`, so the other
+        # missing values (e.g., NaNs in an all-NaN column) would change.
+        if any(value is not None for value in values[pd.isna(values)]):
+            return False
+    return True
+
+
+class _ArrowCachedValue:
+    """
+    Reference to a dataframe or a series stored by the "arrow" serializer.
+
+    Joblib pickles this object in place of the cached value, which is stored
+    in a file of the same cache item, so that the cache items are checked,
+    cleared and evicted by Joblib in the same way for all the serializers.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        columns: Any,
+        is_series: bool,
+        series_name: Any,
+        index_freq: Any,
+    ) -> None:
+        """
+        Constructor.
+
+        :param file_name: name of the file storing the data in the cache item
+        :param columns: columns of the dataframe, which are stored in the file
+            with positional names
+        :param is_series: whether the value is a series stored as a dataframe
+            with one column
+        :param series_name: name of the series
+        :param index_freq: frequency of the index, which is not stored by Arrow
+        """
+        self.file_name = file_name
+        self.columns = columns
+        self.is_series = is_series
+        self.series_name = series_name
+        self.index_freq = index_freq
+
+    @classmethod
+    def dump(
+        cls, obj: Any, item_path: str, cache_type: str
+    ) -> Optional["_ArrowCachedValue"]:
+        """
+        Store a dataframe or a series in the cache item dir `item_path`.
+
+        The memory cache uses uncompressed Arrow IPC files that can be
+        memory-mapped, while the disk cache uses compressed Parquet files.
+
+        :return: the reference to the stored value or `None` if the value
+            can't be stored with Arrow
+        """
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not _is_arrow_serializable(obj):
+            return None
+        is_series = isinstance(obj, pd.Series)
+        if is_series:
+            df = obj.to_frame(name="0")
+            columns = None
+            series_name = obj.name
+        else:
+            # Arrow requires unique string column names.
+            df = obj.copy(deep=False)
+            df.columns = [str(i) for i in range(df.shape[1])]
+            columns = obj.columns
+            series_name = None
+        index_freq = getattr(obj.index, "freq", None)
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            _LOG.debug("Can't store the value with Arrow: %s", e)
+            return None
+        file_name = "output.arrow" if cache_type == "mem" else "output.parquet"
+        hio.create_dir(item_path, incremental=True)
+        file_path = os.path.join(item_path, file_name)
+        # Write to a temporary file and rename it, so that a concurrent reader
+        # never sees an incomplete file.
+        tmp_file_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+        if cache_type == "mem":
+            with pa.OSFile(tmp_file_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        else:
+            pq.write_table(table, tmp_file_path)
+        os.replace(tmp_file_path, file_path)
+        cached_value = cls(file_name, columns, is_series, series_name, index_freq)
+        return cached_value
+
+    def load(self, item_path: str, zero_copy: bool) -> Any:
+        """
+        Load the stored dataframe or series from the cache item dir.
+
+        :param zero_copy: if `True`, the values are not copied when possible,
+            e.g., for the numerical columns without missing values, and they
+            are backed by read-only Arrow memory, which for the memory cache
+            is memory-mapped from the file
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        file_path = os.path.join(item_path, self.file_name)
+        if self.file_name.endswith(".arrow"):
+            source = pa.memory_map(file_path, "r")
+            table = pa.ipc.open_file(source).read_all()
+        else:
+            table = pq.read_table(file_path)
+        # Converting each column to a separate block avoids copying the values
+        # to consolidate the columns with the same type.
+        df = table.to_pandas(split_blocks=zero_copy)
+        if self.index_freq is not None:
+            df.index.freq = self.index_freq
+        if self.is_series:
+            obj = df["0"].rename(self.series_name)
+        else:
+            df.columns = self.columns
+            obj = df
+        return obj
+
+
+def _get_cache_item_size(item_path: str) -> int:
+    """
+    Return the size of the files in a cache item dir, computed like Joblib.
+    """
+    size = 0
+    try:
+        for file_name in os.listdir(item_path):
+            size += os.path.getsize(os.path.join(item_path, file_name))
+    except OSError:
+        # The item has been evicted in the meantime.
+        pass
+    return size
+
+
+def _get_cache_items_to_delete(
+    items: List[jstoba.CacheItemInfo],
+    max_cache_size_in_bytes: Optional[int],
+    max_cache_age: Optional[datetime.timedelta],
+) -> List[jstoba.CacheItemInfo]:
+    """
+    Return the least recently used items to delete to satisfy the limits.
+
+    :param items: all the items of a cache
+    :param max_cache_size_in_bytes: maximum size of all the items
+    :param max_cache_age: maximum time since the last access of an item
+    """
+    cache_size_in_bytes = sum(item.size for item in items)
+    if max_cache_age is not None:
+        deadline = datetime.datetime.now() - max_cache_age
+    items_to_delete = []
+    for item in sorted(items, key=lambda item: item.last_access):
+        is_size_exceeded = (
+            max_cache_size_in_bytes is not None
+            and cache_size_in_bytes > max_cache_size_in_bytes
+        )
+        is_too_old = max_cache_age is not None and item.last_access < deadline
+        if not is_size_exceeded and not is_too_old:
+            break
+        items_to_delete.append(item)
+        cache_size_in_bytes -= item.size
+    return items_to_delete
+
+
 # #############################################################################
 
 
@@ -371,6 +589,10 @@ class _Cached:
         tag: Optional[str] = None,
         disk_cache_path: Optional[str] = None,
         aws_profile: Optional[str] = "am",
+        zero_copy: bool = False,
+        serializer: str = "pickle",
+        max_cache_size_in_bytes: Optional[int] = None,
+        max_cache_age: Optional[datetime.timedelta] = None,
     ):
         """
         Construct the class.
@@ -387,6 +609,16 @@ class _Cached:
             when running unit tests we want to use a different cache)
         :param disk_cache_path: path of the function-specific cache
         :param aws_profile: the AWS profile to use in case of S3 backend
+        :param zero_copy: if `True`, return the cached values without copying
+            them, so the caller must not modify them; otherwise, return a
+            deep copy
+        :param serializer: how the values are stored in the caches, see
+            `_get_serializers()`
+        :param max_cache_size_in_bytes: after storing a value in a cache
+            (memory or disk), evict the least recently used items of that
+            cache until its size is below this limit
+        :param max_cache_age: after storing a value in a cache, evict the items
+            of that cache that were not used for longer than this
         """
         # Make the class have the same attributes (e.g., `__name__`, `__doc__`,
         # `__dict__`) as the called function.
@@ -403,6 +635,22 @@ class _Cached:
         self._tag = tag
         self._disk_cache_path = disk_cache_path
         self._aws_profile = aws_profile
+        self._zero_copy = zero_copy
+        hdbg.dassert_in(serializer, _get_serializers())
+        self._serializer = serializer
+        if max_cache_size_in_bytes is not None:
+            hdbg.dassert_lte(0, max_cache_size_in_bytes)
+        self._max_cache_size_in_bytes = max_cache_size_in_bytes
+        if max_cache_age is not None:
+            hdbg.dassert_isinstance(max_cache_age, datetime.timedelta)
+        self._max_cache_age = max_cache_age
+        # Count the hits, misses and evictions of the caches.
+        self._cache_stats: Dict[str, int] = collections.Counter()
+        # Size of each cache updated after each store and time of the last
+        # scan of its items, so that the items are scanned only when the
+        # limits can be exceeded.
+        self._cache_size_in_bytes: Dict[str, int] = {}
+        self._last_cache_scan_time: Dict[str, float] = {}
         #
         self._reset_cache_tracing()
         # Create the memory and disk cache objects for this function.
@@ -450,7 +698,8 @@ class _Cached:
             )
             # TODO(gp): Not sure making a deep copy is a good idea. In the end,
             #  the client should not modify a cached value.
-            obj = copy.deepcopy(obj)
+            if not self._zero_copy:
+                obj = copy.deepcopy(obj)
         # Print caching info.
         if self._is_verbose:
             # Get time.
@@ -510,6 +759,37 @@ class _Cached:
             ret = "no_cache"
         return ret
 
+    def get_cache_stats(self) -> Dict[str, int]:
+        """
+        Return the number of hits, misses and evictions of the caches.
+
+        :return: counters, e.g.,
+            ```
+            {
+                "mem_hits": 3,
+                "disk_hits": 1,
+                "misses": 2,
+                "mem_evictions": 0,
+                "disk_evictions": 1,
+            }
+            ```
+        """
+        keys = [
+            "mem_hits",
+            "disk_hits",
+            "misses",
+            "mem_evictions",
+            "disk_evictions",
+        ]
+        stats = {key: self._cache_stats[key] for key in keys}
+        return stats
+
+    def reset_cache_stats(self) -> None:
+        """
+        Reset the counters returned by `get_cache_stats()`.
+        """
+        self._cache_stats.clear()
+
     def enable_read_only(self, val: bool) -> None:
         """
         If set to True, the cached function can only read from the cache but
@@ -800,9 +1080,14 @@ class _Cached:
             "Cache backend not initialized for %s",
             cache_type,
         )
-        func_id, args_id = memorized_result._get_output_identifiers(
-            *args, **kwargs
-        )
+        if hasattr(memorized_result, "_get_output_identifiers"):
+            func_id, args_id = memorized_result._get_output_identifiers(
+                *args, **kwargs
+            )
+        else:
+            # Newer versions of Joblib don't have `_get_output_identifiers()`.
+            func_id = memorized_result.func_id
+            args_id = memorized_result._get_args_id(*args, **kwargs)
         _LOG.debug("func_id=%s args_id=%s", func_id, args_id)
         return func_id, args_id
 
@@ -865,9 +1150,114 @@ class _Cached:
         # Write out function code to the cache.
         func_code, _, first_line = jfunci.get_func_code(memorized_result.func)
         memorized_result._write_func_code(func_code, first_line)
+        store_backend = memorized_result.store_backend
+        if self._serializer == "arrow" and isinstance(
+            store_backend, jstoba.FileSystemStoreBackend
+        ):
+            # Store the data before the Joblib pickle, so that the cache item is
+            # visible only when complete.
+            item_path = os.path.join(store_backend.location, func_id, args_id)
+            arrow_obj = _ArrowCachedValue.dump(obj, item_path, cache_type)
+            if arrow_obj is not None:
+                obj = arrow_obj
         # Store the returned value into the cache.
-        memorized_result.store_backend.dump_item([func_id, args_id], obj)
-        #
+        store_backend.dump_item([func_id, args_id], obj)
+        self._enforce_cache_limits(cache_type, func_id, args_id)
+
+    def _load_cached_version(
+        self, cache_type: str, func_id: str, args_id: str
+    ) -> Any:
+        """
+        Load a value stored in the cache by `_store_cached_version()`.
+
+        The identifiers are the ones already computed to check the cache, so
+        the arguments are not hashed again.
+
+        :param cache_type: type of a cache
+        :param func_id: digest of the function obtained from `_get_identifiers()`
+        :param args_id: digest of arguments obtained from `_get_identifiers()`
+        :return: cached value
+        """
+        memorized_result = self._get_memorized_result(cache_type)
+        store_backend = memorized_result.store_backend
+        obj = store_backend.load_item([func_id, args_id], verbose=0)
+        if isinstance(store_backend, jstoba.FileSystemStoreBackend):
+            item_path = os.path.join(store_backend.location, func_id, args_id)
+            if isinstance(obj, _ArrowCachedValue):
+                obj = obj.load(item_path, self._zero_copy)
+            if (
+                self._max_cache_size_in_bytes is not None
+                or self._max_cache_age is not None
+            ):
+                # Mark the item as used, since the cache eviction relies on the
+                # access time, which is not updated by filesystems mounted with
+                # `noatime` or `relatime`.
+                file_path = os.path.join(item_path, "output.pkl")
+                try:
+                    mtime_ns = os.stat(file_path).st_mtime_ns
+                    os.utime(file_path, ns=(time.time_ns(), mtime_ns))
+                except OSError:
+                    # The item has been evicted in the meantime.
+                    pass
+        return obj
+
+    def _enforce_cache_limits(
+        self, cache_type: str, func_id: str, args_id: str
+    ) -> None:
+        """
+        Evict the least recently used items of a cache exceeding the size or
+        the age limits, after storing an item.
+
+        The limits apply to all the items in the cache dir, which can be
+        shared with other functions using the same global cache. Scanning all
+        the items is expensive, so the size of the cache is tracked adding the
+        size of each stored item, and the items are scanned only when the
+        tracked size exceeds the limit, or at most every
+        `_CACHE_LIMITS_SCAN_INTERVAL` to account for the items stored by other
+        functions and to check the age limit.
+
+        :param cache_type: type of a cache
+        :param func_id: digest of the function of the stored item
+        :param args_id: digest of the arguments of the stored item
+        """
+        if self._max_cache_size_in_bytes is None and self._max_cache_age is None:
+            return
+        memorized_result = self._get_memorized_result(cache_type)
+        store_backend = memorized_result.store_backend
+        now = time.time()
+        if cache_type in self._cache_size_in_bytes:
+            item_path = os.path.join(store_backend.location, func_id, args_id)
+            self._cache_size_in_bytes[cache_type] += _get_cache_item_size(
+                item_path
+            )
+            is_size_exceeded = (
+                self._max_cache_size_in_bytes is not None
+                and self._cache_size_in_bytes[cache_type]
+                > self._max_cache_size_in_bytes
+            )
+            is_scan_due = (
+                now - self._last_cache_scan_time[cache_type]
+                >= _CACHE_LIMITS_SCAN_INTERVAL.total_seconds()
+            )
+            if not is_size_exceeded and not is_scan_due:
+                return
+        # Scan the items and evict the ones exceeding the limits.
+        items = store_backend.get_items()
+        items_to_delete = _get_cache_items_to_delete(
+            items, self._max_cache_size_in_bytes, self._max_cache_age
+        )
+        cache_size_in_bytes = sum(item.size for item in items)
+        for item in items_to_delete:
+            _LOG.debug("Evicting cache item '%s'", item.path)
+            try:
+                store_backend.clear_location(item.path)
+            except OSError:
+                # The item has been evicted by another process.
+                continue
+            cache_size_in_bytes -= item.size
+            self._cache_stats[f"{cache_type}_evictions"] += 1
+        self._cache_size_in_bytes[cache_type] = cache_size_in_bytes
+        self._last_cache_scan_time[cache_type] = now
 
     # ///////////////////////////////////////////////////////////////////////////
 
@@ -895,7 +1285,8 @@ class _Cached:
             with htimer.TimedScope(
                 logging.INFO, "Loading cached version from disk"
             ):
-                obj = self._disk_cached_func(*args, **kwargs)
+                obj = self._load_cached_version("disk", func_id, args_id)
+            self._cache_stats["disk_hits"] += 1
             if self._check_only_if_present:
                 raise CachedValueException(func_info)
         else:
@@ -910,14 +1301,19 @@ class _Cached:
             if self._enable_read_only:
                 msg = f"{func_info}: trying to execute"
                 raise NotCachedValueException(msg)
+            self._cache_stats["misses"] += 1
             with htimer.TimedScope(
                 logging.INFO, "Updating cached version on disk"
             ):
-                obj = self._disk_cached_func(*args, **kwargs)
-            # obj = self._execute_intrinsic_function(*args, **kwargs)
-            # The function was not cached in disk, so now we need to update the
-            # memory cache.
-            # self._store_cached_version("disk", func_id, args_id, obj)
+                if self._serializer == "pickle":
+                    obj = self._disk_cached_func(*args, **kwargs)
+                    self._enforce_cache_limits("disk", func_id, args_id)
+                else:
+                    # Joblib would pickle the value, so we store it directly
+                    # after checking the function code like Joblib does.
+                    self._disk_cached_func._check_previous_func_code(stacklevel=4)
+                    obj = self._func(*args, **kwargs)
+                    self._store_cached_version("disk", func_id, args_id, obj)
         return obj
 
     def _execute_func_from_mem_cache(self, *args: Any, **kwargs: Any) -> Any:
@@ -940,7 +1336,8 @@ class _Cached:
             with htimer.TimedScope(
                 logging.INFO, "Loading cached version from memory"
             ):
-                obj = self._memory_cached_func(*args, **kwargs)
+                obj = self._load_cached_version("mem", func_id, args_id)
+            self._cache_stats["mem_hits"] += 1
         else:
             # INV: we know that we didn't hit the memory cache, but we don't know
             # about the disk cache.
@@ -955,6 +1352,7 @@ class _Cached:
                 obj = self._execute_func_from_disk_cache(*args, **kwargs)
             else:
                 _LOG.warning("Skipping disk cache")
+                self._cache_stats["misses"] += 1
                 obj = self._execute_intrinsic_function(*args, **kwargs)
             # The function was not cached in memory, so now we need to update the
             # memory cache.
@@ -1021,6 +1419,10 @@ def cache(
     tag: Optional[str] = None,
     disk_cache_path: Optional[str] = None,
     aws_profile: Optional[str] = None,
+    zero_copy: bool = False,
+    serializer: str = "pickle",
+    max_cache_size_in_bytes: Optional[int] = None,
+    max_cache_age: Optional[datetime.timedelta] = None,
 ) -> Union[Callable, _Cached]:
     """
     Decorate a function with a cache.
@@ -1050,6 +1452,10 @@ def cache(
             tag=tag,
             disk_cache_path=disk_cache_path,
             aws_profile=aws_profile,
+            zero_copy=zero_copy,
+            serializer=serializer,
+            max_cache_size_in_bytes=max_cache_size_in_bytes,
+            max_cache_age=max_cache_age,
         )
 
     return wrapper
@@ -195,6 +195,92 @@ def from_parquet(
     return df
 
 
+def get_max_index_from_metadata(
+    file_name: str,
+    *,
+    filters: Optional[List[Any]] = None,
+    aws_profile: hs3.AwsProfile = None,
+) -> Optional[pd.Timestamp]:
+    """
+    Return the max timestamp in the index of a Parquet dataset without reading
+    the data.
+
+    The max is computed from the statistics of the row groups stored in the
+    footers of the Parquet files, so that only the metadata is read.
+
+    :param file_name: path to a Parquet dataset
+    :param filters: Parquet query on the partition columns selecting the
+        files to consider
+    :param aws_profile: same as in `from_parquet()`
+    :return: the max timestamp in UTC or `None` if it can't be computed from
+        the metadata, e.g., when the filters are not on partition columns, the
+        index is not a timestamp, or a row group has no statistics
+    """
+    _LOG.debug(hprint.to_str("file_name filters"))
+    hdbg.dassert_isinstance(file_name, str)
+    hs3.dassert_is_valid_aws_profile(file_name, aws_profile)
+    if hs3.is_s3_path(file_name):
+        if isinstance(aws_profile, str):
+            filesystem = get_pyarrow_s3fs(aws_profile)
+        else:
+            filesystem = aws_profile
+        file_name = file_name.lstrip("s3://")
+    else:
+        filesystem = None
+        hdbg.dassert_path_exists(file_name)
+    dataset = ds.dataset(
+        file_name, filesystem=filesystem, format="parquet", partitioning="hive"
+    )
+    expression = None
+    if filters:
+        # The statistics can't be used to filter the rows inside a file, so
+        # the filters must select entire files.
+        filter_cols = [
+            filter_[0]
+            for and_filter in filters
+            for filter_ in (
+                and_filter if isinstance(and_filter, list) else [and_filter]
+            )
+        ]
+        partition_cols = dataset.partitioning.schema.names
+        if not set(filter_cols).issubset(partition_cols):
+            _LOG.debug(
+                "Filters on columns %s are not on partition columns %s",
+                filter_cols,
+                partition_cols,
+            )
+            return None
+        expression = pq.filters_to_expression(filters)
+    max_timestamp = None
+    for fragment in dataset.get_fragments(filter=expression):
+        metadata = fragment.metadata
+        schema = metadata.schema.to_arrow_schema()
+        pandas_metadata = schema.pandas_metadata or {}
+        index_cols = pandas_metadata.get("index_columns", [])
+        if len(index_cols) != 1 or not isinstance(index_cols[0], str):
+            # E.g., a `RangeIndex` is stored only in the pandas metadata.
+            return None
+        index_type = schema.field(index_cols[0]).type
+        if not pa.types.is_timestamp(index_type):
+            return None
+        col_idx = metadata.schema.names.index(index_cols[0])
+        for row_group_idx in range(metadata.num_row_groups):
+            row_group = metadata.row_group(row_group_idx)
+            if row_group.num_rows == 0:
+                continue
+            statistics = row_group.column(col_idx).statistics
+            if statistics is None or not statistics.has_min_max:
+                return None
+            timestamp = pd.Timestamp(statistics.max)
+            if timestamp.tz is None:
+                timestamp = timestamp.tz_localize(index_type.tz or "UTC")
+            timestamp = timestamp.tz_convert("UTC")
+            if max_timestamp is None or timestamp > max_timestamp:
+                max_timestamp = timestamp
+    _LOG.debug("-> max_timestamp=%s", max_timestamp)
+    return max_timestamp
+
+
 # Copied from `hio.create_enclosing_dir()` to avoid circular dependencies.
 def _create_enclosing_dir(file_name: str) -> Optional[str]:
     dir_name = os.path.dirname(file_name)
@@ -9,9 +9,12 @@ import io
 import logging
 import os
 import re
+import tempfile
+import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple, Union, cast
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union, cast
 
+import numpy as np
 import pandas as pd
 import psycopg2 as psycop
 import psycopg2.extras as extras
@@ -357,6 +360,7 @@ def remove_database(connection: DbConnection, dbname: str) -> None:
     connection.cursor().execute(
         psql.SQL("DROP DATABASE {} WITH (FORCE);").format(psql.Identifier(dbname))
     )
+    clear_table_names_cache()
 
 
 # #############################################################################
@@ -379,9 +383,54 @@ def get_table_names(connection: DbConnection) -> List[str]:
     cursor = connection.cursor()
     cursor.execute(query)
     tables = [x[0] for x in cursor.fetchall()]
+    # Refresh the cached catalog, since we already paid for the query.
+    with _TABLE_NAMES_CACHE_LOCK:
+        _TABLE_NAMES_CACHE[_get_connection_key(connection)] = set(tables)
     return tables
 
 
+# Map a DB to the names of its tables, to avoid querying the catalog on every
+# insert.
+_TABLE_NAMES_CACHE: Dict[str, Set[str]] = {}
+_TABLE_NAMES_CACHE_LOCK = threading.Lock()
+
+
+def _get_connection_key(connection: DbConnection) -> str:
+    """
+    Return a key identifying the DB that a connection points to.
+    """
+    # E.g., "user=aljsdalsd password=xxx dbname=im_postgres_db_local
+    # host=localhost port=5432".
+    key = str(connection.dsn)
+    return key
+
+
+def clear_table_names_cache() -> None:
+    """
+    Forget the table names cached by `has_table()`.
+    """
+    with _TABLE_NAMES_CACHE_LOCK:
+        _TABLE_NAMES_CACHE.clear()
+
+
+def has_table(connection: DbConnection, table_name: str) -> bool:
+    """
+    Return whether a table exists, using a cached catalog of the table names.
+
+    The catalog is refreshed from the DB only when `table_name` is not in it, so
+    that a table created after the catalog was cached is still found. A table
+    dropped outside of `remove_table()` can still be reported as existing, in
+    which case the following query on the table fails.
+    """
+    key = _get_connection_key(connection)
+    with _TABLE_NAMES_CACHE_LOCK:
+        table_names = _TABLE_NAMES_CACHE.get(key)
+    if table_names is not None and table_name in table_names:
+        return True
+    table_names = get_table_names(connection)
+    return table_name in table_names
+
+
 def get_tables_size(
     connection: DbConnection,
     only_public: bool = True,
@@ -526,6 +575,9 @@ def remove_table(
     if cascade:
         query = " ".join([query, "CASCADE"])
     connection.cursor().execute(query)
+    key = _get_connection_key(connection)
+    with _TABLE_NAMES_CACHE_LOCK:
+        _TABLE_NAMES_CACHE.get(key, set()).discard(table_name)
 
 
 def remove_all_tables(connection: DbConnection, cascade: bool = False) -> None:
@@ -547,6 +599,153 @@ def remove_all_tables(connection: DbConnection, cascade: bool = False) -> None:
 # #############################################################################
 
 
+# Postgres types of the columns that can be read with `COPY`, by OID.
+_COPY_INT_TYPES = (20, 21, 23)  # int8, int2, int4
+_COPY_FLOAT_TYPES = (700, 701, 1700)  # float4, float8, numeric
+_COPY_STR_TYPES = (19, 25, 1042, 1043)  # name, text, bpchar, varchar
+_COPY_BOOL_TYPE = 16
+_COPY_TIMESTAMP_TYPE = 1114
+_COPY_TIMESTAMPTZ_TYPE = 1184
+_COPY_TYPES = (
+    _COPY_INT_TYPES
+    + _COPY_FLOAT_TYPES
+    + _COPY_STR_TYPES
+    + (_COPY_BOOL_TYPE, _COPY_TIMESTAMP_TYPE, _COPY_TIMESTAMPTZ_TYPE)
+)
+
+
+def _get_copy_query_columns(
+    connection: DbConnection, query: str
+) -> Optional[Tuple[List[str], List[int]]]:
+    """
+    Return the names and the type OIDs of the columns returned by a query, if
+    its result can be read with `COPY` into the same dataframe that
+    `pd.read_sql_query()` returns.
+
+    :return: column names and type OIDs or `None` if the query can't be read
+        with `COPY`, e.g., because it is not a `SELECT` or because it returns
+        a column with an unsupported type
+    """
+    # A failing query would abort the transaction of the caller.
+    if connection.autocommit is not True:
+        return None
+    query = query.strip().rstrip(";")
+    if not re.match(r"^(select|with)\b", query, re.IGNORECASE):
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT * FROM ({query}) AS tmp LIMIT 0")
+            description = cursor.description
+    except psycop.Error as e:
+        _LOG.debug("Can't read the query with COPY: %s", e)
+        return None
+    columns = [col.name for col in description]
+    type_oids = [col.type_code for col in description]
+    if not all(type_oid in _COPY_TYPES for type_oid in type_oids):
+        return None
+    if _COPY_TIMESTAMPTZ_TYPE in type_oids:
+        # `COPY` returns the timestamps in the session time zone, while the
+        # current path converts them to UTC, so we require a UTC session to
+        # parse them in the same way.
+        time_zone = connection.info.parameter_status("TimeZone")
+        if time_zone not in ("UTC", "Etc/UTC"):
+            return None
+    return columns, type_oids
+
+
+def _read_copy_csv(
+    file: Any,
+    columns: List[str],
+    type_oids: List[int],
+    *,
+    chunksize: Optional[int] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read the CSV output of `COPY (query) TO STDOUT` into dataframes.
+
+    The dataframes have the same types as the ones returned by
+    `pd.read_sql_query()` for the same rows, e.g., `numeric` columns are
+    floats, integer columns with missing values are floats, timestamps with
+    time zone are in UTC and columns with only missing values contain `None`.
+
+    :param file: binary file with the output of `COPY` in the CSV format with
+        `\\N` as null value
+    :param columns: names of the columns
+    :param type_oids: Postgres types of the columns
+    :param chunksize: number of rows in each dataframe; if `None`, return one
+        dataframe
+    """
+    positions = list(range(len(columns)))
+    dtype = {}
+    na_values = {}
+    for pos, type_oid in zip(positions, type_oids):
+        na_values[pos] = ["\\N"]
+        if type_oid in _COPY_FLOAT_TYPES:
+            dtype[pos] = "float64"
+            na_values[pos].append("NaN")
+        elif type_oid not in _COPY_INT_TYPES:
+            # Parse the strings, booleans and timestamps after reading.
+            dtype[pos] = object
+    try:
+        reader = pd.read_csv(
+            file,
+            header=None,
+            names=positions,
+            dtype=dtype,
+            na_values=na_values,
+            keep_default_na=False,
+            # Parse the floats exactly like Python, as `psycopg2` does.
+            float_precision="round_trip",
+            chunksize=chunksize,
+        )
+    except pd.errors.EmptyDataError:
+        reader = None
+    if reader is None:
+        dfs = []
+    elif chunksize is None:
+        dfs = [reader]
+    else:
+        dfs = reader
+    has_data = False
+    for df in dfs:
+        has_data = True
+        for pos, type_oid in zip(positions, type_oids):
+            srs = df[pos]
+            is_na = srs.isna()
+            if is_na.all():
+                # Columns with only nulls are returned as `None`.
+                df[pos] = np.full(len(srs), None, dtype=object)
+            elif type_oid in _COPY_STR_TYPES:
+                df[pos] = srs.astype(object).where(~is_na, None)
+            elif type_oid == _COPY_BOOL_TYPE:
+                srs = srs.map({"t": True, "f": False})
+                if is_na.any():
+                    df[pos] = srs.astype(object).where(~is_na, None)
+                else:
+                    df[pos] = srs.astype(bool)
+            elif type_oid == _COPY_TIMESTAMP_TYPE:
+                df[pos] = pd.to_datetime(srs, format="ISO8601")
+            elif type_oid == _COPY_TIMESTAMPTZ_TYPE:
+                df[pos] = pd.to_datetime(srs, format="ISO8601", utc=True)
+        df.columns = columns
+        yield df
+    if not has_data:
+        # Like `pd.read_sql_query()`, return an empty dataframe with object
+        # columns.
+        yield pd.DataFrame(columns=columns)
+
+
+def _execute_copy_query(connection: DbConnection, query: str, file: Any) -> None:
+    """
+    Write the result of a query to a binary file with `COPY ... TO STDOUT`.
+    """
+    query = query.strip().rstrip(";")
+    copy_query = f"COPY ({query}) TO STDOUT WITH (FORMAT csv, NULL '\\N')"
+    with connection.cursor() as cursor:
+        cursor.copy_expert(copy_query, file)
+    file.seek(0)
+
+
 # TODO(gp): -> as_df
 def execute_query_to_df(
     connection: DbConnection,
@@ -556,9 +755,17 @@ def execute_query_to_df(
     use_timer: bool = False,
     profile: bool = False,
     verbose: bool = False,
+    *,
+    use_copy: bool = False,
 ) -> pd.DataFrame:
     """
     Execute a query.
+
+    :param use_copy: read the result with `COPY (query) TO STDOUT`, which is
+        much faster and uses less memory than `pd.read_sql_query()` for large
+        results, when the query and the types of its columns allow it (see
+        `_get_copy_query_columns()`); checking the columns costs an extra
+        round trip, so enable it only for queries returning many rows
     """
     if False:
         # Ask the user before executing a query.
@@ -578,8 +785,16 @@ def execute_query_to_df(
     if use_timer:
         idx = htimer.dtimer_start(0, "Sql time")
     cursor = connection.cursor()
+    copy_query_columns = None
+    if use_copy and not profile:
+        copy_query_columns = _get_copy_query_columns(connection, query)
     try:
-        df = pd.read_sql_query(query, connection)
+        if copy_query_columns is not None:
+            buffer = io.BytesIO()
+            _execute_copy_query(connection, query, buffer)
+            df = next(_read_copy_csv(buffer, *copy_query_columns))
+        else:
+            df = pd.read_sql_query(query, connection)
     except psycop.OperationalError:
         # Catch error and execute query directly to print error.
         try:
@@ -594,6 +809,36 @@ def execute_query_to_df(
     return df
 
 
+def execute_query_to_df_chunks(
+    connection: DbConnection,
+    query: str,
+    *,
+    chunksize: int = 100000,
+    use_copy: bool = True,
+) -> Iterator[pd.DataFrame]:
+    """
+    Execute a query and iterate over its result in dataframes of `chunksize`
+    rows.
+
+    With `COPY`, the result is spooled to a temporary file, so that only one
+    chunk at a time is kept in memory.
+
+    :param chunksize: number of rows of each dataframe
+    :param use_copy: same as in `execute_query_to_df()`; it is enabled by
+        default since the results read in chunks are expected to be large
+    """
+    hdbg.dassert_lte(1, chunksize)
+    copy_query_columns = None
+    if use_copy:
+        copy_query_columns = _get_copy_query_columns(connection, query)
+    if copy_query_columns is None:
+        yield from pd.read_sql_query(query, connection, chunksize=chunksize)
+        return
+    with tempfile.TemporaryFile() as file:
+        _execute_copy_query(connection, query, file)
+        yield from _read_copy_csv(file, *copy_query_columns, chunksize=chunksize)
+
+
 # #############################################################################
 # Insert
 # #############################################################################
@@ -637,7 +882,9 @@ def copy_rows_with_copy_from(
     :param table_name: name of the table for insertion
     """
     # The target table needs to exist.
-    hdbg.dassert_in(table_name, get_table_names(connection))
+    hdbg.dassert(
+        has_table(connection, table_name), "Table '%s' doesn't exist", table_name
+    )
     # Read the data.
     buffer = io.StringIO()
     df.to_csv(buffer, index=False, header=False)
@@ -714,7 +961,9 @@ def execute_insert_query(
     else:
         df = obj
     hdbg.dassert_isinstance(df, pd.DataFrame)
-    hdbg.dassert_in(table_name, get_table_names(connection))
+    hdbg.dassert(
+        has_table(connection, table_name), "Table '%s' doesn't exist", table_name
+    )
     _LOG.debug("df=\n%s", hpandas.df_to_str(df, use_tabulate=False))
     # Transform dataframe into list of tuples.
     values = [tuple(v) for v in df.to_numpy()]
@@ -749,7 +998,9 @@ def execute_insert_on_conflict_do_nothing_query(
     else:
         df = obj
     hdbg.dassert_isinstance(df, pd.DataFrame)
-    hdbg.dassert_in(table_name, get_table_names(connection))
+    hdbg.dassert(
+        has_table(connection, table_name), "Table '%s' doesn't exist", table_name
+    )
     _LOG.debug("df=\n%s", hpandas.df_to_str(df, use_tabulate=False))
     # Transform dataframe into list of tuples.
     values = [tuple(v) for v in df.to_numpy()]
@@ -777,6 +1028,143 @@ def execute_insert_on_conflict_do_nothing_query(
         raise e
 
 
+def _df_to_csv_buffer(df: pd.DataFrame) -> io.StringIO:
+    """
+    Serialize a dataframe in the CSV format read by `COPY ... FROM STDIN`.
+
+    Missing values (e.g., `None`, `NaT`, `pd.NA`) are written as `\\N`, so
+    that they are distinguished from empty strings. Float NaNs are written as
+    `NaN`, so that they are stored as NaNs like with `execute_insert_query()`
+    and not as NULLs, e.g., NaNs are equal when checking a unique constraint,
+    while NULLs are not.
+
+    Integer columns with missing values need to be passed with a nullable
+    integer type (e.g., `Int64`), since Postgres doesn't accept floats for an
+    integer column in the text format, e.g., "1.0".
+    """
+    df = df.copy(deep=False)
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_float_dtype(values.dtype) and values.hasnans:
+            df[col] = values.astype(object).where(values.notna(), "NaN")
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep="\\N")
+    buffer.seek(0)
+    return buffer
+
+
+def execute_bulk_upsert_query(
+    connection: DbConnection,
+    obj: Union[pd.DataFrame, pd.Series],
+    table_name: str,
+    unique_columns: List[str],
+    *,
+    update_on_conflict: bool = False,
+) -> None:
+    """
+    Insert many rows into a table using `COPY`, handling the duplicates.
+
+    This is equivalent to `execute_insert_on_conflict_do_nothing_query()`, but
+    it is much faster for large dataframes (>10000 rows): the rows are copied
+    into a temporary staging table and then moved into the target table with a
+    single `INSERT ... SELECT ... ON CONFLICT`, in one transaction.
+
+    The values must have a text representation that Postgres can parse, e.g.,
+    numbers, strings, booleans and timestamps.
+
+    :param connection: connection to the DB
+    :param obj: data to insert
+    :param table_name: name of the table for insertion
+    :param unique_columns: set of columns which should be unique record-wise;
+        if empty, the rows are copied directly into the table without handling
+        the duplicates
+    :param update_on_conflict: if `True`, a row conflicting with an existing
+        one updates the other columns of the existing row (when the data
+        contains multiple rows with the same unique values, the last one is
+        used); otherwise, the row is not inserted
+    """
+    if isinstance(obj, pd.Series):
+        df = obj.to_frame().T
+    else:
+        df = obj
+    hdbg.dassert_isinstance(df, pd.DataFrame)
+    hdbg.dassert(
+        has_table(connection, table_name), "Table '%s' doesn't exist", table_name
+    )
+    hdbg.dassert_is_subset(unique_columns, list(df.columns))
+    if df.empty:
+        _LOG.debug("Nothing to insert into '%s'", table_name)
+        return
+    columns = ",".join(list(df.columns))
+    copy_options = "(FORMAT csv, NULL '\\N')"
+    buffer = _df_to_csv_buffer(df)
+    autocommit = connection.autocommit
+    if autocommit:
+        # The staging table lives until the end of the transaction, so all the
+        # statements must be executed in the same transaction.
+        connection.autocommit = False
+    try:
+        with connection.cursor() as cursor:
+            if not unique_columns:
+                cursor.copy_expert(
+                    f"COPY {table_name}({columns}) FROM STDIN WITH {copy_options}",
+                    buffer,
+                )
+            else:
+                staging_table_name = "tmp_bulk_upsert_staging"
+                cursor.execute(
+                    f"CREATE TEMP TABLE {staging_table_name} "
+                    f"(LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                cursor.copy_expert(
+                    f"COPY {staging_table_name}({columns}) FROM STDIN "
+                    f"WITH {copy_options}",
+                    buffer,
+                )
+                unique_columns_str = ",".join(unique_columns)
+                if update_on_conflict:
+                    # A row can't be updated twice by the same statement, so
+                    # keep only the last row for each unique key.
+                    select = (
+                        f"SELECT DISTINCT ON ({unique_columns_str}) {columns} "
+                        f"FROM {staging_table_name} "
+                        f"ORDER BY {unique_columns_str}, ctid DESC"
+                    )
+                    update_columns = [
+                        col for col in df.columns if col not in unique_columns
+                    ]
+                    if update_columns:
+                        set_str = ",".join(
+                            f"{col} = EXCLUDED.{col}" for col in update_columns
+                        )
+                        conflict_action = f"DO UPDATE SET {set_str}"
+                    else:
+                        conflict_action = "DO NOTHING"
+                else:
+                    select = f"SELECT {columns} FROM {staging_table_name}"
+                    conflict_action = "DO NOTHING"
+                query = (
+                    f"INSERT INTO {table_name}({columns}) {select} "
+                    f"ON CONFLICT ({unique_columns_str}) {conflict_action}"
+                )
+                _LOG.debug("query=%s", query)
+                cursor.execute(query)
+        connection.commit()
+    except Exception as e:
+        _LOG.error(
+            "Failed to insert %s rows into '%s' with '%s'",
+            df.shape[0],
+            table_name,
+            str(e),
+        )
+        if not connection.closed:
+            connection.rollback()
+        raise e
+    finally:
+        if autocommit and not connection.closed:
+            connection.autocommit = True
+
+
 def execute_query(connection: DbConnection, query: str) -> List[tuple]:
     """
     Use for generic simple operations.
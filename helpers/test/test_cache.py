@@ -1,8 +1,10 @@
 import logging
 import tempfile
 import time
+import unittest.mock as umock
 from typing import Any, Callable, Tuple
 
+import joblib._store_backends as jstoba
 import numpy as np
 import pandas as pd
 import pytest
@@ -931,5 +933,197 @@ class TestCacheEnableCheckOnlyIfPresent1(_ResetGlobalCacheHelper):
         self._execute_and_check_state(f, cf, 2, 2, exp_cf_state=cache_from)
 
 
+# #############################################################################
+
+
+def _get_df(num_rows: int) -> pd.DataFrame:
+    """
+    Build a dataframe with a frequency and mixed column types.
+    """
+    index = pd.date_range(
+        "2022-01-01", periods=num_rows, freq="1min", tz="America/New_York"
+    )
+    df = pd.DataFrame(
+        {
+            "price": np.arange(num_rows, dtype=float),
+            1: ["a"] * num_rows,
+            "volume": np.arange(num_rows),
+        },
+        index=index,
+    )
+    return df
+
+
+class TestCacheArrowSerializer1(_ResetGlobalCacheHelper):
+    def test_mem_cache1(self) -> None:
+        self._helper(cache_from="mem", use_mem_cache=True, use_disk_cache=False)
+
+    def test_disk_cache1(self) -> None:
+        self._helper(cache_from="disk", use_mem_cache=False, use_disk_cache=True)
+
+    def test_zero_copy1(self) -> None:
+        """
+        Check that a value loaded without copying can't be modified.
+        """
+        cf = hcache._Cached(
+            _get_df,
+            tag=self.cache_tag,
+            use_disk_cache=False,
+            serializer="arrow",
+            zero_copy=True,
+        )
+        cf(3)
+        df = cf(3)
+        self.assertEqual(cf.get_last_cache_accessed(), "mem")
+        with self.assertRaises(ValueError):
+            df["price"].to_numpy()[0] = 1.0
+
+    def test_non_dataframe1(self) -> None:
+        """
+        Check that values that are not dataframes are pickled.
+        """
+        f, cf = self._get_f_cf_functions(serializer="arrow")
+        self._execute_and_check_state(f, cf, 1, 2, exp_cf_state="no_cache")
+        self._execute_and_check_state(f, cf, 1, 2, exp_cf_state="mem")
+
+    def test_missing_values1(self) -> None:
+        """
+        Check that only the object values with `None` as missing values are
+        stored with Arrow, since Arrow loads back the missing values as `None`.
+        """
+        srs = pd.Series(["a", None])
+        self.assertTrue(hcache._is_arrow_serializable(srs))
+        srs = pd.Series(["a", np.nan])
+        self.assertFalse(hcache._is_arrow_serializable(srs))
+        # An all-NaN object column.
+        df = pd.DataFrame({"a": [1, 2], "b": [np.nan, np.nan]}, dtype=object)
+        df["a"] = df["a"].astype(int)
+        self.assertFalse(hcache._is_arrow_serializable(df))
+        # Check that the value is pickled and loaded back without changes.
+        cf = hcache._Cached(
+            lambda: df,
+            tag=self.cache_tag,
+            use_disk_cache=False,
+            serializer="arrow",
+        )
+        cf()
+        actual = cf()
+        self.assertEqual(cf.get_last_cache_accessed(), "mem")
+        # The NaNs are not converted to `None`.
+        self.assertTrue(actual["b"].map(lambda value: value is not None).all())
+        self.assertTrue(actual["b"].isna().all())
+
+    def _helper(self, cache_from: str, **kwargs: Any) -> None:
+        cf = hcache._Cached(
+            _get_df, tag=self.cache_tag, serializer="arrow", **kwargs
+        )
+        df = cf(3)
+        self.assertEqual(cf.get_last_cache_accessed(), "no_cache")
+        # Check that the value is loaded back from the cache without changes.
+        for num_rows in [3, 3]:
+            actual = cf(num_rows)
+            self.assertEqual(cf.get_last_cache_accessed(), cache_from)
+            hunitest.compare_df(actual, df)
+            self.assertEqual(actual.index.freq, df.index.freq)
+        srs = hcache._Cached(
+            lambda: _get_df(3)["price"].rename("close"),
+            tag=self.cache_tag,
+            serializer="arrow",
+            **kwargs,
+        )
+        srs()
+        actual = srs()
+        self.assertEqual(srs.get_last_cache_accessed(), cache_from)
+        pd.testing.assert_series_equal(actual, df["price"].rename("close"))
+
+
+# #############################################################################
+
+
+class TestCacheStats1(_ResetGlobalCacheHelper):
+    def test_counters1(self) -> None:
+        """
+        Check the counters of the hits and misses.
+        """
+        f, cf = self._get_f_cf_functions()
+        cf(1, 2)
+        cf(1, 2)
+        cf(2, 2)
+        # Clear the memory cache to hit the disk cache.
+        hcache.clear_global_cache("mem", self.cache_tag)
+        cf(1, 2)
+        expected = {
+            "mem_hits": 1,
+            "disk_hits": 1,
+            "misses": 2,
+            "mem_evictions": 0,
+            "disk_evictions": 0,
+        }
+        self.assertDictEqual(cf.get_cache_stats(), expected)
+        cf.reset_cache_stats()
+        self.assertEqual(sum(cf.get_cache_stats().values()), 0)
+
+    def test_evictions1(self) -> None:
+        """
+        Check that the least recently used values are evicted.
+        """
+        cf = hcache._Cached(
+            _get_df,
+            tag=self.cache_tag,
+            use_disk_cache=False,
+            serializer="arrow",
+        )
+        cf(3)
+        # Compute the size of one cached value.
+        backend = cf._get_memorized_result("mem").store_backend
+        item_size = max(item.size for item in backend.get_items())
+        # Allow two values in the cache.
+        cf = hcache._Cached(
+            _get_df,
+            tag=self.cache_tag,
+            use_disk_cache=False,
+            serializer="arrow",
+            max_cache_size_in_bytes=2 * item_size + item_size // 2,
+        )
+        cf(4)
+        # Use the value for 3 rows, so that the value for 4 rows is evicted.
+        cf(3)
+        self.assertEqual(cf.get_last_cache_accessed(), "mem")
+        cf(5)
+        self.assertEqual(cf.get_cache_stats()["mem_evictions"], 1)
+        cf(3)
+        self.assertEqual(cf.get_last_cache_accessed(), "mem")
+        cf(4)
+        self.assertEqual(cf.get_last_cache_accessed(), "no_cache")
+
+    def test_evictions2(self) -> None:
+        """
+        Check that the cache items are scanned only when the cache exceeds the
+        size limit.
+        """
+        cf = hcache._Cached(
+            _get_df,
+            tag=self.cache_tag,
+            use_disk_cache=False,
+            serializer="arrow",
+            max_cache_size_in_bytes=10**9,
+        )
+        with umock.patch.object(
+            jstoba.FileSystemStoreBackend,
+            "get_items",
+            autospec=True,
+            side_effect=jstoba.FileSystemStoreBackend.get_items,
+        ) as get_items:
+            # The items are scanned to initialize the size of the cache.
+            for num_rows in range(3, 6):
+                cf(num_rows)
+            self.assertEqual(get_items.call_count, 1)
+            # Exceed the limit.
+            cf._max_cache_size_in_bytes = 0
+            cf(6)
+            self.assertEqual(get_items.call_count, 2)
+        self.assertEqual(cf.get_cache_stats()["mem_evictions"], 4)
+
+
 # TODO(gp): Add a test for verbose mode in __call__
 # TODO(gp): get_function_cache_info
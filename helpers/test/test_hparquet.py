@@ -652,6 +652,53 @@ class TestPartitionedParquet1(hunitest.TestCase):
 # #############################################################################
 
 
+class TestGetMaxIndexFromMetadata1(hunitest.TestCase):
+    def test_partitioned1(self) -> None:
+        """
+        Check the max index of a dataset filtered by a partition column.
+        """
+        dir_name = self._write_df()
+        for instr in ["A", "B", "C"]:
+            filters = [("instr", "in", [instr])]
+            actual = hparque.get_max_index_from_metadata(
+                dir_name, filters=filters
+            )
+            df = hparque.from_parquet(dir_name, filters=filters)
+            expected = df.index.max().tz_convert("UTC")
+            self.assertEqual(actual, expected)
+        # Check without filters.
+        actual = hparque.get_max_index_from_metadata(dir_name)
+        expected = pd.Timestamp("2020-01-02 16:00:00-05:00", tz="UTC")
+        self.assertEqual(actual, expected)
+
+    def test_not_partitioned1(self) -> None:
+        """
+        Check that filters on columns that are not partition columns are not
+        supported.
+        """
+        dir_name = self._write_df()
+        filters = [("val1", "==", 99)]
+        actual = hparque.get_max_index_from_metadata(dir_name, filters=filters)
+        self.assertIsNone(actual)
+
+    def _write_df(self) -> str:
+        """
+        Write a dataset partitioned by `instr` where each instrument has data
+        ending at a different time.
+        """
+        df1 = _get_df(datetime.date(2020, 1, 1))
+        df2 = _get_df(datetime.date(2020, 1, 2))
+        df2 = df2[df2["instr"] != "A"]
+        df2 = df2[(df2["instr"] != "B") | (df2.index.hour < 12)]
+        df = pd.concat([df1, df2])
+        dir_name = os.path.join(self.get_scratch_space(), "data.parquet")
+        hparque.to_partitioned_parquet(df, ["instr"], dir_name)
+        return dir_name
+
+
+# #############################################################################
+
+
 class TestGetParquetFiltersFromTimestampInterval1(hunitest.TestCase):
     def test_no_interval(self) -> None:
         """
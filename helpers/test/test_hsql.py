@@ -1,4 +1,12 @@
+import datetime
+import io
+import unittest.mock as umock
+
+import numpy as np
+import pandas as pd
+
 import helpers.hsql as hsql
+import helpers.hsql_implementation as hsqlimpl
 import helpers.hunit_test as hunitest
 
 
@@ -22,3 +30,111 @@ class TestCreateInOperator(hunitest.TestCase):
         actual = hsql.create_in_operator(values, column)
         expected = "exchange_id IN ('ftx')"
         self.assertEqual(actual, expected)
+
+
+class TestDfToCsvBuffer1(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Check the CSV format used to `COPY` a dataframe.
+        """
+        timestamps = pd.date_range("2022-01-01", periods=3, tz="UTC")
+        df = pd.DataFrame(
+            {
+                "id": pd.array([1, None, 3], dtype="Int64"),
+                "price": [1.5, np.nan, 2.0],
+                "name": ["a,b", "", None],
+                "timestamp": timestamps.where([True, False, True]),
+            }
+        )
+        actual = hsqlimpl._df_to_csv_buffer(df).getvalue()
+        expected = r"""
+        1,1.5,"a,b",2022-01-01 00:00:00+00:00
+        \N,NaN,,\N
+        3,2.0,\N,2022-01-03 00:00:00+00:00
+        """
+        self.assert_equal(actual, expected, dedent=True)
+
+
+class TestHasTable1(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Check that the table names are queried only for unknown tables.
+        """
+        connection = umock.MagicMock()
+        connection.dsn = "dbname=test_has_table1"
+        cursor = connection.cursor.return_value
+        cursor.fetchall.return_value = [("table1",), ("table2",)]
+        hsqlimpl.clear_table_names_cache()
+        self.assertTrue(hsqlimpl.has_table(connection, "table1"))
+        self.assertTrue(hsqlimpl.has_table(connection, "table2"))
+        self.assertEqual(cursor.execute.call_count, 1)
+        # An unknown table refreshes the table names.
+        self.assertFalse(hsqlimpl.has_table(connection, "table3"))
+        self.assertEqual(cursor.execute.call_count, 2)
+        # A removed table is forgotten.
+        hsqlimpl.remove_table(connection, "table1")
+        cursor.fetchall.return_value = [("table2",)]
+        self.assertFalse(hsqlimpl.has_table(connection, "table1"))
+        hsqlimpl.clear_table_names_cache()
+
+
+class TestReadCopyCsv1(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Check that the output of `COPY` is read with the types returned by
+        `pd.read_sql_query()`.
+        """
+        txt = "\n".join(
+            [
+                r"1,1,1.10,a,t,2022-01-01 00:00:00+00,2022-01-01 00:00:00,\N",
+                r"2,\N,NaN,,f,2022-01-01 00:01:00.5+00,\N,\N",
+                r"3,3,2,\N,t,\N,2022-01-01 00:02:00.123456,\N",
+            ]
+        )
+        columns = ["id", "level", "price", "name", "flag", "ts_tz", "ts", "x"]
+        # int8, int4, numeric, varchar, bool, timestamptz, timestamp, text.
+        type_oids = [20, 23, 1700, 1043, 16, 1184, 1114, 25]
+        file = io.BytesIO(txt.encode("utf-8"))
+        dfs = list(hsqlimpl._read_copy_csv(file, columns, type_oids))
+        self.assertEqual(len(dfs), 1)
+        df = dfs[0]
+        actual = {col: str(dtype) for col, dtype in df.dtypes.items()}
+        expected = {
+            "id": "int64",
+            "level": "float64",
+            "price": "float64",
+            "name": "object",
+            "flag": "bool",
+            "ts_tz": "datetime64[ns, UTC]",
+            "ts": "datetime64[ns]",
+            "x": "object",
+        }
+        self.assertDictEqual(actual, expected)
+        self.assertListEqual(df["price"].tolist()[:1], [1.1])
+        self.assertTrue(np.isnan(df["price"].iloc[1]))
+        self.assertListEqual(df["name"].tolist(), ["a", "", None])
+        self.assertListEqual(df["x"].tolist(), [None, None, None])
+        self.assertEqual(
+            df["ts_tz"].iloc[1], pd.Timestamp("2022-01-01 00:01:00.5", tz="UTC")
+        )
+        self.assertEqual(
+            df["ts"].iloc[2].to_pydatetime(),
+            datetime.datetime(2022, 1, 1, 0, 2, 0, 123456),
+        )
+
+    def test2(self) -> None:
+        """
+        Check reading an empty result and reading in chunks.
+        """
+        columns = ["id", "flag"]
+        type_oids = [20, 16]
+        dfs = list(hsqlimpl._read_copy_csv(io.BytesIO(b""), columns, type_oids))
+        self.assertEqual(len(dfs), 1)
+        self.assertListEqual(dfs[0].columns.tolist(), columns)
+        self.assertEqual(len(dfs[0]), 0)
+        #
+        file = io.BytesIO(b"1,t\n2,\\N\n3,f\n")
+        dfs = list(hsqlimpl._read_copy_csv(file, columns, type_oids, chunksize=2))
+        self.assertListEqual([df["id"].tolist() for df in dfs], [[1, 2], [3]])
+        self.assertListEqual(dfs[0]["flag"].tolist(), [True, None])
+        self.assertEqual(str(dfs[1]["flag"].dtype), "bool")
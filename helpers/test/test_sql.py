@@ -1,5 +1,6 @@
 import logging
 import pprint
+from typing import List
 
 import pandas as pd
 import psycopg2.errors as perrors
@@ -7,6 +8,7 @@ import pytest
 
 import helpers.hpandas as hpandas
 import helpers.hsql as hsql
+import helpers.hunit_test as hunitest
 
 # TODO(gp): This is a problematic dependency, since helpers should not depende
 #  from im_v2. For tests we could be more forgiving, but it would be better to
@@ -159,6 +161,89 @@ class TestSql1(imvcddbut.TestImDbHelper):
         # Delete the table.
         hsql.remove_table(self.connection, "test_table")
 
+    @pytest.mark.slow("16 seconds.")
+    def test_execute_bulk_upsert_query1(self) -> None:
+        """
+        Verify that the rows conflicting with the existing ones are skipped.
+        """
+        actual = self._bulk_upsert(update_on_conflict=False)
+        expected = [
+            "test_string_1",
+            "test_string_2",
+            "test_string_3",
+            "test_string_4",
+            "test_string_5",
+            "new_string_6",
+        ]
+        self.assertListEqual(actual, expected)
+
+    @pytest.mark.slow("16 seconds.")
+    def test_execute_bulk_upsert_query2(self) -> None:
+        """
+        Verify that the rows conflicting with the existing ones are updated.
+        """
+        actual = self._bulk_upsert(update_on_conflict=True)
+        expected = [
+            "test_string_1",
+            "test_string_2",
+            "test_string_3",
+            "new_string_4",
+            "new_string_5",
+            "new_string_6",
+        ]
+        self.assertListEqual(actual, expected)
+
+    @pytest.mark.slow("16 seconds.")
+    def test_execute_bulk_upsert_query3(self) -> None:
+        """
+        Verify that upserting the same rows with NaNs twice doesn't duplicate
+        them and stores NaNs and not NULLs.
+        """
+        query = """CREATE TABLE IF NOT EXISTS test_table_nan(
+                    id INTEGER,
+                    price DOUBLE PRECISION,
+                    UNIQUE (id, price)
+                    )
+                    """
+        self.connection.cursor().execute(query)
+        data = pd.DataFrame({"id": [1, 2, 3], "price": [1.5, float("nan"), 2.5]})
+        for _ in range(2):
+            hsql.execute_bulk_upsert_query(
+                self.connection, data, "test_table_nan", ["id", "price"]
+            )
+        actual = hsql.execute_query(
+            self.connection,
+            "SELECT COUNT(*), COUNT(price), COUNT(*) FILTER "
+            "(WHERE price = 'NaN') FROM test_table_nan",
+        )
+        # There are 3 rows, none of them with NULL price and one with NaN.
+        self.assertListEqual(actual, [(3, 3, 1)])
+        # Delete the table.
+        hsql.remove_table(self.connection, "test_table_nan")
+
+    @pytest.mark.slow("16 seconds.")
+    def test_execute_query_to_df_with_copy1(self) -> None:
+        """
+        Verify that reading with `COPY` returns the same data as reading with
+        `pd.read_sql_query()`.
+        """
+        self._create_test_table()
+        test_data = self._get_test_data()
+        hsql.execute_insert_query(self.connection, test_data, "test_table")
+        query = "SELECT *, NULL::TEXT AS empty FROM test_table ORDER BY id"
+        expected = hsql.execute_query_to_df(self.connection, query)
+        actual = hsql.execute_query_to_df(self.connection, query, use_copy=True)
+        hunitest.compare_df(actual, expected)
+        # Read in chunks.
+        chunks = list(
+            hsql.execute_query_to_df_chunks(self.connection, query, chunksize=2)
+        )
+        self.assertListEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        actual = pd.concat(chunks, ignore_index=True)
+        hunitest.compare_df(actual, expected)
+        # Delete the table.
+        hsql.remove_table(self.connection, "test_table")
+
     @staticmethod
     def _get_test_data() -> pd.DataFrame:
         """
@@ -233,6 +318,41 @@ class TestSql1(imvcddbut.TestImDbHelper):
         )
         return test_data
 
+    def _bulk_upsert(self, update_on_conflict: bool) -> List[str]:
+        """
+        Insert rows overlapping the test data with `COPY` and return the
+        values of `column_2` sorted by id.
+        """
+        self._create_test_table()
+        test_data = self._get_test_data()
+        hsql.execute_insert_query(self.connection, test_data, "test_table")
+        new_data = pd.DataFrame(
+            {
+                "id": [4, 5, 6, 6],
+                "column_1": [2003, 2004, 2005, 2005],
+                "column_2": [
+                    "new_string_4",
+                    "new_string_5",
+                    "old_string_6",
+                    "new_string_6",
+                ],
+            }
+        )
+        new_data = new_data if update_on_conflict else new_data.drop([2])
+        hsql.execute_bulk_upsert_query(
+            self.connection,
+            new_data,
+            "test_table",
+            ["id"],
+            update_on_conflict=update_on_conflict,
+        )
+        df = hsql.execute_query_to_df(
+            self.connection, "SELECT * FROM test_table ORDER BY id"
+        )
+        # Delete the table.
+        hsql.remove_table(self.connection, "test_table")
+        return df["column_2"].tolist()
+
     def _create_test_table(self) -> None:
         """
         Create a test table.
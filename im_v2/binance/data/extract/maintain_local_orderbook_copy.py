@@ -25,6 +25,7 @@ from typing import Dict
 import requests
 
 import helpers.hdbg as hdbg
+import im_v2.binance.data.extract.order_book as imvbdeorbo
 import im_v2.binance.websocket.websocket_client as imvbwwecl
 
 _LOG = logging.getLogger(__name__)
@@ -40,8 +41,8 @@ _ORDER_BOOK_UPDATE_SPEED_MS = 500
 
 _ORDER_BOOK = {
     "lastUpdateId": -1,
-    "bids": [],
-    "asks": [],
+    # Keep at most as many levels as the snapshot has.
+    "book": imvbdeorbo.L2OrderBook(max_depth=1000),
     "wasfirstProcessedEvent": False,
 }
 
@@ -58,46 +59,20 @@ def _get_orderbook_snapshot() -> None:
     )
     resp_json = resp.json()
     _ORDER_BOOK["lastUpdateId"] = resp_json["lastUpdateId"]
-    _ORDER_BOOK["bids"] = resp_json["bids"]
-    _ORDER_BOOK["asks"] = resp_json["asks"]
+    _ORDER_BOOK["book"].set_snapshot(resp_json["bids"], resp_json["asks"])
 
 
 def _update_order_book(message: Dict) -> None:
     """
-    Updates local order book's bid or ask lists based on the received message.
+    Updates local order book's bid or ask levels based on the received message.
+
+    7. The data in each event is the absolute quantity for a price level.
+    8. If the quantity is 0, remove the price level.
+    9. Receiving an event that removes a price level that is not in your
+    local order book can happen and is normal.
     """
-    for side in ["bids", "asks"]:
-        # "bids" -> "b" in a diff. book depth message
-        for update in message[side[0]]:
-            price, quantity = update
-            for i in range(0, len(_ORDER_BOOK[side])):
-                if price == _ORDER_BOOK[side][i][0]:
-                    # 8. If the quantity is 0, remove the price level.
-                    if float(quantity) == 0:
-                        _ORDER_BOOK[side].pop(i)
-                    else:
-                        # 7. The data in each event is the absolute quantity for a price level.
-                        _ORDER_BOOK[side][i] = quantity
-                    break
-
-            # Price not present, add new level
-            # 9. Receiving an event that removes a price level that is not in your
-            # local order book can happen and is normal.
-            if float(quantity) != 0:
-                _ORDER_BOOK[side].insert(-1, update)
-                if side == "asks":
-                    # Asks prices in ascendant order
-                    _ORDER_BOOK[side] = sorted(
-                        _ORDER_BOOK[side], key=lambda x: float(x[0])
-                    )
-                else:
-                    # Bids prices in descendant order
-                    _ORDER_BOOK[side] = sorted(
-                        _ORDER_BOOK[side], key=lambda x: float(x[0]), reverse=True
-                    )
-
-            if len(_ORDER_BOOK[side]) > 1000:
-                _ORDER_BOOK[side].pop(len(_ORDER_BOOK[side]) - 1)
+    # "bids" -> "b" in a diff. book depth message.
+    _ORDER_BOOK["book"].apply_update(message["b"], message["a"])
 
 
 # Two arguments are required by the library.
@@ -156,8 +131,9 @@ def _track_order_book() -> None:
         # If we have gotten in sync with Binance's order book.
         if _ORDER_BOOK["lastUpdateId"] > 0:
             # Print only a few top levels of the book for demonstration.
-            _LOG.info(f"Bids: {_ORDER_BOOK['bids'][:10]}")
-            _LOG.info(f"Asks: {_ORDER_BOOK['asks'][:10]}")
+            bids, asks = _ORDER_BOOK["book"].to_lists(10)
+            _LOG.info(f"Bids: {bids}")
+            _LOG.info(f"Asks: {asks}")
             _LOG.info("\n#######################\n")
         time.sleep(2)
 
@@ -172,4 +148,5 @@ def _main():
         ws_client.stop()
 
 
-_main()
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,282 @@
+"""
+Local copy of an L2 order book updated from depth messages.
+
+Import as:
+
+import im_v2.binance.data.extract.order_book as imvbdeorbo
+"""
+
+import logging
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import helpers.hdbg as hdbg
+
+_LOG = logging.getLogger(__name__)
+
+# A price level as received from Binance, e.g., `["27000.10", "1.520"]`.
+PriceLevel = Sequence[str]
+
+
+# #############################################################################
+# L2BookSide
+# #############################################################################
+
+
+class L2BookSide:
+    """
+    Store the price levels of one side of an L2 order book.
+
+    The levels are stored in preallocated arrays sorted by price, with the best
+    level at the end of the arrays:
+    - bids are stored by increasing price and asks by decreasing price, so the
+      keys `sign * price` are always increasing and can be searched in
+      O(log n) with `np.searchsorted()`
+    - most of the updates are close to the top of the book, so inserting or
+      deleting a level moves only the few levels after it
+    - the top of the book is the last element, i.e., O(1)
+    - the top-N levels are the last N elements, i.e., a vectorized slice
+    """
+
+    def __init__(self, is_bid: bool, *, initial_capacity: int = 1024):
+        """
+        Constructor.
+
+        :param is_bid: whether the side stores bids or asks
+        :param initial_capacity: number of levels to preallocate
+        """
+        hdbg.dassert_lte(1, initial_capacity)
+        self._is_bid = is_bid
+        self._sign = 1.0 if is_bid else -1.0
+        self._keys = np.empty(initial_capacity, dtype=np.float64)
+        self._quantities = np.empty(initial_capacity, dtype=np.float64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        """
+        Remove all the levels.
+        """
+        self._size = 0
+
+    def set_levels(self, prices: np.ndarray, quantities: np.ndarray) -> None:
+        """
+        Replace all the levels, e.g., with the levels of a depth snapshot.
+
+        The levels with zero quantity are ignored.
+
+        :param prices: prices of the levels, in any order and without
+            duplicates
+        :param quantities: quantities of the levels
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        hdbg.dassert_eq(prices.shape, quantities.shape)
+        mask = quantities != 0
+        keys = self._sign * prices[mask]
+        quantities = quantities[mask]
+        idx = np.argsort(keys, kind="stable")
+        keys = keys[idx]
+        hdbg.dassert(np.all(np.diff(keys) > 0), "Duplicated prices")
+        size = keys.shape[0]
+        if size > self._keys.shape[0]:
+            self._keys = np.empty(2 * size, dtype=np.float64)
+            self._quantities = np.empty(2 * size, dtype=np.float64)
+        self._keys[:size] = keys
+        self._quantities[:size] = quantities[idx]
+        self._size = size
+
+    def update(self, price: float, quantity: float) -> None:
+        """
+        Set the absolute quantity of a price level.
+
+        A zero quantity removes the level, if present.
+        """
+        key = self._sign * price
+        size = self._size
+        pos = int(np.searchsorted(self._keys[:size], key))
+        is_present = pos < size and self._keys[pos] == key
+        if quantity == 0:
+            if is_present:
+                self._keys[pos : size - 1] = self._keys[pos + 1 : size]
+                self._quantities[pos : size - 1] = self._quantities[
+                    pos + 1 : size
+                ]
+                self._size -= 1
+            return
+        if is_present:
+            self._quantities[pos] = quantity
+            return
+        if size == self._keys.shape[0]:
+            self._grow()
+        self._keys[pos + 1 : size + 1] = self._keys[pos:size]
+        self._quantities[pos + 1 : size + 1] = self._quantities[pos:size]
+        self._keys[pos] = key
+        self._quantities[pos] = quantity
+        self._size += 1
+
+    def truncate(self, max_depth: int) -> None:
+        """
+        Remove the worst levels, keeping at most `max_depth` levels.
+        """
+        hdbg.dassert_lte(0, max_depth)
+        num_levels_to_remove = self._size - max_depth
+        if num_levels_to_remove <= 0:
+            return
+        self._keys[:max_depth] = self._keys[num_levels_to_remove : self._size]
+        self._quantities[:max_depth] = self._quantities[
+            num_levels_to_remove : self._size
+        ]
+        self._size = max_depth
+
+    def get_top(self) -> Optional[Tuple[float, float]]:
+        """
+        Return the price and quantity of the best level.
+
+        :return: price and quantity, or `None` if the side is empty
+        """
+        if self._size == 0:
+            return None
+        last = self._size - 1
+        return self._sign * self._keys[last], self._quantities[last]
+
+    def get_levels(
+        self, depth: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return prices and quantities of the `depth` best levels.
+
+        :param depth: number of levels to return; if `None`, return all the
+            levels
+        :return: prices and quantities from the best to the worst level
+        """
+        start = 0
+        if depth is not None:
+            hdbg.dassert_lte(0, depth)
+            start = max(0, self._size - depth)
+        prices = self._sign * self._keys[start : self._size][::-1]
+        quantities = self._quantities[start : self._size][::-1].copy()
+        return prices, quantities
+
+    def _grow(self) -> None:
+        capacity = 2 * self._keys.shape[0]
+        for attr in ["_keys", "_quantities"]:
+            array = getattr(self, attr)
+            new_array = np.empty(capacity, dtype=np.float64)
+            new_array[: self._size] = array[: self._size]
+            setattr(self, attr, new_array)
+
+
+# #############################################################################
+# L2OrderBook
+# #############################################################################
+
+
+class L2OrderBook:
+    """
+    Store the bids and asks of an L2 order book.
+
+    The book is initialized from a depth snapshot and kept up to date with the
+    depth updates, e.g., from the Binance diff. book depth stream.
+    """
+
+    def __init__(
+        self, *, max_depth: Optional[int] = None, initial_capacity: int = 1024
+    ):
+        """
+        Constructor.
+
+        :param max_depth: maximum number of levels per side; the worst levels
+            are removed first; if `None`, keep all the levels
+        :param initial_capacity: number of levels to preallocate per side
+        """
+        if max_depth is not None:
+            hdbg.dassert_lte(1, max_depth)
+        self._max_depth = max_depth
+        self.bids = L2BookSide(True, initial_capacity=initial_capacity)
+        self.asks = L2BookSide(False, initial_capacity=initial_capacity)
+
+    def set_snapshot(
+        self, bids: Iterable[PriceLevel], asks: Iterable[PriceLevel]
+    ) -> None:
+        """
+        Replace the content of the book with a depth snapshot.
+
+        :param bids: bid levels as `[price, quantity]` pairs of strings
+        :param asks: ask levels as `[price, quantity]` pairs of strings
+        """
+        for side, levels in [(self.bids, bids), (self.asks, asks)]:
+            levels = np.array(list(levels), dtype=np.float64).reshape(-1, 2)
+            side.set_levels(levels[:, 0], levels[:, 1])
+            if self._max_depth is not None:
+                side.truncate(self._max_depth)
+
+    def apply_update(
+        self, bids: Iterable[PriceLevel], asks: Iterable[PriceLevel]
+    ) -> None:
+        """
+        Apply the levels of a depth update to the book.
+
+        Each level stores the absolute quantity at a price and a zero quantity
+        removes the level. Removing a level that is not in the book is a no-op.
+
+        :param bids: bid levels as `[price, quantity]` pairs of strings
+        :param asks: ask levels as `[price, quantity]` pairs of strings
+        """
+        for side, levels in [(self.bids, bids), (self.asks, asks)]:
+            for price, quantity in levels:
+                side.update(float(price), float(quantity))
+            if self._max_depth is not None:
+                side.truncate(self._max_depth)
+
+    def get_top_of_book(self) -> Tuple[Optional[float], ...]:
+        """
+        Return the best bid and ask.
+
+        :return: bid price, bid size, ask price and ask size; the values of an
+            empty side are `None`
+        """
+        bid = self.bids.get_top() or (None, None)
+        ask = self.asks.get_top() or (None, None)
+        return bid + ask
+
+    def get_snapshot(self, depth: int) -> pd.DataFrame:
+        """
+        Return the `depth` best levels of both sides.
+
+        :return: dataframe indexed by level, starting from 1, with NaNs for the
+            missing levels, e.g.,
+            ```
+                   bid_price  bid_size  ask_price  ask_size
+            level
+            1        27000.1     1.520    27000.2     0.010
+            2        27000.0     0.300    27000.5     2.000
+            ```
+        """
+        hdbg.dassert_lte(1, depth)
+        data = {}
+        for name, side in [("bid", self.bids), ("ask", self.asks)]:
+            prices, quantities = side.get_levels(depth)
+            for col, values in [("price", prices), ("size", quantities)]:
+                column = np.full(depth, np.nan)
+                column[: values.shape[0]] = values
+                data[f"{name}_{col}"] = column
+        index = pd.RangeIndex(1, depth + 1, name="level")
+        df = pd.DataFrame(data, index=index)
+        return df
+
+    def to_lists(
+        self, depth: Optional[int] = None
+    ) -> Tuple[List[List[float]], List[List[float]]]:
+        """
+        Return the `depth` best bids and asks as `[price, quantity]` pairs.
+        """
+        levels = []
+        for side in [self.bids, self.asks]:
+            prices, quantities = side.get_levels(depth)
+            levels.append(np.column_stack([prices, quantities]).tolist())
+        return levels[0], levels[1]
@@ -0,0 +1,114 @@
+import random
+
+import helpers.hpandas as hpandas
+import helpers.hunit_test as hunitest
+import im_v2.binance.data.extract.order_book as imvbdeorbo
+
+
+# #############################################################################
+# TestL2OrderBook1
+# #############################################################################
+
+
+class TestL2OrderBook1(hunitest.TestCase):
+    @staticmethod
+    def get_order_book() -> imvbdeorbo.L2OrderBook:
+        """
+        Build an order book from a depth snapshot.
+        """
+        order_book = imvbdeorbo.L2OrderBook(max_depth=4, initial_capacity=1)
+        bids = [["99.5", "1.0"], ["100.0", "2.0"], ["99.0", "3.0"]]
+        asks = [["100.5", "4.0"], ["101.0", "5.0"], ["102.0", "0.0"]]
+        order_book.set_snapshot(bids, asks)
+        return order_book
+
+    def test_set_snapshot1(self) -> None:
+        """
+        Check that the snapshot levels are sorted and zero levels are ignored.
+        """
+        order_book = self.get_order_book()
+        actual = order_book.get_snapshot(3)
+        expected = r"""
+               bid_price  bid_size  ask_price  ask_size
+        level
+        1          100.0       2.0      100.5       4.0
+        2           99.5       1.0      101.0       5.0
+        3           99.0       3.0        NaN       NaN
+        """
+        self.assert_equal(
+            hpandas.df_to_str(actual, num_rows=None), expected, fuzzy_match=True
+        )
+        self.assertEqual(order_book.get_top_of_book(), (100.0, 2.0, 100.5, 4.0))
+
+    def test_apply_update1(self) -> None:
+        """
+        Check inserting, updating and removing levels.
+        """
+        order_book = self.get_order_book()
+        bids = [
+            # Remove the best bid.
+            ["100.0", "0.0"],
+            # Update a level.
+            ["99.0", "6.0"],
+            # Insert a level at the bottom and at the top.
+            ["98.0", "7.0"],
+            ["100.2", "8.0"],
+            # Insert a level beyond `max_depth`.
+            ["97.0", "9.0"],
+        ]
+        asks = [
+            # Remove a level that is not in the book.
+            ["103.0", "0.0"],
+            ["100.7", "1.5"],
+        ]
+        order_book.apply_update(bids, asks)
+        actual = order_book.get_snapshot(5)
+        expected = r"""
+               bid_price  bid_size  ask_price  ask_size
+        level
+        1          100.2       8.0      100.5       4.0
+        2           99.5       1.0      100.7       1.5
+        3           99.0       6.0      101.0       5.0
+        4           98.0       7.0        NaN       NaN
+        5            NaN       NaN        NaN       NaN
+        """
+        self.assert_equal(
+            hpandas.df_to_str(actual, num_rows=None), expected, fuzzy_match=True
+        )
+        bids, asks = order_book.to_lists(2)
+        self.assertEqual(bids, [[100.2, 8.0], [99.5, 1.0]])
+        self.assertEqual(asks, [[100.5, 4.0], [100.7, 1.5]])
+
+    def test_apply_update2(self) -> None:
+        """
+        Check the book against a dict of levels after random updates.
+        """
+        rng = random.Random(0)
+        order_book = imvbdeorbo.L2OrderBook(initial_capacity=2)
+        expected_levels = {"bids": {}, "asks": {}}
+        for _ in range(2000):
+            price = f"{rng.randint(0, 200) / 10:.1f}"
+            quantity = rng.choice(["0.0", "1.0", "2.5"])
+            side = rng.choice(["bids", "asks"])
+            if side == "bids":
+                order_book.apply_update([[price, quantity]], [])
+            else:
+                order_book.apply_update([], [[price, quantity]])
+            if float(quantity) == 0:
+                expected_levels[side].pop(float(price), None)
+            else:
+                expected_levels[side][float(price)] = float(quantity)
+        bids, asks = order_book.to_lists()
+        expected_bids = sorted(expected_levels["bids"].items(), reverse=True)
+        expected_asks = sorted(expected_levels["asks"].items())
+        self.assertEqual([tuple(level) for level in bids], expected_bids)
+        self.assertEqual([tuple(level) for level in asks], expected_asks)
+
+    def test_get_top_of_book1(self) -> None:
+        """
+        Check the top of an empty book.
+        """
+        order_book = imvbdeorbo.L2OrderBook()
+        self.assertEqual(order_book.get_top_of_book(), (None, None, None, None))
+        order_book.apply_update([], [["101.0", "1.0"]])
+        self.assertEqual(order_book.get_top_of_book(), (None, None, 101.0, 1.0))
@@ -55,14 +55,7 @@ class CcxtImClient(icdc.ImClient):
         # Collect exchange-specific dataframes.
         exchange_dfs = []
         for exchange, full_symbols in exchange_to_full_symbols_unique.items():
-            binance_cond = exchange == "binance"
-            # For Parquet readers use `_dataset` attribute to get dataset type.
-            ohlcv_pq_cond = getattr(self, "_dataset", "") == "ohlcv"
-            # For DB readers use table name to get dataset type, e.g., `ccxt_ohlcv_futures`.
-            ohlcv_db_cond = "ohlcv" in getattr(self, "_table_name", "")
-            # The assumption is that the reader is either Parquet or DB one.
-            ohlcv_cond = ohlcv_pq_cond or ohlcv_db_cond
-            if binance_cond and ohlcv_cond:
+            if self._is_binance_ohlcv(exchange):
                 # Account for the fact that for CCXT OHLCV Binance `timestamp` is the start of the
                 # sampling interval. E.g., to get data for [17:00, 17:02] (end of sampling
                 # interval) one needs to query for [16:59, 17:01] (start of sampling interval).
@@ -102,6 +95,20 @@ class CcxtImClient(icdc.ImClient):
         df = pd.concat(exchange_dfs)
         return df
 
+    def _is_binance_ohlcv(self, exchange: str) -> bool:
+        """
+        Return whether the client reads CCXT OHLCV Binance data, whose
+        `timestamp` is the start of the sampling interval.
+        """
+        binance_cond = exchange == "binance"
+        # For Parquet readers use `_dataset` attribute to get dataset type.
+        ohlcv_pq_cond = getattr(self, "_dataset", "") == "ohlcv"
+        # For DB readers use table name to get dataset type, e.g., `ccxt_ohlcv_futures`.
+        ohlcv_db_cond = "ohlcv" in getattr(self, "_table_name", "")
+        # The assumption is that the reader is either Parquet or DB one.
+        ohlcv_cond = ohlcv_pq_cond or ohlcv_db_cond
+        return binance_cond and ohlcv_cond
+
 
 # #############################################################################
 # CcxtCddClient
@@ -448,3 +455,18 @@ class CcxtHistoricalPqByTileClient(
             aws_profile=aws_profile,
             resample_1min=resample_1min,
         )
+
+    def get_end_ts_for_symbol_from_metadata(
+        self, full_symbol: ivcu.FullSymbol
+    ) -> Optional[pd.Timestamp]:
+        """
+        Get the latest timestamp from the Parquet metadata and apply the
+        timing semantic of the data like `_read_data()`.
+        """
+        end_ts = self._get_end_ts_for_symbol_from_parquet_metadata(full_symbol)
+        exchange, _ = ivcu.parse_full_symbol(full_symbol)
+        if end_ts is not None and self._is_binance_ohlcv(exchange):
+            # Convert `timestamp` to the end of sampling interval, see
+            # `_read_data()`.
+            end_ts = end_ts + pd.Timedelta(minutes=1)
+        return end_ts
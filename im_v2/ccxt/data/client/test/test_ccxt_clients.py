@@ -1883,6 +1883,23 @@ class TestCcxtHistoricalPqByTileClient1(icdc.ImClientTestCase):
         expected_end_ts = pd.to_datetime("2018-08-19 00:01:00", utc=True)
         self._test_get_end_ts_for_symbol1(im_client, full_symbol, expected_end_ts)
 
+    @pytest.mark.requires_aws
+    @pytest.mark.requires_ck_infra
+    def test_get_end_ts_for_symbol_from_metadata1(self) -> None:
+        """
+        Check that the end timestamp from the Parquet metadata of Binance OHLCV
+        data is shifted like the one from the data.
+        """
+        resample_1min = True
+        im_client = self.get_im_client(resample_1min)
+        full_symbol = "binance::BTC_USDT"
+        actual = im_client.get_end_ts_for_symbol_from_metadata(full_symbol)
+        expected = pd.to_datetime("2018-08-19 00:01:00", utc=True)
+        self.assertEqual(actual, expected)
+        # Check that the metadata agrees with the data.
+        expected = im_client._get_start_end_ts_for_symbol(full_symbol, "end")
+        self.assertEqual(actual, expected)
+
     # ////////////////////////////////////////////////////////////////////////
 
     def test_get_universe1(self) -> None:
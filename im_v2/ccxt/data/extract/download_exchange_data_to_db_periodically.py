@@ -55,7 +55,9 @@ def _parse() -> argparse.ArgumentParser:
         choices=["on_buffer_full", "on_sufficient_time"],
         help="Specifies the database saving mode. \n"
         "on_buffer_full: Save data to the database when the buffer is full. \n"
-        "on_sufficient_time: Save data to the database based on a predefined time interval.",
+        "on_sufficient_time: Save data to the database based on a predefined time interval. \n"
+        "For the websocket download, the data is saved by a background writer "
+        "when the buffer is full or its delay expires, regardless of this mode.",
     )
     parser.add_argument(
         "--watch_multiple_symbols",
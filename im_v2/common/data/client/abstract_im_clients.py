@@ -6,8 +6,9 @@ import im_v2.common.data.client.abstract_im_clients as imvcdcaimcl
 
 import abc
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
+import numpy as np
 import pandas as pd
 
 import core.finance.bid_ask as cfibiask
@@ -20,6 +21,65 @@ import im_v2.common.universe as ivcu
 
 _LOG = logging.getLogger(__name__)
 
+
+def _resample_1min_by_full_symbol(
+    df: pd.DataFrame, full_symbol_col_name: str
+) -> pd.DataFrame:
+    """
+    Resample the data of each symbol to 1 minute frequency.
+
+    This is equivalent to `hpandas.resample_df(df_tmp, "T")` for the data
+    `df_tmp` of each symbol, but all the symbols are reindexed at once on the
+    grid of all the `(timestamp, full_symbol)` pairs.
+
+    :param df: data with unique timestamps for each symbol
+    :return: resampled data with the rows sorted by symbol, in order of first
+        appearance, and timestamp
+    """
+    codes, full_symbols = pd.factorize(df[full_symbol_col_name])
+    num_symbols = len(full_symbols)
+    timestamps = df.index.as_unit("ns").asi8
+    # Compute the first and the last timestamp of each symbol.
+    min_timestamps = np.full(num_symbols, np.iinfo(np.int64).max)
+    np.minimum.at(min_timestamps, codes, timestamps)
+    max_timestamps = np.full(num_symbols, np.iinfo(np.int64).min)
+    np.maximum.at(max_timestamps, codes, timestamps)
+    # The grid of each symbol starts from its first timestamp like
+    # `pd.date_range(start, end, freq="T")`.
+    minute = pd.Timedelta(minutes=1).value
+    num_grid_rows = (max_timestamps - min_timestamps) // minute + 1
+    offsets = np.cumsum(num_grid_rows) - num_grid_rows
+    grid_codes = np.repeat(np.arange(num_symbols), num_grid_rows)
+    grid_timestamps = min_timestamps[grid_codes] + minute * (
+        np.arange(num_grid_rows.sum()) - offsets[grid_codes]
+    )
+    # Find the position of each row in the grid, dropping the rows that are
+    # not on the grid.
+    deltas = timestamps - min_timestamps[codes]
+    is_on_grid = deltas % minute == 0
+    grid_positions = offsets[codes[is_on_grid]] + deltas[is_on_grid] // minute
+    indexer = np.full(grid_timestamps.shape[0], -1, dtype=np.int64)
+    indexer[grid_positions] = np.arange(df.shape[0])[is_on_grid]
+    # Reindex, placing NaN in the missing rows.
+    index_name = df.index.name
+    resampled_df = df.reset_index(drop=True).reindex(indexer)
+    resampled_index = pd.DatetimeIndex(grid_timestamps.view("M8[ns]"))
+    resampled_index = resampled_index.tz_localize("UTC").tz_convert(df.index.tz)
+    resampled_df.index = resampled_index.rename(index_name)
+    # Fill NaN values appeared after resampling in full symbol column like
+    # `bfill()` does for each symbol, i.e., up to the last row on the grid.
+    last_grid_positions = offsets.copy()
+    np.maximum.at(last_grid_positions, codes[is_on_grid], grid_positions)
+    is_filled = np.arange(grid_timestamps.shape[0]) <= (
+        last_grid_positions[grid_codes]
+    )
+    full_symbol_srs = pd.Series(full_symbols.take(grid_codes))
+    resampled_df[full_symbol_col_name] = full_symbol_srs.where(
+        is_filled
+    ).to_numpy()
+    return resampled_df
+
+
 # #############################################################################
 # ImClient
 # #############################################################################
@@ -118,20 +178,19 @@ class ImClient(abc.ABC, hobject.PrintableMixin):
 
     @staticmethod
     def get_asset_ids_from_full_symbols(
-        full_symbols: List[ivcu.FullSymbol],
+        full_symbols: Union[List[ivcu.FullSymbol], pd.Series],
     ) -> List[int]:
         """
         Convert full symbols into asset ids.
 
-        :param full_symbols: assets as full symbols
+        :param full_symbols: assets as full symbols, e.g., a list of full
+            symbols or the full symbol column of the data
         :return: assets as numerical ids
         """
-        hdbg.dassert_container_type(full_symbols, list, ivcu.FullSymbol)
-        numerical_asset_id = [
-            ivcu.string_to_numerical_id(full_symbol)
-            for full_symbol in full_symbols
-        ]
-        return numerical_asset_id
+        hdbg.dassert_isinstance(full_symbols, (list, pd.Series))
+        # Each full symbol is converted only once.
+        numerical_asset_id = ivcu.string_ids_to_numerical_ids(full_symbols)
+        return numerical_asset_id.tolist()  # type: ignore[no-any-return]
 
     # TODO(gp): Each derived class should call the proper function instead of
     #  delegating to the same function but using vendor to distinguish, since this
@@ -250,35 +309,34 @@ class ImClient(abc.ABC, hobject.PrintableMixin):
         )
         # Rename index.
         df.index.name = self._timestamp_col_name
-        # Normalize data for each symbol.
-        _LOG.debug("full_symbols=%s", df[full_symbol_col_name].unique())
-        dfs = []
-        for full_symbol, df_tmp in df.groupby(full_symbol_col_name):
-            _LOG.debug("apply_im_normalization: full_symbol=%s", full_symbol)
-            df_tmp = self._apply_im_normalizations(
-                df_tmp,
+        hdbg.dassert_lt(0, df.shape[0], "Empty df=\n%s", df)
+        # Normalize the data of all the symbols at once.
+        normalized_df = self._apply_vectorized_im_normalizations(
+            df,
+            full_symbol_col_name,
+            self._resample_1min,
+            start_ts,
+            end_ts,
+        )
+        if normalized_df is not None:
+            # The resampled data of each symbol is strictly increasing with 1
+            # minute frequency by construction, so only the checks that don't
+            # depend on the resampling are run on all the data.
+            resample_1min = False
+            self._dassert_output_data_is_valid(
+                normalized_df,
                 full_symbol_col_name,
-                self._resample_1min,
+                resample_1min,
                 start_ts,
                 end_ts,
+                self._timestamp_col_name,
+            )
+            df = normalized_df
+        else:
+            # Fall back to normalizing the data for each symbol.
+            df = self._apply_im_normalizations_by_full_symbol(
+                df, full_symbol_col_name, start_ts, end_ts
             )
-            if not df_tmp.empty:
-                # Validate data that remained after normalization and append it
-                # to the result.
-                # TODO(gp): Difference between amp and cmamp.
-                self._dassert_output_data_is_valid(
-                    df_tmp,
-                    full_symbol_col_name,
-                    self._resample_1min,
-                    start_ts,
-                    end_ts,
-                    self._timestamp_col_name,
-                )
-                dfs.append(df_tmp)
-            else:
-                _LOG.debug("Df for full_symbol=%s is empty", full_symbol)
-        hdbg.dassert_lt(0, df.shape[0], "Empty df=\n%s", df)
-        df = pd.concat(dfs, axis=0)
         _LOG.debug("After im_normalization: df=\n%s", hpandas.df_to_str(df))
         # Sort by index and `full_symbol_col_name`.
         # There is not a simple way to sort by index and columns in Pandas,
@@ -317,8 +375,28 @@ class ImClient(abc.ABC, hobject.PrintableMixin):
         """
         Same as `get_start_ts_for_symbol()`.
         """
-        mode = "end"
-        return self._get_start_end_ts_for_symbol(full_symbol, mode)
+        timestamp = self.get_end_ts_for_symbol_from_metadata(full_symbol)
+        if timestamp is None:
+            mode = "end"
+            timestamp = self._get_start_end_ts_for_symbol(full_symbol, mode)
+        return timestamp
+
+    def get_end_ts_for_symbol_from_metadata(
+        self, full_symbol: ivcu.FullSymbol
+    ) -> Optional[pd.Timestamp]:
+        """
+        Return the latest timestamp available for a given `full_symbol` without
+        reading the data.
+
+        Derived classes can override this method if the backend stores this
+        information in its metadata (e.g., Parquet statistics) and the result
+        has the same timing semantic as the data returned by `read_data()`.
+
+        :return: the latest timestamp in UTC or `None` if it is not available
+            from the metadata
+        """
+        _ = full_symbol
+        return None
 
     def get_full_symbols_from_asset_ids(
         self, asset_ids: List[int]
@@ -394,6 +472,92 @@ class ImClient(abc.ABC, hobject.PrintableMixin):
         df.index = df.index.tz_convert("UTC")
         return df
 
+    @staticmethod
+    def _apply_vectorized_im_normalizations(
+        df: pd.DataFrame,
+        full_symbol_col_name: str,
+        resample_1min: bool,
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
+    ) -> Optional[pd.DataFrame]:
+        """
+        Apply the same normalizations as `_apply_im_normalizations()` to the
+        data of all the symbols at once.
+
+        The output is the same as the one of `_apply_im_normalizations()` applied
+        to the data of each symbol and concatenated, up to the order of the
+        rows, which is then sorted by timestamp and symbol.
+
+        :return: normalized data or `None` if the result of the per-symbol
+            normalization can't be reproduced, e.g., when duplicated rows
+            can't be resolved by "knowledge_timestamp" or a symbol has no data
+            to resample
+        """
+        _LOG.debug(hprint.to_str("full_symbol_col_name start_ts end_ts"))
+        # Rows without a symbol are dropped by the group-by on the symbols.
+        is_symbol_na = df[full_symbol_col_name].isna()
+        if is_symbol_na.any():
+            df = df[~is_symbol_na]
+        if df.empty:
+            return None
+        if isinstance(df[full_symbol_col_name].dtype, pd.CategoricalDtype):
+            # The group-by on the symbols also returns the unused categories.
+            return None
+        # 1) Drop duplicated timestamps.
+        # The symbol is one of the columns, so dropping the rows duplicated by
+        # index and all the columns is the same as doing it for each symbol.
+        index_col_name = "use_index_col"
+        hdbg.dassert_not_in(index_col_name, df.columns)
+        keys = df.copy(deep=False)
+        keys[index_col_name] = df.index
+        df = df[~keys.duplicated()]
+        index_symbol_cols = [index_col_name, full_symbol_col_name]
+        if "knowledge_timestamp" in df.columns:
+            keys = df[[full_symbol_col_name, "knowledge_timestamp"]].copy()
+            keys[index_col_name] = df.index
+            if keys.duplicated().any():
+                # Keeping the row with the latest "knowledge_timestamp" depends
+                # on how the sorting breaks the ties.
+                return None
+            # Keep the rows with the latest "knowledge_timestamp" for each
+            # timestamp and symbol.
+            # `NaT` are sorted last like in `_apply_im_normalizations()`, while
+            # `argsort()` returns -1 for them.
+            order = (
+                keys["knowledge_timestamp"]
+                .reset_index(drop=True)
+                .sort_values(kind="stable", na_position="last")
+                .index.to_numpy()
+            )
+            keys = keys.iloc[order]
+            is_last = ~keys.duplicated(subset=index_symbol_cols, keep="last")
+            df = df.iloc[np.sort(order[is_last.to_numpy()])]
+        # 2) Trim the data keeping only the data with index in [start_ts, end_ts].
+        num_symbols = df[full_symbol_col_name].nunique()
+        mask = np.ones(df.shape[0], dtype=bool)
+        if start_ts is not None:
+            mask &= df.index >= start_ts
+        if end_ts is not None:
+            mask &= df.index <= end_ts
+        if not mask.all():
+            df = df[mask]
+        if df.empty:
+            return None
+        # 3) Resample index to 1 min frequency if specified.
+        if resample_1min:
+            if df[full_symbol_col_name].nunique() < num_symbols:
+                # Resampling fails for a symbol without data.
+                return None
+            keys = df[[full_symbol_col_name]].copy()
+            keys[index_col_name] = df.index
+            if keys.duplicated().any():
+                # Resampling fails for a symbol with duplicated timestamps.
+                return None
+            df = _resample_1min_by_full_symbol(df, full_symbol_col_name)
+        # 4) Convert to UTC.
+        df.index = df.index.tz_convert("UTC")
+        return df
+
     @staticmethod
     def _dassert_output_data_is_valid(
         df: pd.DataFrame,
@@ -485,6 +649,45 @@ class ImClient(abc.ABC, hobject.PrintableMixin):
 
     # //////////////////////////////////////////////////////////////////////////
 
+    def _apply_im_normalizations_by_full_symbol(
+        self,
+        df: pd.DataFrame,
+        full_symbol_col_name: str,
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
+    ) -> pd.DataFrame:
+        """
+        Apply `_apply_im_normalizations()` to the data of each symbol.
+        """
+        _LOG.debug("full_symbols=%s", df[full_symbol_col_name].unique())
+        dfs = []
+        for full_symbol, df_tmp in df.groupby(full_symbol_col_name):
+            _LOG.debug("apply_im_normalization: full_symbol=%s", full_symbol)
+            df_tmp = self._apply_im_normalizations(
+                df_tmp,
+                full_symbol_col_name,
+                self._resample_1min,
+                start_ts,
+                end_ts,
+            )
+            if not df_tmp.empty:
+                # Validate data that remained after normalization and append it
+                # to the result.
+                # TODO(gp): Difference between amp and cmamp.
+                self._dassert_output_data_is_valid(
+                    df_tmp,
+                    full_symbol_col_name,
+                    self._resample_1min,
+                    start_ts,
+                    end_ts,
+                    self._timestamp_col_name,
+                )
+                dfs.append(df_tmp)
+            else:
+                _LOG.debug("Df for full_symbol=%s is empty", full_symbol)
+        df = pd.concat(dfs, axis=0)
+        return df
+
     def _get_full_symbol_col_name(
         self, full_symbol_col_name: Optional[str]
     ) -> str:
@@ -6,9 +6,10 @@ import im_v2.common.data.client.historical_pq_clients as imvcdchpcl
 
 import abc
 import collections
+import concurrent.futures
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 
@@ -25,6 +26,30 @@ import im_v2.common.universe as ivcu
 _LOG = logging.getLogger(__name__)
 
 
+def _split_interval(
+    start_ts: pd.Timestamp, end_ts: pd.Timestamp, freq: str
+) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """
+    Split `[start_ts, end_ts]` in consecutive intervals aligned to `freq`.
+
+    E.g., `[2022-01-15, 2022-03-10]` with `freq="MS"` is split into
+    ```
+    [(2022-01-15, 2022-01-31 23:59:59.999999999),
+     (2022-02-01, 2022-02-28 23:59:59.999999999),
+     (2022-03-01, 2022-03-10)]
+    ```
+
+    :param freq: pandas frequency of the interval boundaries, e.g., "MS"
+    :return: closed intervals covering `[start_ts, end_ts]` without overlaps
+    """
+    hdbg.dassert_lte(start_ts, end_ts)
+    boundaries = pd.date_range(start_ts, end_ts, freq=freq).to_list()
+    starts = [start_ts] + [ts for ts in boundaries if ts > start_ts]
+    ends = [ts - pd.Timedelta(1, "ns") for ts in starts[1:]] + [end_ts]
+    intervals = list(zip(starts, ends))
+    return intervals
+
+
 # #############################################################################
 # HistoricalPqByTileClient
 # #############################################################################
@@ -92,10 +117,87 @@ class HistoricalPqByTileClient(
         """
         raise NotImplementedError
 
+    def read_data_by_tile(
+        self,
+        full_symbols: List[ivcu.FullSymbol],
+        start_ts: pd.Timestamp,
+        end_ts: pd.Timestamp,
+        columns: Optional[List[str]],
+        filter_data_mode: str,
+        *,
+        tile_freq: str = "MS",
+        **kwargs: Any,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yield the data in `[start_ts, end_ts]` one time tile at a time.
+
+        While the caller processes a tile, the next tile is read in the
+        background.
+
+        :param tile_freq: pandas frequency of the tile boundaries, e.g., "MS"
+            for monthly tiles
+        :param kwargs: see `read_data()`, e.g., `num_workers`
+        :return: the output of `read_data()` for each tile, in time order
+        """
+        hdbg.dassert_isinstance(start_ts, pd.Timestamp)
+        hdbg.dassert_isinstance(end_ts, pd.Timestamp)
+        tiles = _split_interval(start_ts, end_ts, tile_freq)
+        _LOG.debug("Reading %s tiles", len(tiles))
+
+        def _read_tile(tile: Tuple[pd.Timestamp, pd.Timestamp]) -> pd.DataFrame:
+            tile_start_ts, tile_end_ts = tile
+            df = self.read_data(
+                full_symbols,
+                tile_start_ts,
+                tile_end_ts,
+                columns,
+                filter_data_mode,
+                **kwargs,
+            )
+            return df
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(_read_tile, tiles[0])
+            for next_tile in tiles[1:] + [None]:
+                df = future.result()
+                if next_tile is not None:
+                    # Prefetch the next tile.
+                    future = executor.submit(_read_tile, next_tile)
+                yield df
+
     # ///////////////////////////////////////////////////////////////////////////
     # Private methods.
     # ///////////////////////////////////////////////////////////////////////////
 
+    def _get_end_ts_for_symbol_from_parquet_metadata(
+        self, full_symbol: ivcu.FullSymbol
+    ) -> Optional[pd.Timestamp]:
+        """
+        Return the latest timestamp for a given `full_symbol` from the
+        statistics of the Parquet files.
+
+        The timestamp is the raw one stored in the data, so derived classes
+        can use it to implement `get_end_ts_for_symbol_from_metadata()` only
+        after applying the timing semantic of their data.
+
+        :return: the latest timestamp in UTC or `None` if it is not available
+            from the metadata
+        """
+        full_symbol_col_name = self._get_full_symbol_col_name(None)
+        root_dir_symbol_filter_dict = self._get_root_dirs_symbol_filters(
+            [full_symbol], full_symbol_col_name
+        )
+        end_ts = None
+        for root_dir, symbol_filter in root_dir_symbol_filter_dict.items():
+            root_dir_end_ts = hparque.get_max_index_from_metadata(
+                root_dir, filters=[symbol_filter], aws_profile=self._aws_profile
+            )
+            if root_dir_end_ts is None:
+                return None
+            if end_ts is None or root_dir_end_ts > end_ts:
+                end_ts = root_dir_end_ts
+        return end_ts
+
     # TODO(Grisha): factor out the column names in the child classes, see `CCXT`.
     @staticmethod
     def _get_columns_for_query(
@@ -147,6 +249,11 @@ class HistoricalPqByTileClient(
     ) -> pd.DataFrame:
         """
         See description in the parent class.
+
+        The data of each root dir is read with a separate query. When
+        `num_workers > 1` is passed through `read_data()`, the queries are
+        also split by month (for the "by_year_month" partition mode) and
+        executed concurrently by `num_workers` threads.
         """
         hdbg.dassert_container_type(full_symbols, list, str)
         # Implement logging and add it to kwargs.
@@ -155,6 +262,11 @@ class HistoricalPqByTileClient(
                 "full_symbols start_ts end_ts columns full_symbol_col_name"
             )
         )
+        # The number of threads reading the Parquet data is not a param of
+        # `hparque.from_parquet()`.
+        num_workers = kwargs.pop("num_workers", 1)
+        hdbg.dassert_isinstance(num_workers, int)
+        hdbg.dassert_lte(1, num_workers)
         kwargs["log_level"] = logging.INFO
         # Get columns for query and add them to kwargs.
         kwargs["columns"] = self._get_columns_for_query(
@@ -162,23 +274,72 @@ class HistoricalPqByTileClient(
         )
         # Add AWS profile to kwargs.
         kwargs["aws_profile"] = self._aws_profile
+        # The filters are built for each read from the timestamp interval and
+        # the symbols, so they override the passed ones.
+        kwargs.pop("filters", None)
         # Build root dirs to the data and Parquet filtering condition.
         root_dir_symbol_filter_dict = self._get_root_dirs_symbol_filters(
             full_symbols, full_symbol_col_name
         )
-        #
-        res_df_list = []
-        for root_dir, symbol_filter in root_dir_symbol_filter_dict.items():
-            # Build list of filters for a query and add them to kwargs.
+        # Split the reads by root dir and, when reading concurrently, by
+        # year / month partition.
+        if (
+            num_workers > 1
+            and self._partition_mode == "by_year_month"
+            and start_ts is not None
+            and end_ts is not None
+        ):
+            intervals = _split_interval(start_ts, end_ts, "MS")
+        else:
+            intervals = [(start_ts, end_ts)]
+        tasks = [
+            (root_dir, symbol_filter, interval_start_ts, interval_end_ts)
+            for root_dir, symbol_filter in root_dir_symbol_filter_dict.items()
+            for interval_start_ts, interval_end_ts in intervals
+        ]
+
+        def _read_task(
+            task: Tuple[
+                str,
+                hparque.ParquetFilter,
+                Optional[pd.Timestamp],
+                Optional[pd.Timestamp],
+            ]
+        ) -> pd.DataFrame:
+            root_dir, symbol_filter, task_start_ts, task_end_ts = task
+            # Build list of filters for a query.
             filters = hparque.get_parquet_filters_from_timestamp_interval(
                 self._partition_mode,
-                start_ts,
-                end_ts,
+                task_start_ts,
+                task_end_ts,
                 additional_filters=[symbol_filter],
             )
-            kwargs["filters"] = filters
             # Read Parquet data from a root dir.
-            root_dir_df = hparque.from_parquet(root_dir, **kwargs)
+            df = hparque.from_parquet(root_dir, filters=filters, **kwargs)
+            return df
+
+        if num_workers == 1 or len(tasks) == 1:
+            task_dfs = [_read_task(task) for task in tasks]
+        else:
+            _LOG.debug(
+                "Reading %s tiles with %s threads", len(tasks), num_workers
+            )
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=num_workers
+            ) as executor:
+                task_dfs = list(executor.map(_read_task, tasks))
+        #
+        res_df_list = []
+        for root_dir in root_dir_symbol_filter_dict.keys():
+            root_dir_dfs = [
+                df for task, df in zip(tasks, task_dfs) if task[0] == root_dir
+            ]
+            if len(root_dir_dfs) == 1:
+                root_dir_df = root_dir_dfs[0]
+            else:
+                # Skip the empty partitions, unless all of them are empty.
+                non_empty_dfs = [df for df in root_dir_dfs if not df.empty]
+                root_dir_df = pd.concat(non_empty_dfs or root_dir_dfs[:1])
             # TODO(Grisha): "Handle missing tiles" CmTask #1775.
             # hdbg.dassert_lte(
             #     1,
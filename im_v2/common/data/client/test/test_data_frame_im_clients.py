@@ -329,3 +329,102 @@ class TestDataFrameImClient1(imvcdcimctc.ImClientTestCase):
             expected_first_elements,
             expected_last_elements,
         )
+
+
+# #############################################################################
+# TestDataFrameImClient2
+# #############################################################################
+
+
+class TestDataFrameImClient2(imvcdcimctc.ImClientTestCase):
+    """
+    Test that normalizing the data of all the symbols at once returns the same
+    data as normalizing the data of each symbol.
+    """
+
+    @staticmethod
+    def get_data() -> pd.DataFrame:
+        """
+        Return data with gaps, duplicated rows and knowledge timestamps.
+        """
+        universe = ["binance::ADA_USDT", "binance::BTC_USDT"]
+        df = cofinanc.get_MarketData_df6(universe)
+        # Add gaps that are different for each symbol.
+        df = pd.concat([df.iloc[:3], df.iloc[6:13], df.iloc[16:]])
+        df["knowledge_timestamp"] = df.index + pd.Timedelta(minutes=1)
+        # Add an updated version of some rows with a later knowledge timestamp.
+        df_updated = df.iloc[4:8].copy()
+        df_updated["close"] += 1.0
+        df_updated["knowledge_timestamp"] += pd.Timedelta(minutes=5)
+        # Add exactly duplicated rows.
+        df = pd.concat([df, df_updated, df.iloc[10:12]])
+        return df
+
+    def helper(
+        self,
+        df: pd.DataFrame,
+        resample_1min: bool,
+        start_ts: pd.Timestamp,
+        end_ts: pd.Timestamp,
+    ) -> None:
+        full_symbols = ["binance::ADA_USDT", "binance::BTC_USDT"]
+        im_client = imvcdcdfimc.DataFrameImClient(
+            df, full_symbols, resample_1min=resample_1min
+        )
+        columns = None
+        filter_data_mode = "assert"
+        actual = im_client.read_data(
+            full_symbols, start_ts, end_ts, columns, filter_data_mode
+        )
+        # Normalize the data of each symbol.
+        full_symbol_col_name = "full_symbol"
+        df = df.copy()
+        df.index.name = "timestamp"
+        expected = im_client._apply_im_normalizations_by_full_symbol(
+            df, full_symbol_col_name, start_ts, end_ts
+        )
+        expected = (
+            expected.reset_index()
+            .sort_values(by=["timestamp", full_symbol_col_name])
+            .set_index("timestamp")
+        )
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+
+    def test_read_data1(self) -> None:
+        df = self.get_data()
+        resample_1min = False
+        start_ts = pd.Timestamp("2000-01-01 14:33:00+00:00")
+        end_ts = pd.Timestamp("2000-01-01 14:50:00+00:00")
+        self.helper(df, resample_1min, start_ts, end_ts)
+
+    def test_read_data2(self) -> None:
+        """
+        Test resampling the data with gaps.
+        """
+        df = self.get_data()
+        resample_1min = True
+        start_ts = pd.Timestamp("2000-01-01 14:33:00+00:00")
+        end_ts = pd.Timestamp("2000-01-01 14:50:00+00:00")
+        self.helper(df, resample_1min, start_ts, end_ts)
+
+    def test_read_data3(self) -> None:
+        """
+        Test the data with missing knowledge timestamps.
+        """
+        df = self.get_data()
+        # Set the knowledge timestamp of a row with an update, of an updated
+        # row, and of a row without updates to `NaT`.
+        knowledge_timestamp_idx = df.columns.get_loc("knowledge_timestamp")
+        df.iloc[[5, -3, 9], knowledge_timestamp_idx] = pd.NaT
+        resample_1min = False
+        start_ts = pd.Timestamp("2000-01-01 14:33:00+00:00")
+        end_ts = pd.Timestamp("2000-01-01 14:50:00+00:00")
+        # Check that the data is normalized at once.
+        full_symbol_col_name = "full_symbol"
+        normalized_df = (
+            imvcdcdfimc.DataFrameImClient._apply_vectorized_im_normalizations(
+                df, full_symbol_col_name, resample_1min, start_ts, end_ts
+            )
+        )
+        self.assertIsNotNone(normalized_df)
+        self.helper(df, resample_1min, start_ts, end_ts)
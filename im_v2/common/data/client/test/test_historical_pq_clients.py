@@ -329,6 +329,21 @@ class TestHistoricalPqByTileClient1(icdc.ImClientTestCase):
             im_client, full_symbol, expected_end_timestamp
         )
 
+    @pytest.mark.requires_ck_infra
+    def test_get_end_ts_for_symbol_from_metadata1(self) -> None:
+        """
+        Check that the metadata is not used by a client that doesn't define
+        the timing semantic of its data.
+        """
+        # Generate Parquet test data and initialize client.
+        full_symbol = "binance::BTC_USDT"
+        resample_1min = True
+        im_client = imvcdchpce.get_MockHistoricalByTileClient_example1(
+            self, [full_symbol], resample_1min
+        )
+        actual = im_client.get_end_ts_for_symbol_from_metadata(full_symbol)
+        self.assertIsNone(actual)
+
     # ////////////////////////////////////////////////////////////////////////
 
     def test_get_universe1(self) -> None:
@@ -831,3 +846,94 @@ class TestHistoricalPqByTileClient3(icdc.ImClientTestCase):
         self.assert_equal(str(actual_df.shape[0]), str(expected_length))
         self.assert_equal(str(actual_df.index[0]), str(start_ts))
         self.assert_equal(str(actual_df.index[-1]), str(end_ts))
+
+
+# #############################################################################
+# TestHistoricalPqByTileClient4
+# #############################################################################
+
+
+@pytest.mark.slow
+class TestHistoricalPqByTileClient4(icdc.ImClientTestCase):
+    """
+    Test reading the Parquet data concurrently and by tile.
+    """
+
+    def test_num_workers1(self) -> None:
+        """
+        Reading with multiple threads returns the same data as reading with one
+        thread.
+        """
+        full_symbols = ["binance::BTC_USDT", "kucoin::FIL_USDT"]
+        im_client = imvcdchpce.get_MockHistoricalByTileClient_example2(
+            self, full_symbols
+        )
+        start_ts = pd.Timestamp("2021-08-15 10:00:00+00:00")
+        end_ts = pd.Timestamp("2021-11-03 07:00:00+00:00")
+        columns = None
+        filter_data_mode = "assert"
+        expected = im_client.read_data(
+            full_symbols, start_ts, end_ts, columns, filter_data_mode
+        )
+        actual = im_client.read_data(
+            full_symbols,
+            start_ts,
+            end_ts,
+            columns,
+            filter_data_mode,
+            num_workers=3,
+        )
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+        self.assertEqual(str(actual.index[0]), str(start_ts))
+        self.assertEqual(str(actual.index[-1]), str(end_ts))
+
+    def test_num_workers2(self) -> None:
+        """
+        Passed Parquet filters are overridden by the ones built by the client.
+        """
+        full_symbols = ["binance::BTC_USDT", "kucoin::FIL_USDT"]
+        im_client = imvcdchpce.get_MockHistoricalByTileClient_example2(
+            self, full_symbols
+        )
+        start_ts = pd.Timestamp("2021-08-15 10:00:00+00:00")
+        end_ts = pd.Timestamp("2021-11-03 07:00:00+00:00")
+        columns = None
+        filter_data_mode = "assert"
+        expected = im_client.read_data(
+            full_symbols, start_ts, end_ts, columns, filter_data_mode
+        )
+        actual = im_client.read_data(
+            full_symbols,
+            start_ts,
+            end_ts,
+            columns,
+            filter_data_mode,
+            num_workers=3,
+            filters=[("year", "=", 2021)],
+        )
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+
+    def test_read_data_by_tile1(self) -> None:
+        """
+        The concatenated tiles are equal to the data for the whole interval.
+        """
+        full_symbols = ["binance::BTC_USDT", "kucoin::FIL_USDT"]
+        im_client = imvcdchpce.get_MockHistoricalByTileClient_example2(
+            self, full_symbols
+        )
+        start_ts = pd.Timestamp("2021-08-15 10:00:00+00:00")
+        end_ts = pd.Timestamp("2021-11-03 07:00:00+00:00")
+        columns = None
+        filter_data_mode = "assert"
+        expected = im_client.read_data(
+            full_symbols, start_ts, end_ts, columns, filter_data_mode
+        )
+        tiles = list(
+            im_client.read_data_by_tile(
+                full_symbols, start_ts, end_ts, columns, filter_data_mode
+            )
+        )
+        # There is one tile for each of August, September, October, November.
+        self.assertEqual(len(tiles), 4)
+        actual = pd.concat(tiles)
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True)
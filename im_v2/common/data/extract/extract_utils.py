@@ -12,7 +12,6 @@ import logging
 import os
 import re
 import time
-from copy import deepcopy
 from datetime import datetime, timedelta
 from typing import Any, Dict, Iterator, List, Optional, Union
 
@@ -30,6 +29,7 @@ import im_v2.ccxt.data.extract.extractor as imvcdexex
 import im_v2.common.data.extract.extractor as ivcdexex
 import im_v2.common.data.transform.transform_utils as imvcdttrut
 import im_v2.common.db.db_utils as imvcddbut
+import im_v2.common.db.db_writer as imvcddbwr
 import im_v2.common.universe as ivcu
 from helpers.hthreading import timeout
 
@@ -41,11 +41,14 @@ SUPPORTED_DOWNLOAD_METHODS = ["rest", "websocket"]
 #  - sleep_between_iter_in_ms: time to sleep between iterations in miliseconds.
 #  - max_buffer_size: specifies number of websocket
 #    messages to cache before attempting DB insert.
+#  - max_buffer_delay_in_ms: maximum time a websocket message is cached before
+#    attempting DB insert.
 WEBSOCKET_CONFIG = {
     "ohlcv": {
         # Buffer size is 0 for OHLCV because we want to insert after round of
         # receival from websockets.
         "max_buffer_size": 0,
+        "max_buffer_delay_in_ms": 1000,
         "sleep_between_iter_in_ms": 60000,
         # How many consecutive iterations can happen for a given symbol
         # without receiving new data before resubscribing to the websocket feed.
@@ -53,21 +56,26 @@ WEBSOCKET_CONFIG = {
     },
     "bid_ask": {
         "max_buffer_size": 250,
+        "max_buffer_delay_in_ms": 1000,
         "sleep_between_iter_in_ms": 200,
         "resubscription_threshold_in_iter": 3,
     },
     "trades": {
         "max_buffer_size": 0,
+        "max_buffer_delay_in_ms": 200,
         "sleep_between_iter_in_ms": 200,
         "resubscription_threshold_in_iter": 3,
     },
     # This data_type is used when to build OHLCV data from trades.
     "ohlcv_from_trades": {
         "max_buffer_size": 0,
+        "max_buffer_delay_in_ms": 200,
         "sleep_between_iter_in_ms": 200,
         "resubscription_threshold_in_iter": 3,
     },
 }
+# Maximum number of websocket messages waiting to be inserted in the DB.
+WEBSOCKET_MAX_QUEUE_SIZE = 10000
 
 
 def _add_common_download_args(
@@ -502,7 +510,8 @@ def _is_fresh_data_point(
         # it with all previous values. Keep only those values which are not already
         # added in db (check using timestamp dict) and they have download timestamp
         # greater than 1 minute (60000ms) than the timestamp.
-        new_data_point = deepcopy(data_point)
+        # The OHLCV list is replaced, so a shallow copy is enough.
+        new_data_point = dict(data_point)
         new_data_point["ohlcv"] = []
         end_download_timestamp = pd.Timestamp(
             data_point["end_download_timestamp"]
@@ -561,7 +570,7 @@ def _is_fresh_data_point(
         #                 "trades_endtimestamp" : 1695120659800,
         #                 "currency_pair" : "BTC_USD",
         #               }
-        new_data_point = deepcopy(data_point)
+        new_data_point = dict(data_point)
         new_data_point["ohlcv"] = []
         for ohlcv_data in data_point["ohlcv"]:
             timestamp = ohlcv_data[0]
@@ -680,12 +689,74 @@ async def _download_websocket_realtime_for_one_exchange_periodically(
     )
     _LOG.info("Subscribed to %s websocket data successfully", exchange_id)
     db_connection = imvcddbut.DbConnectionManager.get_connection(args["db_stage"])
-    db_table = args["db_table"]
+
+    def _save_data_points(db_table: str, data_points: List[Dict]) -> None:
+        df = imvcdttrut.transform_raw_websocket_data(
+            data_points,
+            data_type,
+            exchange_id,
+            max_num_levels=args.get("bid_ask_depth"),
+        )
+        # Store the names of currency pairs that were successfully downloaded
+        # to log missing symbols every iteration.
+        downloaded_currency_pairs = df["currency_pair"].unique().tolist()
+        hdbg.dassert_set_eq(
+            currency_pairs, downloaded_currency_pairs, only_warning=True
+        )
+        imvcddbut.save_data_to_db(
+            df, data_type, db_connection, db_table, str(tz)
+        )
+
     # In order not to bombard the database with many small insert operations
-    # a buffer is created, its size is determined by the config specific to each
-    # data type.
-    data_buffer = []
-    data_buffer_to_resample: List[pd.DataFrame] = []
+    # the data points are saved in batches, whose size and delay are determined
+    # by the config specific to each data type. The data points are saved by a
+    # background writer, so that a slow insert doesn't delay the next download.
+    db_writer = imvcddbwr.BatchingDbWriter(
+        _save_data_points,
+        max_queue_size=WEBSOCKET_MAX_QUEUE_SIZE,
+        max_batch_size=WEBSOCKET_CONFIG[data_type]["max_buffer_size"] or None,
+        max_batch_delay_in_secs=(
+            WEBSOCKET_CONFIG[data_type]["max_buffer_delay_in_ms"] / 1000
+        ),
+    )
+    try:
+        await _download_websocket_data_points_periodically(
+            args,
+            exchange,
+            currency_pairs,
+            db_writer,
+        )
+    finally:
+        # Save the data points that are still buffered and raise if some of
+        # them couldn't be saved.
+        try:
+            db_writer.stop()
+        finally:
+            _LOG.info("DB writer metrics: %s", db_writer.get_metrics())
+    _LOG.info("Websocket download finished at %s", pd.Timestamp.now(tz))
+
+
+async def _download_websocket_data_points_periodically(
+    args: Dict[str, Any],
+    exchange: ivcdexex.Extractor,
+    currency_pairs: List[str],
+    db_writer: imvcddbwr.BatchingDbWriter,
+) -> None:
+    """
+    Download the websocket data points periodically and enqueue the fresh ones
+    to be saved in the DB.
+
+    :param args: arguments passed on script run
+    :param exchange: name of exchange used in script run
+    :param currency_pairs: currency pairs to download
+    :param db_writer: writer saving the data points to the DB
+    """
+    data_type = args["data_type"]
+    start_time = pd.Timestamp(args["start_time"])
+    stop_time = pd.Timestamp(args["stop_time"])
+    tz = start_time.tz
+    exchange_id = args["exchange_id"]
+    db_table = args["db_table"]
     # Sync to the specified start_time.
     start_delay = max(0, ((start_time - datetime.now(tz)).total_seconds()))
     _LOG.info("Syncing with the start time, waiting for %s seconds", start_delay)
@@ -747,42 +818,7 @@ async def _download_websocket_realtime_for_one_exchange_periodically(
                 start_time_unix_epoch,
             )
             if is_fresh:
-                data_buffer.append(data_point)
-        download_time = (
-            pd.Timestamp.now(tz) - iter_start_time
-        ).total_seconds() * 1000
-        # If the buffer is full or this is the last iteration, process and save buffered data.
-        is_buffer_full = (
-            len(data_buffer) >= WEBSOCKET_CONFIG[data_type]["max_buffer_size"]
-        )
-        is_last_iteration = pd.Timestamp.now(tz) >= stop_time
-        is_non_empty_buffer = len(data_buffer) > 0
-        # Save the data if the download was faster.
-        is_download_fast = (
-            download_time
-            < WEBSOCKET_CONFIG[data_type]["sleep_between_iter_in_ms"] / 2
-            and args["db_saving_mode"] == "on_sufficient_time"
-        )
-        if (
-            is_buffer_full or is_last_iteration or is_download_fast
-        ) and is_non_empty_buffer:
-            df = imvcdttrut.transform_raw_websocket_data(
-                data_buffer,
-                data_type,
-                exchange_id,
-                max_num_levels=args.get("bid_ask_depth"),
-            )
-            # Store the names of currency pairs that were successfully downloaded
-            # to log missing symbols every iteration.
-            downloaded_currency_pairs = df["currency_pair"].unique().tolist()
-            hdbg.dassert_set_eq(
-                currency_pairs, downloaded_currency_pairs, only_warning=True
-            )
-            imvcddbut.save_data_to_db(
-                df, data_type, db_connection, db_table, str(tz)
-            )
-            # Empty buffer after persisting the data.
-            data_buffer = []
+                db_writer.put(db_table, data_point)
         # Determine actual sleep time needed based on the difference
         # between value set in config and actual time it took to complete
         # an iteration, this provides an "time align" mechanism.
@@ -793,13 +829,16 @@ async def _download_websocket_realtime_for_one_exchange_periodically(
             0,
             WEBSOCKET_CONFIG[data_type]["sleep_between_iter_in_ms"] - iter_length,
         )
+        db_writer_metrics = db_writer.get_metrics()
         _LOG.info(
-            "Iteration took %i ms, waiting between iterations for %i ms",
+            "Iteration took %i ms, waiting between iterations for %i ms, "
+            "DB writer queue depth=%s dropped=%s",
             iter_length,
             actual_sleep_time,
+            db_writer_metrics["queue_depth"],
+            db_writer_metrics["num_dropped_items"],
         )
         await exchange.sleep(actual_sleep_time)
-    _LOG.info("Websocket download finished at %s", pd.Timestamp.now(tz))
 
 
 def _download_rest_realtime_for_one_exchange_periodically(
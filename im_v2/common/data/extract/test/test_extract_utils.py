@@ -1,6 +1,7 @@
 import argparse
 import asyncio
 import os
+import time
 import unittest.mock as umock
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
@@ -8,6 +9,7 @@ from typing import Any, Dict, List, Optional
 import pandas as pd
 import pytest
 
+import helpers.hdatetime as hdateti
 import helpers.henv as henv
 import helpers.hmoto as hmoto
 import helpers.hpandas as hpandas
@@ -20,6 +22,7 @@ import im_v2.ccxt.db.utils as imvccdbut
 import im_v2.common.data.extract.extract_utils as imvcdeexut
 import im_v2.common.data.transform.resample_daily_bid_ask_data as imvcdtrdbad
 import im_v2.common.db.db_utils as imvcddbut
+import im_v2.common.db.db_writer as imvcddbwr
 import im_v2.crypto_chassis.data.extract.extractor as imvccdexex
 
 
@@ -819,6 +822,70 @@ class TestDownloadResampleBidAskData(hmoto.S3Mock_TestCase):
         self.check_resampler()
 
 
+class _FakeWebsocketExchange:
+    """
+    Fake exchange feed returning a new bid/ask data point at every call.
+    """
+
+    def __init__(self) -> None:
+        self.num_downloads = 0
+
+    async def sleep(self, time_in_ms: float) -> None:
+        await asyncio.sleep(time_in_ms / 1000)
+
+    def download_websocket_data(
+        self, data_type: str, exchange_id: str, currency_pair: str
+    ) -> Dict[str, Any]:
+        _ = data_type, exchange_id
+        self.num_downloads += 1
+        data_point = {
+            "timestamp": 1695120600000 + self.num_downloads,
+            "bids": [[1.0, 2.0]],
+            "asks": [[1.1, 3.0]],
+            "currency_pair": currency_pair,
+        }
+        return data_point
+
+
+class TestDownloadWebsocketDataPointsPeriodically1(hunitest.TestCase):
+    def test_slow_db1(self) -> None:
+        """
+        Check that a slow DB doesn't delay the download.
+        """
+        saved_data_points: List[Dict[str, Any]] = []
+
+        def _save(db_table: str, data_points: List[Dict[str, Any]]) -> None:
+            _ = db_table
+            # Each insert takes longer than an iteration.
+            time.sleep(0.5)
+            saved_data_points.extend(data_points)
+
+        db_writer = imvcddbwr.BatchingDbWriter(_save, max_batch_size=2)
+        exchange = _FakeWebsocketExchange()
+        start_time = pd.Timestamp.now(tz="UTC")
+        args = {
+            "data_type": "bid_ask",
+            "vendor": "binance",
+            "exchange_id": "binance",
+            "db_table": "ccxt_bid_ask_futures_raw",
+            "start_time": str(start_time),
+            "stop_time": str(start_time + pd.Timedelta(seconds=1)),
+        }
+        coroutine = imvcdeexut._download_websocket_data_points_periodically(
+            args, exchange, ["BTC_USDT", "ETH_USDT"], db_writer
+        )
+        asyncio.run(coroutine)
+        # With an iteration every 200ms, the download runs ~5 iterations, while
+        # saving in the loop would allow only 2.
+        self.assertLessEqual(8, exchange.num_downloads)
+        db_writer.stop()
+        # All the data points are saved, in order.
+        timestamps = [data_point["timestamp"] for data_point in saved_data_points]
+        num_downloads = exchange.num_downloads
+        expected = [1695120600000 + i for i in range(1, num_downloads + 1)]
+        self.assertListEqual(timestamps, expected)
+
+
 class TestSplitUniverse(hunitest.TestCase):
     def helper(self, group_size: int, universe_part: int) -> List:
         """
@@ -1952,6 +2019,24 @@ class TestDownloadRealtimeForOneExchangePeriodically1(
             """
         self._test_websocket_data_download(next_data, expected)
 
+    @pytest.mark.slow("~10 seconds.")
+    def test_download_websocket_ohlcv_futures5(
+        self,
+    ) -> None:
+        """
+        Test that the download fails when the data can't be saved to the DB.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("DROP TABLE IF EXISTS ccxt_ohlcv_futures_missing;")
+        args = self._get_argument()
+        args["db_table"] = "ccxt_ohlcv_futures_missing"
+        data = self._get_ohlcvs_periodical_data()
+        with self.assertRaises(AssertionError) as cm:
+            self._download_websocket_data(args, data)
+        self.assertIn(
+            "Table 'ccxt_ohlcv_futures_missing' doesn't exist", str(cm.exception)
+        )
+
     @staticmethod
     def _get_argument() -> Dict[str, str]:
         """
@@ -2014,8 +2099,6 @@ class TestDownloadRealtimeForOneExchangePeriodically1(
         :param expected: Expected output from the method
         :return: downloaded data
         """
-        # Data we get from exchange in the first iteration
-        mocked_data = self._get_ohlcvs_periodical_data()
         # Create the database.
         cursor = self.connection.cursor()
         # Remove table if already exists.
@@ -2025,6 +2108,25 @@ class TestDownloadRealtimeForOneExchangePeriodically1(
         cursor.execute(create_db_query)
         # Prepare inputs.
         args = self._get_argument()
+        self._download_websocket_data(args, data)
+        # Get downloaded data.
+        get_data_query = f"SELECT * FROM ccxt_ohlcv_futures;"
+        data = hsql.execute_query_to_df(self.connection, get_data_query)
+        # Check downloaded data.
+        actual = hpandas.df_to_str(data, num_rows=None)
+        self.assert_equal(actual, expected, fuzzy_match=True)
+
+    def _download_websocket_data(
+        self, args: Dict[str, Any], data: Dict[str, Any]
+    ) -> None:
+        """
+        Run the websocket download with mocked data from the exchange.
+
+        :param args: arguments passed on script run
+        :param data: mocked data from exchange in second iteration
+        """
+        # Data we get from exchange in the first iteration
+        mocked_data = self._get_ohlcvs_periodical_data()
         with umock.patch.object(imvcdexex, "CcxtExtractor") as mock_extractor:
             # Tests use special connection params, so we mock the module function.
             mock_instance = umock.AsyncMock()
@@ -2051,9 +2153,3 @@ class TestDownloadRealtimeForOneExchangePeriodically1(
                     args, extractor
                 )
                 asyncio.run(coroutine)
-        # Get downloaded data.
-        get_data_query = f"SELECT * FROM ccxt_ohlcv_futures;"
-        data = hsql.execute_query_to_df(self.connection, get_data_query)
-        # Check downloaded data.
-        actual = hpandas.df_to_str(data, num_rows=None)
-        self.assert_equal(actual, expected, fuzzy_match=True)
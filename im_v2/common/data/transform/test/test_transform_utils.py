@@ -1,6 +1,7 @@
 import os
 import unittest.mock as umock
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -776,3 +777,128 @@ class TestResampleBidAskData2(hunitest.TestCase):
         scratch_dir = self.get_scratch_space()
         aws_profile = "ck"
         hs3.copy_data_from_s3_to_local_dir(s3_input_dir, scratch_dir, aws_profile)
+
+
+class TestStreamingBidAskResampler1(hunitest.TestCase):
+    @staticmethod
+    def get_data() -> pd.DataFrame:
+        """
+        Build raw bid/ask data for 2 symbols and 2 levels with gaps.
+        """
+        rng = np.random.default_rng(seed=0)
+        dfs = []
+        for currency_pair in ["BTC_USDT", "ETH_USDT"]:
+            for level in [1, 2]:
+                num_rows = 2000
+                # Sample mostly every 200ms with a few gaps longer than the
+                # forward fill limit.
+                steps_in_ms = rng.choice(
+                    [100, 200, 300, 70000, 130000],
+                    size=num_rows,
+                    p=[0.2, 0.6, 0.18, 0.01, 0.01],
+                )
+                index = pd.Timestamp(
+                    "2023-05-05 14:00:00.130", tz="UTC"
+                ) + pd.to_timedelta(np.cumsum(steps_in_ms), unit="ms")
+                bid_price = 100 + 0.1 * np.round(
+                    rng.normal(size=num_rows).cumsum()
+                )
+                df = pd.DataFrame(
+                    {
+                        "currency_pair": currency_pair,
+                        "level": level,
+                        "bid_price": bid_price,
+                        "bid_size": rng.integers(1, 100, num_rows).astype(float),
+                        "ask_price": bid_price
+                        + 0.1 * rng.integers(1, 3, num_rows),
+                        "ask_size": rng.integers(1, 100, num_rows).astype(float),
+                    },
+                    index=pd.Index(index, name="timestamp"),
+                )
+                dfs.append(df)
+        data = pd.concat(dfs).sort_index(kind="stable")
+        return data
+
+    def test_process_chunk1(self) -> None:
+        """
+        Verify that the bars are the same as with the non-streaming resampling.
+        """
+        data = self.get_data()
+        resampler = imvcdttrut.StreamingBidAskResampler()
+        chunks = [data.iloc[i : i + 777] for i in range(0, len(data), 777)]
+        dfs = [resampler.process_chunk(chunk) for chunk in chunks]
+        dfs.append(resampler.flush())
+        actual_df = pd.concat(dfs)
+        for (currency_pair, level), group in data.groupby(
+            ["currency_pair", "level"]
+        ):
+            expected = imvcdttrut.resample_bid_ask_data_to_1min(
+                group[imvcdttrut.BID_ASK_COLS].copy()
+            )
+            expected.index.freq = None
+            mask = (actual_df["currency_pair"] == currency_pair) & (
+                actual_df["level"] == level
+            )
+            actual = actual_df[mask].drop(columns=["currency_pair", "level"])
+            pd.testing.assert_frame_equal(
+                actual, expected, check_exact=False, check_names=False
+            )
+
+    def test_process_chunk2(self) -> None:
+        """
+        Verify that only the complete bars are returned for each chunk.
+        """
+        index = pd.to_datetime(
+            [
+                "2023-05-05 14:00:59.900",
+                "2023-05-05 14:01:00.100",
+                "2023-05-05 14:01:00.100",
+                "2023-05-05 14:02:30.000",
+            ],
+            utc=True,
+        )
+        data = pd.DataFrame(
+            {
+                "currency_pair": ["BTC_USDT", "BTC_USDT", "ETH_USDT", "BTC_USDT"],
+                "level": 1,
+                "bid_price": [10.0, 11.0, 1.0, 12.0],
+                "bid_size": 1.0,
+                "ask_price": [10.2, 11.2, 1.2, 12.2],
+                "ask_size": 1.0,
+            },
+            index=index,
+        )
+        resampler = imvcdttrut.StreamingBidAskResampler()
+        cols = ["currency_pair", "level", "bid_price.close", "bid_price.mean"]
+        # The bar ending at 14:01 is complete after receiving the snapshot at
+        # 14:01:00.100 for BTC_USDT.
+        actual = resampler.process_chunk(data.iloc[:3])[cols]
+        expected = r"""
+                                  currency_pair  level  bid_price.close  bid_price.mean
+        timestamp
+        2023-05-05 14:01:00+00:00      BTC_USDT      1             10.0            10.0
+        """
+        self.assert_equal(
+            hpandas.df_to_str(actual, num_rows=None), expected, fuzzy_match=True
+        )
+        # The snapshot at 14:01:00.100 is forward filled for 601 grid points,
+        # i.e., up to 14:02:00.200, and the bar ending at 14:02 is complete.
+        actual = resampler.process_chunk(data.iloc[3:])[cols]
+        expected = r"""
+                                  currency_pair  level  bid_price.close  bid_price.mean
+        timestamp
+        2023-05-05 14:02:00+00:00      BTC_USDT      1             11.0            11.0
+        """
+        self.assert_equal(
+            hpandas.df_to_str(actual, num_rows=None), expected, fuzzy_match=True
+        )
+        actual = resampler.flush()[cols]
+        expected = r"""
+                                  currency_pair  level  bid_price.close  bid_price.mean
+        timestamp
+        2023-05-05 14:02:00+00:00      ETH_USDT      1              1.0        1.000000
+        2023-05-05 14:03:00+00:00      BTC_USDT      1             12.0       11.333333
+        """
+        self.assert_equal(
+            hpandas.df_to_str(actual, num_rows=None), expected, fuzzy_match=True
+        )
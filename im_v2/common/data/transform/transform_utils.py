@@ -7,7 +7,7 @@ import im_v2.common.data.transform.transform_utils as imvcdttrut
 """
 
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
@@ -600,6 +600,481 @@ def resample_multisymbol_multilevel_bid_ask_data_to_1min(
     return data_resampled
 
 
+# #############################################################################
+# StreamingBidAskResampler
+# #############################################################################
+
+
+# Grid point used as "missing", far enough from any real grid point so that the
+# differences between grid points don't overflow.
+_NO_GRID_POINT = np.iinfo(np.int64).min // 4
+
+
+class StreamingBidAskResampler:
+    """
+    Resample bid/ask data of multiple symbols and levels to 1 minute bars chunk
+    by chunk.
+
+    The bars are the same as the ones computed by
+    `resample_bid_ask_data_to_1min()` for each symbol and level, but the raw
+    data doesn't need to be in memory at once and all the symbols and levels
+    are processed together with vectorized operations:
+    - the raw snapshots are sampled on a grid with step
+      `time_resolution_in_ms / 2` and forward filled on the grid for at most
+      601 steps; instead of materializing the grid, each snapshot is
+      represented as a run of constant values on the grid, which contributes
+      to the aggregations of the bars it overlaps in closed form
+    - a run ends only when the next snapshot for the same key is received, so
+      only the last snapshot of each key and its current bar are kept between
+      chunks, while the bars that can't change anymore are returned
+
+    The expected input format is the long format of the raw data, e.g.,
+    ```
+                                     currency_pair  level  bid_price  bid_size  ask_price  ask_size
+    timestamp
+    2022-11-16 00:00:01.200000+00:00      BTC_USDT      1     13.50      5450      13.25      5200
+    2022-11-16 00:00:01.200000+00:00      BTC_USDT      2     13.40      1200      13.30      2300
+    ```
+    """
+
+    # Same forward fill limit as in `resample_bid_ask_data_to_1min()`.
+    _FFILL_LIMIT = 601
+    _VALUE_COLS = BID_ASK_COLS + [
+        "bid_ask_midpoint",
+        "half_spread",
+        "log_size_imbalance",
+    ]
+    _VAR_COLS = [
+        "bid_ask_midpoint_var",
+        "bid_ask_midpoint_autocovar",
+        "log_size_imbalance_var",
+        "log_size_imbalance_autocovar",
+    ]
+
+    def __init__(
+        self,
+        key_cols: Optional[List[str]] = None,
+        *,
+        time_resolution_in_ms: int = 200,
+    ):
+        """
+        Constructor.
+
+        :param key_cols: columns identifying the time series to resample
+            separately; if `None`, use `currency_pair` and `level`
+        :param time_resolution_in_ms: resolution of the raw data, like in
+            `resample_bid_ask_data_to_1min()`
+        """
+        if key_cols is None:
+            key_cols = ["currency_pair", "level"]
+        hdbg.dassert_lte(1, len(key_cols))
+        hdbg.dassert_no_duplicates(key_cols)
+        self._key_cols = key_cols
+        hdbg.dassert_lte(2, time_resolution_in_ms)
+        self._grid_step_in_ns = int(time_resolution_in_ms / 2) * 1_000_000
+        bar_in_ns = pd.Timedelta(minutes=1).value
+        hdbg.dassert_eq(bar_in_ns % self._grid_step_in_ns, 0)
+        self._bar_in_ns = bar_in_ns
+        self._num_grid_points_per_bar = bar_in_ns // self._grid_step_in_ns
+        self._var_suffix = str(int(time_resolution_in_ms / 2)) + "ms"
+        # Keys seen so far, in order of first appearance. The state of each key
+        # is stored in arrays indexed by the position of the key.
+        self._keys: Optional[pd.MultiIndex] = None
+        self._tz = None
+        self._reset_state(0)
+
+    def process_chunk(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Process a chunk of raw snapshots and return the bars that are complete.
+
+        The snapshots of each key must be received in order of time across the
+        chunks, while the snapshots within a chunk don't need to be sorted.
+
+        :param data: raw snapshots indexed by point-in-time
+        :return: bars indexed by their end timestamp, with the key columns and
+            the same resampled columns as `resample_bid_ask_data_to_1min()`,
+            sorted by timestamp
+        """
+        hdbg.dassert_isinstance(data, pd.DataFrame)
+        hdbg.dassert_isinstance(data.index, pd.DatetimeIndex)
+        hdbg.dassert_is_subset(self._key_cols + BID_ASK_COLS, data.columns)
+        if self._keys is None:
+            self._tz = data.index.tz
+        key_ids = self._get_key_ids(data)
+        grid_points = -(-data.index.asi8 // self._grid_step_in_ns)
+        raw_values = data[BID_ASK_COLS].to_numpy(dtype=np.float64)
+        hdbg.dassert(
+            not np.isnan(raw_values).any(),
+            "Missing bid/ask values are not supported",
+        )
+        bid_price, bid_size, ask_price, ask_size = raw_values.T
+        values = np.column_stack(
+            [
+                raw_values,
+                0.5 * (ask_price + bid_price),
+                0.5 * (ask_price - bid_price),
+                np.log(bid_size) - np.log(ask_size),
+            ]
+        )
+        # Put the last snapshot of each key before the new snapshots, so that
+        # a new snapshot in the same grid step replaces it.
+        open_key_ids = np.nonzero(self._open_grid_points != _NO_GRID_POINT)[0]
+        key_ids = np.concatenate([open_key_ids, key_ids])
+        grid_points = np.concatenate(
+            [self._open_grid_points[open_key_ids], grid_points]
+        )
+        times = np.concatenate(
+            [np.full(len(open_key_ids), np.iinfo(np.int64).min), data.index.asi8]
+        )
+        values = np.concatenate([self._open_values[open_key_ids], values])
+        idx = np.lexsort((times, key_ids))
+        key_ids, grid_points, values = key_ids[idx], grid_points[idx], values[idx]
+        is_first_of_key = _is_first_of_group(key_ids)
+        hdbg.dassert(
+            np.all(is_first_of_key[1:] | (np.diff(grid_points) >= 0)),
+            "Snapshots are not in order of time across chunks",
+        )
+        # Keep the last snapshot in each grid step, like `resample().last()`.
+        is_last = np.ones(len(key_ids), dtype=bool)
+        is_last[:-1] = _is_first_of_group(key_ids, grid_points)[1:]
+        key_ids, grid_points, values = (
+            key_ids[is_last],
+            grid_points[is_last],
+            values[is_last],
+        )
+        bars = self._process_snapshots(key_ids, grid_points, values, False)
+        return bars
+
+    def flush(self) -> pd.DataFrame:
+        """
+        Return all the remaining bars and reset the state.
+
+        Like for `resample_bid_ask_data_to_1min()`, the last snapshot of each
+        key is not forward filled after its grid step.
+        """
+        hdbg.dassert_is_not(self._keys, None, "No data was processed")
+        key_ids = np.nonzero(self._open_grid_points != _NO_GRID_POINT)[0]
+        bars = self._process_snapshots(
+            key_ids,
+            self._open_grid_points[key_ids],
+            self._open_values[key_ids],
+            True,
+        )
+        self._reset_state(len(self._open_grid_points))
+        return bars
+
+    def _reset_state(self, num_keys: int) -> None:
+        # Last snapshot of each key, whose run on the grid is not complete.
+        self._open_grid_points = np.full(num_keys, _NO_GRID_POINT)
+        self._open_values = np.full((num_keys, len(self._VALUE_COLS)), np.nan)
+        # Grid point, midpoint, log size imbalance and midpoint diff. of the
+        # snapshot before the last one.
+        self._prev_grid_points = np.full(num_keys, _NO_GRID_POINT)
+        self._prev_midpoints = np.full(num_keys, np.nan)
+        self._prev_log_size_imbalances = np.full(num_keys, np.nan)
+        self._prev_midpoint_diffs = np.full(num_keys, np.nan)
+        # Last returned bar of each key, to return the bars without data.
+        self._last_bars = np.full(num_keys, _NO_GRID_POINT)
+        # Aggregations of the bar that the last snapshot of each key can
+        # still update.
+        self._open_bars: Optional[Dict[str, np.ndarray]] = None
+
+    def _get_key_ids(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Return the position of the key of each row, adding the new keys.
+        """
+        keys = pd.MultiIndex.from_frame(data[self._key_cols])
+        if self._keys is None:
+            self._keys = keys[:0]
+        key_ids = self._keys.get_indexer(keys)
+        is_new = key_ids == -1
+        if is_new.any():
+            self._keys = self._keys.append(keys[is_new].unique())
+            num_new_keys = len(self._keys) - len(self._open_grid_points)
+            for attr, fill_value in [
+                ("_open_grid_points", _NO_GRID_POINT),
+                ("_open_values", np.nan),
+                ("_prev_grid_points", _NO_GRID_POINT),
+                ("_prev_midpoints", np.nan),
+                ("_prev_log_size_imbalances", np.nan),
+                ("_prev_midpoint_diffs", np.nan),
+                ("_last_bars", _NO_GRID_POINT),
+            ]:
+                array = getattr(self, attr)
+                shape = (num_new_keys,) + array.shape[1:]
+                new_array = np.full(shape, fill_value, dtype=array.dtype)
+                setattr(self, attr, np.concatenate([array, new_array]))
+            key_ids = self._keys.get_indexer(keys)
+        return key_ids
+
+    def _get_bars(self, grid_points: np.ndarray) -> np.ndarray:
+        """
+        Return the bars containing the grid points, as `(bar_start, bar_end]`.
+        """
+        return -(-grid_points // self._num_grid_points_per_bar)
+
+    def _process_snapshots(
+        self,
+        key_ids: np.ndarray,
+        grid_points: np.ndarray,
+        values: np.ndarray,
+        is_final: bool,
+    ) -> pd.DataFrame:
+        """
+        Update the state with snapshots sorted by key and grid point.
+
+        :param is_final: whether the last snapshot of each key is the last one
+            overall
+        """
+        is_first_of_key = _is_first_of_group(key_ids)
+        is_last_of_key = np.ones(len(key_ids), dtype=bool)
+        is_last_of_key[:-1] = is_first_of_key[1:]
+        # Get the previous snapshot of each snapshot.
+        midpoints = values[:, 4]
+        log_size_imbalances = values[:, 6]
+        state_key_ids = key_ids[is_first_of_key]
+
+        def _shift(array: np.ndarray, state: np.ndarray) -> np.ndarray:
+            shifted = np.empty_like(array)
+            shifted[1:] = array[:-1]
+            shifted[is_first_of_key] = state[state_key_ids]
+            return shifted
+
+        prev_grid_points = _shift(grid_points, self._prev_grid_points)
+        prev_midpoints = _shift(midpoints, self._prev_midpoints)
+        prev_log_size_imbalances = _shift(
+            log_size_imbalances, self._prev_log_size_imbalances
+        )
+        # The first grid point of a run follows a valid grid point only if the
+        # previous run was forward filled up to it.
+        is_prev_grid_point_valid = (
+            grid_points - prev_grid_points <= self._FFILL_LIMIT + 1
+        )
+        midpoint_diffs = np.where(
+            is_prev_grid_point_valid, midpoints - prev_midpoints, np.nan
+        )
+        prev_midpoint_diffs = _shift(midpoint_diffs, self._prev_midpoint_diffs)
+        # Compute the contributions of the first grid point of each run. Inside
+        # a run the midpoint diff. is 0.
+        midpoint_vars = np.nan_to_num(midpoint_diffs**2)
+        midpoint_autocovars = np.where(
+            grid_points - prev_grid_points == 1,
+            np.nan_to_num(midpoint_diffs * prev_midpoint_diffs),
+            0.0,
+        )
+        log_size_imbalance_autocovars = np.where(
+            is_prev_grid_point_valid,
+            log_size_imbalances * prev_log_size_imbalances,
+            0.0,
+        )
+        # Compute the end of the run of each snapshot.
+        next_grid_points = np.empty_like(grid_points)
+        next_grid_points[:-1] = grid_points[1:]
+        run_ends = np.minimum(
+            next_grid_points - 1, grid_points + self._FFILL_LIMIT
+        )
+        if is_final:
+            run_ends[is_last_of_key] = grid_points[is_last_of_key]
+            is_closed = np.ones(len(key_ids), dtype=bool)
+        else:
+            is_closed = ~is_last_of_key
+            # Save the state of the last snapshot of each key.
+            last_key_ids = key_ids[is_last_of_key]
+            self._open_grid_points[last_key_ids] = grid_points[is_last_of_key]
+            self._open_values[last_key_ids] = values[is_last_of_key]
+            for state, array in [
+                (self._prev_grid_points, prev_grid_points),
+                (self._prev_midpoints, prev_midpoints),
+                (self._prev_log_size_imbalances, prev_log_size_imbalances),
+                (self._prev_midpoint_diffs, prev_midpoint_diffs),
+            ]:
+                state[last_key_ids] = array[is_last_of_key]
+        segments = self._get_run_segments(
+            key_ids[is_closed],
+            grid_points[is_closed],
+            run_ends[is_closed],
+            values[is_closed],
+            midpoint_vars[is_closed],
+            midpoint_autocovars[is_closed],
+            log_size_imbalance_autocovars[is_closed],
+        )
+        if self._open_bars is not None:
+            segments = {
+                col: np.concatenate([self._open_bars[col], segments[col]])
+                for col in segments
+            }
+        bars = _aggregate_segments(segments)
+        # Keep the bars that can still be updated by the open runs.
+        if is_final:
+            is_complete = np.ones(len(bars["key_id"]), dtype=bool)
+        else:
+            open_bars = self._get_bars(self._open_grid_points[bars["key_id"]])
+            is_complete = bars["bar"] < open_bars
+        self._open_bars = {col: bars[col][~is_complete] for col in bars}
+        bars = {col: bars[col][is_complete] for col in bars}
+        df = self._get_bars_df(bars)
+        return df
+
+    def _get_run_segments(
+        self,
+        key_ids: np.ndarray,
+        run_starts: np.ndarray,
+        run_ends: np.ndarray,
+        values: np.ndarray,
+        midpoint_vars: np.ndarray,
+        midpoint_autocovars: np.ndarray,
+        log_size_imbalance_autocovars: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Split the runs of constant values at the bar boundaries.
+
+        :return: aggregations of each segment of a run in a bar
+        """
+        first_bars = self._get_bars(run_starts)
+        num_segments = self._get_bars(run_ends) - first_bars + 1
+        idx = np.repeat(np.arange(len(key_ids)), num_segments)
+        # Position of each segment in its run.
+        offsets = np.arange(len(idx)) - np.repeat(
+            np.cumsum(num_segments) - num_segments, num_segments
+        )
+        bars = first_bars[idx] + offsets
+        starts = np.maximum(
+            run_starts[idx], (bars - 1) * self._num_grid_points_per_bar + 1
+        )
+        ends = np.minimum(run_ends[idx], bars * self._num_grid_points_per_bar)
+        counts = ends - starts + 1
+        is_run_start = offsets == 0
+        values = values[idx]
+        log_size_imbalance_vars = values[:, 6] ** 2
+        segments = {
+            "key_id": key_ids[idx],
+            "bar": bars,
+            "start": starts,
+            "first": values,
+            "last": values,
+            "max": values,
+            "min": values,
+            "sum": values * counts[:, None],
+            "count": counts,
+            "bid_ask_midpoint_var": np.where(
+                is_run_start, midpoint_vars[idx], 0.0
+            ),
+            "bid_ask_midpoint_autocovar": np.where(
+                is_run_start, midpoint_autocovars[idx], 0.0
+            ),
+            "log_size_imbalance_var": log_size_imbalance_vars * counts,
+            # Inside a run each grid point follows a grid point with the same
+            # value.
+            "log_size_imbalance_autocovar": (
+                log_size_imbalance_vars * (counts - is_run_start)
+                + np.where(is_run_start, log_size_imbalance_autocovars[idx], 0.0)
+            ),
+        }
+        return segments
+
+    def _get_bars_df(self, bars: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """
+        Convert the aggregations of the complete bars to the output format.
+
+        The bars without data between the bars of a key are added, like in the
+        output of `resample()`.
+        """
+        key_ids = bars["key_id"]
+        bar_ids = bars["bar"]
+        # Count the missing bars before each bar.
+        prev_bars = np.empty_like(bar_ids)
+        prev_bars[1:] = bar_ids[:-1]
+        is_first_of_key = _is_first_of_group(key_ids)
+        prev_bars[is_first_of_key] = self._last_bars[key_ids[is_first_of_key]]
+        num_missing_bars = np.where(
+            prev_bars == _NO_GRID_POINT, 0, bar_ids - prev_bars - 1
+        )
+        if len(key_ids) > 0:
+            is_last_of_key = np.ones(len(key_ids), dtype=bool)
+            is_last_of_key[:-1] = is_first_of_key[1:]
+            self._last_bars[key_ids[is_last_of_key]] = bar_ids[is_last_of_key]
+        # Compute the position of the bars in the output.
+        num_rows = len(key_ids) + int(num_missing_bars.sum())
+        pos = np.arange(len(key_ids)) + np.cumsum(num_missing_bars)
+        all_key_ids = np.repeat(key_ids, num_missing_bars + 1)
+        all_bars = np.repeat(bar_ids, num_missing_bars + 1)
+        # The missing bars before a bar are `bar - num_missing_bars, ..., bar - 1`.
+        offsets = np.arange(num_rows) - np.repeat(pos, num_missing_bars + 1)
+        all_bars = all_bars + offsets
+        # Build the output columns.
+        data = {}
+        counts = bars["count"][:, None]
+        aggregations = [
+            ("open", "open", bars["first"]),
+            ("close", "close", bars["last"]),
+            ("high", "max", bars["max"]),
+            ("low", "min", bars["min"]),
+            ("mean", "mean", bars["sum"] / counts),
+        ]
+        for price_suffix, suffix, array in aggregations:
+            for i, col in enumerate(self._VALUE_COLS):
+                col_suffix = price_suffix if col.endswith("_price") else suffix
+                column = np.full(num_rows, np.nan)
+                column[pos] = array[:, i]
+                data[f"{col}.{col_suffix}"] = column
+        for col in self._VAR_COLS:
+            column = np.zeros(num_rows)
+            column[pos] = bars[col]
+            data[f"{col}.{self._var_suffix}"] = column
+        timestamps = pd.to_datetime(all_bars * self._bar_in_ns, unit="ns")
+        if self._tz is not None:
+            timestamps = timestamps.tz_localize("UTC").tz_convert(self._tz)
+        df = pd.DataFrame(data, index=pd.Index(timestamps, name="timestamp"))
+        keys = self._keys[all_key_ids].to_frame(index=False)
+        for i, col in enumerate(self._key_cols):
+            df.insert(i, col, keys[col].to_numpy())
+        # Sort by timestamp, keeping the order of the keys.
+        idx = np.lexsort((all_key_ids, all_bars))
+        df = df.iloc[idx]
+        return df
+
+
+def _is_first_of_group(*arrays: np.ndarray) -> np.ndarray:
+    """
+    Return whether each element starts a new group of equal consecutive
+    elements across `arrays`.
+    """
+    num_rows = len(arrays[0])
+    is_first = np.zeros(num_rows, dtype=bool)
+    if num_rows > 0:
+        is_first[0] = True
+        for array in arrays:
+            is_first[1:] |= array[1:] != array[:-1]
+    return is_first
+
+
+def _aggregate_segments(segments: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Aggregate the segments with the same key and bar.
+    """
+    idx = np.lexsort((segments["start"], segments["bar"], segments["key_id"]))
+    segments = {col: array[idx] for col, array in segments.items()}
+    starts = np.nonzero(_is_first_of_group(segments["key_id"], segments["bar"]))[
+        0
+    ]
+    if len(starts) == 0:
+        return segments
+    ends = np.append(starts[1:], len(idx)) - 1
+    bars = {
+        "key_id": segments["key_id"][starts],
+        "bar": segments["bar"][starts],
+        "start": segments["start"][starts],
+        "first": segments["first"][starts],
+        "last": segments["last"][ends],
+        "max": np.maximum.reduceat(segments["max"], starts),
+        "min": np.minimum.reduceat(segments["min"], starts),
+    }
+    for col in segments:
+        if col not in bars:
+            bars[col] = np.add.reduceat(segments[col], starts)
+    return bars
+
+
 def transform_and_resample_rt_bid_ask_data(
     df_raw: pd.DataFrame,
 ) -> pd.DataFrame:
@@ -592,6 +592,7 @@ def save_data_to_db(
     time_zone: str,
     *,
     add_knowledge_timestamp: bool = True,
+    use_copy: bool = False,
 ) -> None:
     """
     Save data into specified database table.
@@ -604,6 +605,10 @@ def save_data_to_db(
     :param db_table: name of the table to insert to.
     :param add_knowledge_timestamp: if True, adds a column with the value of current time
     :param time_zone: time zone used to add correct knowledge_timestamp to the data
+    :param use_copy: if True, load the data with `COPY` through a staging
+        table, which is much faster for large data (e.g., backfills); the
+        integer columns must not contain floats, e.g., `1.0`, which `COPY`
+        rejects
     """
     if data.empty:
         _LOG.warning("The DataFrame is empty, nothing to insert.")
@@ -623,12 +628,15 @@ def save_data_to_db(
         unique_columns = TRADES_UNIQUE_COLUMNS
     else:
         raise ValueError(f"Invalid data_type='{data_type}'")
-    hsql.execute_insert_on_conflict_do_nothing_query(
-        connection=db_connection,
-        obj=data,
-        table_name=db_table,
-        unique_columns=unique_columns,
-    )
+    if use_copy:
+        hsql.execute_bulk_upsert_query(db_connection, data, db_table, unique_columns)
+    else:
+        hsql.execute_insert_on_conflict_do_nothing_query(
+            connection=db_connection,
+            obj=data,
+            table_name=db_table,
+            unique_columns=unique_columns,
+        )
 
 
 # #############################################################################
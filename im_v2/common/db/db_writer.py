@@ -0,0 +1,204 @@
+"""
+Save data to the DB from a background thread without blocking the producer.
+
+Import as:
+
+import im_v2.common.db.db_writer as imvcddbwr
+"""
+
+import collections
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import helpers.hdbg as hdbg
+
+_LOG = logging.getLogger(__name__)
+
+# Signal the writer thread to save all the pending batches and exit.
+_STOP = object()
+
+
+# #############################################################################
+# BatchingDbWriter
+# #############################################################################
+
+
+class BatchingDbWriter:
+    """
+    Save items to DB tables in batches from a background thread.
+
+    The producer (e.g., the asyncio loop downloading websocket data) enqueues
+    items with `put()`, which never blocks: when the bounded queue is full, the
+    item is dropped and counted, so that a slow DB never delays the producer.
+
+    The writer thread groups the items by table and calls
+    `save_func(table_name, items)` when the batch of a table reaches
+    `max_batch_size` items or when its oldest item has waited for
+    `max_batch_delay_in_secs`. The items are passed to `save_func` as they were
+    enqueued, without copies, so the producer must not modify them afterwards.
+
+    A batch that can't be saved is dropped and the writer keeps saving the next
+    batches, but the error is raised to the producer by the next `put()` and by
+    `stop()`, so that the producer doesn't keep running while its data is lost.
+    Transient errors should be retried by `save_func`, e.g., as
+    `save_data_to_db()` does.
+    """
+
+    def __init__(
+        self,
+        save_func: Callable[[str, List[Any]], None],
+        *,
+        max_queue_size: int = 10000,
+        max_batch_size: Optional[int] = None,
+        max_batch_delay_in_secs: float = 1.0,
+    ):
+        """
+        Constructor.
+
+        :param save_func: function saving a batch of items to a table, e.g.,
+            transforming them into a dataframe and inserting it into the DB
+        :param max_queue_size: maximum number of items waiting to be batched
+        :param max_batch_size: maximum number of items in a batch; if `None`,
+            the batches are saved only based on `max_batch_delay_in_secs`
+        :param max_batch_delay_in_secs: maximum time an item waits in a batch
+            before the batch is saved
+        """
+        hdbg.dassert_lte(1, max_queue_size)
+        if max_batch_size is not None:
+            hdbg.dassert_lte(1, max_batch_size)
+        hdbg.dassert_lte(0, max_batch_delay_in_secs)
+        self._save_func = save_func
+        self._max_batch_size = max_batch_size
+        self._max_batch_delay_in_secs = max_batch_delay_in_secs
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        # Map a table to the items of its current batch and the time when the
+        # batch should be saved at the latest.
+        self._batches: Dict[str, List[Any]] = {}
+        self._batch_deadlines: Dict[str, float] = {}
+        # Each counter is updated by only one thread.
+        self._metrics: Dict[str, int] = collections.Counter()
+        # First error that made the writer drop a batch.
+        self._exception: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, table_name: str, item: Any) -> bool:
+        """
+        Enqueue an item to be saved to `table_name`, without blocking.
+
+        :return: whether the item was enqueued, i.e., it was not dropped
+        """
+        hdbg.dassert(self._thread.is_alive(), "The writer is stopped")
+        if self._exception is not None:
+            raise self._exception
+        try:
+            self._queue.put_nowait((table_name, item))
+        except queue.Full:
+            self._metrics["num_dropped_items"] += 1
+            _LOG.warning(
+                "The DB writer queue is full: dropping an item for '%s'",
+                table_name,
+            )
+            return False
+        self._metrics["num_enqueued_items"] += 1
+        queue_depth = self._queue.qsize()
+        if queue_depth > self._metrics["max_queue_depth"]:
+            self._metrics["max_queue_depth"] = queue_depth
+        return True
+
+    def stop(self) -> None:
+        """
+        Save all the enqueued items and stop the writer thread.
+
+        Raise the first error that made the writer drop a batch, if any.
+        """
+        if self._thread.is_alive():
+            # The writer keeps draining the queue, so this eventually succeeds.
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._exception is not None:
+            raise self._exception
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        Return the metrics of the writer.
+
+        :return: metrics, e.g.,
+            ```
+            {
+                "queue_depth": 12,
+                "max_queue_depth": 250,
+                "num_enqueued_items": 10500,
+                "num_dropped_items": 0,
+                "num_saved_items": 10400,
+                "num_failed_items": 0,
+                "num_saved_batches": 42,
+            }
+            ```
+        """
+        keys = [
+            "max_queue_depth",
+            "num_enqueued_items",
+            "num_dropped_items",
+            "num_saved_items",
+            "num_failed_items",
+            "num_saved_batches",
+        ]
+        metrics = {"queue_depth": self._queue.qsize()}
+        metrics.update({key: self._metrics[key] for key in keys})
+        return metrics
+
+    def _run(self) -> None:
+        while True:
+            # Wait for a new item until the next batch needs to be saved.
+            timeout = None
+            if self._batch_deadlines:
+                next_deadline = min(self._batch_deadlines.values())
+                timeout = max(0.0, next_deadline - time.monotonic())
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                entry = None
+            if entry is _STOP:
+                for table_name in list(self._batches):
+                    self._save_batch(table_name)
+                return
+            if entry is not None:
+                table_name, item = entry
+                if table_name not in self._batches:
+                    self._batches[table_name] = []
+                    self._batch_deadlines[table_name] = (
+                        time.monotonic() + self._max_batch_delay_in_secs
+                    )
+                self._batches[table_name].append(item)
+                if (
+                    self._max_batch_size is not None
+                    and len(self._batches[table_name]) >= self._max_batch_size
+                ):
+                    self._save_batch(table_name)
+            # Save the batches that waited long enough.
+            now = time.monotonic()
+            for table_name, deadline in list(self._batch_deadlines.items()):
+                if deadline <= now:
+                    self._save_batch(table_name)
+
+    def _save_batch(self, table_name: str) -> None:
+        items = self._batches.pop(table_name)
+        del self._batch_deadlines[table_name]
+        try:
+            self._save_func(table_name, items)
+        except Exception as e:  # pylint: disable=broad-except
+            # Keep saving the next batches, instead of losing all the data,
+            # and let the producer know about the error.
+            _LOG.exception(
+                "Failed to save %s items to '%s'", len(items), table_name
+            )
+            self._metrics["num_failed_items"] += len(items)
+            if self._exception is None:
+                self._exception = e
+            return
+        self._metrics["num_saved_items"] += len(items)
+        self._metrics["num_saved_batches"] += 1
@@ -298,6 +298,31 @@ class TestSaveDataToDb(hunitest.TestCase):
         with self.assertRaises(imvcddbut.RETRY_EXCEPTION[0]):
             self._call_save_data_to_db()
 
+    def test_save_data_to_db4(self) -> None:
+        """
+        Test that the data is saved with `COPY` when requested.
+        """
+        data = pd.DataFrame({"col1": [1, 2, 3], "col2": [4, 5, 6]})
+        db_connection = umock.create_autospec(imvcddbut.hsql.DbConnection)
+        with umock.patch.object(
+            imvcddbut.hsql, "execute_bulk_upsert_query"
+        ) as mock_execute_bulk_upsert_query:
+            imvcddbut.save_data_to_db(
+                data,
+                "trades",
+                db_connection,
+                "test_table",
+                "UTC",
+                use_copy=True,
+            )
+        self.assertEqual(mock_execute_bulk_upsert_query.call_count, 1)
+        self.assertEqual(
+            self.mock_execute_insert_on_conflict_do_nothing_query.call_count, 0
+        )
+        args = mock_execute_bulk_upsert_query.call_args[0]
+        expected = ("test_table", imvcddbut.TRADES_UNIQUE_COLUMNS)
+        self.assertEqual(args[2:], expected)
+
     def _call_save_data_to_db(self) -> None:
         """
         Call the `save_data_to_db` method with the stub data.
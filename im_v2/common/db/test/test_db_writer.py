@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Any, List, Tuple
+
+import helpers.hunit_test as hunitest
+import im_v2.common.db.db_writer as imvcddbwr
+
+
+class TestBatchingDbWriter1(hunitest.TestCase):
+    def test_batch_size1(self) -> None:
+        """
+        Check that the items are saved in batches by table.
+        """
+        saved: List[Tuple[str, List[Any]]] = []
+        writer = imvcddbwr.BatchingDbWriter(
+            lambda table_name, items: saved.append((table_name, items)),
+            max_batch_size=2,
+            max_batch_delay_in_secs=60,
+        )
+        for item in range(5):
+            writer.put("table_a", item)
+        writer.put("table_b", "x")
+        writer.stop()
+        expected = [
+            ("table_a", [0, 1]),
+            ("table_a", [2, 3]),
+            ("table_a", [4]),
+            ("table_b", ["x"]),
+        ]
+        self.assertListEqual(saved, expected)
+        metrics = writer.get_metrics()
+        self.assertEqual(metrics["num_enqueued_items"], 6)
+        self.assertEqual(metrics["num_saved_items"], 6)
+        self.assertEqual(metrics["num_saved_batches"], 4)
+        self.assertEqual(metrics["queue_depth"], 0)
+
+    def test_batch_delay1(self) -> None:
+        """
+        Check that a batch is saved when its delay expires.
+        """
+        saved: List[Tuple[str, List[Any]]] = []
+        writer = imvcddbwr.BatchingDbWriter(
+            lambda table_name, items: saved.append((table_name, items)),
+            max_batch_delay_in_secs=0.05,
+        )
+        writer.put("table_a", 0)
+        writer.put("table_a", 1)
+        # Wait for the batch to be saved without stopping the writer.
+        for _ in range(100):
+            if saved:
+                break
+            time.sleep(0.05)
+        self.assertListEqual(saved, [("table_a", [0, 1])])
+        writer.stop()
+
+    def test_drop1(self) -> None:
+        """
+        Check that the items are dropped without blocking when the DB is slow.
+        """
+        is_db_available = threading.Event()
+        saved: List[Any] = []
+
+        def _save(table_name: str, items: List[Any]) -> None:
+            _ = table_name
+            is_db_available.wait()
+            saved.extend(items)
+
+        writer = imvcddbwr.BatchingDbWriter(
+            _save, max_queue_size=2, max_batch_size=1
+        )
+        # The writer blocks saving the first item, so only 2 more items fit in
+        # the queue.
+        writer.put("table_a", 0)
+        while writer.get_metrics()["queue_depth"] > 0:
+            time.sleep(0.01)
+        is_enqueued = [writer.put("table_a", item) for item in range(1, 6)]
+        self.assertListEqual(is_enqueued, [True, True, False, False, False])
+        is_db_available.set()
+        writer.stop()
+        self.assertListEqual(saved, [0, 1, 2])
+        metrics = writer.get_metrics()
+        self.assertEqual(metrics["num_dropped_items"], 3)
+        self.assertEqual(metrics["max_queue_depth"], 2)
+
+    def test_failure1(self) -> None:
+        """
+        Check that a failed batch doesn't stop the writer and that the error is
+        raised by `stop()`.
+        """
+        saved: List[Any] = []
+
+        def _save(table_name: str, items: List[Any]) -> None:
+            if table_name == "table_a":
+                raise ValueError("DB is down")
+            saved.extend(items)
+
+        # Save the batches only when stopping, after `table_a` fails.
+        writer = imvcddbwr.BatchingDbWriter(_save, max_batch_delay_in_secs=60)
+        writer.put("table_a", 0)
+        writer.put("table_b", 1)
+        writer.put("table_b", 2)
+        with self.assertRaises(ValueError):
+            writer.stop()
+        self.assertListEqual(saved, [1, 2])
+        metrics = writer.get_metrics()
+        self.assertEqual(metrics["num_failed_items"], 1)
+        self.assertEqual(metrics["num_saved_items"], 2)
+        # The writer is stopped, so the error is raised again.
+        with self.assertRaises(ValueError):
+            writer.stop()
+
+    def test_failure2(self) -> None:
+        """
+        Check that `put()` raises the error after a batch is dropped.
+        """
+
+        def _save(table_name: str, items: List[Any]) -> None:
+            _ = table_name, items
+            raise ValueError("DB is down")
+
+        writer = imvcddbwr.BatchingDbWriter(_save, max_batch_size=1)
+        writer.put("table_a", 0)
+        while writer.get_metrics()["num_failed_items"] == 0:
+            time.sleep(0.01)
+        with self.assertRaises(ValueError):
+            writer.put("table_a", 1)
+        with self.assertRaises(ValueError):
+            writer.stop()
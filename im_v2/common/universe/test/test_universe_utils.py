@@ -1,3 +1,5 @@
+import pandas as pd
+
 import helpers.hunit_test as hunitest
 import im_v2.common.universe.universe_utils as imvcuunut
 
@@ -22,3 +24,42 @@ class TestBuildNumericalToStringIdMapping(hunitest.TestCase):
         self.assertEqual(len(mapping), 2)
         self.assert_equal(mapping[2002879833], "gateio::XRP_USDT")
         self.assert_equal(mapping[2568064341], "kucoin::SOL_USDT")
+
+
+class TestStringIdsToNumericalIds(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Test that repeated string ids are converted like one at a time.
+        """
+        string_ids = ["kucoin::SOL_USDT", "gateio::XRP_USDT", "kucoin::SOL_USDT"]
+        expected = [
+            imvcuunut.string_to_numerical_id(string_id)
+            for string_id in string_ids
+        ]
+        num_ids = imvcuunut.string_ids_to_numerical_ids(string_ids)
+        self.assertEqual(num_ids.tolist(), expected)
+        # Check a series with categorical dtype.
+        srs = pd.Series(string_ids, dtype="category")
+        num_ids = imvcuunut.string_ids_to_numerical_ids(srs)
+        self.assertEqual(num_ids.tolist(), expected)
+
+
+class TestNumericalIdsToStringIds(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Test that numerical ids are converted back to the string ids.
+        """
+        string_ids = ["gateio::XRP_USDT", "kucoin::SOL_USDT", "gateio::XRP_USDT"]
+        num_ids = imvcuunut.string_ids_to_numerical_ids(string_ids)
+        self.assert_equal(
+            imvcuunut.numerical_id_to_string_id(2002879833), "gateio::XRP_USDT"
+        )
+        actual = imvcuunut.numerical_ids_to_string_ids(num_ids)
+        self.assertEqual(actual.tolist(), string_ids)
+
+    def test2(self) -> None:
+        """
+        Test that a numerical id that was never computed can't be converted.
+        """
+        with self.assertRaises(AssertionError):
+            imvcuunut.numerical_id_to_string_id(1)
@@ -5,21 +5,28 @@ import im_v2.common.universe.universe_utils as imvcuunut
 """
 
 import hashlib
-from typing import Dict, List
+import threading
+from typing import Dict, List, Set, Union
+
+import numpy as np
+import pandas as pd
 
 import helpers.hdbg as hdbg
 
 # TODO(gp): This file is more generic than `asset_ids` vs `full_symbols` and
 #  could go in helpers.
 
+# Process-wide memoized mapping between string and numerical ids, filled by
+# `string_to_numerical_id()`.
+_STRING_TO_NUMERICAL_ID: Dict[str, int] = {}
+_NUMERICAL_TO_STRING_ID: Dict[int, str] = {}
+# Numerical ids computed from more than one string id, which can't be
+# converted back.
+_COLLIDING_NUMERICAL_IDS: Set[int] = set()
+_ID_MAPPING_LOCK = threading.Lock()
 
-def string_to_numerical_id(string_id: str) -> int:
-    """
-    Convert string id into a numerical one.
 
-    :param string_id: string id to convert
-    :return: numerical id
-    """
+def _compute_numerical_id(string_id: str) -> int:
     # Initialize MD5 algorithm converter and update it with string id.
     converter = hashlib.md5()
     converter.update(string_id.encode("utf-8"))
@@ -32,6 +39,107 @@ def string_to_numerical_id(string_id: str) -> int:
     return num_id
 
 
+def string_to_numerical_id(string_id: str) -> int:
+    """
+    Convert string id into a numerical one.
+
+    The numerical id of each string id is computed once per process and
+    memoized, together with the reverse mapping used by
+    `numerical_id_to_string_id()`.
+
+    :param string_id: string id to convert
+    :return: numerical id
+    """
+    num_id = _STRING_TO_NUMERICAL_ID.get(string_id)
+    if num_id is None:
+        num_id = _compute_numerical_id(string_id)
+        with _ID_MAPPING_LOCK:
+            other_string_id = _NUMERICAL_TO_STRING_ID.setdefault(
+                num_id, string_id
+            )
+            if other_string_id != string_id:
+                _COLLIDING_NUMERICAL_IDS.add(num_id)
+            _STRING_TO_NUMERICAL_ID[string_id] = num_id
+    return num_id
+
+
+def string_ids_to_numerical_ids(
+    string_ids: Union[List[str], pd.Series]
+) -> np.ndarray:
+    """
+    Convert string ids into numerical ones.
+
+    Only the unique string ids are converted and their numerical ids are
+    mapped back to all the elements, so this is faster than calling
+    `string_to_numerical_id()` on each element of a long sequence with repeated
+    ids, e.g., the full symbol column of the data.
+
+    :param string_ids: string ids to convert, e.g., a list or a series with
+        object or categorical dtype
+    :return: numerical ids as an int64 array aligned with `string_ids`
+    """
+    codes, unique_string_ids = pd.factorize(string_ids)
+    hdbg.dassert(
+        not (codes == -1).any(), "String ids can't be missing: %s", string_ids
+    )
+    unique_numerical_ids = np.empty(len(unique_string_ids), dtype=np.int64)
+    for i, string_id in enumerate(unique_string_ids):
+        hdbg.dassert_isinstance(string_id, str)
+        unique_numerical_ids[i] = string_to_numerical_id(string_id)
+    numerical_ids = unique_numerical_ids[codes]
+    return numerical_ids
+
+
+def numerical_id_to_string_id(numerical_id: int) -> str:
+    """
+    Convert a numerical id into the string id it was computed from.
+
+    Only the numerical ids computed by `string_to_numerical_id()` in the current
+    process can be converted.
+
+    :param numerical_id: numerical id to convert
+    :return: string id
+    """
+    numerical_id = int(numerical_id)
+    hdbg.dassert_in(
+        numerical_id,
+        _NUMERICAL_TO_STRING_ID,
+        "Numerical id was never computed from a string id",
+    )
+    hdbg.dassert_not_in(
+        numerical_id,
+        _COLLIDING_NUMERICAL_IDS,
+        "Collision: id %s was computed from multiple string ids",
+        numerical_id,
+    )
+    string_id = _NUMERICAL_TO_STRING_ID[numerical_id]
+    return string_id
+
+
+def numerical_ids_to_string_ids(
+    numerical_ids: Union[List[int], pd.Series]
+) -> np.ndarray:
+    """
+    Convert numerical ids into the string ids they were computed from.
+
+    Same as `string_ids_to_numerical_ids()` but in the opposite direction.
+
+    :param numerical_ids: numerical ids to convert
+    :return: string ids as an object array aligned with `numerical_ids`
+    """
+    codes, unique_numerical_ids = pd.factorize(numerical_ids)
+    hdbg.dassert(
+        not (codes == -1).any(),
+        "Numerical ids can't be missing: %s",
+        numerical_ids,
+    )
+    unique_string_ids = np.empty(len(unique_numerical_ids), dtype=object)
+    for i, numerical_id in enumerate(unique_numerical_ids):
+        unique_string_ids[i] = numerical_id_to_string_id(numerical_id)
+    string_ids = unique_string_ids[codes]
+    return string_ids
+
+
 # TODO(Grisha): Do we need to use the full symbol? It seems so.
 def build_numerical_to_string_id_mapping(universe: List[str]) -> Dict[int, str]:
     """
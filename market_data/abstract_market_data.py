@@ -495,6 +495,93 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
         # ```
         return twap_df
 
+    def get_twap_price_for_intervals(
+        self,
+        asset_ids: List[int],
+        start_timestamps: List[pd.Timestamp],
+        end_timestamps: List[pd.Timestamp],
+        ts_col_name: str,
+        column: str,
+        *,
+        ignore_delay: bool = False,
+    ) -> pd.Series:
+        """
+        Compute TWAP of the column `column` for multiple assets and intervals.
+
+        This is equivalent to calling `get_twap_price()` for each interval
+        `(start_timestamps[i], end_timestamps[i]]` of `asset_ids[i]`, but the
+        data for the union of the intervals is retrieved with a single query
+        and all the TWAPs are computed with a single groupby.
+
+        :param asset_ids: asset id of each interval
+        :param start_timestamps: beginning of each interval
+        :param end_timestamps: end of each interval
+        :param ts_col_name, column, ignore_delay: same as in `get_twap_price()`
+        :return: series with the TWAP of each interval, in the same order of
+            the intervals, and NaN for the intervals without data, e.g.,
+            ```
+            0    997.93
+            1    1001.42
+            ```
+        """
+        hdbg.dassert_lte(1, len(asset_ids))
+        hdbg.dassert_eq(len(asset_ids), len(start_timestamps))
+        hdbg.dassert_eq(len(asset_ids), len(end_timestamps))
+        intervals = pd.DataFrame(
+            {
+                self._asset_id_col: asset_ids,
+                "interval_start_ts": start_timestamps,
+                "interval_end_ts": end_timestamps,
+                "interval_idx": np.arange(len(asset_ids)),
+            }
+        )
+        hdbg.dassert(
+            (intervals["interval_start_ts"] < intervals["interval_end_ts"]).all(),
+            "Invalid intervals=\n%s",
+            intervals,
+        )
+        unique_asset_ids = sorted(set(asset_ids))
+        self._dassert_valid_asset_ids(unique_asset_ids)
+        # Get the slice of prices covering all the intervals.
+        left_close = False
+        right_close = True
+        prices = self.get_data_for_interval(
+            intervals["interval_start_ts"].min(),
+            intervals["interval_end_ts"].max(),
+            ts_col_name,
+            unique_asset_ids,
+            left_close=left_close,
+            right_close=right_close,
+            limit=None,
+            ignore_delay=ignore_delay,
+        )
+        hdbg.dassert_in(column, prices.columns)
+        if ts_col_name == self._end_time_col_name:
+            # The end timestamp is the index after the normalization.
+            timestamps = prices.index
+        else:
+            hdbg.dassert_in(ts_col_name, prices.columns)
+            timestamps = prices[ts_col_name]
+        prices = pd.DataFrame(
+            {
+                self._asset_id_col: prices[self._asset_id_col].to_numpy(),
+                "timestamp": timestamps,
+                column: prices[column].to_numpy(),
+            }
+        )
+        # Match each price with the intervals of the same asset containing it.
+        df = intervals.merge(prices, on=self._asset_id_col, how="inner")
+        mask = (df["interval_start_ts"] < df["timestamp"]) & (
+            df["timestamp"] <= df["interval_end_ts"]
+        )
+        # Compute the mean value for each interval.
+        twap_srs = df[mask].groupby("interval_idx")[column].mean()
+        twap_srs = twap_srs.reindex(intervals["interval_idx"])
+        twap_srs.index.name = None
+        twap_srs.name = column
+        hpandas.dassert_series_type_in(twap_srs, [np.float64, np.int64])
+        return twap_srs
+
     # TODO(gp): When we want to evaluate a TWAP price in (a, b] we need to:
     #  1) wait until `MarketData` is updated
     #  2) assert that all the requested prices are actually available
@@ -762,6 +849,13 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
 
     @abc.abstractmethod
     def _get_last_end_time(self) -> Optional[pd.Timestamp]:
+        """
+        Return the last `end_time` available at the current time.
+
+        This is polled by `wait_for_latest_data()`, so the derived classes
+        should query only the max timestamp (e.g., with an index lookup or a
+        `SELECT MAX(...)`) instead of retrieving the data.
+        """
         ...
 
     @abc.abstractmethod
@@ -147,7 +147,7 @@ class ImClientMarketData(mdabmada.MarketData):
         _LOG.debug("market_data.columns=%s", sorted(list(market_data.columns)))
         hdbg.dassert_in(full_symbol_col_name, market_data.columns)
         transformed_asset_ids = self._im_client.get_asset_ids_from_full_symbols(
-            market_data[full_symbol_col_name].tolist()
+            market_data[full_symbol_col_name]
         )
         if self._asset_id_col in market_data.columns:
             _LOG.debug(
@@ -218,19 +218,49 @@ class ImClientMarketData(mdabmada.MarketData):
         # `bar_length_in_minutes * 2`. In order not to complicate the interface
         #  use 15T (the longest bar length) * 2.
         timedelta = pd.Timedelta("30T")
-        df = self.get_data_for_last_period(timedelta)
-        _LOG.debug(
-            hpandas.df_to_str(
-                df, print_shape_info=True, tag="after get_data_for_last_period"
-            )
-        )
-        if df.empty:
-            wall_clock_time = self.get_wall_clock_time()
-            _LOG.warning(
-                "No data found near wall_clock_time=%s", wall_clock_time
+        wall_clock_time = self.get_wall_clock_time()
+        # Getting the latest timestamps from the metadata of the `ImClient` is
+        # much cheaper than reading the data, but it's possible only if there
+        # is no data after the current time (e.g., it's not a simulation).
+        df_max_ts_per_asset = self._get_max_end_time_per_asset_from_metadata()
+        if (
+            df_max_ts_per_asset is not None
+            and (df_max_ts_per_asset < wall_clock_time).all()
+        ):
+            # Keep only the assets with data for the last period, like when
+            # reading the data.
+            start_ts = self._process_period(timedelta, wall_clock_time)
+            df_max_ts_per_asset = df_max_ts_per_asset[
+                df_max_ts_per_asset >= start_ts
+            ]
+        else:
+            df = self.get_data_for_last_period(timedelta)
+            _LOG.debug(
+                hpandas.df_to_str(
+                    df,
+                    print_shape_info=True,
+                    tag="after get_data_for_last_period",
+                )
             )
+            if df.empty:
+                df_max_ts_per_asset = pd.Series(dtype="datetime64[ns, UTC]")
+            else:
+                df_max_ts_per_asset = (
+                    df.reset_index()
+                    .groupby(by=[self._asset_id_col])
+                    .max()[self._end_time_col_name]
+                )
+        if df_max_ts_per_asset.empty:
+            _LOG.warning("No data found near wall_clock_time=%s", wall_clock_time)
             ret = None
         else:
+            _LOG.debug(
+                hpandas.df_to_str(
+                    df_max_ts_per_asset,
+                    print_shape_info=True,
+                    tag="latest timestamp per asset",
+                )
+            )
             # The latest timestamp is min timestamp across max timestamps
             # across all assets. In other words, data is ready when data is
             # ready for every asset.
@@ -241,18 +271,36 @@ class ImClientMarketData(mdabmada.MarketData):
             # We are looking for end timestamp that is present for all the assets.
             # In this case, it is 15:59 because at 16:00 the data is available
             # only for `asset1` and `asset3`.
-            df_max_ts_per_asset = (
-                df.reset_index()
-                .groupby(by=[self._asset_id_col])
-                .max()[self._end_time_col_name]
-            )
-            _LOG.debug(
-                hpandas.df_to_str(
-                    df_max_ts_per_asset,
-                    print_shape_info=True,
-                    tag="latest timestamp per asset",
-                )
-            )
-            ret = df_max_ts_per_asset.min()
+            ret = df_max_ts_per_asset.min().tz_convert(self._timezone)
         _LOG.debug("-> ret=%s", ret)
         return ret
+
+    def _get_max_end_time_per_asset_from_metadata(
+        self,
+    ) -> Optional[pd.Series]:
+        """
+        Get the latest end timestamp for each asset from the `ImClient`
+        metadata.
+
+        :return: series indexed by asset id with the latest end timestamps, or
+            `None` if the metadata is not available for some asset
+        """
+        if self._asset_ids is None:
+            full_symbols = self._im_client.get_universe()
+        else:
+            full_symbols = self._im_client.get_full_symbols_from_asset_ids(
+                self._asset_ids
+            )
+        end_timestamps = []
+        for full_symbol in full_symbols:
+            end_ts = self._im_client.get_end_ts_for_symbol_from_metadata(
+                full_symbol
+            )
+            if end_ts is None:
+                return None
+            end_timestamps.append(end_ts)
+        asset_ids = self._im_client.get_asset_ids_from_full_symbols(full_symbols)
+        srs = pd.Series(
+            end_timestamps, index=asset_ids, dtype="datetime64[ns, UTC]"
+        )
+        return srs
@@ -4,12 +4,15 @@ Import as:
 import market_data.replayed_market_data as mdremada
 """
 
+import datetime
 import logging
 from typing import Any, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
 import core.real_time as creatime
+import helpers.hdatetime as hdateti
 import helpers.hdbg as hdbg
 import helpers.hpandas as hpandas
 import helpers.hprint as hprint
@@ -27,6 +30,41 @@ _TRACE = False
 # #############################################################################
 
 
+# Value of `NaT` when timestamps are represented as int.
+_NAT_AS_INT = np.iinfo(np.int64).min
+
+
+def _timestamp_to_int(timestamp: pd.Timestamp) -> int:
+    """
+    Convert a timestamp to nanoseconds since epoch in UTC.
+    """
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tz is not None:
+        timestamp = timestamp.tz_convert(None)
+    return int(timestamp.to_datetime64().astype("datetime64[ns]").view("int64"))
+
+
+def _get_datetime_col_as_int(
+    df: pd.DataFrame, col_name: str
+) -> Optional[np.ndarray]:
+    """
+    Return the values of a datetime column as nanoseconds since epoch in UTC.
+
+    :return: the values, or `None` if the column doesn't exist or doesn't
+        have a datetime type
+    """
+    if col_name not in df.columns:
+        return None
+    srs = df[col_name]
+    if not pd.api.types.is_datetime64_any_dtype(srs):
+        return None
+    dt_index = pd.DatetimeIndex(srs)
+    if dt_index.tz is not None:
+        dt_index = dt_index.tz_convert(None)
+    values = dt_index.to_numpy(dtype="datetime64[ns]").view("int64")
+    return values
+
+
 # TODO(gp): This should have a delay and / or we should use timestamp_db.
 class ReplayedMarketData(mdabmada.MarketData):
     """
@@ -78,6 +116,23 @@ class ReplayedMarketData(mdabmada.MarketData):
             self._df.sort_values(
                 [self._end_time_col_name, self._asset_id_col], inplace=True
             )
+        # Build the indices used by `_get_data()` to look up the data with
+        # binary search, instead of scanning the entire df at every call.
+        self._build_index()
+
+    def __str__(
+        self,
+        attr_names_to_skip: Optional[List[str]] = None,
+    ) -> str:
+        attr_names_to_skip = self._get_attr_names_to_skip(attr_names_to_skip)
+        return super().__str__(attr_names_to_skip=attr_names_to_skip)
+
+    def __repr__(
+        self,
+        attr_names_to_skip: Optional[List[str]] = None,
+    ) -> str:
+        attr_names_to_skip = self._get_attr_names_to_skip(attr_names_to_skip)
+        return super().__repr__(attr_names_to_skip=attr_names_to_skip)
 
     def should_be_online(self, wall_clock_time: pd.Timestamp) -> bool:
         return True
@@ -105,39 +160,50 @@ class ReplayedMarketData(mdabmada.MarketData):
             delay_in_secs = 0
         else:
             delay_in_secs = self._delay_in_secs
-        # TODO(gp): This assertion seems very slow. Move this check in a
-        #  centralized place instead of calling it every time, if possible.
         if asset_ids is not None:
             # Make sure that the requested asset_ids are in the df at some point.
             # This avoids mistakes when mocking data for certain assets, but request
             # data for assets that don't exist, which can make us wait for data that
             # will never come.
-            hdbg.dassert_is_subset(
-                asset_ids, self._df[self._asset_id_col].unique()
-            )
+            hdbg.dassert_is_subset(asset_ids, self._df_asset_ids)
         # Filter the data by the current time.
         wall_clock_time = self.get_wall_clock_time()
         if _TRACE:
             _LOG.trace(hprint.to_str("wall_clock_time"))
-        df_tmp = creatime.get_data_as_of_datetime(
-            self._df,
-            self._knowledge_datetime_col_name,
-            wall_clock_time,
-            delay_in_secs=delay_in_secs,
-        )
+        if self._knowledge_times is None:
+            # The knowledge times can't be indexed, so scan the entire df.
+            df_tmp = creatime.get_data_as_of_datetime(
+                self._df,
+                self._knowledge_datetime_col_name,
+                wall_clock_time,
+                delay_in_secs=delay_in_secs,
+            )
+        else:
+            df_tmp = self._get_data_as_of_datetime(
+                wall_clock_time,
+                delay_in_secs,
+                start_ts,
+                end_ts,
+                ts_col_name,
+                asset_ids,
+                left_close,
+                right_close,
+            )
         # Handle `columns`.
         if self._columns is not None:
             hdbg.dassert_is_subset(self._columns, df_tmp.columns)
             df_tmp = df_tmp[self._columns]
         # Handle `period`.
         hdbg.dassert_in(ts_col_name, df_tmp.columns)
-        df_tmp = hpandas.trim_df(
-            df_tmp, ts_col_name, start_ts, end_ts, left_close, right_close
-        )
+        if self._get_ts_col_index(ts_col_name) is None:
+            # The rows have not been filtered by `ts_col_name` yet.
+            df_tmp = hpandas.trim_df(
+                df_tmp, ts_col_name, start_ts, end_ts, left_close, right_close
+            )
         # Handle `asset_ids`
         if _TRACE:
             _LOG.trace("before df_tmp=\n%s", hpandas.df_to_str(df_tmp))
-        if asset_ids is not None:
+        if asset_ids is not None and not self._is_filtered_by_asset_ids():
             hdbg.dassert_in(self._asset_id_col, df_tmp.columns)
             mask = df_tmp[self._asset_id_col].isin(set(asset_ids))
             df_tmp = df_tmp[mask]
@@ -151,23 +217,303 @@ class ReplayedMarketData(mdabmada.MarketData):
             _LOG.trace("-> df_tmp=\n%s", hpandas.df_to_str(df_tmp))
         return df_tmp
 
+    # //////////////////////////////////////////////////////////////////////////
+    # Index.
+    # //////////////////////////////////////////////////////////////////////////
+
+    @staticmethod
+    def _get_attr_names_to_skip(
+        attr_names_to_skip: Optional[List[str]],
+    ) -> List[str]:
+        """
+        Add the indices built by `_build_index()` to the attributes to skip
+        when printing the object.
+        """
+        if attr_names_to_skip is None:
+            attr_names_to_skip = []
+        attr_names_to_skip.extend(
+            [
+                "_df_asset_ids",
+                "_asset_id_to_rows",
+                "_has_missing_asset_ids",
+                "_ts_col_indices",
+                "_knowledge_time_cummax",
+                "_knowledge_time_cummin_from_end",
+                "_knowledge_times",
+            ]
+        )
+        return attr_names_to_skip
+
+    def _build_index(self) -> None:
+        """
+        Build the indices of the replayed df.
+
+        - The asset ids in the df
+        - The running max and the running min from the end of the knowledge
+          times, so that the rows known at a given time are found with binary
+          search even if the knowledge times are not sorted
+        - The row positions of each asset
+        - The values of the timestamp columns used to filter the data, built
+          on demand by `_get_ts_col_index()`
+        """
+        df = self._df
+        self._df_asset_ids: Optional[frozenset] = None
+        self._asset_id_to_rows: Dict[Any, np.ndarray] = {}
+        self._has_missing_asset_ids = False
+        if self._asset_id_col in df.columns:
+            codes, asset_ids = pd.factorize(df[self._asset_id_col])
+            self._df_asset_ids = frozenset(asset_ids)
+            self._has_missing_asset_ids = bool((codes < 0).any())
+            rows = np.argsort(codes, kind="stable")
+            bounds = np.cumsum(np.bincount(codes[codes >= 0]))[:-1]
+            for asset_id, asset_rows in zip(asset_ids, np.split(rows, bounds)):
+                self._asset_id_to_rows[asset_id] = asset_rows
+        self._ts_col_indices: Dict[str, Optional[np.ndarray]] = {}
+        knowledge_times = _get_datetime_col_as_int(
+            df, self._knowledge_datetime_col_name
+        )
+        if knowledge_times is not None:
+            # A row without knowledge time is never known.
+            knowledge_times = np.where(
+                knowledge_times == _NAT_AS_INT,
+                np.iinfo(np.int64).max,
+                knowledge_times,
+            )
+            # All the rows before the first row with running max greater than
+            # a time are known at that time.
+            self._knowledge_time_cummax = np.maximum.accumulate(knowledge_times)
+            # All the rows after the last row with running min from the end
+            # smaller than or equal to a time are not known at that time.
+            self._knowledge_time_cummin_from_end = np.minimum.accumulate(
+                knowledge_times[::-1]
+            )[::-1]
+        self._knowledge_times = knowledge_times
+
+    def _get_ts_col_index(self, ts_col_name: str) -> Optional[np.ndarray]:
+        """
+        Return the values of a timestamp column if it can be binary searched.
+
+        :return: the timestamps as int, or `None` if the column is not sorted
+            or has missing values
+        """
+        if ts_col_name not in self._ts_col_indices:
+            values = None
+            if self._knowledge_times is not None and (
+                self._columns is None or ts_col_name in self._columns
+            ):
+                values = _get_datetime_col_as_int(self._df, ts_col_name)
+            if values is not None and (
+                (values == _NAT_AS_INT).any() or (np.diff(values) < 0).any()
+            ):
+                values = None
+            self._ts_col_indices[ts_col_name] = values
+        return self._ts_col_indices[ts_col_name]
+
+    def _is_filtered_by_asset_ids(self) -> bool:
+        """
+        Return whether `_get_data_as_of_datetime()` filters by asset ids.
+        """
+        return self._knowledge_times is not None and bool(self._asset_id_to_rows)
+
+    def _get_data_as_of_datetime(
+        self,
+        wall_clock_time: pd.Timestamp,
+        delay_in_secs: int,
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
+        ts_col_name: str,
+        asset_ids: Optional[List[int]],
+        left_close: bool,
+        right_close: bool,
+    ) -> pd.DataFrame:
+        """
+        Same as `creatime.get_data_as_of_datetime()` using the indices.
+
+        The rows are also filtered by `ts_col_name` and by `asset_ids`, if
+        possible. When only a contiguous range of rows is selected, the
+        returned df is a slice of the replayed df without copies.
+        """
+        hdbg.dassert_lte(0, delay_in_secs)
+        hdateti.dassert_tz_compatible_timestamp_with_df(
+            wall_clock_time, self._df, self._knowledge_datetime_col_name
+        )
+        datetime_eff = wall_clock_time - datetime.timedelta(seconds=delay_in_secs)
+        datetime_eff = _timestamp_to_int(datetime_eff)
+        # All the rows in `[0, first_row)` are known and all the rows in
+        # `[last_row, ...)` are not known, so only the rows in between need to
+        # be checked.
+        first_row = np.searchsorted(
+            self._knowledge_time_cummax, datetime_eff, side="right"
+        )
+        last_row = np.searchsorted(
+            self._knowledge_time_cummin_from_end, datetime_eff, side="right"
+        )
+        # Restrict to the rows in the requested interval.
+        start_row, end_row = 0, last_row
+        ts_values = self._get_ts_col_index(ts_col_name)
+        if ts_values is not None:
+            if start_ts is not None:
+                hdateti.dassert_tz_compatible_timestamp_with_df(
+                    start_ts, self._df, ts_col_name
+                )
+                side = "left" if left_close else "right"
+                start_row = np.searchsorted(
+                    ts_values, _timestamp_to_int(start_ts), side=side
+                )
+            if end_ts is not None:
+                hdateti.dassert_tz_compatible_timestamp_with_df(
+                    end_ts, self._df, ts_col_name
+                )
+                side = "right" if right_close else "left"
+                end_row = min(
+                    end_row,
+                    np.searchsorted(ts_values, _timestamp_to_int(end_ts), side),
+                )
+        end_row = max(start_row, end_row)
+        first_row = min(max(start_row, first_row), end_row)
+        if asset_ids is not None and self._asset_id_to_rows:
+            asset_ids_set = set(asset_ids)
+            if self._has_missing_asset_ids or not asset_ids_set.issuperset(
+                self._df_asset_ids
+            ):
+                # Collect the rows of the requested assets in the interval.
+                rows = []
+                for asset_id in asset_ids_set:
+                    asset_rows = self._asset_id_to_rows[asset_id]
+                    lo, hi = np.searchsorted(asset_rows, [start_row, end_row])
+                    rows.append(asset_rows[lo:hi])
+                rows = np.sort(np.concatenate(rows))
+                is_known = (rows < first_row) | (
+                    self._knowledge_times[rows] <= datetime_eff
+                )
+                return self._df.iloc[rows[is_known]]
+        if first_row == end_row:
+            # All the rows in the interval are known. Copy the slice, so that
+            # the caller can't modify the data through a view.
+            return self._df.iloc[start_row:end_row].copy()
+        is_known = self._knowledge_times[first_row:end_row] <= datetime_eff
+        rows = np.concatenate(
+            [
+                np.arange(start_row, first_row),
+                first_row + np.flatnonzero(is_known),
+            ]
+        )
+        return self._df.iloc[rows]
+
     def _get_last_end_time(self) -> Optional[pd.Timestamp]:
         # We need to find the last timestamp before the current time. We use
         # `7W` but could also use all the data since we don't call the DB.
-        # TODO(gp): SELECT MAX(start_time) instead of getting all the data
-        #  and then find the max and use `start_time`
         timedelta = pd.Timedelta("7D")
-        df = self.get_data_for_last_period(timedelta)
-        _LOG.debug(
-            hpandas.df_to_str(df, print_shape_info=True, tag="after get_data")
-        )
-        if df.empty:
-            ret = None
+        if self._can_get_last_end_time_from_index():
+            ret = self._get_last_end_time_from_index(timedelta)
         else:
-            ret = df.index.max()
+            df = self.get_data_for_last_period(timedelta)
+            _LOG.debug(
+                hpandas.df_to_str(df, print_shape_info=True, tag="after get_data")
+            )
+            if df.empty:
+                ret = None
+            else:
+                ret = df.index.max()
         _LOG.debug("-> ret=%s", ret)
         return ret
 
+    def _can_get_last_end_time_from_index(self) -> bool:
+        """
+        Return whether `_get_last_end_time_from_index()` can be used.
+        """
+        if self._knowledge_times is None:
+            return False
+        end_times = self._get_ts_col_index(self._end_time_col_name)
+        start_times = self._get_ts_col_index(self._start_time_col_name)
+        if end_times is None or start_times is None:
+            return False
+        # The returned timestamp needs to be converted to the timezone of the
+        # data.
+        dtype = self._df.dtypes[self._end_time_col_name]
+        return isinstance(dtype, pd.DatetimeTZDtype)
+
+    def _get_last_end_time_from_index(
+        self, timedelta: pd.Timedelta
+    ) -> Optional[pd.Timestamp]:
+        """
+        Same as getting the max `end_time` of `get_data_for_last_period()`
+        using the indices.
+
+        Since the df is sorted by `end_time`, the max `end_time` is the one of
+        the last row known at the current time, which is found with binary
+        search checking only the rows whose knowledge time is not sorted.
+        """
+        wall_clock_time = self.get_wall_clock_time()
+        hdateti.dassert_tz_compatible_timestamp_with_df(
+            wall_clock_time, self._df, self._knowledge_datetime_col_name
+        )
+        datetime_eff = wall_clock_time - datetime.timedelta(
+            seconds=self._delay_in_secs
+        )
+        datetime_eff = _timestamp_to_int(datetime_eff)
+        first_row = np.searchsorted(
+            self._knowledge_time_cummax, datetime_eff, side="right"
+        )
+        last_row = np.searchsorted(
+            self._knowledge_time_cummin_from_end, datetime_eff, side="right"
+        )
+        # Restrict to the rows with `start_time` in the last period, i.e., in
+        # `[wall_clock_time - timedelta, wall_clock_time)`.
+        start_times = self._get_ts_col_index(self._start_time_col_name)
+        start_ts = self._process_period(timedelta, wall_clock_time)
+        start_row, end_row = np.searchsorted(
+            start_times,
+            [_timestamp_to_int(start_ts), _timestamp_to_int(wall_clock_time)],
+        )
+        end_row = min(end_row, last_row)
+        if self._asset_ids is not None and self._asset_id_to_rows:
+            hdbg.dassert_is_subset(self._asset_ids, self._df_asset_ids)
+            asset_ids_set = set(self._asset_ids)
+            if self._has_missing_asset_ids or not asset_ids_set.issuperset(
+                self._df_asset_ids
+            ):
+                # Find the last known row of each requested asset.
+                row = -1
+                for asset_id in asset_ids_set:
+                    asset_rows = self._asset_id_to_rows[asset_id]
+                    lo, mid, hi = np.searchsorted(
+                        asset_rows, [start_row, first_row, end_row]
+                    )
+                    mid = min(max(lo, mid), hi)
+                    is_known = (
+                        self._knowledge_times[asset_rows[mid:hi]] <= datetime_eff
+                    )
+                    idxs = np.flatnonzero(is_known)
+                    if idxs.size > 0:
+                        row = max(row, asset_rows[mid + idxs[-1]])
+                    elif mid > lo:
+                        row = max(row, asset_rows[mid - 1])
+                return self._row_to_end_time(row)
+        # All the rows in `[start_row, mid)` are known, so only the rows in
+        # `[mid, end_row)` need to be checked.
+        end_row = max(start_row, end_row)
+        mid = min(max(start_row, first_row), end_row)
+        is_known = self._knowledge_times[mid:end_row] <= datetime_eff
+        idxs = np.flatnonzero(is_known)
+        if idxs.size > 0:
+            row = mid + idxs[-1]
+        elif mid > start_row:
+            row = mid - 1
+        else:
+            row = -1
+        return self._row_to_end_time(row)
+
+    def _row_to_end_time(self, row: int) -> Optional[pd.Timestamp]:
+        """
+        Return the `end_time` of a row or `None` if the row is -1.
+        """
+        if row < 0:
+            return None
+        end_times = self._get_ts_col_index(self._end_time_col_name)
+        end_time = pd.Timestamp(end_times[row], tz="UTC")
+        return end_time.tz_convert(self._timezone)
+
 
 # #############################################################################
 # Serialize / deserialize example of DB.
@@ -1,8 +1,11 @@
 import logging
-from typing import Any, Callable, Tuple, Union
+from typing import Any, Callable, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+import core.finance as cofinanc
+import core.real_time as creatime
 import helpers.hasyncio as hasynci
 import helpers.hdatetime as hdateti
 import helpers.hpandas as hpandas
@@ -733,3 +736,249 @@ class TestReplayedMarketData4(hunitest.TestCase):
                 event_loop=event_loop,
             )
         return start_time, end_time, num_iter
+
+
+class TestReplayedMarketData5(hunitest.TestCase):
+    """
+    Test that `ReplayedMarketData._get_data()` using the indices returns the
+    same data as filtering the entire df.
+    """
+
+    def test_get_data1(self) -> None:
+        """
+        Check data with sorted knowledge times.
+        """
+        df = self._get_df()
+        self._check_get_data(df)
+
+    def test_get_data2(self) -> None:
+        """
+        Check data with unsorted and missing knowledge times.
+        """
+        df = self._get_df()
+        delays = np.random.RandomState(0).randint(0, 180, size=df.shape[0])
+        df["timestamp_db"] += pd.to_timedelta(delays, unit="s")
+        df.loc[df.index[7], "timestamp_db"] = pd.NaT
+        self._check_get_data(df)
+
+    def test_get_data3(self) -> None:
+        """
+        Check that modifying the returned data doesn't modify the replayed df.
+        """
+        df = self._get_df()
+        market_data = mdremada.ReplayedMarketData(
+            df,
+            "timestamp_db",
+            0,
+            "asset_id",
+            [1000, 1001, 1002],
+            "start_datetime",
+            "end_datetime",
+            None,
+            lambda: pd.Timestamp("2000-01-01 10:30:00-05:00"),
+        )
+        expected = market_data._df.copy()
+        actual = market_data._get_data(
+            pd.Timestamp("2000-01-01 09:40:00-05:00"),
+            pd.Timestamp("2000-01-01 10:00:00-05:00"),
+            "end_datetime",
+            None,
+            left_close=True,
+            right_close=False,
+            limit=None,
+            ignore_delay=False,
+        )
+        self.assertFalse(actual.empty)
+        # Modify the data in place.
+        actual.iloc[0, actual.columns.get_loc("last_price")] = -1.0
+        pd.testing.assert_frame_equal(market_data._df, expected)
+
+    @staticmethod
+    def _get_df() -> pd.DataFrame:
+        start_datetime = pd.Timestamp("2000-01-01 09:30:00-05:00")
+        end_datetime = pd.Timestamp("2000-01-01 10:29:00-05:00")
+        df = cofinanc.generate_random_price_data(
+            start_datetime, end_datetime, ["last_price"], [1000, 1001, 1002]
+        )
+        return df
+
+    @staticmethod
+    def _get_expected_data(
+        df: pd.DataFrame,
+        wall_clock_time: pd.Timestamp,
+        delay_in_secs: int,
+        start_ts: pd.Timestamp,
+        end_ts: pd.Timestamp,
+        asset_ids: Optional[List[int]],
+    ) -> pd.DataFrame:
+        """
+        Filter the entire df.
+        """
+        df = creatime.get_data_as_of_datetime(
+            df, "timestamp_db", wall_clock_time, delay_in_secs=delay_in_secs
+        )
+        df = hpandas.trim_df(df, "end_datetime", start_ts, end_ts, True, False)
+        if asset_ids is not None:
+            df = df[df["asset_id"].isin(asset_ids)]
+        return df
+
+    def _check_get_data(self, df: pd.DataFrame) -> None:
+        wall_clock_time = None
+        market_data = mdremada.ReplayedMarketData(
+            df,
+            "timestamp_db",
+            10,
+            "asset_id",
+            [1000, 1001, 1002],
+            "start_datetime",
+            "end_datetime",
+            None,
+            lambda: wall_clock_time,
+        )
+        start_ts = pd.Timestamp("2000-01-01 09:40:00-05:00")
+        end_ts = pd.Timestamp("2000-01-01 10:00:00-05:00")
+        for minutes in [-5, 0, 5, 15, 25, 35, 70]:
+            wall_clock_time = start_ts + pd.Timedelta(minutes=minutes)
+            for asset_ids in [None, [1000, 1001, 1002], [1001], [1002, 1000]]:
+                actual = market_data._get_data(
+                    start_ts,
+                    end_ts,
+                    "end_datetime",
+                    asset_ids,
+                    left_close=True,
+                    right_close=False,
+                    limit=None,
+                    ignore_delay=False,
+                )
+                expected = self._get_expected_data(
+                    market_data._df,
+                    wall_clock_time,
+                    10,
+                    start_ts,
+                    end_ts,
+                    asset_ids,
+                )
+                pd.testing.assert_frame_equal(actual, expected)
+
+
+# #############################################################################
+
+
+class TestReplayedMarketData6(hunitest.TestCase):
+    """
+    Test that `ReplayedMarketData.get_last_end_time()` using the indices
+    returns the same timestamp as the max of the data for the last period.
+    """
+
+    def test_get_last_end_time1(self) -> None:
+        """
+        Check with sorted knowledge times.
+        """
+        df = TestReplayedMarketData5._get_df()
+        self._check_get_last_end_time(df)
+
+    def test_get_last_end_time2(self) -> None:
+        """
+        Check with unsorted and missing knowledge times.
+        """
+        df = TestReplayedMarketData5._get_df()
+        delays = np.random.RandomState(0).randint(0, 180, size=df.shape[0])
+        df["timestamp_db"] += pd.to_timedelta(delays, unit="s")
+        df.loc[df.index[-2], "timestamp_db"] = pd.NaT
+        self._check_get_last_end_time(df)
+
+    def _check_get_last_end_time(self, df: pd.DataFrame) -> None:
+        wall_clock_time = None
+        for asset_ids in [[1000, 1001, 1002], [1001], [1002, 1000]]:
+            market_data = mdremada.ReplayedMarketData(
+                df.copy(),
+                "timestamp_db",
+                10,
+                "asset_id",
+                asset_ids,
+                "start_datetime",
+                "end_datetime",
+                None,
+                lambda: wall_clock_time,
+            )
+            self.assertTrue(market_data._can_get_last_end_time_from_index())
+            for minutes in [-5, 0, 1, 2, 3, 15, 35, 58, 59, 60, 70]:
+                wall_clock_time = pd.Timestamp(
+                    "2000-01-01 09:30:00-05:00"
+                ) + pd.Timedelta(minutes=minutes)
+                actual = market_data.get_last_end_time()
+                # Compute the expected value from the data.
+                df_tmp = market_data.get_data_for_last_period(
+                    pd.Timedelta("7D")
+                )
+                expected = None if df_tmp.empty else df_tmp.index.max()
+                self.assertEqual(actual, expected)
+                if expected is not None:
+                    self.assertEqual(str(actual.tz), "America/New_York")
+
+
+# #############################################################################
+
+
+class TestReplayedMarketData7(hunitest.TestCase):
+    """
+    Test that `get_twap_price_for_intervals()` returns the same prices as
+    `get_twap_price()` for each interval.
+    """
+
+    def test_get_twap_price_for_intervals1(self) -> None:
+        """
+        Check intervals filtering on the end timestamp.
+        """
+        self._check_get_twap_price_for_intervals("end_datetime")
+
+    def test_get_twap_price_for_intervals2(self) -> None:
+        """
+        Check intervals filtering on the start timestamp.
+        """
+        self._check_get_twap_price_for_intervals("start_datetime")
+
+    def _check_get_twap_price_for_intervals(self, ts_col_name: str) -> None:
+        df = TestReplayedMarketData5._get_df()
+        wall_clock_time = pd.Timestamp("2000-01-01 10:00:00-05:00")
+        market_data = mdremada.ReplayedMarketData(
+            df,
+            "timestamp_db",
+            0,
+            "asset_id",
+            [1000, 1001, 1002],
+            "start_datetime",
+            "end_datetime",
+            None,
+            lambda: wall_clock_time,
+        )
+        # Build overlapping intervals, including one without data.
+        asset_ids = [1000, 1001, 1000, 1002, 1001, 1000]
+        start_timestamps = [
+            pd.Timestamp(f"2000-01-01 {hh_mm}:00-05:00")
+            for hh_mm in ["09:30", "09:30", "09:33", "09:45", "09:40", "10:05"]
+        ]
+        end_timestamps = [
+            pd.Timestamp(f"2000-01-01 {hh_mm}:00-05:00")
+            for hh_mm in ["09:35", "09:35", "09:40", "09:50", "09:58", "10:10"]
+        ]
+        actual = market_data.get_twap_price_for_intervals(
+            asset_ids,
+            start_timestamps,
+            end_timestamps,
+            ts_col_name,
+            "last_price",
+        )
+        # Compute the expected prices one interval at a time.
+        expected = []
+        for asset_id, start_ts, end_ts in zip(
+            asset_ids, start_timestamps, end_timestamps
+        ):
+            twap_df = market_data.get_twap_price(
+                start_ts, end_ts, ts_col_name, [asset_id], "last_price"
+            )
+            price = np.nan if twap_df.empty else twap_df["last_price"].iloc[0]
+            expected.append(price)
+        expected = pd.Series(expected, name="last_price")
+        pd.testing.assert_series_equal(actual, expected)
+        self.assertTrue(np.isnan(actual.iloc[-1]))
@@ -292,6 +292,81 @@ def _get_execution_prices(
     return prices
 
 
+def _get_twap_execution_prices(
+    market_data: mdata.MarketData,
+    orders: List[oordorde.Order],
+    *,
+    timestamp_col: str,
+    column_remap: Optional[Dict[str, str]],
+) -> pd.Series:
+    """
+    Get the simulated TWAP execution prices of a list of orders.
+
+    Unlike `_get_execution_prices()`, the orders can have different start and
+    end timestamps (e.g., the child orders of a TWAP schedule) and the prices
+    of all the orders are computed from a single query to `market_data`.
+
+    :param timestamp_col, column_remap: same as in `_get_execution_prices()`
+    :return: a series with the price of each order, in the same order as
+        `orders`
+    """
+    _LOG.debug(hprint.to_str("orders"))
+    hdbg.dassert_lte(1, len(orders))
+    needed_columns = ["bid", "ask", "price", "midpoint"]
+    if column_remap is None:
+        column_remap = {col_name: col_name for col_name in needed_columns}
+    hdbg.dassert_set_eq(column_remap.keys(), needed_columns)
+    # Parse the order type.
+    order_types = {order.type_ for order in orders}
+    hdbg.dassert_eq(len(order_types), 1)
+    order_type = order_types.pop()
+    config = order_type.split("@")
+    hdbg.dassert_eq(len(config), 2, "Invalid type_='%s'", order_type)
+    price_type, timing = config
+    hdbg.dassert_eq(timing, "twap", "Invalid type_='%s'", order_type)
+    asset_ids = [order.asset_id for order in orders]
+    start_timestamps = [order.start_timestamp for order in orders]
+    end_timestamps = [order.end_timestamp for order in orders]
+
+    def _get_twap_prices(column: str) -> pd.Series:
+        # See `_get_price_per_share()` for why the delay is ignored.
+        ignore_delay = True
+        prices = market_data.get_twap_price_for_intervals(
+            asset_ids,
+            start_timestamps,
+            end_timestamps,
+            timestamp_col,
+            column,
+            ignore_delay=ignore_delay,
+        )
+        return prices
+
+    # Get the price depending on the price_type.
+    if price_type in ("price", "midpoint"):
+        column = column_remap[price_type]
+        prices = _get_twap_prices(column)
+    elif price_type.startswith("partial_spread"):
+        perc = float(price_type.split("_")[2])
+        hdbg.dassert_lte(0, perc)
+        hdbg.dassert_lte(perc, 1.0)
+        bids = _get_twap_prices(column_remap["bid"])
+        asks = _get_twap_prices(column_remap["ask"])
+        is_buy = pd.Series(
+            [order.diff_num_shares >= 0 for order in orders], bids.index
+        )
+        is_sell = ~is_buy
+        # See `_get_execution_prices()` for the semantic of `perc`.
+        buy_prices = (1.0 - perc) * bids + perc * asks
+        sell_prices = perc * bids + (1.0 - perc) * asks
+        prices = is_buy * buy_prices + is_sell * sell_prices
+    else:
+        raise ValueError(f"Invalid type='{order_type}'")
+    hdbg.dassert_isinstance(prices, pd.Series)
+    if _TRACE:
+        _LOG.trace("prices=\n%s", hpandas.df_to_str(prices, precision=2))
+    return prices
+
+
 # TODO(Paul): This function allows us to get the execution price for one order
 #   at a time. It supports multiple (but untested) ways of doing this. Consider
 #   vectorizing this code or else adding a switch to invoke order-by-order
@@ -513,14 +588,24 @@ def fill_orders_fully_twap(
     )
     # Split the orders in child orders over the period of time.
     child_orders = _split_in_child_twap_orders(orders, freq_as_pd_string)
-    #
+    # Get the prices of all the child orders at once, instead of querying
+    # `market_data` for each child order.
+    prices = _get_twap_execution_prices(
+        market_data,
+        child_orders,
+        timestamp_col=timestamp_col,
+        column_remap=column_remap,
+    )
     fills = []
-    for order in child_orders:
-        fills_tmp = fill_orders_fully_at_once(
-            market_data, timestamp_col, column_remap, [order]
+    for order, price in zip(child_orders, prices.to_numpy()):
+        _LOG.debug(hprint.to_str("order"))
+        hdbg.dassert(np.isfinite(price), "Unable to fill order=\n%s", order)
+        # Build the corresponding fill.
+        fill = omfill.Fill(
+            order, order.end_timestamp, order.diff_num_shares, price
         )
-        hdbg.dassert_eq(len(fills_tmp), 1)
-        fills.append(fills_tmp[0])
+        _LOG.debug(hprint.to_str("fill"))
+        fills.append(fill)
     return fills
 
 
@@ -4,6 +4,7 @@ Import as:
 import oms.broker.ccxt.ccxt_logger as obcccclo
 """
 
+import atexit
 import logging
 import os
 from typing import Any, Callable, Dict, List, Optional, Union
@@ -18,6 +19,7 @@ import helpers.hdbg as hdbg
 import helpers.hio as hio
 import helpers.hprint as hprint
 import helpers.hwall_clock_time as hwacltim
+import oms.broker.ccxt.ccxt_segment_log as obcccselo
 import oms.fill as omfill
 import oms.order.order as oordorde
 
@@ -39,18 +41,17 @@ def load_oms_fills(logs_dir: str) -> List[List[omfill.Fill]]:
     # Initialize logger.
     logger = CcxtLogger(logs_dir, mode="read")
     # Read OMS fills and OMS parent orders from logs.
-    oms_fills_file_paths = logger._get_files(logger._oms_fills_dir)
+    oms_fills_data = logger._load_raw_data(logger._oms_fills_dir)
     oms_parent_orders_file_paths = logger._get_files(
         logger._oms_parent_orders_dir, file_extension="json"
     )
-    # `Fills` and `Orders` should have equal number of file paths.
-    hdbg.dassert_eq(len(oms_fills_file_paths), len(oms_parent_orders_file_paths))
+    # `Fills` and `Orders` should have equal number of files.
+    hdbg.dassert_eq(len(oms_fills_data), len(oms_parent_orders_file_paths))
     oms_fills = []
-    for order_path, fill_path in zip(
-        oms_parent_orders_file_paths, oms_fills_file_paths
+    for order_path, fills_data in zip(
+        oms_parent_orders_file_paths, oms_fills_data
     ):
         orders_data = hio.from_json(order_path, use_types=True)
-        fills_data = hio.from_json(fill_path, use_types=True)
         for order_data, fill_data in zip(orders_data, fills_data):
             # Get OMS `Order`.
             order = oordorde.Order(
@@ -86,6 +87,10 @@ class CcxtLogger:
 
     For more info on logs structure, see
     `docs/trade_execution/ck.ccxt_broker_logs_schema.reference.md`
+
+    Child orders, CCXT order responses, fills and trades can be logged either
+    as one JSON file per record or appended to segment files (see
+    `ccxt_segment_log.py`). The reader supports both formats.
     """
 
     # Default locations of log files.
@@ -108,7 +113,13 @@ class CcxtLogger:
     BROKER_CONFIG = "broker_config.json"
     ARGS_FILE = "args.json"
 
-    def __init__(self, log_dir: str, *, mode: str = "read"):
+    def __init__(
+        self,
+        log_dir: str,
+        *,
+        mode: str = "read",
+        log_format: str = "json_files",
+    ):
         """
         Constructor.
 
@@ -117,9 +128,21 @@ class CcxtLogger:
         :param mode: there are two modes:
             - write: the logger will write log files in `log_dir`
             - read: the logger will read log files from `log_dir`
+        :param log_format: format used to write child orders, CCXT order
+            responses, fills and trades
+            - "json_files": write one JSON file per record
+            - "jsonl_segments": append records to rotated segment files from a
+              background thread
         """
         self._log_dir = log_dir
         hdbg.dassert_is_not(self._log_dir, None)
+        hdbg.dassert_in(log_format, ["json_files", "jsonl_segments"])
+        self._log_format = log_format
+        self._segment_writer = None
+        if mode == "write" and log_format == "jsonl_segments":
+            self._segment_writer = obcccselo.SegmentLogWriter()
+            # Write the enqueued records before the interpreter exits.
+            atexit.register(self._segment_writer.close)
         if mode == "read":
             fields = [
                 "args",
@@ -227,24 +250,32 @@ class CcxtLogger:
             "extra_params"
         ].get("ccxt_id", -1)
         # Get current timestamp and bar.
+        wall_clock_time = get_wall_clock_time()
         wall_clock_time_str = hdateti.timestamp_to_str(
-            get_wall_clock_time(), include_msec=True
+            wall_clock_time, include_msec=True
         )
         bar_timestamp = hwacltim.get_current_bar_timestamp(
             as_str=True, include_msec=True
         )
         order_asset_id = logged_oms_child_order["asset_id"]
+        # The records are indexed by CCXT id.
+        ccxt_ids = logged_oms_child_order["ccxt_id"]
+        if not isinstance(ccxt_ids, list):
+            ccxt_ids = [ccxt_ids]
         # 1) Save OMS child orders.
-        incremental = True
         oms_order_log_dir = os.path.join(
             child_orders_log_dir, self.OMS_CHILD_ORDERS
         )
-        hio.create_dir(oms_order_log_dir, incremental)
         oms_order_file_name = (
             f"{order_asset_id}_{bar_timestamp}.{wall_clock_time_str}.json"
         )
-        oms_order_file_name = os.path.join(oms_order_log_dir, oms_order_file_name)
-        hio.to_json(oms_order_file_name, logged_oms_child_order, use_types=True)
+        self._write_record(
+            oms_order_log_dir,
+            oms_order_file_name,
+            wall_clock_time,
+            ccxt_ids,
+            logged_oms_child_order,
+        )
         _LOG.debug(
             "Saved OMS child orders log file %s",
             hprint.to_str("oms_order_file_name"),
@@ -253,12 +284,16 @@ class CcxtLogger:
         ccxt_log_dir = os.path.join(
             child_orders_log_dir, self.CCXT_CHILD_ORDER_RESPONSE
         )
-        hio.create_dir(ccxt_log_dir, incremental)
         response_file_name = (
             f"{order_asset_id}_{bar_timestamp}.{wall_clock_time_str}.json"
         )
-        response_file_name = os.path.join(ccxt_log_dir, response_file_name)
-        hio.to_json(response_file_name, ccxt_child_order_response, use_types=True)
+        self._write_record(
+            ccxt_log_dir,
+            response_file_name,
+            wall_clock_time,
+            ccxt_ids,
+            ccxt_child_order_response,
+        )
         _LOG.debug(
             "Saved CCXT child order response log file %s",
             hprint.to_str("response_file_name"),
@@ -287,12 +322,18 @@ class CcxtLogger:
         hio.create_dir(fills_log_dir, incremental=True)
         # Save CCXT fills, e.g.,
         # log_dir/child_order_fills/ccxt_fills/ccxt_fills_20230511-114405.json
-        timestamp_str = hdateti.timestamp_to_str(get_wall_clock_time())
-        ccxt_fills_file_name = os.path.join(
-            self._log_dir, self.CCXT_FILLS, f"ccxt_fills_{timestamp_str}.json"
-        )
+        wall_clock_time = get_wall_clock_time()
+        timestamp_str = hdateti.timestamp_to_str(wall_clock_time)
+        ccxt_fills_file_name = f"ccxt_fills_{timestamp_str}.json"
         _LOG.debug(hprint.to_str("ccxt_fills_file_name"))
-        hio.to_json(ccxt_fills_file_name, ccxt_fills, use_types=True)
+        ccxt_ids = [ccxt_fill.get("id") for ccxt_fill in ccxt_fills]
+        self._write_record(
+            os.path.join(self._log_dir, self.CCXT_FILLS),
+            ccxt_fills_file_name,
+            wall_clock_time,
+            ccxt_ids,
+            ccxt_fills,
+        )
 
     def log_ccxt_trades(
         self,
@@ -312,16 +353,21 @@ class CcxtLogger:
         """
         fills_log_dir = os.path.join(self._log_dir, self.CCXT_CHILD_ORDER_FILLS)
         hio.create_dir(fills_log_dir, incremental=True)
-        timestamp_str = hdateti.timestamp_to_str(wall_clock_time())
+        timestamp = wall_clock_time()
+        timestamp_str = hdateti.timestamp_to_str(timestamp)
         # Save CCXT trades, e.g.,
         # log_dir/child_order_fills/ccxt_trades/ccxt_trades_20230511-114405.json
-        ccxt_trades_file_name = os.path.join(
-            self._log_dir,
-            self.CCXT_CHILD_ORDER_TRADES,
-            f"ccxt_trades_{timestamp_str}.json",
-        )
+        ccxt_trades_file_name = f"ccxt_trades_{timestamp_str}.json"
         _LOG.debug(hprint.to_str("ccxt_trades_file_name"))
-        hio.to_json(ccxt_trades_file_name, ccxt_trades, use_types=True)
+        # A trade refers to the CCXT id of its order.
+        ccxt_ids = [ccxt_trade.get("order") for ccxt_trade in ccxt_trades]
+        self._write_record(
+            os.path.join(self._log_dir, self.CCXT_CHILD_ORDER_TRADES),
+            ccxt_trades_file_name,
+            timestamp,
+            ccxt_ids,
+            ccxt_trades,
+        )
 
     def log_oms_fills(
         self, get_wall_clock_time: Callable, oms_fills: List[omfill.Fill]
@@ -343,14 +389,18 @@ class CcxtLogger:
         # log_dir/child_order_fills/oms_fills/oms_fills_20230511-114405.json
         if oms_fills:
             oms_fills = [fill.to_dict() for fill in oms_fills]
-        timestamp_str = hdateti.timestamp_to_str(get_wall_clock_time())
-        oms_fills_file_name = os.path.join(
-            self._log_dir,
-            self.OMS_FILLS,
-            f"oms_fills_{timestamp_str}.json",
-        )
+        wall_clock_time = get_wall_clock_time()
+        timestamp_str = hdateti.timestamp_to_str(wall_clock_time)
+        oms_fills_file_name = f"oms_fills_{timestamp_str}.json"
         _LOG.debug(hprint.to_str("oms_fills_file_name"))
-        hio.to_json(oms_fills_file_name, oms_fills, use_types=True)
+        # OMS fills don't have a CCXT id.
+        self._write_record(
+            os.path.join(self._log_dir, self.OMS_FILLS),
+            oms_fills_file_name,
+            wall_clock_time,
+            [],
+            oms_fills,
+        )
 
     # TODO(gp): Reorganize the format to be a bit regular
     # 1) always OMS data before than CCXT
@@ -530,6 +580,20 @@ class CcxtLogger:
         file_name_tag = "balance"
         self._log_raw_data(dir_name, file_name_tag, get_wall_clock_time, balance)
 
+    def flush(self) -> None:
+        """
+        Block until all the logged records are written.
+        """
+        if self._segment_writer is not None:
+            self._segment_writer.flush()
+
+    def close(self) -> None:
+        """
+        Write all the logged records and stop logging.
+        """
+        if self._segment_writer is not None:
+            self._segment_writer.close()
+
     # #########################################################################
     # Read logs
     # #########################################################################
@@ -1867,6 +1931,34 @@ class CcxtLogger:
         trades = trades.set_index("timestamp", drop=False)
         return trades
 
+    def _write_record(
+        self,
+        dir_name: str,
+        file_name: str,
+        wall_clock_time: pd.Timestamp,
+        ccxt_ids: List[Any],
+        data: Any,
+    ) -> None:
+        """
+        Write a record in the log format of the logger.
+
+        :param dir_name: dir to store the record in
+        :param file_name: name of the JSON file storing the record
+        :param wall_clock_time: time when the record is logged
+        :param ccxt_ids: CCXT ids of the orders the record refers to, used to
+            index the record in the segments
+        :param data: data to log
+        """
+        if self._log_format == "json_files":
+            file_path = os.path.join(dir_name, file_name)
+            hio.to_json(file_path, data, use_types=True)
+        elif self._log_format == "jsonl_segments":
+            self._segment_writer.write(
+                dir_name, file_name, wall_clock_time, ccxt_ids, data
+            )
+        else:
+            raise ValueError(f"Invalid log_format='{self._log_format}'")
+
     def _log_raw_data(
         self,
         dir_name: str,
@@ -1898,15 +1990,25 @@ class CcxtLogger:
         append_list: bool = True,
     ) -> List[Dict[str, Any]]:
         """
-        Load raw data from the JSON files in the log directory.
+        Load raw data from the JSON files and the segments in the log
+        directory.
 
         :param append_list: Set to True for DataFrame.extend() or False
             for DataFrame.append().
         """
         files = self._get_files(dir_name)
-        data_list = []
+        # Load the records stored as JSON files.
+        records = []
         for path in tqdm(files, desc=f"Loading '{dir_name}'"):
+            if obcccselo.is_segment_file(path):
+                continue
             data = hio.from_json(path, use_types=True)
+            records.append((os.path.basename(path), data))
+        # Load the records stored in segments.
+        records.extend(obcccselo.load_segment_records(dir_name))
+        records.sort(key=lambda record: record[0])
+        data_list = []
+        for _, data in records:
             if append_list:
                 data_list.append(data)
             else:
@@ -0,0 +1,312 @@
+"""
+Append-only segment files for `CcxtLogger`.
+
+Instead of writing one JSON file per logged record, records are appended as
+JSON lines to segment files that are rotated when they reach a given size, e.g.,
+```
+{log_dir}/oms_child_orders/segment.000000.jsonl
+{log_dir}/oms_child_orders/segment.000000.index.csv
+{log_dir}/oms_child_orders/segment.000001.jsonl
+...
+```
+Each line of a segment stores the name of the file that the record would have
+in the file-per-record format and the data, so that the records are loaded in
+the same order and with the same content in both formats.
+
+Each segment has an index with one row per record and order id, storing the
+location of the record in the segment, the wall clock time when the record
+was logged and the order id, so that a subset of the records can be loaded
+without parsing all the segments.
+
+Import as:
+
+import oms.broker.ccxt.ccxt_segment_log as obcccselo
+"""
+
+import csv
+import glob
+import logging
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import helpers.hdbg as hdbg
+import helpers.hio as hio
+
+_LOG = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "segment"
+SEGMENT_EXTENSION = ".jsonl"
+INDEX_EXTENSION = ".index.csv"
+INDEX_COLS = ["file_name", "offset", "length", "timestamp", "order_id"]
+
+
+def is_segment_file(file_name: str) -> bool:
+    """
+    Return whether `file_name` is a segment or a segment index file.
+    """
+    base_name = os.path.basename(file_name)
+    is_segment = base_name.startswith(SEGMENT_PREFIX + ".") and (
+        base_name.endswith(SEGMENT_EXTENSION)
+        or base_name.endswith(INDEX_EXTENSION)
+    )
+    return is_segment
+
+
+def _get_segment_paths(dir_name: str) -> List[str]:
+    pattern = os.path.join(dir_name, f"{SEGMENT_PREFIX}.*{SEGMENT_EXTENSION}")
+    paths = sorted(glob.glob(pattern))
+    return paths
+
+
+def _get_index_path(segment_path: str) -> str:
+    hdbg.dassert(segment_path.endswith(SEGMENT_EXTENSION), segment_path)
+    index_path = segment_path[: -len(SEGMENT_EXTENSION)] + INDEX_EXTENSION
+    return index_path
+
+
+# #############################################################################
+# SegmentLogWriter
+# #############################################################################
+
+
+class SegmentLogWriter:
+    """
+    Append records to rotated segment files from a background thread.
+
+    The records are serialized by the caller, so that they are not affected by
+    later changes to the logged objects, while the file IO happens in a
+    background thread, so that logging doesn't block the caller (e.g., the
+    asyncio loop of the broker).
+    """
+
+    def __init__(self, *, max_segment_size_in_bytes: int = 64 * 1024**2):
+        """
+        Constructor.
+
+        :param max_segment_size_in_bytes: a new segment is started when the
+            current one exceeds this size
+        """
+        hdbg.dassert_lt(0, max_segment_size_in_bytes)
+        self._max_segment_size_in_bytes = max_segment_size_in_bytes
+        # Map a dir to the segment file, the index file, the index CSV writer
+        # and the size of its current segment.
+        self._segments: Dict[str, Tuple[Any, Any, Any, int]] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(
+        self,
+        dir_name: str,
+        file_name: str,
+        timestamp: pd.Timestamp,
+        order_ids: List[Any],
+        data: Any,
+    ) -> None:
+        """
+        Enqueue a record to be appended to the segments in `dir_name`.
+
+        :param dir_name: dir storing the segments
+        :param file_name: name of the file storing the record in the
+            file-per-record format
+        :param timestamp: wall clock time when the record is logged
+        :param order_ids: ids of the orders the record refers to, used to
+            index the record
+        :param data: data to log
+        """
+        import jsonpickle
+
+        self._raise_if_failed()
+        hdbg.dassert_not_in("\n", file_name)
+        record = jsonpickle.encode({"file_name": file_name, "data": data})
+        self._queue.put((dir_name, file_name, timestamp, order_ids, record))
+
+    def flush(self) -> None:
+        """
+        Block until all the enqueued records are written.
+        """
+        self._queue.join()
+        self._raise_if_failed()
+
+    def close(self) -> None:
+        """
+        Write all the enqueued records and close the segments.
+        """
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_if_failed()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Writing the segments failed") from self._error
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    for segment_file, index_file, _, _ in self._segments.values():
+                        segment_file.close()
+                        index_file.close()
+                    self._segments = {}
+                    return
+                if self._error is None:
+                    self._append(*item)
+            except Exception as e:  # pylint: disable=broad-except
+                _LOG.exception("Error writing the segments")
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _append(
+        self,
+        dir_name: str,
+        file_name: str,
+        timestamp: pd.Timestamp,
+        order_ids: List[Any],
+        record: str,
+    ) -> None:
+        if dir_name not in self._segments:
+            self._open_new_segment(dir_name)
+        segment_file, index_file, index_writer, size = self._segments[dir_name]
+        data = (record + "\n").encode("utf-8")
+        segment_file.write(data)
+        segment_file.flush()
+        # Index the record only after it has been written, so that the index
+        # never points to an incomplete record.
+        timestamp_str = pd.Timestamp(timestamp).isoformat()
+        if not order_ids:
+            order_ids = [""]
+        for order_id in order_ids:
+            index_writer.writerow(
+                [file_name, size, len(data), timestamp_str, order_id]
+            )
+        index_file.flush()
+        size += len(data)
+        self._segments[dir_name] = (segment_file, index_file, index_writer, size)
+        if size >= self._max_segment_size_in_bytes:
+            segment_file.close()
+            index_file.close()
+            self._open_new_segment(dir_name)
+
+    def _open_new_segment(self, dir_name: str) -> None:
+        """
+        Open a new segment after the ones already in `dir_name`.
+        """
+        hio.create_dir(dir_name, incremental=True)
+        paths = _get_segment_paths(dir_name)
+        if paths:
+            # E.g., `segment.000001.jsonl`.
+            last_idx = int(os.path.basename(paths[-1]).split(".")[1])
+            idx = last_idx + 1
+        else:
+            idx = 0
+        segment_path = os.path.join(
+            dir_name, f"{SEGMENT_PREFIX}.{idx:06d}{SEGMENT_EXTENSION}"
+        )
+        index_path = _get_index_path(segment_path)
+        # Never overwrite an existing segment.
+        hdbg.dassert_path_not_exists(segment_path)
+        segment_file = open(segment_path, "ab")
+        index_file = open(index_path, "a", newline="")
+        index_writer = csv.writer(index_file)
+        index_writer.writerow(INDEX_COLS)
+        index_file.flush()
+        self._segments[dir_name] = (segment_file, index_file, index_writer, 0)
+
+
+# #############################################################################
+# Read segments
+# #############################################################################
+
+
+def build_segment_index(dir_name: str) -> pd.DataFrame:
+    """
+    Build the index of the records stored in the segments of `dir_name`.
+
+    :return: dataframe with one row per record and order id, e.g.,
+        ```
+                                              file_name  offset  length  \
+        0  1464553467_20230315_123500.20230315_123538.json       0    1532
+        1  1464553467_20230315_123500.20230315_123539.json    1532    1527
+
+                                 timestamp    order_id  \
+        0 2023-03-15 12:35:38.000000+00:00  7954906695
+        1 2023-03-15 12:35:39.000000+00:00  7954906696
+
+                               segment
+        0  .../segment.000000.jsonl
+        1  .../segment.000000.jsonl
+        ```
+    """
+    dfs = []
+    for segment_path in _get_segment_paths(dir_name):
+        index_path = _get_index_path(segment_path)
+        if not os.path.exists(index_path):
+            _LOG.warning("Missing index for segment '%s'", segment_path)
+            continue
+        df = pd.read_csv(index_path, dtype={"file_name": str, "order_id": str})
+        df["segment"] = segment_path
+        dfs.append(df)
+    if not dfs:
+        df = pd.DataFrame(columns=INDEX_COLS + ["segment"])
+    else:
+        df = pd.concat(dfs, ignore_index=True)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    df["order_id"] = df["order_id"].fillna("")
+    return df
+
+
+def load_segment_records(
+    dir_name: str,
+    *,
+    order_ids: Optional[List[Any]] = None,
+    start_timestamp: Optional[pd.Timestamp] = None,
+    end_timestamp: Optional[pd.Timestamp] = None,
+) -> List[Tuple[str, Any]]:
+    """
+    Load the records stored in the segments of `dir_name`.
+
+    Only the records selected through the index are read and parsed.
+
+    :param order_ids: load only the records referring to these order ids; if
+        `None`, do not filter by order id
+    :param start_timestamp: load only the records logged at or after this time
+    :param end_timestamp: load only the records logged at or before this time
+    :return: pairs of file name in the file-per-record format and data, sorted
+        by file name
+    """
+    import jsonpickle
+
+    index = build_segment_index(dir_name)
+    if order_ids is not None:
+        order_ids = [str(order_id) for order_id in order_ids]
+        index = index[index["order_id"].isin(order_ids)]
+    if start_timestamp is not None:
+        index = index[index["timestamp"] >= start_timestamp]
+    if end_timestamp is not None:
+        index = index[index["timestamp"] <= end_timestamp]
+    # A record indexed by multiple order ids is loaded once.
+    index = index.drop_duplicates(subset=["segment", "offset"])
+    # Read the records in order of position in each segment.
+    records = []
+    for segment_path, segment_index in index.groupby("segment", sort=True):
+        segment_index = segment_index.sort_values("offset")
+        with open(segment_path, "rb") as f:
+            for offset, length in zip(
+                segment_index["offset"], segment_index["length"]
+            ):
+                f.seek(offset)
+                txt = f.read(length).decode("utf-8")
+                record = jsonpickle.decode(txt)
+                records.append((record["file_name"], record["data"]))
+    # Sort in the same order as the files in the file-per-record format.
+    records.sort(key=lambda record: record[0])
+    return records
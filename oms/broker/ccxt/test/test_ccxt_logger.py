@@ -16,6 +16,7 @@ import helpers.hsystem as hsystem
 import helpers.hunit_test as hunitest
 import oms.broker.ccxt.abstract_ccxt_broker as obcaccbr
 import oms.broker.ccxt.ccxt_logger as obcccclo
+import oms.broker.ccxt.ccxt_segment_log as obcccselo
 import oms.fill as omfill
 import oms.order.order as oordorde
 
@@ -2792,6 +2793,78 @@ class TestCcxtLogger2(hunitest.TestCase):
         self.assert_equal(actual, expected_ccxt_order_response, fuzzy_match=True)
 
 
+class TestCcxtLogger3(hunitest.TestCase):
+    """
+    Check logging with `log_format="jsonl_segments"`.
+    """
+
+    def test_load_ccxt_trades_df1(self) -> None:
+        """
+        Check that the trades logged in segments are loaded like the ones
+        logged as JSON files.
+        """
+        expected = self._log_and_load_ccxt_trades("json_files")
+        actual = self._log_and_load_ccxt_trades("jsonl_segments")
+        expected = hpandas.df_to_str(expected, num_rows=None)
+        actual = hpandas.df_to_str(actual, num_rows=None)
+        self.assert_equal(actual, expected)
+
+    def test_load_segment_records1(self) -> None:
+        """
+        Check loading the trades of some orders through the segment index.
+        """
+        log_dir = self.get_scratch_space()
+        self._log_ccxt_trades(log_dir, "jsonl_segments")
+        trades_dir = os.path.join(
+            log_dir, obcccclo.CcxtLogger.CCXT_CHILD_ORDER_TRADES
+        )
+        records = obcccselo.load_segment_records(
+            trades_dir, order_ids=[7954913312, 8077704766]
+        )
+        # Each record is a list of trades, so the trades of the other orders in
+        # the same records are loaded as well.
+        actual = [
+            (file_name, [trade["order"] for trade in trades])
+            for file_name, trades in records
+        ]
+        actual = pprint.pformat(actual)
+        expected = r"""
+        [('ccxt_trades_20230315_123500.json', [7954906695, 7954913312]),
+        ('ccxt_trades_20230315_123503.json', [8077704766, 8889302610])]
+        """
+        self.assert_equal(actual, expected, fuzzy_match=True)
+        # Filter by the time when the records were logged.
+        records = obcccselo.load_segment_records(
+            trades_dir,
+            start_timestamp=pd.Timestamp("2023-03-15 12:35:02", tz="UTC"),
+        )
+        actual = [file_name for file_name, _ in records]
+        expected = [
+            "ccxt_trades_20230315_123502.json",
+            "ccxt_trades_20230315_123503.json",
+        ]
+        self.assertEqual(actual, expected)
+
+    @staticmethod
+    def _log_ccxt_trades(log_dir: str, log_format: str) -> None:
+        """
+        Log the dummy CCXT trades, one list of trades per second.
+        """
+        logger = obcccclo.CcxtLogger(log_dir, mode="write", log_format=log_format)
+        for i, ccxt_trades in enumerate(_get_dummy_ccxt_trades()):
+            timestamp = pd.Timestamp("2023-03-15 12:35:00", tz="UTC")
+            timestamp += pd.Timedelta(seconds=i)
+            logger.log_ccxt_trades(lambda: timestamp, ccxt_trades)
+        logger.close()
+
+    def _log_and_load_ccxt_trades(self, log_format: str) -> pd.DataFrame:
+        log_dir = os.path.join(self.get_scratch_space(), log_format)
+        self._log_ccxt_trades(log_dir, log_format)
+        reader = obcccclo.CcxtLogger(log_dir)
+        ccxt_trades = reader.load_ccxt_trades(convert_to_dataframe=True)
+        return ccxt_trades
+
+
 @pytest.mark.skip("CMTask5079: Disabled due to obsolete data format.")
 class Test_read_rt_data1(hunitest.TestCase):
     """
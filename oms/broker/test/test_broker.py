@@ -344,3 +344,86 @@ class Test_fill_orders1(hunitest.TestCase):
         # There should be no difference.
         asset_ids = [101, 102]
         self.helper(asset_ids, order, mode, exp)
+
+
+# #############################################################################
+# Test_fill_orders_fully_twap1
+# #############################################################################
+
+
+class Test_fill_orders_fully_twap1(hunitest.TestCase):
+    """
+    Check that `fill_orders_fully_twap()` computes the same fills as filling
+    each child order separately.
+    """
+
+    def test1(self) -> None:
+        """
+        Test:
+        - type_ = "price@twap"
+        """
+        type_ = "price@twap"
+        self.helper(type_)
+
+    def test2(self) -> None:
+        """
+        Test:
+        - type_ = "partial_spread_0.25@twap"
+        """
+        type_ = "partial_spread_0.25@twap"
+        self.helper(type_)
+
+    def helper(self, type_: str) -> None:
+        asset_ids = [101, 102, 103]
+        start_timestamp = pd.Timestamp("2000-01-01 09:30:00-05:00")
+        end_timestamp = pd.Timestamp("2000-01-01 09:40:00-05:00")
+        orders = [
+            oordorde.Order(
+                start_timestamp,
+                asset_id,
+                type_,
+                start_timestamp,
+                end_timestamp,
+                0,
+                diff_num_shares,
+            )
+            for asset_id, diff_num_shares in zip(asset_ids, [100, -30, 10])
+        ]
+        timestamp_col = "end_datetime"
+        column_remap = None
+        freq_as_pd_string = "2T"
+        with hasynci.solipsism_context() as event_loop:
+            market_data, _ = mdata.get_ReplayedTimeMarketData_example5(
+                event_loop,
+                pd.Timestamp("2000-01-01 09:29:00-05:00"),
+                pd.Timestamp("2000-01-01 10:30:00-05:00"),
+                asset_ids,
+                replayed_delay_in_mins_or_timestamp=end_timestamp,
+                use_midpoint_as_price=True,
+            )
+            fills = obrobrok.fill_orders_fully_twap(
+                market_data,
+                timestamp_col,
+                column_remap,
+                orders,
+                freq_as_pd_string=freq_as_pd_string,
+            )
+            # Fill each child order separately.
+            child_orders = obrobrok._split_in_child_twap_orders(
+                orders, freq_as_pd_string
+            )
+            expected_fills = []
+            for order in child_orders:
+                expected_fills.extend(
+                    obrobrok.fill_orders_fully_at_once(
+                        market_data, timestamp_col, column_remap, [order]
+                    )
+                )
+        # Check.
+        self.assertEqual(len(fills), 15)
+        self.assertEqual(len(fills), len(expected_fills))
+        for fill, expected_fill in zip(fills, expected_fills):
+            self.assertEqual(fill.order.asset_id, expected_fill.order.asset_id)
+            self.assertEqual(fill.timestamp, expected_fill.timestamp)
+            self.assertEqual(fill.num_shares, expected_fill.num_shares)
+            self.assertAlmostEqual(fill.price, expected_fill.price)
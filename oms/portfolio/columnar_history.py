@@ -0,0 +1,301 @@
+"""
+Import as:
+
+import oms.portfolio.columnar_history as opocohis
+"""
+
+import logging
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+import helpers.hdbg as hdbg
+import helpers.hobject as hobject
+
+_LOG = logging.getLogger(__name__)
+
+
+# #############################################################################
+# ColumnarHistory
+# #############################################################################
+
+
+class ColumnarHistory(hobject.PrintableMixin):
+    """
+    Store snapshots of per-asset values keyed by increasing timestamps.
+
+    This is a columnar version of a `KeySortedOrderedDict` from timestamp to a
+    `pd.Series` indexed by asset id (or to a `pd.DataFrame` indexed by asset id
+    with `value_cols` as columns), e.g.,
+    ```
+                               101    202
+    2000-01-01 09:35:00-05:00  10.0  -20.0
+    2000-01-01 09:40:00-05:00  15.0  -20.0
+    ```
+    - the values are stored in arrays with shape `(num_keys, num_asset_ids)`
+      that are preallocated and grown in chunks, so that storing a snapshot is
+      O(1) amortized
+    - the history is returned as a dataframe built on top of the arrays,
+      instead of concatenating all the snapshots
+    - each snapshot stores the id of its layout (i.e., the asset ids in the
+      order of the snapshot index), so that a snapshot is returned exactly as
+      it was stored
+    """
+
+    def __init__(
+        self,
+        max_keys: Optional[int] = None,
+        *,
+        value_cols: Optional[List[str]] = None,
+        initial_capacity: int = 128,
+    ):
+        """
+        Constructor.
+
+        :param max_keys: maximum number of snapshots to store; the oldest
+            snapshots are evicted first; if `None`, store all the snapshots
+        :param value_cols: columns of the snapshot dataframes; if `None`, the
+            snapshots are series
+        :param initial_capacity: number of snapshots to preallocate
+        """
+        if max_keys is not None:
+            hdbg.dassert_lte(1, max_keys)
+        hdbg.dassert_lte(1, initial_capacity)
+        self._max_keys = max_keys
+        self._value_cols = value_cols
+        num_value_cols = 1 if value_cols is None else len(value_cols)
+        # Asset ids in order of first appearance.
+        self._columns: List[Hashable] = []
+        self._column_to_pos: Dict[Hashable, int] = {}
+        self._columns_index = pd.Index([])
+        # Layouts of the snapshots, as the array positions of their asset ids.
+        self._layouts: List[np.ndarray] = []
+        self._asset_ids_to_layout_id: Dict[Tuple[Hashable, ...], int] = {}
+        # Index and layout id of the last stored snapshot, to skip the lookup
+        # when the asset ids don't change.
+        self._last_index: Optional[pd.Index] = None
+        self._last_layout_id: Optional[int] = None
+        # Preallocated storage with one row per snapshot.
+        self._values = [
+            np.full((initial_capacity, 0), np.nan) for _ in range(num_value_cols)
+        ]
+        self._layout_ids = np.zeros(initial_capacity, dtype=np.int64)
+        self._timestamps = np.zeros(initial_capacity, dtype=np.int64)
+        self._tz = None
+        # The stored snapshots are in the rows `[self._start, self._end)`.
+        self._start = 0
+        self._end = 0
+        # Map each key to its position in the sequence of all the keys ever
+        # stored. Row = position - `self._offset`.
+        self._key_to_pos: Dict[pd.Timestamp, int] = {}
+        self._offset = 0
+        self._last_key: Optional[pd.Timestamp] = None
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __contains__(self, key: pd.Timestamp) -> bool:
+        hdbg.dassert_isinstance(key, pd.Timestamp)
+        return key in self._key_to_pos
+
+    def __getitem__(self, key: pd.Timestamp) -> Union[pd.Series, pd.DataFrame]:
+        """
+        Return the snapshot stored at `key`.
+        """
+        hdbg.dassert_isinstance(key, pd.Timestamp)
+        row = self._key_to_pos[key] - self._offset
+        pos = self._layouts[self._layout_ids[row]]
+        index = self._get_columns(pos)
+        if self._value_cols is None:
+            value = pd.Series(self._values[0][row, pos], index=index, name=key)
+        else:
+            data = {
+                col: values[row, pos]
+                for col, values in zip(self._value_cols, self._values)
+            }
+            value = pd.DataFrame(data, index=index, columns=self._value_cols)
+        return value
+
+    def __setitem__(
+        self, key: pd.Timestamp, value: Union[pd.Series, pd.DataFrame]
+    ) -> None:
+        """
+        Store the snapshot `value` at `key`.
+
+        `key` must be greater than all the stored keys.
+        """
+        hdbg.dassert_isinstance(key, pd.Timestamp)
+        if self._last_key is not None:
+            hdbg.dassert_lt(self._last_key, key)
+        if self._value_cols is None:
+            hdbg.dassert_isinstance(value, pd.Series)
+        else:
+            hdbg.dassert_isinstance(value, pd.DataFrame)
+            hdbg.dassert_is_subset(self._value_cols, value.columns)
+        hdbg.dassert(not value.index.has_duplicates)
+        layout_id = self._get_layout_id(value.index)
+        if self._end == self._layout_ids.shape[0]:
+            self._grow()
+        row = self._end
+        pos = self._layouts[layout_id]
+        for values, col in zip(self._values, self._value_cols or [None]):
+            srs = value if col is None else value[col]
+            values[row, pos] = srs.to_numpy(dtype=np.float64, na_value=np.nan)
+        self._layout_ids[row] = layout_id
+        if self._tz is None:
+            self._tz = key.tz
+        self._timestamps[row] = key.value
+        self._key_to_pos[key] = row + self._offset
+        self._last_key = key
+        self._end += 1
+        # Evict the oldest snapshot, if needed.
+        if self._max_keys is not None and len(self) > self._max_keys:
+            first_key = self._get_index(self._start, self._start + 1)[0]
+            del self._key_to_pos[first_key]
+            self._start += 1
+
+    def peek(self) -> Tuple[pd.Timestamp, Union[pd.Series, pd.DataFrame]]:
+        """
+        Get the last key and snapshot.
+        """
+        hdbg.dassert_lt(0, len(self), "No snapshot available")
+        key = self._last_key
+        return key, self[key]
+
+    def get_df(
+        self, num_keys: Optional[int] = None, *, value_col: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Get the `num_keys` most recent snapshots as a dataframe.
+
+        The dataframe is indexed by key and has the asset ids as columns. An
+        asset id missing from a snapshot is represented with a NaN. Like for
+        `pd.DataFrame(snapshots).transpose()`, the asset ids are sorted, unless
+        all the snapshots have the same asset ids.
+
+        The returned dataframe can share memory with this object, so it must
+        not be modified in place.
+
+        :param num_keys: number of most recent snapshots to return; if `None`,
+            return all the stored snapshots
+        :param value_col: column of the snapshots to return; required iff the
+            snapshots are dataframes
+        """
+        if self._value_cols is None:
+            hdbg.dassert_is(value_col, None)
+            values = self._values[0]
+        else:
+            hdbg.dassert_in(value_col, self._value_cols)
+            values = self._values[self._value_cols.index(value_col)]
+        start = self._start
+        if num_keys is not None:
+            hdbg.dassert_lte(0, num_keys)
+            start = max(start, self._end - num_keys)
+        index = self._get_index(start, self._end)
+        layout_ids = np.unique(self._layout_ids[start : self._end])
+        if len(layout_ids) == 0:
+            pos = np.array([], dtype=np.int64)
+        elif len(layout_ids) == 1:
+            # All the snapshots have the same layout, so we keep its order.
+            pos = self._layouts[layout_ids[0]]
+        else:
+            # Sort the union of the asset ids.
+            pos = np.unique(
+                np.concatenate([self._layouts[id_] for id_ in layout_ids])
+            )
+            idx = np.argsort(self._get_columns(pos).to_numpy(), kind="stable")
+            pos = pos[idx]
+        columns = self._get_columns(pos)
+        data = values[start : self._end]
+        if not np.array_equal(pos, np.arange(data.shape[1])):
+            data = data[:, pos]
+        # If the snapshots have all the asset ids in order of first appearance,
+        # the dataframe is a view of the storage.
+        df = pd.DataFrame(data, index=index, columns=columns, copy=False)
+        return df
+
+    def _get_columns(self, pos: np.ndarray) -> pd.Index:
+        """
+        Return the asset ids at the array positions `pos`.
+        """
+        return self._columns_index[pos]
+
+    def _get_index(self, start: int, end: int) -> pd.DatetimeIndex:
+        """
+        Return the keys stored in the rows `[start, end)`.
+        """
+        if self._last_key is None:
+            # The timezone is not known before storing the first key.
+            return pd.Index([])
+        index = pd.DatetimeIndex(self._timestamps[start:end].view("M8[ns]"))
+        if self._tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self._tz)
+        return index
+
+    def _get_layout_id(self, index: pd.Index) -> int:
+        """
+        Return the id of the layout of a snapshot with index `index`.
+
+        The asset ids not seen before are added to the storage.
+        """
+        if self._last_index is not None and (
+            index is self._last_index or index.equals(self._last_index)
+        ):
+            return self._last_layout_id
+        if not self._columns:
+            # Use the dtype and the name of the first index.
+            self._columns_index = index[:0]
+        new_columns = [col for col in index if col not in self._column_to_pos]
+        if new_columns:
+            for col in new_columns:
+                self._column_to_pos[col] = len(self._columns)
+                self._columns.append(col)
+            columns_index = self._columns_index.append(
+                pd.Index(new_columns, dtype=index.dtype)
+            )
+            self._columns_index = columns_index.rename(self._columns_index.name)
+            num_rows = self._layout_ids.shape[0]
+            num_new_columns = len(new_columns)
+            self._values = [
+                np.hstack([values, np.full((num_rows, num_new_columns), np.nan)])
+                for values in self._values
+            ]
+        asset_ids = tuple(index)
+        if asset_ids not in self._asset_ids_to_layout_id:
+            pos = np.array(
+                [self._column_to_pos[col] for col in asset_ids], dtype=np.int64
+            )
+            self._asset_ids_to_layout_id[asset_ids] = len(self._layouts)
+            self._layouts.append(pos)
+        layout_id = self._asset_ids_to_layout_id[asset_ids]
+        self._last_index = index
+        self._last_layout_id = layout_id
+        return layout_id
+
+    def _grow(self) -> None:
+        """
+        Make room for a new snapshot at the end of the storage.
+
+        The stored rows are moved to the beginning of the new storage, which
+        doubles the capacity unless at least half of the rows were evicted.
+        """
+        capacity = self._layout_ids.shape[0]
+        num_rows = len(self)
+        if num_rows > capacity // 2:
+            capacity *= 2
+        rows = slice(self._start, self._end)
+
+        def _move(array: np.ndarray, fill_value: Any) -> np.ndarray:
+            new_array = np.full(
+                (capacity,) + array.shape[1:], fill_value, dtype=array.dtype
+            )
+            new_array[:num_rows] = array[rows]
+            return new_array
+
+        self._values = [_move(values, np.nan) for values in self._values]
+        self._layout_ids = _move(self._layout_ids, 0)
+        self._timestamps = _move(self._timestamps, 0)
+        self._offset += self._start
+        self._start = 0
+        self._end = num_rows
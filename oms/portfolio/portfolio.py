@@ -5,7 +5,6 @@ import oms.portfolio.portfolio as oporport
 """
 
 import abc
-import collections
 import logging
 import os
 from typing import Any, Dict, List, Optional, Tuple
@@ -22,6 +21,7 @@ import helpers.hpandas as hpandas
 import helpers.hprint as hprint
 import helpers.hwall_clock_time as hwacltim
 import oms.broker.broker as obrobrok
+import oms.portfolio.columnar_history as opocohis
 
 _LOG = logging.getLogger(__name__)
 
@@ -126,32 +126,30 @@ class Portfolio(abc.ABC, hobject.PrintableMixin):
         # At each call to `mark_to_market()`, we capture `wall_clock_time` and
         # perform a sequence of updates to the following dictionaries.
         self._max_num_bars = max_num_bars
-        # We use `KeySortedOrderedDict` keyed `timestamp` to:
+        # We use `ColumnarHistory` keyed by `timestamp` to:
         # - enforce that inserted new keys are always increasing according to the
         #   key order (i.e., increasing in time)
         # - simplify extracting the last timestamp
-        # We initialize the collection of dictionaries from `holdings_shares_df`.
+        # - store the snapshots in preallocated arrays, so that the historical
+        #   accessors don't need to concatenate the snapshots
+        # We initialize the collection of histories from `holdings_shares_df`.
         # - timestamp to pd.Series of holdings in shares (indexed by asset_id)
         # - this does not include the "cash asset".
-        self._holdings_shares = cksoordi.KeySortedOrderedDict(
-            pd.Timestamp, self._max_num_bars
-        )
+        self._holdings_shares = opocohis.ColumnarHistory(self._max_num_bars)
         # - timestamp to float value of cash
         self._cash = cksoordi.KeySortedOrderedDict(
             pd.Timestamp, self._max_num_bars
         )
         # - timestamp to pd.DataFrame of price, value (indexed by asset_id)
-        self._holdings_notional = cksoordi.KeySortedOrderedDict(
-            pd.Timestamp, self._max_num_bars
+        self._holdings_notional = opocohis.ColumnarHistory(
+            self._max_num_bars, value_cols=Portfolio.PRICE_COLS
         )
         # - timestamp to pd.Series of notional trades (indexed by asset_id)
-        self._executed_trades_notional = cksoordi.KeySortedOrderedDict(
-            pd.Timestamp, self._max_num_bars
+        self._executed_trades_notional = opocohis.ColumnarHistory(
+            self._max_num_bars
         )
         # - timestamp to pd.Series of statistics
-        self._statistics = cksoordi.KeySortedOrderedDict(
-            pd.Timestamp, self._max_num_bars
-        )
+        self._statistics = opocohis.ColumnarHistory(self._max_num_bars)
         # Validate universe and holdings_shares.
         self._retrieve_initial_holdings_shares_from_db = (
             retrieve_initial_holdings_from_db
@@ -422,17 +420,8 @@ class Portfolio(abc.ABC, hobject.PrintableMixin):
         """
         Return whether the Portfolio contains only cash and no holdings_shares.
         """
-        # Get the dictionary of the last holdings_shares, excluding cash.
-        num_periods = 1
-        holdings_shares_odict = self._holdings_shares.get_ordered_dict(
-            num_periods
-        )
-        if _LOG.isEnabledFor(logging.DEBUG):
-            _LOG.debug(hprint.to_str("holdings_shares_odict"))
-        # The
-        hdbg.dassert_isinstance(holdings_shares_odict, dict)
-        hdbg.dassert_eq(len(holdings_shares_odict), 1)
-        timestamp, holdings_srs = holdings_shares_odict.popitem()
+        # Get the last holdings_shares, excluding cash.
+        timestamp, holdings_srs = self._holdings_shares.peek()
         if _LOG.isEnabledFor(logging.DEBUG):
             _LOG.debug(hprint.to_str("timestamp"))
         hdbg.dassert_isinstance(timestamp, pd.Timestamp)
@@ -445,11 +434,7 @@ class Portfolio(abc.ABC, hobject.PrintableMixin):
         """
         Return the last timestamp of Portfolio internal state.
         """
-        num_periods = 1
-        holdings_shares_odict = self._holdings_shares.get_ordered_dict(
-            num_periods
-        )
-        timestamp, _ = holdings_shares_odict.popitem()
+        timestamp, _ = self._holdings_shares.peek()
         return timestamp
 
     # /////////////////////////////////////////////////////////////////////////////
@@ -554,8 +539,7 @@ class Portfolio(abc.ABC, hobject.PrintableMixin):
         """
         Return a dataframe of portfolio statistics over time.
         """
-        stats_odict = self._statistics.get_ordered_dict(num_periods)
-        df = pd.DataFrame(stats_odict).transpose()
+        df = self._statistics.get_df(num_periods)
         # Add `pnl` by diffing the snapshots of `net_wealth`.
         # ```
         # pnl = df["net_wealth"].diff().rename("pnl").to_frame()
@@ -578,12 +562,7 @@ class Portfolio(abc.ABC, hobject.PrintableMixin):
         """
         Return a dataframe of portfolio holdings_shares in shares over time.
         """
-        asset_holdings_shares_odict = self._holdings_shares.get_ordered_dict(
-            num_periods
-        )
-        asset_holdings_shares = pd.DataFrame(
-            asset_holdings_shares_odict
-        ).transpose()
+        asset_holdings_shares = self._holdings_shares.get_df(num_periods)
         # # TODO(gp): @all there is a little repetition that we would like to remove.
         # # Explicitly cast to float. This makes the string representation of
         # # the dataframe more uniform and better.
@@ -599,17 +578,13 @@ class Portfolio(abc.ABC, hobject.PrintableMixin):
         """
         Return a dataframe of portfolio holdings_shares in dollars over time.
         """
-        holdings_notional = collections.OrderedDict()
-        for k, v in self._holdings_notional.get_ordered_dict(num_periods).items():
-            holdings_notional[k] = v["value"]
-        holdings_notional = pd.DataFrame(holdings_notional).transpose()
-        holdings_notional.columns.name = self._asset_id_col
+        holdings_notional = self._holdings_notional.get_df(
+            num_periods, value_col="value"
+        )
         # Explicitly cast to float. This makes the string representation of
         # the dataframe more uniform and better.
-        # We replace NaNs with numpy NaNs, since numpy NaNs are recognized as
-        # having "float" type.
-        holdings_notional.fillna(np.nan, inplace=True)
         holdings_notional = holdings_notional.astype("float")
+        holdings_notional.columns.name = self._asset_id_col
         if _LOG.isEnabledFor(logging.DEBUG):
             _LOG.debug(
                 "holdings_notional=\n%s",
@@ -644,19 +619,13 @@ class Portfolio(abc.ABC, hobject.PrintableMixin):
         """
         Return a dataframe of notional executed trades over time.
         """
-        executed_trades_notional_odict = (
-            self._executed_trades_notional.get_ordered_dict(num_periods)
+        executed_trades_notional = self._executed_trades_notional.get_df(
+            num_periods
         )
-        executed_trades_notional = pd.DataFrame(
-            executed_trades_notional_odict
-        ).transpose()
-        executed_trades_notional.columns.name = self._asset_id_col
         # Explicitly cast to float. This makes the string representation of
         # the dataframe more uniform and better.
-        # We replace NaNs with numpy NaNs, since numpy NaNs are recognized as
-        # having "float" type.
-        executed_trades_notional.fillna(np.nan, inplace=True)
         executed_trades_notional = executed_trades_notional.astype("float")
+        executed_trades_notional.columns.name = self._asset_id_col
         if _LOG.isEnabledFor(logging.DEBUG):
             _LOG.debug(
                 "executed_trades_notional=\n%s",
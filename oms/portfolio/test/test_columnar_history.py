@@ -0,0 +1,83 @@
+import logging
+from typing import List, Optional
+
+import pandas as pd
+
+import helpers.hpandas as hpandas
+import helpers.hunit_test as hunitest
+import oms.portfolio.columnar_history as opocohis
+
+_LOG = logging.getLogger(__name__)
+
+_5mins = pd.Timedelta(minutes=5)
+
+
+# #############################################################################
+# TestColumnarHistory1
+# #############################################################################
+
+
+class TestColumnarHistory1(hunitest.TestCase):
+    @staticmethod
+    def get_history(
+        asset_ids_list: List[List[int]], max_keys: Optional[int] = None
+    ) -> opocohis.ColumnarHistory:
+        """
+        Build a `ColumnarHistory` with a snapshot for each list of asset ids.
+        """
+        history = opocohis.ColumnarHistory(max_keys, initial_capacity=2)
+        timestamp = pd.Timestamp("2000-01-01 09:30:00", tz="America/New_York")
+        for i, asset_ids in enumerate(asset_ids_list):
+            timestamp += _5mins
+            index = pd.Index(asset_ids, dtype="int64", name="asset_id")
+            values = [10.0 * (i + 1) + j for j in range(len(asset_ids))]
+            history[timestamp] = pd.Series(values, index=index, name=timestamp)
+        return history
+
+    def test_get_df1(self) -> None:
+        """
+        Check the dataframe of snapshots with the same asset ids.
+        """
+        history = self.get_history([[202, 101]] * 4)
+        actual = history.get_df(3)
+        expected = r"""
+        asset_id                    202   101
+        2000-01-01 09:40:00-05:00  20.0  21.0
+        2000-01-01 09:45:00-05:00  30.0  31.0
+        2000-01-01 09:50:00-05:00  40.0  41.0
+        """
+        self.assert_equal(
+            hpandas.df_to_str(actual, num_rows=None), expected, fuzzy_match=True
+        )
+
+    def test_get_df2(self) -> None:
+        """
+        Check the dataframe of snapshots with different asset ids.
+        """
+        history = self.get_history([[202], [], [303, 101]], max_keys=2)
+        actual = history.get_df()
+        expected = r"""
+        asset_id                    101  303
+        2000-01-01 09:40:00-05:00   NaN  NaN
+        2000-01-01 09:45:00-05:00  31.0  30.0
+        """
+        self.assert_equal(
+            hpandas.df_to_str(actual, num_rows=None), expected, fuzzy_match=True
+        )
+        self.assertEqual(len(history), 2)
+
+    def test_getitem1(self) -> None:
+        """
+        Check that the snapshots are returned as they were stored.
+        """
+        asset_ids_list = [[202], [303, 101], [], [101, 303]]
+        history = self.get_history(asset_ids_list)
+        timestamps = history.get_df().index
+        self.assertEqual(len(timestamps), len(asset_ids_list))
+        for timestamp, asset_ids in zip(timestamps, asset_ids_list):
+            actual = history[timestamp]
+            self.assertEqual(actual.name, timestamp)
+            self.assertEqual(actual.index.to_list(), asset_ids)
+        timestamp, actual = history.peek()
+        self.assertEqual(timestamp, timestamps[-1])
+        self.assertEqual(actual.to_dict(), {101: 40.0, 303: 41.0})
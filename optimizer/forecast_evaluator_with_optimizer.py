@@ -3,9 +3,12 @@ Import as:
 
 import optimizer.forecast_evaluator_with_optimizer as ofevwiop
 """
+import concurrent.futures
+import functools
 import logging
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from tqdm.autonotebook import tqdm
 
@@ -92,8 +95,20 @@ class ForecastEvaluatorWithOptimizer(dtfmabfoev.AbstractForecastEvaluator):
         burn_in_days: int = 0,
         compute_extended_stats: bool = False,
         asset_id_to_share_decimals: Optional[Dict[int, int]] = None,
+        num_workers: int = 1,
         **kwargs: Dict[str, Any],
     ) -> Dict[str, pd.DataFrame]:
+        """
+        Compute the portfolio optimizing the target holdings bar by bar.
+
+        The bars are split in segments that don't depend on each other, i.e.,
+        days starting with no holdings when holdings are liquidated at the end
+        of the day and trades are reset at the beginning of the day, so that
+        the segments can be computed in parallel and then stitched together.
+        The result doesn't depend on `num_workers`.
+
+        :param num_workers: number of processes computing the segments
+        """
         # Record index in case we reindex the results.
         if reindex_like_input:
             raise NotImplementedError(
@@ -101,114 +116,84 @@ class ForecastEvaluatorWithOptimizer(dtfmabfoev.AbstractForecastEvaluator):
             )
         else:
             idx = None
-        # Prepare to process the DAG df row by row.
-        iter_ = enumerate(df.iterrows())
-        iter_idx = df.index
-        num_rows = df.shape[0]
-        # Track holdings and trades by timestamp.
-        holdings_shares_dict = {}
-        holdings_notional_dict = {}
-        executed_trades_shares_dict = {}
-        executed_trades_notional_dict = {}
-        # Initialize holdings and trades at zero.
+        hdbg.dassert_isinstance(num_workers, int)
+        hdbg.dassert_lte(1, num_workers)
+        # Prepare the per-bar inputs as arrays aligned on the asset ids.
         # TODO(Paul): support non-zero initialization of holdings.
-        initial_timestamp = df.index[0]
         asset_ids = df.columns.levels[1]
-        initial_conditions = pd.Series(0, asset_ids, name=initial_timestamp)
-        holdings_shares_dict[initial_timestamp] = initial_conditions.rename(
-            "holdings_shares"
-        )
-        holdings_notional_dict[initial_timestamp] = initial_conditions.rename(
-            "holdings_notional"
-        )
-        executed_trades_shares_dict[
-            initial_timestamp
-        ] = initial_conditions.rename("executed_trades_shares")
-        executed_trades_notional_dict[
-            initial_timestamp
-        ] = initial_conditions.rename("executed_trades_notional")
+        inputs = {
+            col: df[col].reindex(columns=asset_ids).to_numpy(dtype=float)
+            for col in [
+                self._price_col,
+                self._volatility_col,
+                self._prediction_col,
+            ]
+        }
+        # Mark the bars at the beginning and at the end of each day.
         bod_timestamps = cofinanc.retrieve_beginning_of_day_timestamps(
             df[self._price_col]
         )
+        is_bod = df.index.isin(bod_timestamps["timestamp"])
         eod_timestamps = cofinanc.retrieve_end_of_day_timestamps(
             df[self._price_col]
         )
-        # Process the DAG row by row.
-        for idx, (timestamp, dag_data) in tqdm(iter_, total=num_rows):
-            if idx + 1 < num_rows:
-                next_timestamp = iter_idx[idx + 1]
-            else:
-                next_timestamp = None
-            _LOG.debug(
-                "Processing timestamp=%s; next_timestamp=%s",
-                timestamp,
-                next_timestamp,
-            )
-            next_timestamp_is_eod = False
-            if (
-                next_timestamp is not None
-                and eod_timestamps.loc[next_timestamp.date()].iloc[0]
-                == next_timestamp
-            ):
-                next_timestamp_is_eod = True
-            next_timestamp_is_bod = False
-            if (
-                next_timestamp is not None
-                and bod_timestamps.loc[next_timestamp.date()].iloc[0]
-                == next_timestamp
-            ):
-                next_timestamp_is_bod = True
-            dag_slice = self._extract_and_normalize_slice(dag_data)
-            # Get the holdings in shares corresponding to the current DAG row.
-            holdings_shares = holdings_shares_dict[timestamp]
-            # Compute notional value of current holdings.
-            holdings_notional = self._compute_holdings_notional(
-                dag_slice, holdings_shares
-            )
-            holdings_notional_dict[timestamp] = holdings_notional
-            # Compute the notional value of the trades that executed over the
-            # last bar.
-            executed_trades_shares = executed_trades_shares_dict[timestamp]
-            executed_trades_notional = self._compute_executed_trades_notional(
-                dag_slice, executed_trades_shares
+        is_eod = df.index.isin(eod_timestamps["timestamp"])
+        # Split the bars in segments that can be computed independently.
+        segments = self._get_segments(
+            is_bod,
+            is_eod,
+            liquidate_at_end_of_day,
+            initialize_beginning_of_day_trades_to_zero,
+        )
+        _LOG.debug("Computing %s segments", len(segments))
+        tasks = [
+            (
+                first_row,
+                start_row,
+                {
+                    col: values[first_row:end_row]
+                    for col, values in inputs.items()
+                },
+                is_bod[first_row : end_row + 1],
+                is_eod[first_row : end_row + 1],
+                end_row == df.shape[0],
             )
-            executed_trades_notional_dict[timestamp] = executed_trades_notional
-            # Compute notional value of target holdings.
-            liquidate_holdings = liquidate_at_end_of_day and next_timestamp_is_eod
-            targets_df = self._optimize(
-                dag_slice,
-                holdings_shares,
-                holdings_notional,
-                quantization,
-                asset_id_to_share_decimals,
-                liquidate_holdings,
+            for first_row, start_row, end_row in segments
+        ]
+        compute_segment = functools.partial(
+            self._compute_portfolio_segment,
+            asset_ids=asset_ids,
+            quantization=quantization,
+            asset_id_to_share_decimals=asset_id_to_share_decimals,
+            liquidate_at_end_of_day=liquidate_at_end_of_day,
+            initialize_beginning_of_day_trades_to_zero=initialize_beginning_of_day_trades_to_zero,
+        )
+        if num_workers == 1 or len(tasks) <= 1:
+            results = [compute_segment(task, use_tqdm=True) for task in tasks]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=num_workers
+            ) as executor:
+                results = list(
+                    tqdm(executor.map(compute_segment, tasks), total=len(tasks))
+                )
+        # Stitch the segments together.
+        index = pd.DatetimeIndex(df.index, freq=None)
+        columns = asset_ids.rename(None)
+        (
+            holdings_shares,
+            holdings_notional,
+            executed_trades_shares,
+            executed_trades_notional,
+        ) = [
+            pd.DataFrame(
+                np.concatenate([result[i] for result in results]),
+                index=index,
+                columns=columns,
             )
-            # If the time step is not the last one, set the next-period
-            # share holdings and executed trades in shares (assuming orders
-            # are fully filled).
-            if next_timestamp is not None:
-                if (
-                    next_timestamp_is_bod
-                    and initialize_beginning_of_day_trades_to_zero
-                ):
-                    holdings_shares_dict[next_timestamp] = holdings_shares.rename(
-                        "holdings_shares"
-                    )
-                    executed_trades_shares_dict[next_timestamp] = pd.Series(
-                        0, asset_ids, name="executed_trades_shares"
-                    )
-                else:
-                    holdings_shares_dict[next_timestamp] = targets_df[
-                        "target_holdings_shares"
-                    ].rename("holdings_shares")
-                    executed_trades_shares_dict[next_timestamp] = (
-                        targets_df["target_trades_shares"]
-                    ).rename("executed_trades_shares")
+            for i in range(4)
+        ]
         # Create the portfolio dataframe.
-        holdings_shares = pd.DataFrame(holdings_shares_dict).T
-        holdings_notional = pd.DataFrame(holdings_notional_dict).T
-        executed_trades_shares = pd.DataFrame(executed_trades_shares_dict).T
-        executed_trades_notional = pd.DataFrame(executed_trades_notional_dict).T
         pnl = holdings_notional.subtract(
             holdings_notional.shift(1), fill_value=0
         ).subtract(executed_trades_notional, fill_value=0)
@@ -324,21 +309,138 @@ class ForecastEvaluatorWithOptimizer(dtfmabfoev.AbstractForecastEvaluator):
         _LOG.debug("trimmed df=\n%s", hpandas.df_to_str(df))
         return df
 
-    def _extract_and_normalize_slice(self, df: pd.DataFrame) -> pd.DataFrame:
-        # Extract the required columns from the DAG.
-        dag_slice = df.unstack().T[
-            [self._price_col, self._volatility_col, self._prediction_col]
-        ]
-        # Normalize the DAG slice column names.
-        dag_slice.index.name = "asset_id"
-        dag_slice = dag_slice.rename(
-            columns={
-                self._price_col: "price",
-                self._volatility_col: "volatility",
-                self._prediction_col: "prediction",
-            }
+    @staticmethod
+    def _get_segments(
+        is_bod: np.ndarray,
+        is_eod: np.ndarray,
+        liquidate_at_end_of_day: bool,
+        initialize_beginning_of_day_trades_to_zero: bool,
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Split the bars in segments that can be computed independently.
+
+        A day starts a new segment if its holdings don't depend on the
+        optimizer, i.e., when the previous day has multiple bars, its holdings
+        are liquidated before its last bar and then carried over to the day
+        without trades.
+
+        :return: segments as `(first_row, start_row, end_row)`, where the rows
+            in `[first_row, start_row)` are only needed to compute the holdings
+            at `start_row`, and the rows in `[start_row, end_row)` are the bars
+            of the segment
+        """
+        num_rows = len(is_bod)
+        start_rows = [0]
+        if liquidate_at_end_of_day and initialize_beginning_of_day_trades_to_zero:
+            for row in np.flatnonzero(is_bod):
+                if row >= 2 and is_eod[row - 1] and not is_bod[row - 1]:
+                    start_rows.append(row)
+        start_rows = sorted(set(start_rows))
+        segments = []
+        for i, start_row in enumerate(start_rows):
+            end_row = start_rows[i + 1] if i + 1 < len(start_rows) else num_rows
+            # Start from the bar liquidating the holdings of the previous day.
+            first_row = start_row - 2 if start_row > 0 else 0
+            segments.append((first_row, start_row, end_row))
+        return segments
+
+    def _compute_portfolio_segment(
+        self,
+        task: Tuple[
+            int, int, Dict[str, np.ndarray], np.ndarray, np.ndarray, bool
+        ],
+        *,
+        asset_ids: pd.Index,
+        quantization: Optional[int],
+        asset_id_to_share_decimals: Optional[Dict[int, int]],
+        liquidate_at_end_of_day: bool,
+        initialize_beginning_of_day_trades_to_zero: bool,
+        use_tqdm: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute holdings and trades for the bars of a segment.
+
+        :param task: first row, start row, inputs and beginning / end of day
+            flags of the segment, as built by `_compute_portfolio()`, and
+            whether the segment is the last one
+        :return: holdings and executed trades, in shares and notional, for the
+            bars in `[start_row, end_row)`
+        """
+        first_row, start_row, inputs, is_bod, is_eod, is_last = task
+        num_rows = inputs[self._price_col].shape[0]
+        asset_index = asset_ids.rename("asset_id")
+        # Initialize holdings and trades at zero. If the segment doesn't start
+        # at the first bar, the holdings of the first bars are liquidated and
+        # their trades are discarded.
+        holdings_shares = pd.Series(0.0, asset_ids, name="holdings_shares")
+        executed_trades_shares = pd.Series(
+            0.0, asset_ids, name="executed_trades_shares"
+        )
+        results: Tuple[List[np.ndarray], ...] = ([], [], [], [])
+        iter_ = range(num_rows)
+        if use_tqdm:
+            iter_ = tqdm(iter_, total=num_rows)
+        for row in iter_:
+            dag_slice = pd.DataFrame(
+                {
+                    "price": inputs[self._price_col][row],
+                    "volatility": inputs[self._volatility_col][row],
+                    "prediction": inputs[self._prediction_col][row],
+                },
+                index=asset_index,
+            )
+            # Compute notional value of current holdings.
+            holdings_notional = self._compute_holdings_notional(
+                dag_slice, holdings_shares
+            )
+            # Compute the notional value of the trades that executed over the
+            # last bar.
+            executed_trades_notional = self._compute_executed_trades_notional(
+                dag_slice, executed_trades_shares
+            )
+            if first_row + row >= start_row:
+                for values, srs in zip(
+                    results,
+                    [
+                        holdings_shares,
+                        holdings_notional,
+                        executed_trades_shares,
+                        executed_trades_notional,
+                    ],
+                ):
+                    values.append(srs.reindex(asset_ids).to_numpy(dtype=float))
+            has_next = row + 1 < num_rows or not is_last
+            if not has_next:
+                break
+            if is_bod[row + 1] and initialize_beginning_of_day_trades_to_zero:
+                # The targets are not used, so there is no need to optimize.
+                executed_trades_shares = pd.Series(
+                    0.0, asset_ids, name="executed_trades_shares"
+                )
+                continue
+            # Compute the target holdings and set the next-period share
+            # holdings and executed trades in shares (assuming orders are
+            # fully filled).
+            liquidate_holdings = liquidate_at_end_of_day and is_eod[row + 1]
+            targets_df = self._optimize(
+                dag_slice,
+                holdings_shares,
+                holdings_notional,
+                quantization,
+                asset_id_to_share_decimals,
+                liquidate_holdings,
+            )
+            holdings_shares = targets_df["target_holdings_shares"].rename(
+                "holdings_shares"
+            )
+            executed_trades_shares = targets_df["target_trades_shares"].rename(
+                "executed_trades_shares"
+            )
+        num_assets = len(asset_ids)
+        arrays = tuple(
+            np.array(values).reshape(-1, num_assets) for values in results
         )
-        return dag_slice
+        return arrays
 
     def _apply_burn_in_and_reindex(
         self,
@@ -4,7 +4,9 @@ Import as:
 import optimizer.single_period_optimization as osipeopt
 """
 
+import collections
 import logging
+import threading
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
@@ -44,6 +46,70 @@ def optimize(
     return output_df
 
 
+class _ParameterizedProblem:
+    """
+    Store a cvx problem together with its variables and parameters.
+    """
+
+    def __init__(
+        self,
+        problem: cvx.Problem,
+        target_weights: cvx.Expression,
+        target_weight_diffs: cvx.Variable,
+        current_weights: cvx.Parameter,
+        predictions: cvx.Parameter,
+        current_predicted_return: cvx.Parameter,
+        volatility: cvx.Parameter,
+        volatility_weighted_current_weights: cvx.Parameter,
+    ) -> None:
+        self.problem = problem
+        self.target_weights = target_weights
+        self.target_weight_diffs = target_weight_diffs
+        self.current_weights = current_weights
+        self.predictions = predictions
+        self.current_predicted_return = current_predicted_return
+        self.volatility = volatility
+        self.volatility_weighted_current_weights = (
+            volatility_weighted_current_weights
+        )
+        # A problem stores its data and its solution in its parameters and
+        # variables, so it can't be solved by multiple threads at the same
+        # time.
+        self.lock = threading.Lock()
+
+    def set_data(
+        self,
+        current_weights: np.ndarray,
+        predictions: np.ndarray,
+        volatility: np.ndarray,
+    ) -> None:
+        """
+        Set the values of the parameters.
+
+        The products of the data are computed here, since in cvxpy a product
+        of two parameters doesn't follow the DPP rules.
+        """
+        self.current_weights.value = current_weights
+        self.predictions.value = predictions
+        self.current_predicted_return.value = predictions @ current_weights
+        self.volatility.value = volatility
+        self.volatility_weighted_current_weights.value = (
+            volatility * current_weights
+        )
+
+
+# Cache of the problems built by `SinglePeriodOptimizer`, so that the problem is
+# compiled by cvxpy only when the config, the universe, or the restrictions
+# change, and not at every bar.
+_PROBLEM_CACHE: "collections.OrderedDict[Tuple, _ParameterizedProblem]" = (
+    collections.OrderedDict()
+)
+_PROBLEM_CACHE_SIZE = 8
+# The lock protects only the cache, while each problem has its own lock, so
+# that different problems can be solved at the same time.
+_PROBLEM_CACHE_LOCK = threading.Lock()
+
+
 class SinglePeriodOptimizer:
     def __init__(
         self,
@@ -88,14 +154,18 @@ class SinglePeriodOptimizer:
         self._asset_ids = self._df["asset_id"]
         self._n_assets = df.shape[0]
         holdings_notional = self._df["holdings_notional"]
-        _LOG.debug("holdings_notional=\n%s", hpandas.df_to_str(holdings_notional))
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug(
+                "holdings_notional=\n%s", hpandas.df_to_str(holdings_notional)
+            )
         self._gmv = holdings_notional.abs().sum()
         self._current_weights = (
             holdings_notional * self._n_assets / self._target_gmv
         )
-        _LOG.debug(
-            "current_weights=\n%s", hpandas.df_to_str(self._current_weights)
-        )
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug(
+                "current_weights=\n%s", hpandas.df_to_str(self._current_weights)
+            )
         # We pass "solver" as a string to avoid propagating `cvx` dependencies.
         if "solver" in config_dict:
             solver = config_dict["solver"]
@@ -130,20 +200,23 @@ class SinglePeriodOptimizer:
             # Compute optimal weights.
             target_weights, target_weight_diffs = self._optimize_weights()
             target_weights = pd.Series(
-                data=target_weights.value,
+                data=target_weights,
                 index=self._asset_ids,
                 name="target_weights",
             )
             target_weight_diffs = pd.Series(
-                data=target_weight_diffs.value,
+                data=target_weight_diffs,
                 index=self._asset_ids,
                 name="target_weight_diffs",
             )
-            _LOG.debug(
-                "target_weight_diffs=\n%s", hpandas.df_to_str(target_weight_diffs)
-            )
+            if _LOG.isEnabledFor(logging.DEBUG):
+                _LOG.debug(
+                    "target_weight_diffs=\n%s",
+                    hpandas.df_to_str(target_weight_diffs),
+                )
             _ = target_weight_diffs
-        _LOG.debug("target_weights=\n%s", hpandas.df_to_str(target_weights))
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug("target_weights=\n%s", hpandas.df_to_str(target_weights))
         # Convert target weights to target notional holdings.
         rescaling = self._target_gmv / self._n_assets
         _LOG.debug("rescaling factor=%f", rescaling)
@@ -262,28 +335,88 @@ class SinglePeriodOptimizer:
         for col in restriction_cols:
             hpandas.dassert_series_type_is(df[col], np.bool_)
 
-    def _optimize_weights(self) -> Tuple[cvx.Variable, cvx.Variable]:
+    def _optimize_weights(self) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Create and solve the cvx optimization problem.
+        Solve the cvx optimization problem.
+
+        The problem is built once for a given config, universe and set of
+        restrictions, and then re-solved with warm start at each call, updating
+        only the values of its parameters.
 
         :return: target weights and weight diffs (from current weights),
             normalized by current GMV.
         """
-        # Determine the current GMV and GMV-normalized weights.
+        do_not_buy, do_not_sell = self._get_restriction_masks()
+        key = (
+            str(sorted(self._config_dict.items())),
+            tuple(self._asset_ids),
+            tuple(do_not_buy),
+            tuple(do_not_sell),
+        )
+        with _PROBLEM_CACHE_LOCK:
+            if key in _PROBLEM_CACHE:
+                _PROBLEM_CACHE.move_to_end(key)
+                problem = _PROBLEM_CACHE[key]
+            else:
+                _LOG.debug("Building the cvx problem for key=%s", key)
+                problem = self._build_problem(do_not_buy, do_not_sell)
+                _PROBLEM_CACHE[key] = problem
+                if len(_PROBLEM_CACHE) > _PROBLEM_CACHE_SIZE:
+                    _PROBLEM_CACHE.popitem(last=False)
+        with problem.lock:
+            # Update the data of the problem.
+            current_weights = self._current_weights.to_numpy()
+            _LOG.debug("current_weights=\n%s", current_weights)
+            predictions = self._df["prediction"] * self._df["volatility"]
+            problem.set_data(
+                current_weights,
+                predictions.to_numpy(),
+                self._df["volatility"].to_numpy(),
+            )
+            # Optimize.
+            # The solvers that support warm start (e.g., OSQP) start from the
+            # previous solution, so the solution is equal to the one of a new
+            # problem only up to the tolerance of the solver. Other solvers
+            # (e.g., ECOS) ignore it.
+            optimal_value = problem.problem.solve(
+                self._solver, verbose=self._verbose, warm_start=True
+            )
+            if problem.problem.status != "optimal":
+                _LOG.warning("problem.status=%s", problem.problem.status)
+            _LOG.debug("`optimal_value`=%0.2f", optimal_value)
+            # Copy the solution, since the variables are overwritten by the
+            # next solve.
+            target_weights = problem.target_weights.value.copy()
+            target_weight_diffs = problem.target_weight_diffs.value.copy()
+        # TODO(Paul): Compute estimates for PnL, costs.
+        return target_weights, target_weight_diffs
+
+    def _build_problem(
+        self, do_not_buy: np.ndarray, do_not_sell: np.ndarray
+    ) -> _ParameterizedProblem:
+        """
+        Create the cvx optimization problem with the data as parameters.
+        """
+        current_weights = cvx.Parameter(self._n_assets)
+        predictions = cvx.Parameter(self._n_assets)
+        current_predicted_return = cvx.Parameter()
+        volatility = cvx.Parameter(self._n_assets, nonneg=True)
+        volatility_weighted_current_weights = cvx.Parameter(self._n_assets)
         # Create a placeholder for (current) GMV-normalized weight adjustments.
+        # The target weights are an expression and not another variable, so
+        # that the problem passed to the solver is the same as when the data
+        # are constants.
         target_weight_diffs = cvx.Variable(self._n_assets)
-        current_weights = self._current_weights.to_numpy()
-        _LOG.debug("current_weights=\n%s", current_weights)
         target_weights = current_weights + target_weight_diffs
         # Create a placeholder for predicted returns (to maximize subject to
         # constraints).
-        predictions = self._df["prediction"] * self._df["volatility"]
-        predicted_returns = cvx.multiply(predictions.values, target_weights)
-        mu = cvx.sum(predicted_returns)
+        mu = predictions @ target_weight_diffs + current_predicted_return
         hdbg.dassert(mu.is_concave())
         # Get constraints.
-        soft_constraints = self._get_soft_constraints()
-        hard_constraints = self._get_hard_constraints()
+        soft_constraints = self._get_soft_constraints(
+            volatility, volatility_weighted_current_weights
+        )
+        hard_constraints = self._get_hard_constraints(do_not_buy, do_not_sell)
         # Convert constraints into cvxpy expressions.
         soft_constraint_cvx_expr = [
             constraint.get_expr(
@@ -302,18 +435,25 @@ class SinglePeriodOptimizer:
             cvx.Maximize(mu - sum(soft_constraint_cvx_expr)),
             hard_constraint_cvx_expr,
         )
-        # Optimize.
-        optimal_value = problem.solve(self._solver, verbose=self._verbose)
-        if problem.status != "optimal":
-            _LOG.warning("problem.status=%s", problem.status)
-        _LOG.debug("`optimal_value`=%0.2f", optimal_value)
-        # TODO(Paul): Compute estimates for PnL, costs.
-        return target_weights, target_weight_diffs
+        hdbg.dassert(problem.is_dpp())
+        return _ParameterizedProblem(
+            problem,
+            target_weights,
+            target_weight_diffs,
+            current_weights,
+            predictions,
+            current_predicted_return,
+            volatility,
+            volatility_weighted_current_weights,
+        )
 
-    def _get_soft_constraints(self) -> List[opbase.Expression]:
+    def _get_soft_constraints(
+        self,
+        volatility: cvx.Parameter,
+        volatility_weighted_current_weights: cvx.Parameter,
+    ) -> List[opbase.Expression]:
         # Create soft constraints
         soft_constraints = []
-        volatility = self._df["volatility"]
         # Maybe add constant correlation risk constraint.
         if "constant_correlation" in self._config_dict:
             constant_correlation = self._config_dict["constant_correlation"]
@@ -324,6 +464,7 @@ class SinglePeriodOptimizer:
                 constant_correlation,
                 volatility,
                 constant_correlation_penalty,
+                volatility_weighted_current_weights=volatility_weighted_current_weights,
             )
             soft_constraints.append(constant_correlation_risk)
         # Add GMV constraint.
@@ -349,7 +490,9 @@ class SinglePeriodOptimizer:
         soft_constraints.append(transaction_cost_penalty)
         return soft_constraints
 
-    def _get_hard_constraints(self) -> List[opbase.Expression]:
+    def _get_hard_constraints(
+        self, do_not_buy: np.ndarray, do_not_sell: np.ndarray
+    ) -> List[opbase.Expression]:
         # Create hard constraints.
         hard_constraints = []
         # Add target GMV hard constraint.
@@ -363,28 +506,47 @@ class SinglePeriodOptimizer:
             self._relative_holding_max_frac_of_gmv
         )
         hard_constraints.append(relative_holding_constraint)
-        if self._restrictions is not None:
-            restriction_constraints = self._get_restriction_constraints()
-            if restriction_constraints:
-                hard_constraints.extend(restriction_constraints)
+        restriction_constraints = self._get_restriction_constraints(
+            do_not_buy, do_not_sell
+        )
+        if restriction_constraints:
+            hard_constraints.extend(restriction_constraints)
         return hard_constraints
 
-    def _get_restriction_constraints(self) -> List[opbase.Expression]:
-        constraints = []
+    def _get_restriction_masks(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the assets that cannot be bought and sold given the restrictions.
+
+        :return: boolean arrays aligned with the assets
+        """
+        if self._restrictions is None:
+            no_restrictions = np.zeros(self._n_assets, dtype=bool)
+            return no_restrictions, no_restrictions
         df = self._df.merge(self._restrictions, how="left", on="asset_id").fillna(
             False
         )
         do_not_buy = ((df["holdings_shares"] >= 0) & df["is_buy_restricted"]) | (
             (df["holdings_shares"] < 0) & df["is_buy_cover_restricted"]
         )
-        if do_not_buy.any():
-            do_not_buy_constraint = oharcons.DoNotBuyHardConstraint(do_not_buy)
-            constraints.append(do_not_buy_constraint)
         do_not_sell = (
             (df["holdings_shares"] > 0) & df["is_sell_long_restricted"]
         ) | ((df["holdings_shares"] <= 0) & df["is_sell_short_restricted"])
+        return do_not_buy.to_numpy(dtype=bool), do_not_sell.to_numpy(dtype=bool)
+
+    @staticmethod
+    def _get_restriction_constraints(
+        do_not_buy: np.ndarray, do_not_sell: np.ndarray
+    ) -> List[opbase.Expression]:
+        constraints = []
+        if do_not_buy.any():
+            do_not_buy_constraint = oharcons.DoNotBuyHardConstraint(
+                pd.Series(do_not_buy)
+            )
+            constraints.append(do_not_buy_constraint)
         if do_not_sell.any():
-            do_not_sell_constraint = oharcons.DoNotSellHardConstraint(do_not_sell)
+            do_not_sell_constraint = oharcons.DoNotSellHardConstraint(
+                pd.Series(do_not_sell)
+            )
             constraints.append(do_not_sell_constraint)
         # Note: it is possible for this list to be empty.
         return constraints
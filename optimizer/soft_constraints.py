@@ -6,7 +6,9 @@ import optimizer.soft_constraints as osofcons
 
 import abc
 import logging
+from typing import Optional, Union
 
+import numpy as np
 import pandas as pd
 
 import helpers.hdbg as hdbg
@@ -22,6 +24,21 @@ cvx = pytest.importorskip("cvxpy")
 _LOG = logging.getLogger(__name__)
 
 
+def _get_values(
+    data: Union[pd.Series, cvx.Parameter]
+) -> Union[np.ndarray, cvx.Parameter]:
+    """
+    Return the values of a series, or a `cvx.Parameter` as it is.
+
+    Passing a `cvx.Parameter` allows to build the cost once and re-solve the
+    problem with new data by updating the value of the parameter.
+    """
+    if isinstance(data, pd.Series):
+        return data.values
+    hdbg.dassert_isinstance(data, cvx.Parameter)
+    return data
+
+
 # #############################################################################
 # Class and builder for objective function costs.
 # #############################################################################
@@ -37,14 +54,18 @@ class SoftConstraint(abc.ABC):
         Initialize the Lagrange multiplier to 1.0.
         """
         hdbg.dassert_lte(0, gamma)
-        self.gamma = cvx.Parameter(nonneg=True, value=gamma)
+        # The multiplier is a constant and not a `cvx.Parameter`, since the
+        # product of two parameters (e.g., the multiplier and the volatility)
+        # doesn't follow the DPP rules and would make cvxpy recompile the
+        # problem at every solve.
+        self.gamma = gamma
         self.expr = None
 
     def __mul__(self, other):
         """
         Scale the cost by the constant.
         """
-        self.gamma.value *= other
+        self.gamma *= other
         return self
 
     def __rmul__(self, other):
@@ -109,21 +130,56 @@ class ConstantCorrelationRiskModel(SoftConstraint):
     """
 
     def __init__(
-        self, correlation: float, volatility: pd.Series, gamma: float = 1.0
+        self,
+        correlation: float,
+        volatility: Union[pd.Series, cvx.Parameter],
+        gamma: float = 1.0,
+        *,
+        volatility_weighted_current_weights: Optional[cvx.Parameter] = None,
     ) -> None:
+        """
+        Constructor.
+
+        :param volatility_weighted_current_weights: product of the current
+            weights and of the volatility, required when `volatility` is a
+            `cvx.Parameter`, since the target weights already depend on the
+            current weights and a product of two parameters is not DPP
+        """
+        if isinstance(volatility, cvx.Parameter):
+            hdbg.dassert_isinstance(
+                volatility_weighted_current_weights, cvx.Parameter
+            )
+        else:
+            hdbg.dassert_is(volatility_weighted_current_weights, None)
         self._correlation = correlation
         self._volatility = volatility
+        self._volatility_weighted_current_weights = (
+            volatility_weighted_current_weights
+        )
         super().__init__(gamma)
 
     def _estimate(self, target_weights, target_weight_diffs, gmv) -> opbase.EXPR:
-        _ = target_weight_diffs
         _ = gmv
-        expr1 = (1 - self._correlation) * cvx.sum_squares(
-            cvx.multiply(target_weights, self._volatility.values)
-        )
-        expr2 = self._correlation * cvx.power(
-            target_weights @ self._volatility.values, 2
-        )
+        if self._volatility_weighted_current_weights is None:
+            _ = target_weight_diffs
+            volatility = self._volatility.values
+            expr1 = (1 - self._correlation) * cvx.sum_squares(
+                cvx.multiply(target_weights, volatility)
+            )
+            expr2 = self._correlation * cvx.power(target_weights @ volatility, 2)
+        else:
+            _ = target_weights
+            # Use `target_weights = current_weights + target_weight_diffs`.
+            volatility_weighted_target_weights = (
+                self._volatility_weighted_current_weights
+                + cvx.multiply(target_weight_diffs, self._volatility)
+            )
+            expr1 = (1 - self._correlation) * cvx.sum_squares(
+                volatility_weighted_target_weights
+            )
+            expr2 = self._correlation * cvx.power(
+                cvx.sum(volatility_weighted_target_weights), 2
+            )
         expr = expr1 + expr2
         return expr
 
@@ -148,15 +204,18 @@ class SpreadCost(SoftConstraint):
 
 
 class TransactionCost(SoftConstraint):
-    def __init__(self, volatility: pd.Series, gamma: float = 1.0) -> None:
-        hdbg.dassert_isinstance(volatility, pd.Series)
+    def __init__(
+        self, volatility: Union[pd.Series, cvx.Parameter], gamma: float = 1.0
+    ) -> None:
+        hdbg.dassert_isinstance(volatility, (pd.Series, cvx.Parameter))
         self._volatility = volatility
         super().__init__(gamma)
 
     def _estimate(self, target_weights, target_weight_diffs, gmv) -> opbase.EXPR:
         _ = target_weights
         _ = gmv
-        expr = self._volatility.values @ cvx.abs(target_weight_diffs).T
+        volatility = _get_values(self._volatility)
+        expr = volatility @ cvx.abs(target_weight_diffs).T
         return expr
 
 
@@ -399,3 +399,27 @@ class TestForecastEvaluatorWithOptimizer2(hunitest.TestCase):
 2022-01-05 16:00:00-05:00 -36.72     100280.69      124.56       0.00    0.00
 """
         self.assert_equal(actual, expected, fuzzy_match=True)
+
+    def test_num_workers1(self) -> None:
+        """
+        Check that computing the days in parallel gives the serial result.
+        """
+        data = self.get_data(
+            pd.Timestamp("2022-01-03 09:30:00", tz="America/New_York"),
+            pd.Timestamp("2022-01-05 16:00:00", tz="America/New_York"),
+            asset_ids=[101, 201, 301],
+        )
+        config_dict = self.get_config_dict()
+        forecast_evaluator = ofevwiop.ForecastEvaluatorWithOptimizer(
+            price_col="price",
+            volatility_col="volatility",
+            prediction_col="prediction",
+            optimizer_config_dict=config_dict,
+        )
+        expected = forecast_evaluator.compute_portfolio(data, quantization=0)
+        actual = forecast_evaluator.compute_portfolio(
+            data, quantization=0, num_workers=2
+        )
+        self.assertEqual(actual.keys(), expected.keys())
+        for key, df in expected.items():
+            pd.testing.assert_frame_equal(actual[key], df, check_exact=True)
@@ -357,3 +357,77 @@ class TestSinglePeriodOptimizer1(hunitest.TestCase):
         """
         # pylint: enable=line-too-long
         self.assert_equal(actual, expected, fuzzy_match=True)
+
+    def test_reuse_problem(self) -> None:
+        """
+        Check that re-solving a cached problem with new data matches solving a
+        newly built problem.
+        """
+        dict_ = {
+            "dollar_neutrality_penalty": 0.1,
+            "constant_correlation": 0.5,
+            "constant_correlation_penalty": 0.25,
+            "relative_holding_penalty": 0.0,
+            "relative_holding_max_frac_of_gmv": 1.0,
+            "target_gmv": 3000,
+            "target_gmv_upper_bound_penalty": 0.0,
+            "target_gmv_hard_upper_bound_multiple": 1.01,
+            "transaction_cost_penalty": 0.1,
+        }
+        df1 = self.get_prediction_df()
+        df2 = df1.copy()
+        df2["holdings_shares"] = [-200, 1800, 400]
+        df2["holdings_notional"] = df2["holdings_shares"] * df2["price"]
+        df2["prediction"] = [0.02, -0.04, 0.06]
+        restrictions = None
+        quantization = 0
+        asset_id_to_share_decimals = None
+        precision = 2
+        args = (restrictions, quantization, asset_id_to_share_decimals, precision)
+        # Solve newly built problems.
+        osipeopt._PROBLEM_CACHE.clear()
+        expected1 = _run_optimizer(dict_, df1, *args)
+        osipeopt._PROBLEM_CACHE.clear()
+        expected2 = _run_optimizer(dict_, df2, *args)
+        # Solve the same problem with different data.
+        actual2 = _run_optimizer(dict_, df2, *args)
+        actual1 = _run_optimizer(dict_, df1, *args)
+        self.assertEqual(len(osipeopt._PROBLEM_CACHE), 1)
+        self.assert_equal(actual1, expected1)
+        self.assert_equal(actual2, expected2)
+
+    def test_reuse_problem_osqp(self) -> None:
+        """
+        Check that re-solving a cached problem with warm start matches solving
+        a newly built problem up to the tolerance of the solver.
+        """
+        dict_ = {
+            "dollar_neutrality_penalty": 0.1,
+            "constant_correlation": 0.5,
+            "constant_correlation_penalty": 0.25,
+            "relative_holding_penalty": 0.0,
+            "relative_holding_max_frac_of_gmv": 1.0,
+            "target_gmv": 3000,
+            "target_gmv_upper_bound_penalty": 0.0,
+            "target_gmv_hard_upper_bound_multiple": 1.01,
+            "transaction_cost_penalty": 0.1,
+            "solver": "OSQP",
+        }
+        df1 = self.get_prediction_df()
+        df2 = df1.copy()
+        df2["holdings_shares"] = [-200, 1800, 400]
+        df2["holdings_notional"] = df2["holdings_shares"] * df2["price"]
+        df2["prediction"] = [0.02, -0.04, 0.06]
+        # Solve newly built problems.
+        osipeopt._PROBLEM_CACHE.clear()
+        expected1 = osipeopt.SinglePeriodOptimizer(dict_, df1).optimize()
+        osipeopt._PROBLEM_CACHE.clear()
+        expected2 = osipeopt.SinglePeriodOptimizer(dict_, df2).optimize()
+        # Solve the same problem with different data, starting from the
+        # previous solution.
+        actual2 = osipeopt.SinglePeriodOptimizer(dict_, df2).optimize()
+        actual1 = osipeopt.SinglePeriodOptimizer(dict_, df1).optimize()
+        self.assertEqual(len(osipeopt._PROBLEM_CACHE), 1)
+        # The solutions are equal up to 1 dollar for a GMV of 3000 dollars.
+        pd.testing.assert_frame_equal(actual1, expected1, rtol=0, atol=1.0)
+        pd.testing.assert_frame_equal(actual2, expected2, rtol=0, atol=1.0)